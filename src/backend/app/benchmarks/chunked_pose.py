@@ -0,0 +1,118 @@
+
+
+#
+# Single-clip pose estimation latency versus chunk worker count, and
+# how far the stitched landmarks drift from a single-chunk run.
+#
+# backend/app> python -m benchmarks.chunked_pose --video swing.mp4 --workers 1 2 4 8
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import multiprocessing
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures                  import ProcessPoolExecutor
+from   swing_analysis_classes.chunked_pose import estimate_chunk, estimate_chunked
+from   swing_analysis_classes.model_tier   import MODEL_TIERS
+from   swing_analysis_classes.pose_track   import PoseTrack, VISIBILITY_THRESHOLD
+from   video.decoder                       import open_decoder
+from   typing                              import List
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: drift
+#
+#   DESCRIPTION:
+#       Mean absolute landmark difference (normalized image units)
+#       between two tracks over landmarks observed in both.
+#
+# ---------------------------------------------------------------------
+def drift( track: PoseTrack, reference: PoseTrack ) -> float:
+    n    = min( track.n_frames, reference.n_frames )
+    seen = ( track.visibility[ :n ] > VISIBILITY_THRESHOLD ) & ( reference.visibility[ :n ] > VISIBILITY_THRESHOLD )
+    if not seen.any():
+        return float( "nan" )
+    return float( np.abs( track.xy[ :n ] - reference.xy[ :n ] )[ seen ].mean() )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark chunk-parallel pose estimation." )
+    parser.add_argument( "--video", required=True, help="Clip to analyze." )
+    parser.add_argument( "--workers", nargs="+", type=int, default=[ 1, 2, 4 ], help="Worker counts to compare." )
+    parser.add_argument( "--tier", choices=list( MODEL_TIERS ), default="full", help="Pose model tier." )
+    parser.add_argument( "--repeats", type=int, default=3, help="Timed runs per worker count." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args = parse_args( sys.argv[ 1: ] )
+    with open_decoder( args.video ) as decoder:
+        n_frames = decoder.frame_count or None
+
+    print( f"cpus: { os.cpu_count() }  frames: { n_frames }" )
+    print( f"{ 'workers':>7}  { 'median s':>8}  { 'speedup':>7}  { 'fps':>7}  { 'drift':>8}" )
+
+    reference = None
+    baseline  = None
+    for workers in args.workers:
+
+        # -------------------------------------------------------------
+        # A fresh pool per worker count. One untimed chunk per worker
+        # builds the pose graphs first.
+        # -------------------------------------------------------------
+        pool = ProcessPoolExecutor( max_workers=workers, mp_context=multiprocessing.get_context( "spawn" ) )
+        warm = [ pool.submit( estimate_chunk, args.video, 0, 1, MODEL_TIERS[ args.tier ] ) for _ in range( workers ) ]
+        for future in warm:
+            future.result()
+
+        latencies = []
+        for _ in range( args.repeats ):
+            start    = time.perf_counter()
+            track, _ = estimate_chunked( args.video, 0, n_frames, workers, model_complexity=MODEL_TIERS[ args.tier ], pool=pool )
+            latencies.append( time.perf_counter() - start )
+        pool.shutdown()
+
+        latency   = float( np.median( latencies ) )
+        reference = reference or track
+        baseline  = baseline or latency
+        print(
+            f"{ workers:>7}  { latency:>8.3f}  { baseline / latency:>7.2f}  "
+            f"{ track.n_frames / latency:>7.1f}  { drift( track, reference ):>8.4f}"
+        )
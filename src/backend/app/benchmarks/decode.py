@@ -0,0 +1,122 @@
+
+
+#
+# Decode-only throughput for each decoder backend, thread count and
+# output format, against the previous VideoCapture + cvtColor path.
+#
+# backend/app> python -m benchmarks.decode --video swing_hevc.mov
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import cv2
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   video.decoder import av, open_decoder
+from   typing        import List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# ( pixel format, output width ) combinations to time. None keeps the
+# source size.
+# ---------------------------------------------------------------------
+OUTPUT_MODES: List[ Tuple[ str, Optional[ int ] ] ] = [
+    ( "bgr", None ),
+    ( "rgb", None ),
+    ( "rgb", 640 ),
+    ( "gray", 64 ),
+]
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: time_legacy
+#
+#   DESCRIPTION:
+#       Frames per second of the previous path: default VideoCapture
+#       followed by a separate BGR -> RGB conversion.
+#
+# ---------------------------------------------------------------------
+def time_legacy( path: str ) -> float:
+    cap     = cv2.VideoCapture( path )
+    count   = 0
+    start   = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cv2.cvtColor( frame, cv2.COLOR_BGR2RGB )
+        count += 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+    return count / elapsed
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: time_decoder
+#
+#   DESCRIPTION:
+#       Frames per second of one decoder configuration.
+#
+# ---------------------------------------------------------------------
+def time_decoder( path: str, backend: str, threads: int, pixel_format: str, width: Optional[ int ] ) -> float:
+    count = 0
+    start = time.perf_counter()
+    with open_decoder( path, backend=backend, threads=threads, pixel_format=pixel_format, width=width ) as decoder:
+        for _ in decoder:
+            count += 1
+    return count / ( time.perf_counter() - start )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark video decoding." )
+    parser.add_argument( "--video", required=True, help="Clip to decode." )
+    parser.add_argument( "--threads", type=int, nargs="+", default=[ 0, 1, 2, 4 ], help="Decode thread counts (0 = auto)." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args     = parse_args( sys.argv[ 1: ] )
+    backends = [ "opencv" ] + ( [ "pyav" ] if av is not None else [] )
+
+    print( f"{ 'legacy (VideoCapture + cvtColor)':<34} { time_legacy( args.video ):>8.1f} fps" )
+    for backend in backends:
+        for threads in args.threads:
+            for pixel_format, width in OUTPUT_MODES:
+                label = f"{ backend } threads={ threads } { pixel_format }@{ width or 'source' }"
+                fps   = time_decoder( args.video, backend, threads, pixel_format, width )
+                print( f"{ label:<34} { fps:>8.1f} fps" )
@@ -0,0 +1,167 @@
+
+
+#
+# Pose inference throughput at 1, 4 and 16 concurrent clips, comparing
+# one pose graph per request with the shared inference server (pooled
+# graphs on a fixed set of inference threads).
+#
+# backend/app> python -m benchmarks.inference_server --video swing.mp4
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import cv2
+import os
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   mediapipe.python.solutions              import pose as mp_pose_module
+from   swing_analysis_classes.inference_server import InferenceServer
+from   swing_analysis_classes.tracking         import MIN_DETECTION_CONFIDENCE, TRACKER_MIN_CONFIDENCE, TrackingScheduler
+from   typing                                  import Callable, List
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+CONCURRENCY_LEVELS = [ 1, 4, 16 ]
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: load_frames
+#
+#   DESCRIPTION:
+#       Decode up to max_frames RGB frames once, so the benchmark
+#       measures inference rather than decoding.
+#
+# ---------------------------------------------------------------------
+def load_frames( path: str, max_frames: int ) -> List:
+    cap    = cv2.VideoCapture( path )
+    frames = []
+    while len( frames ) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append( cv2.cvtColor( frame, cv2.COLOR_BGR2RGB ) )
+    cap.release()
+    if not frames:
+        raise SystemExit( f"Could not read frames from { path }" )
+    return frames
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: run_concurrently
+#
+#   DESCRIPTION:
+#       Run one clip per thread and return the wall time in seconds.
+#
+# ---------------------------------------------------------------------
+def run_concurrently( n_clips: int, run_clip: Callable[ [], None ] ) -> float:
+    threads = [ threading.Thread( target=run_clip ) for _ in range( n_clips ) ]
+    start   = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: per_request_clip
+#
+#   DESCRIPTION:
+#       Baseline: the clip builds its own pose graph and runs every
+#       frame through it, as PoseEstimation does without a server.
+#
+# ---------------------------------------------------------------------
+def per_request_clip( frames: List ) -> None:
+    with mp_pose_module.Pose(
+        static_image_mode=False,
+        model_complexity=1,
+        smooth_landmarks=True,
+        enable_segmentation=False,
+        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+        min_tracking_confidence=TRACKER_MIN_CONFIDENCE
+    ) as pose_obj:
+        tracker = TrackingScheduler( pose_obj )
+        for frame in frames:
+            tracker.process( frame )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: server_clip
+#
+#   DESCRIPTION:
+#       The clip submits every frame to the shared inference server and
+#       waits for them to run.
+#
+# ---------------------------------------------------------------------
+def server_clip( server: InferenceServer, frames: List ) -> None:
+    session = server.open_clip()
+    for frame_idx, frame in enumerate( frames ):
+        server.submit( session, frame_idx, frame )
+    server.close_clip( session )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark pose inference throughput under concurrent clips." )
+    parser.add_argument( "--video", required=True, help="Clip replayed by every simulated request." )
+    parser.add_argument( "--frames", type=int, default=120, help="Frames per clip." )
+    parser.add_argument( "--clips", type=int, nargs="+", default=CONCURRENCY_LEVELS, help="Concurrency levels." )
+    parser.add_argument( "--workers", type=int, default=os.cpu_count() or 1, help="Inference server threads." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args   = parse_args( sys.argv[ 1: ] )
+    frames = load_frames( args.video, args.frames )
+    server = InferenceServer( workers=args.workers )
+
+    # -----------------------------------------------------------------
+    # Warm the server's graph pool so graph construction isn't timed.
+    # -----------------------------------------------------------------
+    server_clip( server, frames[ :1 ] )
+
+    print( f"{ len( frames ) } frames per clip, { args.workers } server workers" )
+    print( f"{ 'clips':>5}  { 'per-request fps':>15}  { 'server fps':>10}" )
+    for n_clips in args.clips:
+        total    = n_clips * len( frames )
+        baseline = run_concurrently( n_clips, lambda: per_request_clip( frames ) )
+        served   = run_concurrently( n_clips, lambda: server_clip( server, frames ) )
+
+        print( f"{ n_clips:>5}  { total / baseline:>15.1f}  { total / served:>10.1f}" )
+
+    server.shutdown()
@@ -0,0 +1,156 @@
+
+
+#
+# Offline load test against the local stand-in LLM server: throughput,
+# tail latency and error counts at several concurrency levels, either
+# for the LLM call alone or, with --video, for the full analysis
+# pipeline.
+#
+# backend/app> python -m benchmarks.llm_load --requests 200 --median-ms 1200 --error-rate 0.02
+# backend/app> python -m benchmarks.llm_load --video swing.mp4 --requests 16
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures             import ThreadPoolExecutor
+from   services.gemini_endpoint       import Client
+from   services.llm_cache             import LLMCache
+from   services.llm_providers         import LLM_DEFAULT_MODEL, MockHTTPProvider, set_llm_provider
+from   services.mock_llm_server       import MockLLMServer
+from   swing_analysis_classes.prompt  import SYSTEM_INSTRUCTION
+from   typing                         import Callable, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+CONCURRENCY_LEVELS = [ 1, 4, 16, 64 ]
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: run_load
+#
+#   DESCRIPTION:
+#       Run request( i ) for i in range( n_requests ) with the given
+#       concurrency. Returns the wall time, the latency of every
+#       successful request and the number of failures.
+#
+# ---------------------------------------------------------------------
+def run_load( request: Callable[ [ int ], None ], n_requests: int, concurrency: int ) -> Tuple[ float, List[ float ], int ]:
+
+    def __timed( i: int ) -> Optional[ float ]:
+        start = time.perf_counter()
+        try:
+            request( i )
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor( max_workers=concurrency ) as pool:
+        results = list( pool.map( __timed, range( n_requests ) ) )
+    elapsed = time.perf_counter() - start
+
+    latencies = [ latency for latency in results if latency is not None ]
+    return elapsed, latencies, n_requests - len( latencies )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: report
+#
+#   DESCRIPTION:
+#       Print one result row.
+#
+# ---------------------------------------------------------------------
+def report( concurrency: int, n_requests: int, elapsed: float, latencies: List[ float ], failures: int ) -> None:
+    if latencies:
+        p50, p95, p99 = ( 1000.0 * np.percentile( latencies, q ) for q in ( 50, 95, 99 ) )
+    else:
+        p50 = p95 = p99 = float( "nan" )
+    print( f"{ concurrency:>11} { n_requests / elapsed:>9.2f} { p50:>9.0f} { p95:>9.0f} { p99:>9.0f} { failures:>7}" )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Load test the LLM path against a local stand-in server." )
+    parser.add_argument( "--video", default=None, help="Run the full analysis on this clip instead of the LLM call alone." )
+    parser.add_argument( "--requests", type=int, default=200, help="Requests per concurrency level." )
+    parser.add_argument( "--concurrency", type=int, nargs="+", default=CONCURRENCY_LEVELS )
+    parser.add_argument( "--median-ms", type=float, default=1200.0 )
+    parser.add_argument( "--sigma", type=float, default=0.35 )
+    parser.add_argument( "--error-rate", type=float, default=0.0 )
+    parser.add_argument( "--timeout-rate", type=float, default=0.0 )
+    parser.add_argument( "--timeout-seconds", type=float, default=10.0, help="Client timeout; the server holds timeouts longer." )
+    parser.add_argument( "--seed", type=int, default=0 )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args   = parse_args( sys.argv[ 1: ] )
+    server = MockLLMServer(
+        port=0,
+        median_ms=args.median_ms,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds * 2,
+        seed=args.seed
+    )
+    provider = MockHTTPProvider( server.start(), timeout=args.timeout_seconds )
+
+    # -----------------------------------------------------------------
+    # Every request gets a distinct prompt / metadata so the response
+    # cache and call coalescing don't collapse the load.
+    # -----------------------------------------------------------------
+    if args.video:
+        from swing_analysis_classes.main import Analyze
+
+        set_llm_provider( provider )
+        def request( i: int ) -> None:
+            Analyze( args.video, "face-on", "intermediate", f"Load test swing { i }" )
+    else:
+        client = Client( provider=provider, cache=LLMCache( ttl_seconds=0 ) )
+        def request( i: int ) -> None:
+            client.generate_response( f"Load test request { i }", LLM_DEFAULT_MODEL, SYSTEM_INSTRUCTION )
+
+    print( f"{ 'concurrency':>11} { 'req/s':>9} { 'p50 ms':>9} { 'p95 ms':>9} { 'p99 ms':>9} { 'errors':>7}" )
+    for concurrency in args.concurrency:
+        elapsed, latencies, failures = run_load( request, args.requests, concurrency )
+        report( concurrency, args.requests, elapsed, latencies, failures )
+
+    provider.close()
+    server.stop()
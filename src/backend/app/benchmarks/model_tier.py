@@ -0,0 +1,119 @@
+
+
+#
+# Latency and metric drift of each pose model tier on one or more
+# clips. Drift is measured against the reference tier (heavy by
+# default).
+#
+# backend/app> python -m benchmarks.model_tier --videos a.mp4 b.mp4
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import math
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   swing_analysis_classes.metrics         import MetricsCalculator
+from   swing_analysis_classes.model_tier      import MODEL_TIERS
+from   swing_analysis_classes.pose_estimation import PoseEstimation
+from   swing_analysis_classes.segmentation    import Segmentation
+from   typing                                 import Dict, List, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: analyze_clip
+#
+#   DESCRIPTION:
+#       Run pose estimation with the given tier, then segmentation and
+#       metrics. Returns the pose estimation latency (seconds) and the
+#       metrics.
+#
+# ---------------------------------------------------------------------
+def analyze_clip( video: str, tier: str ) -> Tuple[ float, Dict[ str, float ] ]:
+    start     = time.perf_counter()
+    pose_data = PoseEstimation( vid_in=video, model_tier=tier ).pose_data
+    latency   = time.perf_counter() - start
+
+    segments = Segmentation( pose_data )
+    metrics  = MetricsCalculator( pose_data, segments=segments ).metrics
+    return latency, { name: float( value ) for name, value in metrics.items() }
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark pose model tiers." )
+    parser.add_argument( "--videos", nargs="+", required=True, help="Clips to analyze." )
+    parser.add_argument( "--tiers", nargs="+", choices=list( MODEL_TIERS ), default=list( MODEL_TIERS ), help="Tiers to compare." )
+    parser.add_argument( "--reference", choices=list( MODEL_TIERS ), default="heavy", help="Tier drift is measured against." )
+    parser.add_argument( "--repeats", type=int, default=3, help="Timed runs per clip and tier." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args = parse_args( sys.argv[ 1: ] )
+    if args.reference not in args.tiers:
+        args.tiers.append( args.reference )
+
+    # -----------------------------------------------------------------
+    # Time every tier on every clip. The first run of a tier also
+    # builds (and possibly downloads) its model, so it isn't timed.
+    # -----------------------------------------------------------------
+    latencies: Dict[ str, List[ float ] ] = { tier: [] for tier in args.tiers }
+    metrics: Dict[ str, Dict[ str, Dict[ str, float ] ] ] = { tier: {} for tier in args.tiers }
+    for tier in args.tiers:
+        analyze_clip( args.videos[ 0 ], tier )
+        for video in args.videos:
+            for _ in range( args.repeats ):
+                latency, metrics[ tier ][ video ] = analyze_clip( video, tier )
+                latencies[ tier ].append( latency )
+
+    # -----------------------------------------------------------------
+    # Report median latency and mean absolute metric drift per tier.
+    # -----------------------------------------------------------------
+    names = sorted( metrics[ args.reference ][ args.videos[ 0 ] ] )
+    print( f"{ 'tier':<6}  { 'median s':>8}  " + "  ".join( f"{ name:>24}" for name in names ) )
+    for tier in args.tiers:
+        drift = []
+        for name in names:
+            deltas = [
+                abs( metrics[ tier ][ video ][ name ] - metrics[ args.reference ][ video ][ name ] )
+                for video in args.videos
+            ]
+            finite = [ delta for delta in deltas if math.isfinite( delta ) ]
+            drift.append( float( np.mean( finite ) ) if finite else math.nan )
+        print( f"{ tier:<6}  { np.median( latencies[ tier ] ):>8.3f}  " + "  ".join( f"{ value:>24.3f}" for value in drift ) )
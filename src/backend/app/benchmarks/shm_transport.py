@@ -0,0 +1,127 @@
+
+
+#
+# Cost of returning a pose track from a pool worker: the pickled
+# result versus the shared-memory pose block.
+#
+# backend/app> python -m benchmarks.shm_transport --frames 480
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import multiprocessing
+import numpy        as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures                   import ProcessPoolExecutor
+from   swing_analysis_classes.pose_track    import LANDMARK_NAMES, PoseTrack
+from   swing_analysis_classes.shm_transport import PoseBlock
+from   typing                               import List, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: pose_pickled
+#
+#   DESCRIPTION:
+#       Pool task: build a pose track and return it (pickled).
+#
+# ---------------------------------------------------------------------
+def pose_pickled( n_frames: int ) -> PoseTrack:
+    xy = np.random.default_rng( 0 ).random( ( n_frames, len( LANDMARK_NAMES ), 2 ), dtype=np.float32 )
+    return PoseTrack( xy=xy, visibility=np.ones( xy.shape[ :2 ], dtype=np.float32 ), fps=240.0 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: pose_shared
+#
+#   DESCRIPTION:
+#       Pool task: write the same track into a shared pose block and
+#       return only its row count.
+#
+# ---------------------------------------------------------------------
+def pose_shared( block: PoseBlock, n_frames: int ) -> int:
+    xy = np.random.default_rng( 0 ).random( ( n_frames, len( LANDMARK_NAMES ), 2 ), dtype=np.float32 )
+    block.frame_indices[ : ] = np.arange( n_frames )
+    block.xy[ : ]            = xy
+    block.visibility[ : ]    = 1.0
+    block.close()
+    return n_frames
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: time_poses
+#
+#   DESCRIPTION:
+#       Median seconds to get an n_frames pose track back from a pool
+#       worker, pickled and through a shared pose block.
+#
+# ---------------------------------------------------------------------
+def time_poses( pool: ProcessPoolExecutor, n_frames: int, repeats: int ) -> Tuple[ float, float ]:
+    pickled, shared = [], []
+    for _ in range( repeats ):
+        start = time.perf_counter()
+        track = pool.submit( pose_pickled, n_frames ).result()
+        pickled.append( time.perf_counter() - start )
+
+        start = time.perf_counter()
+        block = PoseBlock( n_frames )
+        pool.submit( pose_shared, block, n_frames ).result()
+        track = block.track( 0, n_frames, 240.0 )
+        shared.append( time.perf_counter() - start )
+        del track
+        block.close()
+    return float( np.median( pickled ) ), float( np.median( shared ) )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark pickled versus shared-memory pose transfer." )
+    parser.add_argument( "--frames", type=int, default=480, help="Pose track length (e.g. 2 s at 240 fps)." )
+    parser.add_argument( "--repeats", type=int, default=3, help="Timed runs per transport." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args    = parse_args( sys.argv[ 1: ] )
+    context = multiprocessing.get_context( "spawn" )
+
+    with ProcessPoolExecutor( max_workers=1, mp_context=context ) as pool:
+        pool.submit( pose_pickled, 1 ).result()
+        pose_pickle, pose_shm = time_poses( pool, args.frames, args.repeats )
+    print( f"pose track ({ args.frames } frames): pickle { pose_pickle * 1e3:.2f} ms, shm block { pose_shm * 1e3:.2f} ms" )
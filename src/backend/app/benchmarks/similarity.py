@@ -0,0 +1,142 @@
+
+
+#
+# Swing similarity search: index build time, query latency and recall
+# of the IVF + DTW re-rank search against brute-force DTW, on synthetic
+# swing sequences.
+#
+# backend/app> python -m benchmarks.similarity --swings 100000
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   swing_analysis_classes.similarity import N_PROBE, RERANK, SEQUENCE_LENGTH, SIMILARITY_LANDMARKS, SimilarityIndex, dtw_distances
+from   typing                            import List
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Candidates per brute-force DTW batch.
+# ---------------------------------------------------------------------
+BRUTE_FORCE_BATCH = 4096
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: synthetic_sequences
+#
+#   DESCRIPTION:
+#       n_swings smooth random trajectories drawn around n_styles swing
+#       "styles", with per-swing noise and tempo changes, so the data
+#       has the clustered structure real swings have.
+#
+# ---------------------------------------------------------------------
+def synthetic_sequences( n_swings: int, n_styles: int, seed: int = 0 ) -> np.ndarray:
+    rng   = np.random.default_rng( seed )
+    dim   = 2 * len( SIMILARITY_LANDMARKS )
+    t     = np.linspace( 0.0, 1.0, SEQUENCE_LENGTH )
+    freqs = np.arange( 1, 4 )
+
+    styles = rng.normal( size=( n_styles, len( freqs ), dim ) )
+    style  = rng.integers( 0, n_styles, size=n_swings )
+    coeffs = styles[ style ] + 0.3 * rng.normal( size=( n_swings, len( freqs ), dim ) )
+    tempo  = t[ None, : ] ** rng.uniform( 0.8, 1.25, size=( n_swings, 1 ) )
+    basis  = np.sin( np.pi * freqs[ None, :, None ] * tempo[ :, None, : ] )
+    return np.einsum( "nft,nfd->ntd", basis, coeffs ).astype( np.float16 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: brute_force
+#
+#   DESCRIPTION:
+#       Exact top-k by DTW against every indexed swing.
+#
+# ---------------------------------------------------------------------
+def brute_force( query: np.ndarray, sequences: np.ndarray, k: int ) -> np.ndarray:
+    distances = np.concatenate( [
+        dtw_distances( query, sequences[ start:start + BRUTE_FORCE_BATCH ] )
+        for start in range( 0, len( sequences ), BRUTE_FORCE_BATCH )
+    ] )
+    return np.argsort( distances, kind="stable" )[ :k ]
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Benchmark swing similarity search." )
+    parser.add_argument( "--swings", type=int, default=100000, help="Indexed swings." )
+    parser.add_argument( "--styles", type=int, default=200, help="Swing styles the synthetic data clusters around." )
+    parser.add_argument( "--queries", type=int, default=200, help="Timed queries." )
+    parser.add_argument( "--recall-queries", type=int, default=10, help="Queries checked against brute-force DTW." )
+    parser.add_argument( "-k", type=int, default=5, help="Neighbours per query." )
+    parser.add_argument( "--probe", type=int, default=N_PROBE, help="Inverted lists probed per query." )
+    parser.add_argument( "--rerank", type=int, default=RERANK, help="Candidates re-ranked by DTW." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args      = parse_args( sys.argv[ 1: ] )
+    sequences = synthetic_sequences( args.swings, args.styles )
+    queries   = synthetic_sequences( args.queries, args.styles, seed=1 ).astype( np.float32 )
+    keys      = [ str( i ) for i in range( args.swings ) ]
+
+    start = time.perf_counter()
+    index = SimilarityIndex.build( keys, sequences )
+    print( f"build: { args.swings } swings, { len( index.centroids ) } lists in { time.perf_counter() - start:.1f}s" )
+
+    # -----------------------------------------------------------------
+    # Query latency.
+    # -----------------------------------------------------------------
+    index.search( queries[ 0 ], k=args.k, n_probe=args.probe, rerank=args.rerank )
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search( query, k=args.k, n_probe=args.probe, rerank=args.rerank )
+        latencies.append( ( time.perf_counter() - start ) * 1e3 )
+    print( f"query: p50 { np.percentile( latencies, 50 ):.2f} ms, p95 { np.percentile( latencies, 95 ):.2f} ms" )
+
+    # -----------------------------------------------------------------
+    # Recall against brute-force DTW (which is also timed).
+    # -----------------------------------------------------------------
+    recalls, brute_times = [], []
+    for query in queries[ :args.recall_queries ]:
+        start = time.perf_counter()
+        exact = set( brute_force( query, sequences, args.k ).tolist() )
+        brute_times.append( time.perf_counter() - start )
+        found = { int( key ) for key, _ in index.search( query, k=args.k, n_probe=args.probe, rerank=args.rerank ) }
+        recalls.append( len( exact & found ) / args.k )
+    print( f"recall@{ args.k }: { np.mean( recalls ):.3f} (brute-force DTW { np.median( brute_times ):.2f} s per query)" )
@@ -0,0 +1,110 @@
+
+
+#
+# Build the swing similarity index from stored pose tracks. Each track
+# is gap filled, segmented and reduced to its normalized address to
+# impact sequence; the sequences are embedded and indexed for
+# approximate k-NN (see swing_analysis_classes/similarity.py).
+#
+# Reference swings (e.g. tour pros) can be indexed separately by
+# pointing --tracks-dir at their track store and --out elsewhere.
+#
+# backend/app> python build_swing_index.py --workers 8
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.append( PARENT_DIR )
+
+from concurrent.futures                import ProcessPoolExecutor
+from lib                               import POSE_TRACK_DIR
+from services.pose_track_store         import PoseTrackStore
+from swing_analysis_classes.similarity import SIMILARITY_INDEX_DIR, SimilarityIndex, track_sequence
+from typing                            import List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: sequence_for
+#
+#   DESCRIPTION:
+#       Worker entry point: the similarity sequence of one stored
+#       track, or None (with the error printed) if it can't be made.
+#
+# ---------------------------------------------------------------------
+def sequence_for( key: str, tracks_dir: str ) -> Tuple[ str, Optional[ np.ndarray ] ]:
+    try:
+        return key, track_sequence( PoseTrackStore( tracks_dir ).load( key ) )
+    except Exception as exc:
+        print( f"{ key }: { type( exc ).__name__ }: { exc }" )
+        return key, None
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Build the swing similarity index from stored pose tracks." )
+    parser.add_argument( "--tracks-dir", default=POSE_TRACK_DIR, help="Pose track store to read from." )
+    parser.add_argument( "--out", default=SIMILARITY_INDEX_DIR, help="Index directory to write." )
+    parser.add_argument( "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes." )
+    parser.add_argument( "--lists", type=int, default=None, help="Inverted lists (default: sqrt of the swing count)." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args  = parse_args( sys.argv[ 1: ] )
+    start = time.perf_counter()
+
+    # -----------------------------------------------------------------
+    # Sequences for every stored track, computed in parallel.
+    # -----------------------------------------------------------------
+    keys      = list( PoseTrackStore( args.tracks_dir ).keys() )
+    sequences = []
+    indexed   = []
+    with ProcessPoolExecutor( max_workers=args.workers ) as pool:
+        for key, sequence in pool.map( sequence_for, keys, [ args.tracks_dir ] * len( keys ), chunksize=64 ):
+            if sequence is not None:
+                indexed.append( key )
+                sequences.append( sequence )
+
+    # -----------------------------------------------------------------
+    # Embed, cluster and write the index.
+    # -----------------------------------------------------------------
+    if not indexed:
+        raise SystemExit( f"No usable pose tracks in { args.tracks_dir }." )
+    index = SimilarityIndex.build( indexed, np.asarray( sequences ), n_lists=args.lists )
+    path  = index.save( args.out )
+    print( f"Indexed { len( index ) } of { len( keys ) } swings in { time.perf_counter() - start:.1f}s -> { path }" )
@@ -4,6 +4,7 @@
 #                                  IMPORTS 
 # -----------------------------------------------------------------------------
 
+import hashlib
 import os
 
 # -----------------------------------------------------------------------------
@@ -16,10 +17,35 @@ import os
 BASE_DIR   = os.path.dirname( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ) )
 SHARED_DIR = os.path.join( BASE_DIR, "shared" )
 
+# ---------------------------------------------------------------------
+# Persisted pose tracks, keyed by the hash of the source video.
+# ---------------------------------------------------------------------
+POSE_TRACK_DIR = os.path.join( BASE_DIR, "pose_tracks" )
+
+# ---------------------------------------------------------------------
+# Uploaded videos waiting for (or kept after) analysis, keyed by their
+# content hash. Must be storage shared by the API and every inference
+# worker when they run on separate nodes.
+# ---------------------------------------------------------------------
+VIDEO_DIR = os.environ.get( "SWING_VIDEO_DIR", os.path.join( BASE_DIR, "videos" ) )
+
 # -----------------------------------------------------------------------------
 #                                 PROCEDURES
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: hash_file
+#
+#   DESCRIPTION:
+#       Return the hex sha256 digest of a file's contents. Used to key
+#       stored data by the content of the video it came from.
+#
+# ---------------------------------------------------------------------
+def hash_file( path: str ) -> str:
+    with open( path, "rb" ) as file:
+        return hashlib.file_digest( file, "sha256" ).hexdigest()
+
 # -----------------------------------------------------------------------------
 #                                  CLASSES
 # -----------------------------------------------------------------------------
@@ -20,34 +20,47 @@ import sys
 PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
 sys.path.append( PARENT_DIR )
 
+from contextlib              import asynccontextmanager
 from fastapi                 import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles     import StaticFiles
-from pathlib                 import Path
 
 from routes.analyze          import router as analyze_router
 from routes.health           import router as health_router
+from routes.history          import router as history_router
+from routes.jobs             import router as jobs_router
+from routes.live             import router as live_router
+from routes.session          import router as session_router
+from routes.shared           import SharedFiles
+from services.artifact_store import get_artifact_store
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
 # -----------------------------------------------------------------------------
 
 # ---------------------------------------------------------------------
-# Initialize our FastAPI app
-# ---------------------------------------------------------------------
-app = FastAPI()
-
-# ---------------------------------------------------------------------
-# Resolve a relative path to the shared directory so it can be reached
-# regardless of where the server is launched from.
+# Generated artifacts (processed videos) live in the shared directory
+# and are managed by the artifact store.
 # ---------------------------------------------------------------------
-BASE_DIR   = Path( __file__ ).resolve().parent.parent.parent
-SHARED_DIR = BASE_DIR / "shared"
+ARTIFACT_STORE = get_artifact_store()
 
 # -----------------------------------------------------------------------------
 #                                 PROCEDURES
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: lifespan
+#
+#   DESCRIPTION:
+#       Run the artifact sweeper for as long as the server is up.
+#
+# ---------------------------------------------------------------------
+@asynccontextmanager
+async def lifespan( app: FastAPI ):
+    ARTIFACT_STORE.start_sweeper()
+    yield
+    ARTIFACT_STORE.stop_sweeper()
+
 # -----------------------------------------------------------------------------
 #                                  CLASSES
 # -----------------------------------------------------------------------------
@@ -56,6 +69,11 @@ SHARED_DIR = BASE_DIR / "shared"
 #                                 EXECUTION 
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+# Initialize our FastAPI app
+# ---------------------------------------------------------------------
+app = FastAPI( lifespan=lifespan )
+
 # ---------------------------------------------------------------------
 # CORS for frontend
 # ---------------------------------------------------------------------
@@ -71,7 +89,7 @@ app.add_middleware(
 # ---------------------------------------------------------------------
 app.mount(
     path="/shared",
-    app=StaticFiles( directory=SHARED_DIR ),
+    app=SharedFiles( store=ARTIFACT_STORE ),
     name="shared"
 )
 
@@ -80,3 +98,7 @@ app.mount(
 # ---------------------------------------------------------------------
 app.include_router( router=analyze_router )
 app.include_router( router=health_router )
+app.include_router( router=history_router )
+app.include_router( router=jobs_router )
+app.include_router( router=live_router )
+app.include_router( router=session_router )
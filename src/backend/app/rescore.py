@@ -0,0 +1,324 @@
+
+
+#
+# Offline bulk re-scoring of stored pose tracks. Runs segmentation and
+# metrics only (no HTTP server, no LLM).
+#
+# backend/app> python rescore.py --out ../rescore_results --workers 8
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import itertools
+import json
+import math
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.append( PARENT_DIR )
+
+from concurrent.futures                   import ProcessPoolExecutor
+from lib                                  import POSE_TRACK_DIR
+from services.pose_track_store            import PoseTrackStore
+from swing_analysis_classes.interpolation import FILL_METHODS, PoseInterpolation
+from swing_analysis_classes.metrics       import MetricsCalculator
+from swing_analysis_classes.segmentation  import MOVEMENT_THRESHOLD, STABILITY_WINDOW, Segmentation
+from typing                               import Any, Dict, Iterator, List, Set
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Output layout. Each checkpoint is one columnar part file; the run
+# manifest pins the parameters so a resumed run can't mix results from
+# different settings.
+# ---------------------------------------------------------------------
+MANIFEST_FILENAME = "manifest.json"
+PART_PREFIX       = "part-"
+PART_SUFFIX       = ".npz"
+RESULTS_FILENAME  = "results.npz"
+
+# ---------------------------------------------------------------------
+# Columns written for every swing, ahead of the metric columns. Key
+# frames are indices into the source video.
+# ---------------------------------------------------------------------
+FRAME_COLUMNS = [ "address_frame", "backswing_frame", "impact_frame" ]
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: score_track
+#
+#   DESCRIPTION:
+#       Worker entry point. Load one stored (raw) pose track, fill its
+#       gaps, and run segmentation and metrics on it. Failures are
+#       returned as an error string so one bad swing never stops the
+#       batch.
+#
+# ---------------------------------------------------------------------
+def score_track( key: str, tracks_dir: str, params: Dict[ str, Any ] ) -> Dict[ str, Any ]:
+    result: Dict[ str, Any ] = { "video_hash": key, "error": "" }
+    try:
+        track     = PoseTrackStore( tracks_dir ).load( key )
+        pose_data = PoseInterpolation(
+            track,
+            method=params[ "interpolation" ],
+            smoothing=params[ "smoothing" ]
+        ).pose_track.to_pose_data()
+        segments  = Segmentation(
+            pose_data,
+            movement_threshold=params[ "movement_threshold" ],
+            stability_window=params[ "stability_window" ]
+        )
+        metrics   = MetricsCalculator( pose_data, segments=segments ).metrics
+
+        result[ "address_frame" ]   = segments.video_frames[ "address" ]
+        result[ "backswing_frame" ] = segments.video_frames[ "backswing" ]
+        result[ "impact_frame" ]    = segments.video_frames[ "impact" ]
+        result.update( metrics )
+    except Exception as exc:
+        result[ "error" ] = f"{ type( exc ).__name__ }: { exc }"
+    return result
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: write_columns
+#
+#   DESCRIPTION:
+#       Write a list of per-swing result rows as one columnar .npz file
+#       (one array per column). Missing values become -1 for frame
+#       columns and NaN for metrics. Written atomically.
+#
+# ---------------------------------------------------------------------
+def write_columns( path: str, rows: List[ Dict[ str, Any ] ] ) -> None:
+    metric_names = sorted( { name for row in rows for name in row } - set( FRAME_COLUMNS ) - { "video_hash", "error" } )
+
+    columns = {
+        "video_hash": np.array( [ row[ "video_hash" ] for row in rows ], dtype=str ),
+        "error":      np.array( [ row[ "error" ] for row in rows ], dtype=str ),
+    }
+    for name in FRAME_COLUMNS:
+        columns[ name ] = np.array( [ row.get( name, -1 ) for row in rows ], dtype=np.int32 )
+    for name in metric_names:
+        columns[ name ] = np.array( [ row.get( name, math.nan ) for row in rows ], dtype=np.float64 )
+
+    tmp_path = f"{ path }.tmp{ PART_SUFFIX }"
+    np.savez( tmp_path, **columns )
+    os.replace( tmp_path, path )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: read_columns
+#
+#   DESCRIPTION:
+#       Load a columnar .npz file back into a dictionary of arrays.
+#
+# ---------------------------------------------------------------------
+def read_columns( path: str ) -> Dict[ str, np.ndarray ]:
+    with np.load( path ) as data:
+        return { name: data[ name ] for name in data.files }
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: list_parts
+#
+#   DESCRIPTION:
+#       Sorted paths of the checkpointed part files in an output dir.
+#
+# ---------------------------------------------------------------------
+def list_parts( out_dir: str ) -> List[ str ]:
+    return sorted(
+        os.path.join( out_dir, name ) for name in os.listdir( out_dir )
+        if name.startswith( PART_PREFIX ) and name.endswith( PART_SUFFIX ) and ".tmp" not in name
+    )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: load_checkpoint
+#
+#   DESCRIPTION:
+#       Prepare the output directory and return the set of video hashes
+#       already scored by a previous run. The manifest must match the
+#       current parameters, otherwise resuming would mix results.
+#
+# ---------------------------------------------------------------------
+def load_checkpoint( out_dir: str, params: Dict[ str, Any ] ) -> Set[ str ]:
+    os.makedirs( out_dir, exist_ok=True )
+    manifest_path = os.path.join( out_dir, MANIFEST_FILENAME )
+
+    if os.path.isfile( manifest_path ):
+        with open( manifest_path ) as file:
+            previous = json.load( file )
+        if previous != params:
+            raise SystemExit( f"{ out_dir } holds results for different parameters: { previous }" )
+    else:
+        with open( manifest_path, "w" ) as file:
+            json.dump( params, file, indent=2 )
+
+    done: Set[ str ] = set()
+    for part in list_parts( out_dir ):
+        done.update( read_columns( part )[ "video_hash" ].tolist() )
+    return done
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: merge_parts
+#
+#   DESCRIPTION:
+#       Concatenate all part files into a single results file. Columns
+#       missing from older parts (e.g. a newly added metric) are filled
+#       with the column's missing value.
+#
+# ---------------------------------------------------------------------
+def merge_parts( out_dir: str ) -> str:
+    parts = [ read_columns( part ) for part in list_parts( out_dir ) ]
+    names = sorted( { name for part in parts for name in part } )
+
+    merged = {}
+    for name in names:
+        chunks = []
+        for part in parts:
+            n_rows = len( part[ "video_hash" ] )
+            if name in part:
+                chunks.append( part[ name ] )
+            elif name in FRAME_COLUMNS:
+                chunks.append( np.full( n_rows, -1, dtype=np.int32 ) )
+            else:
+                chunks.append( np.full( n_rows, math.nan ) )
+        merged[ name ] = np.concatenate( chunks ) if chunks else np.array( [] )
+
+    path = os.path.join( out_dir, RESULTS_FILENAME )
+    np.savez( path, **merged )
+    return path
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: batched
+#
+#   DESCRIPTION:
+#       Yield lists of up to 'size' items from an iterator.
+#
+# ---------------------------------------------------------------------
+def batched( items: Iterator[ str ], size: int ) -> Iterator[ List[ str ] ]:
+    while True:
+        batch = list( itertools.islice( items, size ) )
+        if not batch:
+            return
+        yield batch
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: rescore
+#
+#   DESCRIPTION:
+#       Stream every stored pose track that hasn't been scored yet
+#       through a process pool, checkpointing one part file per batch
+#       and reporting throughput as it goes.
+#
+# ---------------------------------------------------------------------
+def rescore( tracks_dir: str, out_dir: str, params: Dict[ str, Any ], workers: int, batch_size: int ) -> str:
+
+    # -----------------------------------------------------------------
+    # Resume from whatever a previous run already finished.
+    # -----------------------------------------------------------------
+    done    = load_checkpoint( out_dir, params )
+    pending = ( key for key in PoseTrackStore( tracks_dir ).keys() if key not in done )
+    part_id = len( list_parts( out_dir ) )
+    if done:
+        print( f"Resuming: { len( done ) } swings already scored." )
+
+    # -----------------------------------------------------------------
+    # Score batch by batch. Keys are listed lazily, so the archive is
+    # never loaded into memory up front.
+    # -----------------------------------------------------------------
+    scored, failed = 0, 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor( max_workers=workers ) as pool:
+        for batch in batched( pending, batch_size ):
+            rows = list( pool.map(
+                score_track, batch,
+                itertools.repeat( tracks_dir ), itertools.repeat( params ),
+                chunksize=max( 1, len( batch ) // ( workers * 4 ) )
+            ) )
+
+            write_columns( os.path.join( out_dir, f"{ PART_PREFIX }{ part_id:06d}{ PART_SUFFIX }" ), rows )
+            part_id += 1
+
+            scored  += len( rows )
+            failed  += sum( 1 for row in rows if row[ "error" ] )
+            elapsed  = time.perf_counter() - start
+            print( f"{ scored } swings scored ({ failed } failed) - { scored / elapsed:.1f} swings/s" )
+
+    # -----------------------------------------------------------------
+    # Consolidate every checkpoint into the final results file.
+    # -----------------------------------------------------------------
+    elapsed = time.perf_counter() - start
+    if scored:
+        print( f"Done: { scored } swings in { elapsed:.1f}s ({ scored / elapsed:.1f} swings/s)" )
+    return merge_parts( out_dir )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Re-run segmentation and metrics over stored pose tracks." )
+    parser.add_argument( "--out", required=True, help="Output directory (results and checkpoints)." )
+    parser.add_argument( "--tracks-dir", default=POSE_TRACK_DIR, help="Pose track store to read from." )
+    parser.add_argument( "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes." )
+    parser.add_argument( "--batch-size", type=int, default=1000, help="Swings per checkpoint." )
+    parser.add_argument( "--movement-threshold", type=float, default=MOVEMENT_THRESHOLD )
+    parser.add_argument( "--stability-window", type=int, default=STABILITY_WINDOW )
+    parser.add_argument( "--interpolation", choices=FILL_METHODS, default="linear" )
+    parser.add_argument( "--smoothing", choices=[ "savgol", "one_euro" ], default=None )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args = parse_args( sys.argv[ 1: ] )
+    path = rescore(
+        tracks_dir=args.tracks_dir,
+        out_dir=args.out,
+        params={
+            "movement_threshold": args.movement_threshold,
+            "stability_window": args.stability_window,
+            "interpolation": args.interpolation,
+            "smoothing": args.smoothing,
+        },
+        workers=args.workers,
+        batch_size=args.batch_size
+    )
+    print( f"Results written to { path }" )
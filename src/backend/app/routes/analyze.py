@@ -16,10 +16,18 @@ import tempfile
 PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
 sys.path.append( PARENT_DIR )
 
-from   app.swing_analysis_classes.main import Analyze
-from   fastapi                         import APIRouter, UploadFile, File, Form
-from   pathlib                         import Path
-from   typing                          import Dict, Optional
+from   app.swing_analysis_classes.main   import Analyze
+from   fastapi                           import APIRouter, HTTPException, UploadFile, File, Form
+from   fastapi.concurrency               import run_in_threadpool
+from   fastapi.responses                 import JSONResponse
+from   routes.jobs                       import enqueue_analysis, rejection
+from   services.cost_model               import QUEUE, admit, probe_angles, probe_video
+from   services.job_queue                import get_job_queue
+from   services.video_store              import VideoStore
+from   swing_analysis_classes.dual_angle import DOWN_THE_LINE, FACE_ON, DualAngleAnalysis
+from   swing_analysis_classes.model_tier import AUTO_TIER, MODEL_TIERS
+from   pathlib                           import Path
+from   typing                            import Dict, Optional, Union
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
@@ -39,13 +47,26 @@ router = APIRouter( prefix="/analysis", tags=[ "analysis" ] )
 #       [description].
 #
 # ---------------------------------------------------------------------
-@router.post("/")
+@router.post("/", response_model=None)
 async def analyze(
     video: UploadFile = File(...),
     experience_level: str = Form(...),
     camera_angle: str = Form(...),
-    metadata: Optional[ str ] = Form( None )
-) -> Dict:
+    metadata: Optional[ str ] = Form( None ),
+    model_tier: Optional[ str ] = Form( None ),
+    golfer: Optional[ str ] = Form( None ),
+    club: Optional[ str ] = Form( None ),
+    deadline_seconds: Optional[ float ] = Form( None )
+) -> Union[ Dict, JSONResponse ]:
+
+    # -----------------------------------------------------------------
+    # Reject unknown pose model tiers up front. When omitted, the
+    # deployment default (SWING_MODEL_TIER) applies.
+    # -----------------------------------------------------------------
+    if model_tier is not None and model_tier.lower() not in ( *MODEL_TIERS, AUTO_TIER ):
+        raise HTTPException( status_code=422, detail=f"Unknown model tier: { model_tier }" )
+    if deadline_seconds is not None and deadline_seconds <= 0:
+        raise HTTPException( status_code=422, detail=f"Deadline must be positive: { deadline_seconds }" )
     
     # -----------------------------------------------------------------
     # Create a unique temporary directory to store the input file and
@@ -65,29 +86,116 @@ async def analyze(
             shutil.copyfileobj( video.file, buffer )
 
         # -------------------------------------------------------------
-        # Run the full analysis pipeline.
+        # Admission control from the probed clip. Clips predicted to
+        # run too long for a synchronous request are moved to the
+        # video store and queued, answering 202 like /jobs does. With a
+        # deadline, admission also picks the pipeline configuration
+        # predicted to meet it.
+        # -------------------------------------------------------------
+        probe     = await run_in_threadpool( probe_video, str( video_path ) )
+        admission = await run_in_threadpool( admit, probe, model_tier, get_job_queue(), True, deadline_seconds )
+        if admission.rejected:
+            raise rejection( admission )
+
+        if admission.action == QUEUE:
+            video_hash = await run_in_threadpool( VideoStore().put_file, str( video_path ) )
+            content    = await run_in_threadpool(
+                enqueue_analysis,
+                video_hash=video_hash,
+                admission=admission,
+                camera_angle=camera_angle,
+                experience_level=experience_level,
+                metadata=metadata,
+                model_tier=model_tier,
+                golfer=golfer,
+                club=club,
+                deadline_seconds=deadline_seconds
+            )
+            return JSONResponse( status_code=202, content=content )
+
+        # -------------------------------------------------------------
+        # Run the full analysis pipeline. It is CPU bound and blocking,
+        # so it runs in the threadpool to keep the event loop free and
+        # let concurrent requests share the inference server.
         # -------------------------------------------------------------
-        output = Analyze(
+        output = await run_in_threadpool(
+            Analyze,
             video_path=str( video_path ),
             camera_angle=camera_angle,
             experience_level=experience_level,
-            metadata=metadata
+            metadata=metadata,
+            model_tier=admission.tier_override() or model_tier,
+            golfer=golfer,
+            club=club,
+            pipeline=admission.pipeline
         )
 
         # -------------------------------------------------------------
-        # Grab the filename from the returned video overlay so it can
-        # be resolved in the static folder shared directory.
+        # Return the JSON response including the full swing analysis,
+        # (sharded) URLs of the pose overlayed swing video and key
+        # frame stills under the static shared directory mount, and
+        # the admission decision.
         # -------------------------------------------------------------
-        pose_overlay_path = Path( output.video_overlay_path ).name if output.video_overlay_path else None
+        return { **output.response(), "admission": admission.to_dict() }
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: analyze_dual
+#
+#   DESCRIPTION:
+#       Analyze one swing recorded from two angles. Both clips are
+#       processed at the same time and synchronized; the response has
+#       a single analysis of the merged metrics plus each angle's
+#       overlay video and key frames, and the admission decision.
+#
+# ---------------------------------------------------------------------
+@router.post("/dual")
+async def analyze_dual(
+    face_on: UploadFile = File(...),
+    down_the_line: UploadFile = File(...),
+    experience_level: str = Form(...),
+    metadata: Optional[ str ] = Form( None ),
+    model_tier: Optional[ str ] = Form( None ),
+    golfer: Optional[ str ] = Form( None ),
+    club: Optional[ str ] = Form( None )
+) -> Dict:
+
+    if model_tier is not None and model_tier.lower() not in ( *MODEL_TIERS, AUTO_TIER ):
+        raise HTTPException( status_code=422, detail=f"Unknown model tier: { model_tier }" )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
 
         # -------------------------------------------------------------
-        # Return the JSON response including the full swing analysis
-        # and a path to the pose overlayed swing video.
+        # Save both uploads, prefixed by angle so identical file names
+        # don't collide.
         # -------------------------------------------------------------
-        return {
-            "swing_analysis": output.analysis,
-            "pose_overlay": f"/shared/{ pose_overlay_path }"
-        }
+        video_paths: Dict[ str, str ] = {}
+        for angle, video in ( ( FACE_ON, face_on ), ( DOWN_THE_LINE, down_the_line ) ):
+            video_path = Path( tmp_dir ) / f"{ angle }_{ video.filename or 'tmp_swing.mp4' }"
+            with video_path.open( "wb" ) as buffer:
+                shutil.copyfileobj( video.file, buffer )
+            video_paths[ angle ] = str( video_path )
+
+        # -------------------------------------------------------------
+        # Admission control over both clips together. Dual-angle
+        # analyses can't be queued, so they always run now.
+        # -------------------------------------------------------------
+        probe     = await run_in_threadpool( probe_angles, video_paths.values() )
+        admission = await run_in_threadpool( admit, probe, model_tier )
+        if admission.rejected:
+            raise rejection( admission )
+
+        output = await run_in_threadpool(
+            DualAngleAnalysis,
+            video_paths=video_paths,
+            experience_level=experience_level,
+            metadata=metadata,
+            model_tier=admission.tier_override() or model_tier,
+            golfer=golfer,
+            club=club
+        )
+        return { **output.response(), "admission": admission.to_dict() }
 
 # -----------------------------------------------------------------------------
 #                                  CLASSES
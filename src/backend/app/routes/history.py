@@ -0,0 +1,217 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   datetime                          import datetime, timezone
+from   fastapi                           import APIRouter, HTTPException, Query
+from   fastapi.concurrency               import run_in_threadpool
+from   services.pose_track_store         import PoseTrackStore
+from   services.swing_history            import HISTORY_MAX_PAGE_SIZE, HISTORY_PAGE_SIZE, TREND_WINDOW, get_swing_history
+from   swing_analysis_classes.similarity import get_similarity_index, track_sequence
+from   typing                            import Any, Dict, List, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+router = APIRouter( prefix="/history", tags=[ "history" ] )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _timestamp
+#
+#   DESCRIPTION:
+#       Epoch seconds of an ISO 8601 date or date-time query parameter
+#       (UTC unless it carries an offset); 422 if it doesn't parse.
+#
+# ---------------------------------------------------------------------
+def _timestamp( value: Optional[ str ], name: str ) -> Optional[ float ]:
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat( value )
+    except ValueError:
+        raise HTTPException( status_code=422, detail=f"Invalid { name } date: { value }" ) from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace( tzinfo=timezone.utc )
+    return parsed.timestamp()
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _similar_swings
+#
+#   DESCRIPTION:
+#       Nearest indexed swings to a video's stored pose track, with the
+#       recorded swings of each match.
+#
+# ---------------------------------------------------------------------
+def _similar_swings( video_hash: str, k: int ) -> List[ Dict[ str, Any ] ]:
+    index = get_similarity_index()
+    if index is None:
+        raise HTTPException( status_code=503, detail="The swing similarity index has not been built." )
+
+    store = PoseTrackStore()
+    if not store.exists( video_hash ):
+        raise HTTPException( status_code=404, detail="No pose track is stored for this swing." )
+    sequence = track_sequence( store.load( video_hash ) )
+    if sequence is None:
+        return []
+
+    matches = index.search( sequence, k=k, exclude=[ video_hash ] )
+    swings  = get_swing_history().swings_for_videos( [ key for key, _ in matches ] )
+    return [ { "video_hash": key, "distance": distance, "swings": swings[ key ] } for key, distance in matches ]
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: list_history
+#
+#   DESCRIPTION:
+#       Stored swings, newest first, optionally for one golfer / club
+#       and date range. Pass the returned next_cursor to get the next
+#       page.
+#
+# ---------------------------------------------------------------------
+@router.get("/")
+async def list_history(
+    golfer: Optional[ str ] = None,
+    club: Optional[ str ] = None,
+    since: Optional[ str ] = None,
+    until: Optional[ str ] = None,
+    limit: int = Query( HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE ),
+    cursor: Optional[ str ] = None
+) -> Dict:
+    try:
+        swings, next_cursor = await run_in_threadpool(
+            get_swing_history().history,
+            golfer=golfer,
+            club=club,
+            since=_timestamp( since, "since" ),
+            until=_timestamp( until, "until" ),
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as error:
+        raise HTTPException( status_code=422, detail=str( error ) ) from None
+    return { "swings": swings, "next_cursor": next_cursor }
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: metric_trend
+#
+#   DESCRIPTION:
+#       One metric across a golfer's swings with its rolling mean over
+#       the last `window` swings, e.g.
+#
+#           /history/trend?golfer=jane&metric=hip_rotation_range_deg
+#
+# ---------------------------------------------------------------------
+@router.get("/trend")
+async def metric_trend(
+    golfer: str,
+    metric: str,
+    window: int = Query( TREND_WINDOW, ge=1 ),
+    club: Optional[ str ] = None,
+    since: Optional[ str ] = None,
+    until: Optional[ str ] = None
+) -> Dict:
+    points = await run_in_threadpool(
+        get_swing_history().trend,
+        golfer=golfer,
+        metric=metric,
+        window=window,
+        club=club,
+        since=_timestamp( since, "since" ),
+        until=_timestamp( until, "until" )
+    )
+    return { "golfer": golfer, "metric": metric, "club": club, "window": window, "points": points }
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: metric_summary
+#
+#   DESCRIPTION:
+#       Count, mean, min and max of every metric over a golfer's
+#       swings.
+#
+# ---------------------------------------------------------------------
+@router.get("/summary")
+async def metric_summary(
+    golfer: str,
+    club: Optional[ str ] = None,
+    since: Optional[ str ] = None,
+    until: Optional[ str ] = None
+) -> Dict:
+    summary = await run_in_threadpool(
+        get_swing_history().summary,
+        golfer=golfer,
+        club=club,
+        since=_timestamp( since, "since" ),
+        until=_timestamp( until, "until" )
+    )
+    return { "golfer": golfer, "club": club, **summary }
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: get_swing
+#
+#   DESCRIPTION:
+#       One stored swing.
+#
+# ---------------------------------------------------------------------
+@router.get("/{swing_id}")
+async def get_swing( swing_id: int ) -> Dict:
+    swing = await run_in_threadpool( get_swing_history().get, swing_id )
+    if swing is None:
+        raise HTTPException( status_code=404, detail=f"Unknown swing: { swing_id }" )
+    return swing
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: similar_swings
+#
+#   DESCRIPTION:
+#       The k indexed swings (past swings or reference swings) whose
+#       address to impact motion is closest to this swing's, nearest
+#       first by DTW distance.
+#
+# ---------------------------------------------------------------------
+@router.get("/{swing_id}/similar")
+async def similar_swings( swing_id: int, k: int = Query( 5, ge=1, le=50 ) ) -> Dict:
+    swing = await run_in_threadpool( get_swing_history().get, swing_id )
+    if swing is None:
+        raise HTTPException( status_code=404, detail=f"Unknown swing: { swing_id }" )
+    if swing[ "video_hash" ] is None:
+        raise HTTPException( status_code=404, detail="No pose track is stored for this swing." )
+
+    matches = await run_in_threadpool( _similar_swings, swing[ "video_hash" ], k )
+    return { "swing_id": swing_id, "matches": matches }
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,212 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   fastapi                           import APIRouter, HTTPException, UploadFile, File, Form
+from   fastapi.concurrency               import run_in_threadpool
+from   fastapi.responses                 import JSONResponse
+from   services.cost_model               import Admission, admit, probe_video
+from   services.job_queue                import QUEUED, RUNNING, get_job_queue
+from   services.video_store              import VideoStore
+from   swing_analysis_classes.model_tier import AUTO_TIER, MODEL_TIERS
+from   typing                            import Any, Dict, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+router = APIRouter( prefix="/jobs", tags=[ "jobs" ] )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: job_id_for
+#
+#   DESCRIPTION:
+#       Deterministic job id for an analysis request: the same video
+#       with the same options always maps to the same job, so retried
+#       or duplicate submissions don't run the analysis twice.
+#
+# ---------------------------------------------------------------------
+def job_id_for( payload: Dict[ str, Any ] ) -> str:
+    return hashlib.sha256( json.dumps( payload, sort_keys=True ).encode( "utf-8" ) ).hexdigest()
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: rejection
+#
+#   DESCRIPTION:
+#       HTTP error for a rejected request: 503 with Retry-After while
+#       the queue backlog is too long, 413 for a clip predicted to take
+#       too long on its own.
+#
+# ---------------------------------------------------------------------
+def rejection( admission: Admission ) -> HTTPException:
+    if admission.retry_after is not None:
+        return HTTPException(
+            status_code=503,
+            detail=admission.to_dict(),
+            headers={ "Retry-After": str( max( math.ceil( admission.retry_after ), 1 ) ) }
+        )
+    return HTTPException( status_code=413, detail=admission.to_dict() )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: enqueue_analysis
+#
+#   DESCRIPTION:
+#       Queue an admitted analysis of a stored video, at its predicted
+#       cost, and return the job status with its ETA and the admission
+#       decision. A downgraded tier replaces the requested one. A
+#       deadline goes with the job, so the worker can configure the
+#       pipeline for the time left when the job starts.
+#
+# ---------------------------------------------------------------------
+def enqueue_analysis(
+    video_hash: str,
+    admission: Admission,
+    camera_angle: str,
+    experience_level: str,
+    metadata: Optional[ str ] = None,
+    model_tier: Optional[ str ] = None,
+    golfer: Optional[ str ] = None,
+    club: Optional[ str ] = None,
+    deadline_seconds: Optional[ float ] = None
+) -> Dict[ str, Any ]:
+    payload = {
+        "video_hash": video_hash,
+        "camera_angle": camera_angle,
+        "experience_level": experience_level,
+        "metadata": metadata,
+        "model_tier": admission.tier_override() or model_tier,
+        "golfer": golfer,
+        "club": club,
+        "deadline_seconds": deadline_seconds
+    }
+    queue = get_job_queue()
+    job   = queue.enqueue( job_id_for( payload ), payload, cost=admission.predicted_seconds )
+    eta   = queue.eta( job )
+
+    # -----------------------------------------------------------------
+    # Resubmitting a finished job returns it as is; the upload stored
+    # for it is not needed.
+    # -----------------------------------------------------------------
+    if job.state not in ( QUEUED, RUNNING ):
+        VideoStore().release( video_hash, queue, since=time.time() )
+    if eta is not None:
+        admission.eta_seconds = eta = round( eta, 2 )
+
+    return { **job.to_dict(), "eta_seconds": eta, "admission": admission.to_dict() }
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: submit_job
+#
+#   DESCRIPTION:
+#       Queue a swing analysis for the inference workers. The video is
+#       stored once, by content hash, in the shared video store; only
+#       the hash and analysis options go through the queue. Returns
+#       202 with the job's status (or the existing job's, for a repeat
+#       submission) and its ETA.
+#
+#       The stored clip is probed and admitted first: it may run on a
+#       cheaper pose model tier, or be rejected if it is predicted to
+#       take too long or the queue is too backed up. Jobs are queued at
+#       their predicted cost, so short clips run first.
+#
+#       An optional deadline (seconds from submission) has the pipeline
+#       configured to finish in time, given the expected queue wait.
+#
+# ---------------------------------------------------------------------
+@router.post("/")
+async def submit_job(
+    video: UploadFile = File(...),
+    experience_level: str = Form(...),
+    camera_angle: str = Form(...),
+    metadata: Optional[ str ] = Form( None ),
+    model_tier: Optional[ str ] = Form( None ),
+    golfer: Optional[ str ] = Form( None ),
+    club: Optional[ str ] = Form( None ),
+    deadline_seconds: Optional[ float ] = Form( None )
+) -> JSONResponse:
+
+    if model_tier is not None and model_tier.lower() not in ( *MODEL_TIERS, AUTO_TIER ):
+        raise HTTPException( status_code=422, detail=f"Unknown model tier: { model_tier }" )
+    if deadline_seconds is not None and deadline_seconds <= 0:
+        raise HTTPException( status_code=422, detail=f"Deadline must be positive: { deadline_seconds }" )
+
+    # -----------------------------------------------------------------
+    # Store the upload, admit it and queue the job. All of it blocks on
+    # disk / network I/O, so it runs in the threadpool.
+    # -----------------------------------------------------------------
+    store      = VideoStore()
+    video_hash = await run_in_threadpool( store.put, video.file )
+    probe      = await run_in_threadpool( probe_video, store.path_for( video_hash ) )
+    admission  = await run_in_threadpool( admit, probe, model_tier, get_job_queue(), False, deadline_seconds )
+    if admission.rejected:
+        await run_in_threadpool( store.release, video_hash, get_job_queue(), time.time() )
+        raise rejection( admission )
+
+    content = await run_in_threadpool(
+        enqueue_analysis,
+        video_hash=video_hash,
+        admission=admission,
+        camera_angle=camera_angle,
+        experience_level=experience_level,
+        metadata=metadata,
+        model_tier=model_tier,
+        golfer=golfer,
+        club=club,
+        deadline_seconds=deadline_seconds
+    )
+    return JSONResponse( status_code=202, content=content )
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: get_job
+#
+#   DESCRIPTION:
+#       Status of a queued job with its current ETA; once it is done,
+#       the result is the same response the synchronous /analysis
+#       endpoint returns.
+#
+# ---------------------------------------------------------------------
+@router.get("/{job_id}")
+async def get_job( job_id: str ) -> Dict:
+    queue = get_job_queue()
+    job   = await run_in_threadpool( queue.get, job_id )
+    if job is None:
+        raise HTTPException( status_code=404, detail=f"Unknown job: { job_id }" )
+    eta = await run_in_threadpool( queue.eta, job )
+    return { **job.to_dict(), "eta_seconds": round( eta, 2 ) if eta is not None else None }
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,217 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import asyncio
+import cv2
+import json
+import numpy as np
+import os
+import sys
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   fastapi                           import APIRouter, WebSocket, WebSocketDisconnect
+from   fastapi.concurrency               import run_in_threadpool
+from   swing_analysis_classes.live       import LIVE_BUDGET_MS, LIVE_FPS, LIVE_MODEL_TIER, LiveSession
+from   swing_analysis_classes.model_tier import MODEL_TIERS
+from   typing                            import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+router = APIRouter( prefix="/live", tags=[ "live" ] )
+
+# ---------------------------------------------------------------------
+# WebSocket close code for a rejected request (policy violation).
+# ---------------------------------------------------------------------
+CLOSE_POLICY_VIOLATION = 1008
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: decode_frame
+#
+#   DESCRIPTION:
+#       Decode one encoded camera frame (JPEG, PNG, ...) to RGB, None
+#       if the bytes aren't an image.
+#
+# ---------------------------------------------------------------------
+def decode_frame( data: bytes ) -> Optional[ np.ndarray ]:
+    image = cv2.imdecode( np.frombuffer( data, dtype=np.uint8 ), cv2.IMREAD_COLOR )
+    if image is None:
+        return None
+    return cv2.cvtColor( image, cv2.COLOR_BGR2RGB )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: pose_message
+#
+#   DESCRIPTION:
+#       Compact per-frame landmark message: [ x, y, visibility ] per
+#       landmark name, or null when no pose was detected.
+#
+# ---------------------------------------------------------------------
+def pose_message( frame_index: int, landmarks: Optional[ Dict[ str, Dict[ str, Any ] ] ], latency_ms: float, dropped: int ) -> Dict[ str, Any ]:
+    points = None
+    if landmarks is not None:
+        points = { name: [ round( lm[ "x" ], 5 ), round( lm[ "y" ], 5 ), round( lm[ "visibility" ], 3 ) ] for name, lm in landmarks.items() }
+    return {
+        "type": "pose",
+        "frame": frame_index,
+        "landmarks": points,
+        "latency_ms": round( latency_ms, 1 ),
+        "dropped": dropped,
+    }
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _is_end
+#
+#   DESCRIPTION:
+#       Whether a text message is the client's { "type": "end" }.
+#
+# ---------------------------------------------------------------------
+def _is_end( text: Optional[ str ] ) -> bool:
+    try:
+        message = json.loads( text or "" )
+    except ValueError:
+        return False
+    return isinstance( message, dict ) and message.get( "type" ) == "end"
+
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: live
+#
+#   DESCRIPTION:
+#       Live swing analysis of a camera feed. The client sends encoded
+#       frames as binary messages (and { "type": "end" } as text when
+#       the feed stops); the server answers each processed frame with
+#       its landmarks and pushes "address" / "swing" events as soon as
+#       they are known.
+#
+#       Only the newest frame waits to be processed: a frame that
+#       arrives while another is waiting replaces it, and a frame that
+#       is older than the latency budget by the time its turn comes is
+#       dropped. Either way the drop is counted and reported, so a slow
+#       connection or model degrades to a lower frame rate instead of
+#       a growing delay.
+#
+# ---------------------------------------------------------------------
+@router.websocket("/")
+async def live(
+    websocket: WebSocket,
+    model_tier: Optional[ str ] = None,
+    fps: float = LIVE_FPS,
+    budget_ms: float = LIVE_BUDGET_MS
+) -> None:
+
+    await websocket.accept()
+    model_tier = ( model_tier or LIVE_MODEL_TIER ).lower()
+    if model_tier not in MODEL_TIERS:
+        await websocket.close( code=CLOSE_POLICY_VIOLATION, reason=f"Unknown model tier: { model_tier }" )
+        return
+
+    # -----------------------------------------------------------------
+    # Creating the session may load a pose graph, so it runs in the
+    # threadpool like every other pose call.
+    # -----------------------------------------------------------------
+    session = await run_in_threadpool( LiveSession, model_tier=model_tier, fps=fps )
+    await websocket.send_json( { "type": "ready", "model_tier": model_tier, "fps": session.fps, "budget_ms": budget_ms } )
+
+    mailbox: "asyncio.Queue[ Optional[ Tuple[ int, float, bytes ] ] ]" = asyncio.Queue( maxsize=1 )
+    counts = { "received": 0, "dropped": 0 }
+
+    # -----------------------------------------------------------------
+    # Receiver: keep only the newest frame in the mailbox. None marks
+    # the end of the feed; returns whether the client disconnected
+    # (rather than ending the feed).
+    # -----------------------------------------------------------------
+    async def receive() -> bool:
+        disconnected = True
+        while True:
+            message = await websocket.receive()
+            if message[ "type" ] == "websocket.disconnect":
+                break
+            if message.get( "bytes" ) is not None:
+                frame_index = counts[ "received" ]
+                counts[ "received" ] += 1
+                if mailbox.full():
+                    mailbox.get_nowait()
+                    counts[ "dropped" ] += 1
+                mailbox.put_nowait( ( frame_index, time.perf_counter(), message[ "bytes" ] ) )
+            elif _is_end( message.get( "text" ) ):
+                disconnected = False
+                break
+
+        # -------------------------------------------------------------
+        # A frame still waiting is processed when the feed ends, but
+        # not for a client that is gone.
+        # -------------------------------------------------------------
+        if disconnected and mailbox.full():
+            mailbox.get_nowait()
+        await mailbox.put( None )
+        return disconnected
+
+    receiver = asyncio.create_task( receive() )
+
+    # -----------------------------------------------------------------
+    # Processor: run the newest frame unless it is already over budget.
+    # -----------------------------------------------------------------
+    try:
+        while ( item := await mailbox.get() ) is not None:
+            frame_index, arrived, data = item
+            if ( time.perf_counter() - arrived ) * 1000.0 > budget_ms:
+                counts[ "dropped" ] += 1
+                continue
+
+            image = await run_in_threadpool( decode_frame, data )
+            if image is None:
+                await websocket.send_json( { "type": "error", "frame": frame_index, "detail": "Frame is not a decodable image." } )
+                continue
+
+            landmarks, events = await run_in_threadpool( session.process, frame_index, image )
+            latency_ms        = ( time.perf_counter() - arrived ) * 1000.0
+            await websocket.send_json( pose_message( frame_index, landmarks, latency_ms, counts[ "dropped" ] ) )
+            for event in events:
+                await websocket.send_json( event )
+
+        # -------------------------------------------------------------
+        # End of feed: report the swing in progress and a summary.
+        # -------------------------------------------------------------
+        if await receiver:
+            return
+        events: List[ Dict[ str, Any ] ] = await run_in_threadpool( session.end )
+        for event in events:
+            await websocket.send_json( event )
+        await websocket.send_json( { "type": "end", "received": counts[ "received" ], "dropped": counts[ "dropped" ], "swings": session.swings } )
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        session.close()
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,103 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS 
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import sys
+import tempfile
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   fastapi                                import APIRouter, HTTPException, UploadFile, File, Form
+from   fastapi.concurrency                    import run_in_threadpool
+from   routes.jobs                            import rejection
+from   services.cost_model                    import admit, probe_session
+from   swing_analysis_classes.model_tier      import AUTO_TIER, MODEL_TIERS
+from   swing_analysis_classes.pipeline_config import LOCAL_SCORER
+from   swing_analysis_classes.session         import SessionAnalysis
+from   video.swing_window                     import MAX_SESSION_SWINGS
+from   pathlib                                import Path
+from   typing                                 import Dict, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+router = APIRouter( prefix="/session", tags=[ "session" ] )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   EDNPOINT NAME: analyze_session
+#
+#   DESCRIPTION:
+#       Analyze a range session recording: every swing in the video is
+#       found, segmented and scored on its own. Returns the metrics,
+#       key frames and overlay clip of each swing, in time order, and
+#       the admission decision.
+#
+# ---------------------------------------------------------------------
+@router.post("/")
+async def analyze_session(
+    video: UploadFile = File(...),
+    experience_level: Optional[ str ] = Form( None ),
+    camera_angle: Optional[ str ] = Form( None ),
+    model_tier: Optional[ str ] = Form( None ),
+    golfer: Optional[ str ] = Form( None ),
+    club: Optional[ str ] = Form( None ),
+    max_swings: int = Form( MAX_SESSION_SWINGS, ge=1, le=MAX_SESSION_SWINGS )
+) -> Dict:
+
+    if model_tier is not None and model_tier.lower() not in ( *MODEL_TIERS, AUTO_TIER ):
+        raise HTTPException( status_code=422, detail=f"Unknown model tier: { model_tier }" )
+
+    # -----------------------------------------------------------------
+    # Save the upload to a temporary directory for the length of the
+    # analysis; the overlay clips live in the artifact store.
+    # -----------------------------------------------------------------
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = Path( tmp_dir ) / ( video.filename or "tmp_session.mp4" )
+        with video_path.open( "wb" ) as buffer:
+            shutil.copyfileobj( video.file, buffer )
+
+        # -------------------------------------------------------------
+        # Admission control, as for a single swing: the prediction
+        # covers the expected swings of the recording (no LLM call),
+        # may downgrade the pose model, and rejects recordings over
+        # the limit. Sessions can't be queued, so they always run now.
+        # -------------------------------------------------------------
+        probe     = await run_in_threadpool( probe_session, str( video_path ), max_swings )
+        admission = await run_in_threadpool( admit, probe, model_tier, config={ "scorer": LOCAL_SCORER } )
+        if admission.rejected:
+            raise rejection( admission )
+
+        output = await run_in_threadpool(
+            SessionAnalysis,
+            video_path=str( video_path ),
+            camera_angle=camera_angle,
+            experience_level=experience_level,
+            model_tier=admission.tier_override() or model_tier,
+            golfer=golfer,
+            club=club,
+            max_swings=max_swings
+        )
+        return { **output.response(), "admission": admission.to_dict() }
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION 
+# -----------------------------------------------------------------------------
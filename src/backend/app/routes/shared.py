@@ -0,0 +1,137 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   fastapi                  import HTTPException
+from   fastapi.staticfiles      import StaticFiles
+from   services.artifact_store  import ArtifactStore
+from   starlette.datastructures import Headers
+from   starlette.responses      import FileResponse, Response
+from   starlette.staticfiles    import NotModifiedResponse
+from   starlette.types          import Scope
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Registered artifacts never change (a new analysis always gets a new
+# path), so browsers may cache them for as long as they like.
+# ---------------------------------------------------------------------
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: ArtifactFileResponse
+#
+#   DESCRIPTION:
+#       File response used for artifacts. Byte-range and If-Range
+#       handling come from Starlette's FileResponse; full-body responses
+#       are handed to the server as a path (zero-copy sendfile) when it
+#       advertises the ASGI "http.response.pathsend" extension.
+#       Otherwise, larger read chunks keep the per-request syscall and
+#       event loop overhead down while the browser scrubs.
+#
+# ---------------------------------------------------------------------
+class ArtifactFileResponse( FileResponse ):
+    chunk_size = 1024 * 1024
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: SharedFiles
+#
+#   DESCRIPTION:
+#       Static files mount for the shared artifact directory. Lookups
+#       are checked against the artifact store index first: expired
+#       artifacts answer 410 Gone, and every served artifact refreshes
+#       its LRU timestamp. Dotfiles (the index itself) are never served.
+#
+# ---------------------------------------------------------------------
+class SharedFiles( StaticFiles ):
+
+    def __init__( self, store: ArtifactStore ) -> None:
+        super().__init__( directory=store.root )
+        self.store = store
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: get_response
+    #
+    #   DESCRIPTION:
+    #       Resolve the artifact's lifecycle state before handing off to
+    #       the regular static file lookup.
+    #
+    # -----------------------------------------------------------------
+    async def get_response( self, path: str, scope: Scope ) -> Response:
+
+        # -------------------------------------------------------------
+        # Hide the metadata index and any other dotfiles.
+        # -------------------------------------------------------------
+        if any( part.startswith( "." ) for part in path.split( os.sep ) if part not in ( "", "." ) ):
+            raise HTTPException( status_code=404 )
+
+        # -------------------------------------------------------------
+        # Expired artifacts are gone for good, which lets the client
+        # tell "re-run the analysis" apart from a bad link.
+        # -------------------------------------------------------------
+        state = self.store.status( path )
+        if state == "expired":
+            raise HTTPException( status_code=410 )
+
+        if state == "live":
+            self.store.touch( path )
+
+        return await super().get_response( path, scope )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: file_response
+    #
+    #   DESCRIPTION:
+    #       Serve tracked artifacts with a strong ETag derived from the
+    #       content hash and immutable cache headers. Conditional
+    #       requests (If-None-Match) are answered with 304, and If-Range
+    #       is validated against the same ETag. Untracked files fall
+    #       back to the default static file behavior.
+    #
+    # -----------------------------------------------------------------
+    def file_response( self, full_path, stat_result, scope: Scope, status_code: int = 200 ) -> Response:
+        etag = self.store.etag( self.store.relative_path( str( full_path ) ) )
+        if etag is None:
+            return super().file_response( full_path, stat_result, scope, status_code )
+
+        response = ArtifactFileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers={ "etag": f'"{ etag }"', "cache-control": IMMUTABLE_CACHE_CONTROL }
+        )
+        if self.is_not_modified( response.headers, Headers( scope=scope ) ):
+            return NotModifiedResponse( response.headers )
+        return response
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
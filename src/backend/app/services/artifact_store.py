@@ -0,0 +1,557 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   lib    import SHARED_DIR, hash_file
+from   typing import Optional
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Lifecycle limits for generated artifacts. Each can be overridden per
+# deployment through the environment.
+# ---------------------------------------------------------------------
+ARTIFACT_TTL_SECONDS    = int( os.environ.get( "SWING_ARTIFACT_TTL_SECONDS", 24 * 60 * 60 ) )
+ARTIFACT_MAX_BYTES      = int( os.environ.get( "SWING_ARTIFACT_MAX_BYTES", 10 * 1024 ** 3 ) )
+ARTIFACT_SWEEP_SECONDS  = int( os.environ.get( "SWING_ARTIFACT_SWEEP_SECONDS", 5 * 60 ) )
+
+# ---------------------------------------------------------------------
+# Expired artifacts keep a tombstone row so the static mount can answer
+# 410 instead of 404. Tombstones are pruned after this long.
+# ---------------------------------------------------------------------
+TOMBSTONE_RETENTION_SECONDS = 7 * 24 * 60 * 60
+
+# ---------------------------------------------------------------------
+# Files in the store that were allocated but never registered (their
+# request failed) are removed once they haven't been written for this
+# long.
+# ---------------------------------------------------------------------
+ORPHAN_GRACE_SECONDS = int( os.environ.get( "SWING_ARTIFACT_ORPHAN_SECONDS", 60 * 60 ) )
+
+# ---------------------------------------------------------------------
+# Access timestamps are only rewritten when they are older than this,
+# so repeated range requests while scrubbing don't hammer the index.
+# ---------------------------------------------------------------------
+TOUCH_RESOLUTION_SECONDS = 60
+
+# ---------------------------------------------------------------------
+# Number of rows processed per eviction query.
+# ---------------------------------------------------------------------
+SWEEP_BATCH_SIZE = 256
+
+# ---------------------------------------------------------------------
+# Name of the metadata index kept at the root of the store. Dotfiles
+# are never served by the static mount.
+# ---------------------------------------------------------------------
+INDEX_FILENAME = ".artifacts.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    rel_path     TEXT    PRIMARY KEY,
+    kind         TEXT    NOT NULL,
+    size_bytes   INTEGER NOT NULL,
+    created_at   REAL    NOT NULL,
+    last_access  REAL    NOT NULL,
+    expires_at   REAL    NOT NULL,
+    state        TEXT    NOT NULL DEFAULT 'live',
+    etag         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_lru     ON artifacts ( state, last_access );
+CREATE INDEX IF NOT EXISTS idx_artifacts_expires ON artifacts ( state, expires_at );
+"""
+
+logger = logging.getLogger( "swing.artifacts" )
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: ArtifactStore
+#
+#   DESCRIPTION:
+#       Manages the lifecycle of generated artifacts (e.g. pose overlay
+#       videos) in the shared directory. Files are written into sharded
+#       subdirectories and tracked in a small SQLite index, so expiry
+#       and size-cap eviction never need to list the directory.
+#
+#       Artifacts expire after a TTL, and the least recently accessed
+#       artifacts are evicted once the total size exceeds the cap. A
+#       background sweeper thread applies both policies periodically,
+#       and also removes stale files that were never registered.
+#
+# ---------------------------------------------------------------------
+class ArtifactStore:
+
+    def __init__(
+        self,
+        root: str = SHARED_DIR,
+        ttl_seconds: int = ARTIFACT_TTL_SECONDS,
+        max_bytes: int = ARTIFACT_MAX_BYTES,
+        sweep_interval: int = ARTIFACT_SWEEP_SECONDS
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Initialize the storage root and lifecycle policy.
+        # -------------------------------------------------------------
+        self.root           = root
+        self.ttl_seconds    = ttl_seconds
+        self.max_bytes      = max_bytes
+        self.sweep_interval = sweep_interval
+        os.makedirs( self.root, exist_ok=True )
+
+        # -------------------------------------------------------------
+        # Open the metadata index. A single connection is shared across
+        # request and sweeper threads, so all access goes through the
+        # lock.
+        # -------------------------------------------------------------
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join( self.root, INDEX_FILENAME ),
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.execute( "PRAGMA journal_mode=WAL" )
+        self._conn.executescript( SCHEMA )
+
+        # -------------------------------------------------------------
+        # Indexes created before content hashes were tracked lack the
+        # etag column.
+        # -------------------------------------------------------------
+        columns = [ row[ 1 ] for row in self._conn.execute( "PRAGMA table_info( artifacts )" ) ]
+        if "etag" not in columns:
+            self._conn.execute( "ALTER TABLE artifacts ADD COLUMN etag TEXT" )
+
+        # -------------------------------------------------------------
+        # Background sweeper state.
+        # -------------------------------------------------------------
+        self._sweeper: Optional[ threading.Thread ] = None
+        self._stop    = threading.Event()
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: allocate
+    #
+    #   DESCRIPTION:
+    #       Reserve a unique path for a new artifact. The first two hex
+    #       characters of the generated id select the shard directory.
+    #
+    # -----------------------------------------------------------------
+    def allocate( self, prefix: str, suffix: str ) -> str:
+        artifact_id = uuid.uuid4().hex
+        shard_dir   = os.path.join( self.root, artifact_id[ :2 ] )
+        os.makedirs( shard_dir, exist_ok=True )
+        return os.path.join( shard_dir, f"{ prefix }_{ artifact_id }{ suffix }" )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: register
+    #
+    #   DESCRIPTION:
+    #       Record a finished artifact in the index so it participates
+    #       in TTL expiry and LRU eviction. Paths that were never
+    #       written (e.g. the video writer failed to open) are ignored.
+    #
+    #       Artifacts are immutable once registered, so a hash of the
+    #       content is computed here and served as a strong ETag.
+    #
+    # -----------------------------------------------------------------
+    def register( self, path: str, kind: str ) -> bool:
+
+        # -------------------------------------------------------------
+        # Nothing to track if the artifact never made it to disk.
+        # -------------------------------------------------------------
+        if not os.path.isfile( path ):
+            return False
+
+        etag = hash_file( path )
+        now  = time.time()
+        size = os.path.getsize( path )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts VALUES ( ?, ?, ?, ?, ?, ?, 'live', ? )",
+                ( self.relative_path( path ), kind, size, now, now, now + self.ttl_seconds, etag )
+            )
+
+        # -------------------------------------------------------------
+        # Enforce the size cap straight away rather than waiting for
+        # the next sweep. The new artifact itself is never evicted
+        # here, since its URL hasn't reached the client yet.
+        # -------------------------------------------------------------
+        self._evict_over_capacity( keep=self.relative_path( path ) )
+        return True
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: discard
+    #
+    #   DESCRIPTION:
+    #       Delete an artifact that turned out not to be needed (e.g.
+    #       the overlay clip of a rejected swing candidate) and leave a
+    #       tombstone if it was registered.
+    #
+    # -----------------------------------------------------------------
+    def discard( self, path: str ) -> None:
+        self._expire( [ self.relative_path( path ) ] )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: status
+    #
+    #   DESCRIPTION:
+    #       Return "live", "expired", or None (unknown) for an artifact
+    #       path relative to the store root. Live artifacts that are
+    #       past their TTL are reported as expired even if the sweeper
+    #       hasn't removed them yet.
+    #
+    # -----------------------------------------------------------------
+    def status( self, rel_path: str ) -> Optional[ str ]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, expires_at FROM artifacts WHERE rel_path = ?",
+                ( self._normalize( rel_path ), )
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        state, expires_at = row
+        if state == "live" and expires_at <= time.time():
+            return "expired"
+        return state
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: etag
+    #
+    #   DESCRIPTION:
+    #       Return the content hash of a live artifact, or None if the
+    #       artifact isn't tracked.
+    #
+    # -----------------------------------------------------------------
+    def etag( self, rel_path: str ) -> Optional[ str ]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag FROM artifacts WHERE rel_path = ? AND state = 'live'",
+                ( self._normalize( rel_path ), )
+            ).fetchone()
+        return row[ 0 ] if row else None
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: touch
+    #
+    #   DESCRIPTION:
+    #       Mark an artifact as recently accessed for LRU ordering.
+    #
+    # -----------------------------------------------------------------
+    def touch( self, rel_path: str ) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artifacts SET last_access = ? WHERE rel_path = ? AND state = 'live' AND last_access < ?",
+                ( now, self._normalize( rel_path ), now - TOUCH_RESOLUTION_SECONDS )
+            )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: relative_path
+    #
+    #   DESCRIPTION:
+    #       Convert an absolute artifact path into the POSIX style path
+    #       relative to the store root (e.g. "3f/pose_overlay_3f...mp4").
+    #
+    # -----------------------------------------------------------------
+    def relative_path( self, path: str ) -> str:
+        return self._normalize( os.path.relpath( os.path.realpath( path ), os.path.realpath( self.root ) ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: url_for
+    #
+    #   DESCRIPTION:
+    #       Public URL of an artifact under the "/shared" static mount.
+    #
+    # -----------------------------------------------------------------
+    def url_for( self, path: str ) -> str:
+        return f"/shared/{ self.relative_path( path ) }"
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: sweep
+    #
+    #   DESCRIPTION:
+    #       Apply the lifecycle policy once: expire artifacts past their
+    #       TTL, evict least recently used artifacts over the size cap,
+    #       remove stale unregistered files and prune old tombstones.
+    #       Returns the number of files removed.
+    #
+    # -----------------------------------------------------------------
+    def sweep( self ) -> int:
+        now     = time.time()
+        removed = 0
+
+        # -------------------------------------------------------------
+        # Expire everything past its TTL, a batch at a time.
+        # -------------------------------------------------------------
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rel_path FROM artifacts WHERE state = 'live' AND expires_at <= ? LIMIT ?",
+                    ( now, SWEEP_BATCH_SIZE )
+                ).fetchall()
+            if not rows:
+                break
+            removed += self._expire( [ row[ 0 ] for row in rows ] )
+
+        # -------------------------------------------------------------
+        # Bring the store back under its size cap.
+        # -------------------------------------------------------------
+        removed += self._evict_over_capacity()
+
+        # -------------------------------------------------------------
+        # Remove files nothing will ever register.
+        # -------------------------------------------------------------
+        removed += self._remove_orphans( now - ORPHAN_GRACE_SECONDS )
+
+        # -------------------------------------------------------------
+        # Forget tombstones old enough that nobody should still hold
+        # their URLs.
+        # -------------------------------------------------------------
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM artifacts WHERE state = 'expired' AND expires_at <= ?",
+                ( now - TOMBSTONE_RETENTION_SECONDS, )
+            )
+
+        return removed
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: start_sweeper
+    #
+    #   DESCRIPTION:
+    #       Start the background sweeper thread (idempotent).
+    #
+    # -----------------------------------------------------------------
+    def start_sweeper( self ) -> None:
+        if self._sweeper and self._sweeper.is_alive():
+            return
+
+        self._stop.clear()
+        self._sweeper = threading.Thread( target=self._sweep_loop, name="artifact-sweeper", daemon=True )
+        self._sweeper.start()
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: stop_sweeper
+    #
+    #   DESCRIPTION:
+    #       Signal the background sweeper to exit and wait for it.
+    #
+    # -----------------------------------------------------------------
+    def stop_sweeper( self ) -> None:
+        self._stop.set()
+        if self._sweeper:
+            self._sweeper.join()
+            self._sweeper = None
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _sweep_loop
+    #
+    #   DESCRIPTION:
+    #       Body of the sweeper thread. Errors are logged and the sweep
+    #       retried next interval, so a single bad sweep (a locked file
+    #       on Windows, a busy database) doesn't kill it.
+    #
+    # -----------------------------------------------------------------
+    def _sweep_loop( self ) -> None:
+        while not self._stop.wait( self.sweep_interval ):
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception( "Artifact sweep failed" )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _evict_over_capacity
+    #
+    #   DESCRIPTION:
+    #       Evict least recently accessed live artifacts, other than
+    #       keep, until the total tracked size is within the cap.
+    #
+    # -----------------------------------------------------------------
+    def _evict_over_capacity( self, keep: Optional[ str ] = None ) -> int:
+        removed = 0
+        while True:
+            with self._lock:
+                total = self._conn.execute(
+                    "SELECT COALESCE( SUM( size_bytes ), 0 ) FROM artifacts WHERE state = 'live'"
+                ).fetchone()[ 0 ]
+                if total <= self.max_bytes:
+                    break
+
+                # -----------------------------------------------------
+                # Walk the LRU index just far enough to free the excess.
+                # -----------------------------------------------------
+                victims, excess = [], total - self.max_bytes
+                for rel_path, size in self._conn.execute(
+                    "SELECT rel_path, size_bytes FROM artifacts WHERE state = 'live' AND rel_path IS NOT ? ORDER BY last_access LIMIT ?",
+                    ( keep, SWEEP_BATCH_SIZE )
+                ):
+                    victims.append( rel_path )
+                    excess -= size
+                    if excess <= 0:
+                        break
+
+            if not victims:
+                break
+            removed += self._expire( victims )
+        return removed
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _remove_orphans
+    #
+    #   DESCRIPTION:
+    #       Delete files in the shard directories that have no live
+    #       index row and were last written before the cutoff: paths
+    #       allocated by requests that failed before registering them,
+    #       or expired artifacts whose removal failed.
+    #
+    # -----------------------------------------------------------------
+    def _remove_orphans( self, cutoff: float ) -> int:
+        stale = []
+        for shard in os.scandir( self.root ):
+            if not shard.is_dir() or shard.name.startswith( "." ):
+                continue
+            for entry in os.scandir( shard.path ):
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    stale.append( f"{ shard.name }/{ entry.name }" )
+
+        removed = 0
+        for start in range( 0, len( stale ), SWEEP_BATCH_SIZE ):
+            batch = stale[ start:start + SWEEP_BATCH_SIZE ]
+            with self._lock:
+                live = { row[ 0 ] for row in self._conn.execute(
+                    f"SELECT rel_path FROM artifacts WHERE state = 'live' AND rel_path IN ( { ', '.join( '?' * len( batch ) ) } )",
+                    batch
+                ) }
+            for rel_path in batch:
+                if rel_path in live:
+                    continue
+                try:
+                    os.remove( os.path.join( self.root, *rel_path.split( "/" ) ) )
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _expire
+    #
+    #   DESCRIPTION:
+    #       Delete the given artifacts from disk and turn their index
+    #       rows into tombstones.
+    #
+    # -----------------------------------------------------------------
+    def _expire( self, rel_paths: list[ str ] ) -> int:
+        removed = 0
+        for rel_path in rel_paths:
+            try:
+                os.remove( os.path.join( self.root, *rel_path.split( "/" ) ) )
+                removed += 1
+            except FileNotFoundError:
+                pass
+
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE artifacts SET state = 'expired', expires_at = ? WHERE rel_path = ?",
+                [ ( now, rel_path ) for rel_path in rel_paths ]
+            )
+        return removed
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _normalize
+    #
+    #   DESCRIPTION:
+    #       Index keys always use forward slashes, regardless of OS.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _normalize( rel_path: str ) -> str:
+        return rel_path.replace( os.sep, "/" ).lstrip( "/" )
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+_store: Optional[ ArtifactStore ] = None
+_store_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_artifact_store
+#
+#   DESCRIPTION:
+#       Return the process-wide artifact store for the shared directory,
+#       creating it on first use.
+#
+# ---------------------------------------------------------------------
+def get_artifact_store() -> ArtifactStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore()
+        return _store
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,645 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import cv2
+import json
+import math
+import numpy as np
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   lib                                    import BASE_DIR
+from   scipy.optimize                         import nnls
+from   services.job_queue                     import JobQueue
+from   swing_analysis_classes.model_tier      import MODEL_TIERS, choose_model_tier
+from   swing_analysis_classes.pipeline_config import LLM_SCORER, PipelineConfig
+from   typing                                 import Any, Dict, Iterable, List, Optional
+from   video.swing_window                     import SWING_WINDOW_ENABLED
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Finished analyses record their pipeline time in the cost database
+# (a local SQLite file) unless disabled for the deployment. Admission
+# control runs off the model's predictions.
+# ---------------------------------------------------------------------
+COST_MODEL_ENABLED = os.environ.get( "SWING_COST_MODEL", "1" ) == "1"
+COST_DB            = os.environ.get( "SWING_COST_DB", os.path.join( BASE_DIR, "costs.sqlite3" ) )
+ADMISSION_ENABLED  = os.environ.get( "SWING_ADMISSION", "1" ) == "1"
+
+# ---------------------------------------------------------------------
+# The pose model only runs on the swing window, which is only found
+# once the clip is decoded. Predictions assume a window this long and,
+# for a range session recording, one swing per SESSION_SWING_SECONDS.
+# ---------------------------------------------------------------------
+TYPICAL_WINDOW_SECONDS = 4.0
+SESSION_SWING_SECONDS  = 20.0
+
+# ---------------------------------------------------------------------
+# Pipeline seconds are modelled as a linear combination of features of
+# the probed clip and the pipeline configuration (see PipelineConfig):
+#
+#   base        fixed cost: key frame stills, history
+#   llm         the LLM call, when the LLM scores the swing
+#   decode      source frames x megapixels decoded: the whole clip for
+#               the motion pre-pass plus the analyzed frames
+#   convert     analyzed frames x megapixels at the inference width
+#   overlay     the same, when the overlay is drawn and encoded
+#   pose_<tier> frames through that tier's landmark model (analyzed
+#               frames over the stride)
+#
+# The defaults below are used until enough analyses are recorded.
+# Samples store the configuration itself, so they stay usable when
+# features change.
+# ---------------------------------------------------------------------
+COST_FEATURES = ( "base", "llm", "decode", "convert", "overlay", *( f"pose_{ tier }" for tier in MODEL_TIERS ) )
+
+DEFAULT_COEFFICIENTS = {
+    "base": 1.0,
+    "llm": 2.0,
+    "decode": 0.002,
+    "convert": 0.002,
+    "overlay": 0.006,
+    "pose_lite": 0.008,
+    "pose_full": 0.015,
+    "pose_heavy": 0.045
+}
+
+# ---------------------------------------------------------------------
+# Configuration keys missing from a sample or request take the values
+# of the standard pipeline.
+# ---------------------------------------------------------------------
+STANDARD_CONFIG = { "stride": 1, "inference_width": None, "overlay": True, "scorer": LLM_SCORER }
+
+# ---------------------------------------------------------------------
+# Calibration. The model is refit on the most recent samples at most
+# once per refit interval, and only once there are enough of them. A
+# coefficient whose feature was seen in too few samples (e.g. a tier
+# nobody uses), or never varied (e.g. the LLM, if it always ran, which
+# the fit couldn't tell apart from the base cost), keeps its default.
+# ---------------------------------------------------------------------
+CALIBRATION_WINDOW      = 1000
+MIN_CALIBRATION_SAMPLES = int( os.environ.get( "SWING_COST_MIN_SAMPLES", 20 ) )
+MIN_FEATURE_SAMPLES     = 5
+REFIT_SECONDS           = float( os.environ.get( "SWING_COST_REFIT_SECONDS", 60 ) )
+
+# ---------------------------------------------------------------------
+# Admission policy, in predicted pipeline seconds. Above the downgrade
+# threshold the cheapest pose model tier that fits is used instead;
+# clips still predicted over the maximum are rejected. The synchronous
+# endpoint hands requests over the sync limit to the job queue, and
+# jobs that would wait longer than the maximum wait are turned away
+# until the backlog drains.
+# ---------------------------------------------------------------------
+ADMISSION_DOWNGRADE_SECONDS = float( os.environ.get( "SWING_ADMISSION_DOWNGRADE_SECONDS", 60 ) )
+ADMISSION_MAX_SECONDS       = float( os.environ.get( "SWING_ADMISSION_MAX_SECONDS", 300 ) )
+ADMISSION_SYNC_SECONDS      = float( os.environ.get( "SWING_ADMISSION_SYNC_SECONDS", 30 ) )
+ADMISSION_MAX_WAIT_SECONDS  = float( os.environ.get( "SWING_ADMISSION_MAX_WAIT_SECONDS", 900 ) )
+
+# ---------------------------------------------------------------------
+# Admission actions.
+# ---------------------------------------------------------------------
+ACCEPT    = "accept"
+DOWNGRADE = "downgrade"
+QUEUE     = "queue"
+REJECT    = "reject"
+
+# ---------------------------------------------------------------------
+# Pose model tiers from cheapest to most expensive.
+# ---------------------------------------------------------------------
+TIERS_BY_COST = sorted( MODEL_TIERS, key=MODEL_TIERS.get )
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL    NOT NULL,
+    frame_count INTEGER NOT NULL,
+    fps         REAL    NOT NULL,
+    width       INTEGER NOT NULL,
+    height      INTEGER NOT NULL,
+    config      TEXT    NOT NULL,
+    seconds     REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_date ON samples ( recorded_at );
+"""
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: VideoProbe
+#
+#   DESCRIPTION:
+#       Frame count, frame rate and resolution of a clip, read from the
+#       container header without decoding. Fields are zero where the
+#       container doesn't report them. windows is the number of swing
+#       windows the pose model is expected to run on (more than one for
+#       a session recording or several angles).
+#
+# ---------------------------------------------------------------------
+class VideoProbe:
+
+    def __init__( self, frame_count: int, fps: float, width: int, height: int, windows: int = 1 ) -> None:
+        self.frame_count = max( int( frame_count ), 0 )
+        self.fps         = max( float( fps ), 0.0 )
+        self.width       = max( int( width ), 0 )
+        self.height      = max( int( height ), 0 )
+        self.windows     = max( int( windows ), 1 )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    @property
+    def megapixels( self ) -> float:
+        return self.width * self.height / 1e6
+
+
+    @property
+    def duration( self ) -> float:
+        return self.frame_count / self.fps if self.fps > 0 else 0.0
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: analyzed_frames
+    #
+    #   DESCRIPTION:
+    #       Frames the pose model is expected to run on: the typical
+    #       swing windows when the motion pre-pass is enabled (and the
+    #       frame rate is known), otherwise the whole clip.
+    #
+    # -----------------------------------------------------------------
+    def analyzed_frames( self ) -> int:
+        if SWING_WINDOW_ENABLED and self.fps > 0:
+            return min( self.frame_count, self.windows * int( round( TYPICAL_WINDOW_SECONDS * self.fps ) ) )
+        return self.frame_count
+
+
+    def to_dict( self ) -> Dict[ str, Any ]:
+        return {
+            "frame_count": self.frame_count,
+            "fps": round( self.fps, 3 ),
+            "width": self.width,
+            "height": self.height,
+            "duration": round( self.duration, 3 )
+        }
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: CostModel
+#
+#   DESCRIPTION:
+#       Predicts the pipeline seconds of an analysis from the probed
+#       clip and its configuration, calibrated on the recorded times of
+#       past analyses (the samples table). A configuration is a dict of
+#       pipeline choices (PipelineConfig.cost_config).
+#
+#       Coefficients are refit by non-negative least squares, so no
+#       feature can make a clip look cheaper. Samples are shared by all
+#       processes using the same database file.
+#
+# ---------------------------------------------------------------------
+class CostModel:
+
+    def __init__( self, path: str = COST_DB ) -> None:
+
+        # -------------------------------------------------------------
+        # A single connection is shared across request threads, so all
+        # access goes through the lock.
+        # -------------------------------------------------------------
+        os.makedirs( os.path.dirname( os.path.abspath( path ) ), exist_ok=True )
+        self.path  = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect( path, check_same_thread=False, isolation_level=None, timeout=30 )
+        self._conn.execute( "PRAGMA journal_mode=WAL" )
+        self._conn.executescript( SCHEMA )
+
+        # -------------------------------------------------------------
+        # Current coefficients, how many samples they were fit on, and
+        # when they were fit.
+        # -------------------------------------------------------------
+        self.coefficients: Dict[ str, float ] = dict( DEFAULT_COEFFICIENTS )
+        self.samples   = 0
+        self._fit_time = None
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: predict
+    #
+    #   DESCRIPTION:
+    #       Predicted pipeline seconds of a clip with a configuration.
+    #
+    # -----------------------------------------------------------------
+    def predict( self, probe: VideoProbe, config: Dict[ str, Any ] ) -> float:
+        self._refit_if_due()
+        features = features_for( probe, config )
+        return float( sum( self.coefficients[ name ] * value for name, value in zip( COST_FEATURES, features ) ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: observe
+    #
+    #   DESCRIPTION:
+    #       Record the measured pipeline seconds of a finished analysis.
+    #
+    # -----------------------------------------------------------------
+    def observe( self, probe: VideoProbe, config: Dict[ str, Any ], seconds: float ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO samples ( recorded_at, frame_count, fps, width, height, config, seconds ) VALUES ( ?, ?, ?, ?, ?, ?, ? )",
+                ( time.time(), probe.frame_count, probe.fps, probe.width, probe.height, json.dumps( config, sort_keys=True ), seconds )
+            )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: calibrate
+    #
+    #   DESCRIPTION:
+    #       Refit the coefficients on the most recent samples. With too
+    #       few samples the defaults stay in place. Returns the number
+    #       of samples used.
+    #
+    # -----------------------------------------------------------------
+    def calibrate( self ) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT frame_count, fps, width, height, config, seconds FROM samples ORDER BY recorded_at DESC LIMIT ?",
+                ( CALIBRATION_WINDOW, )
+            ).fetchall()
+        self._fit_time = time.monotonic()
+
+        if len( rows ) < MIN_CALIBRATION_SAMPLES:
+            self.coefficients = dict( DEFAULT_COEFFICIENTS )
+            self.samples      = 0
+            return 0
+
+        features = np.array( [ features_for( VideoProbe( *row[ :4 ] ), json.loads( row[ 4 ] ) ) for row in rows ] )
+        seconds  = np.array( [ row[ 5 ] for row in rows ] )
+
+        # -------------------------------------------------------------
+        # Hold coefficients of rarely seen features at their defaults:
+        # subtract their contribution and fit the rest.
+        # -------------------------------------------------------------
+        default = np.array( [ DEFAULT_COEFFICIENTS[ name ] for name in COST_FEATURES ] )
+        fitted  = ( np.count_nonzero( features, axis=0 ) >= MIN_FEATURE_SAMPLES ) & ( np.ptp( features, axis=0 ) > 0 )
+        fitted[ COST_FEATURES.index( "base" ) ] = True
+        target  = seconds - features[ :, ~fitted ] @ default[ ~fitted ]
+
+        # -------------------------------------------------------------
+        # Scale columns to unit norm so frame-level and per-request
+        # coefficients are fit with comparable precision.
+        # -------------------------------------------------------------
+        columns = features[ :, fitted ]
+        scale   = np.linalg.norm( columns, axis=0 )
+        solution, _ = nnls( columns / scale, target )
+
+        coefficients = default.copy()
+        coefficients[ fitted ] = solution / scale
+        self.coefficients = dict( zip( COST_FEATURES, coefficients.tolist() ) )
+        self.samples      = len( rows )
+        return self.samples
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _refit_if_due
+    #
+    #   DESCRIPTION:
+    #       Calibrate on first use and then every refit interval, so
+    #       samples recorded by other processes are picked up.
+    #
+    # -----------------------------------------------------------------
+    def _refit_if_due( self ) -> None:
+        if self._fit_time is None or time.monotonic() - self._fit_time >= REFIT_SECONDS:
+            self.calibrate()
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: Admission
+#
+#   DESCRIPTION:
+#       Admission decision for one request: the action, the pose model
+#       tier to run (after any downgrade), the predicted pipeline
+#       seconds, and why. With a deadline, the pipeline configuration
+#       chosen to meet it. eta_seconds is filled in once the request's
+#       place in the job queue is known. A request rejected only for
+#       the queue backlog has retry_after set.
+#
+# ---------------------------------------------------------------------
+class Admission:
+
+    def __init__(
+        self,
+        action: str,
+        model_tier: Optional[ str ],
+        predicted_seconds: float,
+        probe: VideoProbe,
+        reason: Optional[ str ] = None,
+        requested_tier: Optional[ str ] = None,
+        pipeline: Optional[ PipelineConfig ] = None
+    ) -> None:
+        self.action            = action
+        self.model_tier        = model_tier
+        self.predicted_seconds = predicted_seconds
+        self.probe             = probe
+        self.reason            = reason
+        self.requested_tier    = requested_tier
+        self.pipeline          = pipeline
+        self.eta_seconds       = predicted_seconds
+        self.retry_after: Optional[ float ] = None
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    @property
+    def rejected( self ) -> bool:
+        return self.action == REJECT
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: tier_override
+    #
+    #   DESCRIPTION:
+    #       Tier the pipeline must be run with, or None to resolve the
+    #       requested tier as usual (so "auto" still sees the load when
+    #       the analysis actually starts). Deadline requests carry their
+    #       tier in the pipeline configuration instead.
+    #
+    # -----------------------------------------------------------------
+    def tier_override( self ) -> Optional[ str ]:
+        return self.model_tier if self.action == DOWNGRADE and self.pipeline is None else None
+
+
+    def to_dict( self ) -> Dict[ str, Any ]:
+        return {
+            "action": self.action,
+            "model_tier": self.model_tier,
+            "requested_tier": self.requested_tier,
+            "predicted_seconds": round( self.predicted_seconds, 2 ),
+            "eta_seconds": round( self.eta_seconds, 2 ),
+            "reason": self.reason,
+            "pipeline": self.pipeline.to_dict() if self.pipeline is not None else None,
+            "video": self.probe.to_dict()
+        }
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: probe_video
+#
+#   DESCRIPTION:
+#       Probe a clip's container header (see VideoProbe).
+#
+# ---------------------------------------------------------------------
+def probe_video( video_path: str ) -> VideoProbe:
+    cap = cv2.VideoCapture( video_path )
+    try:
+        return VideoProbe(
+            frame_count=cap.get( cv2.CAP_PROP_FRAME_COUNT ),
+            fps=cap.get( cv2.CAP_PROP_FPS ),
+            width=cap.get( cv2.CAP_PROP_FRAME_WIDTH ),
+            height=cap.get( cv2.CAP_PROP_FRAME_HEIGHT )
+        )
+    finally:
+        cap.release()
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: probe_session
+#
+#   DESCRIPTION:
+#       Probe a range session recording: one swing window per
+#       SESSION_SWING_SECONDS of video, up to max_swings.
+#
+# ---------------------------------------------------------------------
+def probe_session( video_path: str, max_swings: int ) -> VideoProbe:
+    probe         = probe_video( video_path )
+    probe.windows = max( 1, min( max_swings, math.ceil( probe.duration / SESSION_SWING_SECONDS ) ) )
+    return probe
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: probe_angles
+#
+#   DESCRIPTION:
+#       Probe the clips of one swing recorded from several angles as a
+#       single clip: all of their frames, a swing window per angle, at
+#       the highest frame rate and resolution among them.
+#
+# ---------------------------------------------------------------------
+def probe_angles( video_paths: Iterable[ str ] ) -> VideoProbe:
+    probes = [ probe_video( path ) for path in video_paths ]
+    return VideoProbe(
+        frame_count=sum( probe.frame_count for probe in probes ),
+        fps=max( probe.fps for probe in probes ),
+        width=max( probe.width for probe in probes ),
+        height=max( probe.height for probe in probes ),
+        windows=len( probes )
+    )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: features_for
+#
+#   DESCRIPTION:
+#       Cost feature vector (in COST_FEATURES order) of a clip with a
+#       configuration.
+#
+# ---------------------------------------------------------------------
+def features_for( probe: VideoProbe, config: Dict[ str, Any ] ) -> List[ float ]:
+    config   = { **STANDARD_CONFIG, **config }
+    analyzed = probe.analyzed_frames()
+
+    # -----------------------------------------------------------------
+    # Frames are decoded at the inference width, if it is below the
+    # source width.
+    # -----------------------------------------------------------------
+    width  = config[ "inference_width" ]
+    scaled = probe.megapixels
+    if width and 0 < width < probe.width:
+        scaled *= ( width / probe.width ) ** 2
+
+    values = {
+        "base": 1.0,
+        "llm": 1.0 if config[ "scorer" ] == LLM_SCORER else 0.0,
+        "decode": ( probe.frame_count + analyzed ) * probe.megapixels,
+        "convert": analyzed * scaled,
+        "overlay": analyzed * scaled if config[ "overlay" ] else 0.0,
+        f"pose_{ config.get( 'model_tier' ) }": math.ceil( analyzed / max( int( config[ "stride" ] ), 1 ) )
+    }
+    return [ float( values.get( name, 0.0 ) ) for name in COST_FEATURES ]
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: choose_pipeline
+#
+#   DESCRIPTION:
+#       Deadline scheduling: of the pipeline configurations up to the
+#       given pose model tier, pick the one that gives up the least
+#       quality (PipelineConfig.penalty) among those predicted to
+#       finish within the deadline, the faster one on a tie. If none
+#       is, pick the fastest. The chosen configuration records the
+#       deadline and its prediction.
+#
+# ---------------------------------------------------------------------
+def choose_pipeline( probe: VideoProbe, deadline_seconds: float, max_tier: str ) -> PipelineConfig:
+    model  = get_cost_model()
+    ranked = [
+        ( config.penalty(), model.predict( probe, config.cost_config() ), index, config )
+        for index, config in enumerate( PipelineConfig.candidates( max_tier, probe.width ) )
+    ]
+    in_time = [ entry for entry in ranked if entry[ 1 ] <= deadline_seconds ]
+    if in_time:
+        _, predicted, _, chosen = min( in_time )
+    else:
+        predicted, _, chosen = min( ( entry[ 1 ], entry[ 2 ], entry[ 3 ] ) for entry in ranked )
+
+    chosen.deadline_seconds  = deadline_seconds
+    chosen.predicted_seconds = predicted
+    return chosen
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: admit
+#
+#   DESCRIPTION:
+#       Decide whether and how to run an analysis of a probed clip.
+#
+#       The requested tier is resolved as the pipeline would, and
+#       downgraded when the prediction is over the downgrade threshold.
+#       With a deadline, the whole pipeline is configured to meet it
+#       instead (see choose_pipeline).
+#
+#       A prediction still over the maximum rejects the request.
+#       Synchronous requests over the sync limit are sent to the job
+#       queue instead. For queued requests the ETA adds the queued work
+#       that would run first, and a wait over the maximum rejects the
+#       request too.
+#
+#       config holds pipeline choices that are fixed for the request
+#       (e.g. no LLM call for a session), used in every prediction.
+#
+# ---------------------------------------------------------------------
+def admit(
+    probe: VideoProbe,
+    requested_tier: Optional[ str ],
+    queue: Optional[ JobQueue ] = None,
+    synchronous: bool = False,
+    deadline_seconds: Optional[ float ] = None,
+    config: Optional[ Dict[ str, Any ] ] = None
+) -> Admission:
+    model  = get_cost_model()
+    config = config or {}
+    tier   = choose_model_tier( requested_tier, n_frames=probe.analyzed_frames() )
+    cost   = model.predict( probe, { **config, "model_tier": tier } )
+
+    # -----------------------------------------------------------------
+    # With a deadline, the pipeline is configured to finish in time;
+    # a queued request has its expected wait taken off the deadline
+    # first.
+    # -----------------------------------------------------------------
+    action, reason, pipeline = ACCEPT, None, None
+    if deadline_seconds is not None:
+        backlog_seconds = queue.backlog_seconds( cost ) if queue is not None and not synchronous else 0.0
+        pipeline        = choose_pipeline( probe, deadline_seconds - backlog_seconds, tier )
+        if pipeline.predicted_seconds > pipeline.deadline_seconds:
+            action, reason = DOWNGRADE, f"No configuration is predicted to finish within { deadline_seconds:.0f} s; running the fastest."
+        elif pipeline.penalty() > PipelineConfig( model_tier=tier, **STANDARD_CONFIG ).penalty():
+            action, reason = DOWNGRADE, f"Pipeline degraded to finish within { deadline_seconds:.0f} s."
+        tier, cost = pipeline.model_tier, pipeline.predicted_seconds
+
+    if not ADMISSION_ENABLED:
+        return Admission( action, tier, cost, probe, reason, requested_tier, pipeline )
+
+    # -----------------------------------------------------------------
+    # Downgrade to the most expensive cheaper tier that fits, or the
+    # cheapest one if none does.
+    # -----------------------------------------------------------------
+    if pipeline is None and cost > ADMISSION_DOWNGRADE_SECONDS and TIERS_BY_COST.index( tier ) > 0:
+        cheaper = TIERS_BY_COST[ :TIERS_BY_COST.index( tier ) ]
+        costs   = { candidate: model.predict( probe, { **config, "model_tier": candidate } ) for candidate in cheaper }
+        fitting = [ candidate for candidate in cheaper if costs[ candidate ] <= ADMISSION_DOWNGRADE_SECONDS ]
+        downgraded = fitting[ -1 ] if fitting else cheaper[ 0 ]
+
+        reason = f"Predicted { cost:.0f} s with the { tier } model; downgraded to { downgraded }."
+        action, tier, cost = DOWNGRADE, downgraded, costs[ downgraded ]
+
+    if cost > ADMISSION_MAX_SECONDS:
+        return Admission( REJECT, tier, cost, probe, f"Predicted { cost:.0f} s exceeds the { ADMISSION_MAX_SECONDS:.0f} s limit.", requested_tier, pipeline )
+
+    if synchronous and cost > ADMISSION_SYNC_SECONDS:
+        action = QUEUE
+        reason = f"Predicted { cost:.0f} s is over the { ADMISSION_SYNC_SECONDS:.0f} s synchronous limit; queued."
+        synchronous = False
+
+    admission = Admission( action, tier, cost, probe, reason, requested_tier, pipeline )
+    if not synchronous and queue is not None:
+        backlog_seconds       = queue.backlog_seconds( cost )
+        admission.eta_seconds = backlog_seconds + cost
+        if backlog_seconds > ADMISSION_MAX_WAIT_SECONDS:
+            admission.action = REJECT
+            admission.reason = f"Queue backlog of { backlog_seconds:.0f} s exceeds the { ADMISSION_MAX_WAIT_SECONDS:.0f} s limit."
+            admission.retry_after = backlog_seconds - ADMISSION_MAX_WAIT_SECONDS
+    return admission
+
+
+_model: Optional[ CostModel ] = None
+_model_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_cost_model
+#
+#   DESCRIPTION:
+#       Return the process-wide cost model, opening it on first use.
+#
+# ---------------------------------------------------------------------
+def get_cost_model() -> CostModel:
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = CostModel()
+        return _model
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
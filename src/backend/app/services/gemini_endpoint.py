@@ -4,10 +4,10 @@
 #                                  IMPORTS 
 # -----------------------------------------------------------------------------
 
-from .            import config
-from google       import genai
-from google.genai import types
-from pydantic     import BaseModel
+from .llm_cache     import LLMCache, get_llm_cache, prompt_key
+from .llm_providers import LLM_DEFAULT_MODEL, LLMProvider, get_llm_provider
+from .llm_schema    import ResponseSchema
+from typing         import Optional
 
 # -----------------------------------------------------------------------------
 #                                  CONSTANTS
@@ -17,56 +17,30 @@ from pydantic     import BaseModel
 #                                   CLASSES
 # -----------------------------------------------------------------------------
 
-# ---------------------------------------------------------------------
-#
-#   CLASS NAME: ResponseSchemaScore
-#
-#   DESCRIPTION:
-#       Pydantic base model for structuring the Gemini API responses
-#       for specific swing category scores.
-#
-# ---------------------------------------------------------------------
-class ResponseSchemaScore( BaseModel ):
-    name: str                # "Posture & Setup"
-    score: int               # 0–100
-    summary: str             # One-sentence explanation
-
-
-# ---------------------------------------------------------------------
-#
-#   CLASS NAME: ResponseSchema
-#
-#   DESCRIPTION:
-#       Pydantic base model for structuring the Gemini API responses.
-#
-# ---------------------------------------------------------------------
-class ResponseSchema( BaseModel ):
-    swingAnalysis: str
-    categoryScores: list[ ResponseSchemaScore ]
-    overallScore: int
-    keyObservations: list[ str ]
-    coachingTips: list[ str ]
-
-
 # ---------------------------------------------------------------------
 #
 #   CLASS NAME: Client
 #
 #   DESCRIPTION:
-#       This is the access point to the Gemini API. It's sole
-#       responsibility is to manage communication with the Gemini
-#       service.
+#       This is the access point to the LLM. It's sole responsibility
+#       is to manage communication with the configured provider
+#       (Gemini by default, see services/llm_providers.py).
 #
 # ---------------------------------------------------------------------
 class Client():
     
-    def __init__( self, api_key: str = config.GEMINI_KEY ):
+    def __init__( self, provider: Optional[ LLMProvider ] = None, cache: Optional[ LLMCache ] = None ):
 
         # -------------------------------------------------------------
-        # Initialize with the project-specific API key.
+        # Initialize with the deployment's provider.
         # -------------------------------------------------------------
-        self.api_key       = api_key
-        self.gemini_client = genai.Client( api_key=self.api_key )
+        self.provider = provider if provider is not None else get_llm_provider()
+
+        # -------------------------------------------------------------
+        # Identical prompts share one in-flight call and recent
+        # responses are reused (process-wide cache by default).
+        # -------------------------------------------------------------
+        self.cache = cache if cache is not None else get_llm_cache()
 
     # -----------------------------------------------------------------
     #                        PUBLIC METHODS
@@ -77,23 +51,18 @@ class Client():
     #   PROCEDURE NAME: generate_response
     #
     #   DESCRIPTION:
-    #       Public API method to generate a response from Gemini given
-    #       a text prompt.
+    #       Public API method to generate a response from the provider
+    #       given a text prompt, and optionally static instructions to
+    #       send as the system instruction. Concurrent identical prompts
+    #       (double clicks, client retries) are coalesced onto a single
+    #       provider call.
     #
     # -----------------------------------------------------------------
-    def generate_response( self, prompt: str, model: str = "gemini-2.5-flash" ):
-        
-        # -------------------------------------------------------------
-        # Return Gemini's response to the provided prompt.
-        # -------------------------------------------------------------
-        response = self.gemini_client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                response_schema=ResponseSchema ) )
-    
-        return response.parsed
+    def generate_response( self, prompt: str, model: str = LLM_DEFAULT_MODEL, system_instruction: Optional[ str ] = None ) -> ResponseSchema:
+        return self.cache.get_or_call(
+            prompt_key( prompt, f"{ self.provider.name }:{ model }", system_instruction ),
+            lambda: self.provider.generate( prompt, model, system_instruction )
+        )
 
 
 # -----------------------------------------------------------------------------
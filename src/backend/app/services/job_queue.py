@@ -0,0 +1,830 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+# ---------------------------------------------------------------------
+# The Redis backend is optional; without the client library only the
+# local SQLite queue is available.
+# ---------------------------------------------------------------------
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   abc    import ABC, abstractmethod
+from   lib    import BASE_DIR
+from   typing import Any, Dict, List, Optional
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Queue backend: "redis://host:port/db" (or "rediss://") for a shared
+# Redis-compatible server, otherwise a local SQLite file given as
+# "sqlite:///path" or a plain path. The SQLite queue is shared by the
+# processes of one node.
+# ---------------------------------------------------------------------
+JOB_QUEUE_URL = os.environ.get( "SWING_JOB_QUEUE", os.path.join( BASE_DIR, "jobs.sqlite3" ) )
+
+# ---------------------------------------------------------------------
+# A reserved job is hidden from other workers for this long. Workers
+# extend the lease while they are still working; if one dies, the job
+# becomes visible again and is redelivered.
+# ---------------------------------------------------------------------
+JOB_VISIBILITY_SECONDS = float( os.environ.get( "SWING_JOB_VISIBILITY_SECONDS", 120 ) )
+
+# ---------------------------------------------------------------------
+# Deliveries before a job is dead-lettered, and the delay before a
+# failed job is retried (multiplied by its attempt count).
+# ---------------------------------------------------------------------
+JOB_MAX_ATTEMPTS  = int( os.environ.get( "SWING_JOB_MAX_ATTEMPTS", 3 ) )
+JOB_RETRY_SECONDS = float( os.environ.get( "SWING_JOB_RETRY_SECONDS", 5 ) )
+
+# ---------------------------------------------------------------------
+# Shortest job first. Each job carries its predicted cost in seconds,
+# and the visible job with the lowest cost minus JOB_AGING_RATE times
+# its wait runs next, so short clips overtake long ones without any
+# job waiting forever. Redis scans at most JOB_SJF_SCAN ready jobs.
+# ---------------------------------------------------------------------
+JOB_AGING_RATE = float( os.environ.get( "SWING_JOB_AGING_RATE", 0.1 ) )
+JOB_SJF_SCAN   = 256
+
+# ---------------------------------------------------------------------
+# Workers draining the queue, over all nodes. Queued work is divided
+# between them when estimating a job's ETA.
+# ---------------------------------------------------------------------
+JOB_WORKERS = int( os.environ.get( "SWING_JOB_WORKERS", 1 ) )
+
+# ---------------------------------------------------------------------
+# Job states.
+# ---------------------------------------------------------------------
+QUEUED  = "queued"
+RUNNING = "running"
+DONE    = "done"
+DEAD    = "dead"
+
+# ---------------------------------------------------------------------
+# Error recorded on a job whose lease ran out on its last attempt.
+# ---------------------------------------------------------------------
+LEASE_EXPIRED_ERROR = "Visibility timeout expired on the last attempt."
+
+JOB_COLUMNS = "id, payload, state, attempts, lease, result, error, cost, created_at, updated_at"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT    PRIMARY KEY,
+    payload     TEXT    NOT NULL,
+    state       TEXT    NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    lease       TEXT,
+    visible_at  REAL    NOT NULL,
+    result      TEXT,
+    error       TEXT,
+    created_at  REAL    NOT NULL,
+    updated_at  REAL    NOT NULL,
+    cost        REAL    NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs ( state, visible_at );
+"""
+
+# ---------------------------------------------------------------------
+# Redis scripts. Each runs atomically on the server, so concurrent
+# workers can never both hold a job, and a worker whose lease was
+# taken over can no longer complete or fail it.
+#
+#   KEYS[ 1 ]  key prefix
+# ---------------------------------------------------------------------
+REDIS_ENQUEUE = """
+local key = KEYS[ 1 ] .. ':job:' .. ARGV[ 1 ]
+if redis.call( 'EXISTS', key ) == 1 then return 0 end
+redis.call( 'HSET', key, 'payload', ARGV[ 2 ], 'state', 'queued', 'attempts', 0,
+            'created_at', ARGV[ 3 ], 'updated_at', ARGV[ 3 ], 'cost', ARGV[ 4 ] )
+redis.call( 'ZADD', KEYS[ 1 ] .. ':ready', ARGV[ 3 ], ARGV[ 1 ] )
+return 1
+"""
+
+REDIS_RESERVE = """
+local now, deadline, lease, max_attempts = tonumber( ARGV[ 1 ] ), ARGV[ 2 ], ARGV[ 3 ], tonumber( ARGV[ 4 ] )
+for _, id in ipairs( redis.call( 'ZRANGEBYSCORE', KEYS[ 1 ] .. ':running', '-inf', now ) ) do
+    local key = KEYS[ 1 ] .. ':job:' .. id
+    redis.call( 'ZREM', KEYS[ 1 ] .. ':running', id )
+    if tonumber( redis.call( 'HGET', key, 'attempts' ) ) >= max_attempts then
+        redis.call( 'HSET', key, 'state', 'dead', 'lease', '', 'error', ARGV[ 5 ], 'updated_at', now )
+        redis.call( 'ZADD', KEYS[ 1 ] .. ':dead', now, id )
+    else
+        redis.call( 'HSET', key, 'state', 'queued', 'lease', '', 'updated_at', now )
+        redis.call( 'ZADD', KEYS[ 1 ] .. ':ready', now, id )
+    end
+end
+local best, best_priority = nil, nil
+for _, id in ipairs( redis.call( 'ZRANGEBYSCORE', KEYS[ 1 ] .. ':ready', '-inf', now, 'LIMIT', 0, tonumber( ARGV[ 6 ] ) ) ) do
+    local fields   = redis.call( 'HMGET', KEYS[ 1 ] .. ':job:' .. id, 'cost', 'created_at' )
+    local priority = ( tonumber( fields[ 1 ] ) or 0 ) - tonumber( ARGV[ 7 ] ) * ( now - tonumber( fields[ 2 ] ) )
+    if best == nil or priority < best_priority then best, best_priority = id, priority end
+end
+if best == nil then return false end
+local key = KEYS[ 1 ] .. ':job:' .. best
+redis.call( 'ZREM', KEYS[ 1 ] .. ':ready', best )
+redis.call( 'ZADD', KEYS[ 1 ] .. ':running', deadline, best )
+redis.call( 'HINCRBY', key, 'attempts', 1 )
+redis.call( 'HSET', key, 'state', 'running', 'lease', lease, 'updated_at', now )
+return best
+"""
+
+REDIS_EXTEND = """
+local key = KEYS[ 1 ] .. ':job:' .. ARGV[ 1 ]
+if redis.call( 'HGET', key, 'lease' ) ~= ARGV[ 2 ] then return 0 end
+redis.call( 'ZADD', KEYS[ 1 ] .. ':running', ARGV[ 3 ], ARGV[ 1 ] )
+return 1
+"""
+
+REDIS_COMPLETE = """
+local key = KEYS[ 1 ] .. ':job:' .. ARGV[ 1 ]
+if redis.call( 'HGET', key, 'lease' ) ~= ARGV[ 2 ] then return 0 end
+redis.call( 'ZREM', KEYS[ 1 ] .. ':running', ARGV[ 1 ] )
+redis.call( 'HSET', key, 'state', 'done', 'lease', '', 'result', ARGV[ 3 ], 'updated_at', ARGV[ 4 ] )
+return 1
+"""
+
+REDIS_FAIL = """
+local key = KEYS[ 1 ] .. ':job:' .. ARGV[ 1 ]
+if redis.call( 'HGET', key, 'lease' ) ~= ARGV[ 2 ] then return false end
+redis.call( 'ZREM', KEYS[ 1 ] .. ':running', ARGV[ 1 ] )
+local attempts = tonumber( redis.call( 'HGET', key, 'attempts' ) )
+if ARGV[ 4 ] == '0' or attempts >= tonumber( ARGV[ 5 ] ) then
+    redis.call( 'HSET', key, 'state', 'dead', 'lease', '', 'error', ARGV[ 3 ], 'updated_at', ARGV[ 6 ] )
+    redis.call( 'ZADD', KEYS[ 1 ] .. ':dead', ARGV[ 6 ], ARGV[ 1 ] )
+    return 'dead'
+end
+redis.call( 'HSET', key, 'state', 'queued', 'lease', '', 'error', ARGV[ 3 ], 'updated_at', ARGV[ 6 ] )
+redis.call( 'ZADD', KEYS[ 1 ] .. ':ready', ARGV[ 6 ] + ARGV[ 7 ] * attempts, ARGV[ 1 ] )
+return 'queued'
+"""
+
+REDIS_REQUEUE = """
+local key = KEYS[ 1 ] .. ':job:' .. ARGV[ 1 ]
+if redis.call( 'ZREM', KEYS[ 1 ] .. ':dead', ARGV[ 1 ] ) == 0 then return 0 end
+redis.call( 'HSET', key, 'state', 'queued', 'attempts', 0, 'updated_at', ARGV[ 2 ] )
+redis.call( 'ZADD', KEYS[ 1 ] .. ':ready', ARGV[ 2 ], ARGV[ 1 ] )
+return 1
+"""
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: Job
+#
+#   DESCRIPTION:
+#       A queued analysis job. The payload only references its input
+#       (e.g. a video content hash), never carries it. A reserved job
+#       holds a lease token that must accompany every state change.
+#       cost is the job's predicted run time in seconds.
+#
+# ---------------------------------------------------------------------
+class Job:
+
+    def __init__(
+        self,
+        id: str,
+        payload: Dict[ str, Any ],
+        state: str = QUEUED,
+        attempts: int = 0,
+        lease: Optional[ str ] = None,
+        result: Optional[ Dict[ str, Any ] ] = None,
+        error: Optional[ str ] = None,
+        cost: float = 0.0,
+        created_at: float = 0.0,
+        updated_at: float = 0.0
+    ) -> None:
+        self.id         = id
+        self.payload    = payload
+        self.state      = state
+        self.attempts   = attempts
+        self.lease      = lease
+        self.result     = result
+        self.error      = error
+        self.cost       = cost
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: to_dict
+    #
+    #   DESCRIPTION:
+    #       JSON-ready job status, as returned by the jobs API.
+    #
+    # -----------------------------------------------------------------
+    def to_dict( self ) -> Dict[ str, Any ]:
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "predicted_seconds": round( self.cost, 2 )
+        }
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: priority
+    #
+    #   DESCRIPTION:
+    #       Scheduling priority at a given time; lower runs first.
+    #
+    # -----------------------------------------------------------------
+    def priority( self, now: float ) -> float:
+        return self.cost - JOB_AGING_RATE * ( now - self.created_at )
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: JobQueue
+#
+#   DESCRIPTION:
+#       Interface of a job queue with at-least-once delivery.
+#
+#       Enqueueing is idempotent: a job id that already exists (queued,
+#       running, done or dead) is not queued again and the existing job
+#       is returned. A reserved job stays invisible to other workers for
+#       the visibility timeout, which the worker extends while it runs;
+#       if the lease runs out the job is redelivered. A job that fails
+#       or times out on its last attempt is dead-lettered.
+#
+#       Visible jobs are reserved shortest (predicted) job first, with
+#       aging. The ETAs below are estimates from the predicted costs of
+#       the pending jobs.
+#
+# ---------------------------------------------------------------------
+class JobQueue( ABC ):
+
+    def __init__( self, max_attempts: int = JOB_MAX_ATTEMPTS, retry_seconds: float = JOB_RETRY_SECONDS ) -> None:
+        self.max_attempts  = max_attempts
+        self.retry_seconds = retry_seconds
+
+    @abstractmethod
+    def enqueue( self, job_id: str, payload: Dict[ str, Any ], cost: float = 0.0 ) -> Job:
+        ...
+
+    @abstractmethod
+    def get( self, job_id: str ) -> Optional[ Job ]:
+        ...
+
+    @abstractmethod
+    def reserve( self, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> Optional[ Job ]:
+        ...
+
+    @abstractmethod
+    def extend( self, job: Job, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> bool:
+        ...
+
+    @abstractmethod
+    def complete( self, job: Job, result: Dict[ str, Any ] ) -> bool:
+        ...
+
+    @abstractmethod
+    def fail( self, job: Job, error: str, retry: bool = True ) -> Optional[ str ]:
+        ...
+
+    @abstractmethod
+    def dead_letters( self, limit: int = 100 ) -> List[ Job ]:
+        ...
+
+    @abstractmethod
+    def requeue( self, job_id: str ) -> bool:
+        ...
+
+    @abstractmethod
+    def pending( self ) -> List[ Job ]:
+        ...
+
+    @abstractmethod
+    def video_in_use( self, video_hash: str ) -> bool:
+        ...
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: backlog_seconds
+    #
+    #   DESCRIPTION:
+    #       Seconds a new job of the given cost would wait before it
+    #       starts: the remaining time of running jobs plus the queued
+    #       jobs that would run before it, shared between the workers.
+    #
+    # -----------------------------------------------------------------
+    def backlog_seconds( self, cost: float ) -> float:
+        now = time.time()
+        return self._work_ahead( self.pending(), cost, now, now )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: eta
+    #
+    #   DESCRIPTION:
+    #       Estimated seconds until a job is done, or None once it is
+    #       done or dead-lettered.
+    #
+    # -----------------------------------------------------------------
+    def eta( self, job: Job ) -> Optional[ float ]:
+        now = time.time()
+        if job.state == RUNNING:
+            return max( job.cost - ( now - job.updated_at ), 0.0 )
+        if job.state != QUEUED:
+            return None
+        others = [ other for other in self.pending() if other.id != job.id ]
+        return self._work_ahead( others, job.cost, job.created_at, now ) + job.cost
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _work_ahead
+    #
+    #   DESCRIPTION:
+    #       Work that runs before a job created at `created_at` with the
+    #       given cost, divided between the workers.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _work_ahead( pending: List[ Job ], cost: float, created_at: float, now: float ) -> float:
+        priority = cost - JOB_AGING_RATE * ( now - created_at )
+        work     = 0.0
+        for job in pending:
+            if job.state == RUNNING:
+                work += max( job.cost - ( now - job.updated_at ), 0.0 )
+            elif job.priority( now ) <= priority:
+                work += job.cost
+        return work / max( JOB_WORKERS, 1 )
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: SQLiteJobQueue
+#
+#   DESCRIPTION:
+#       Job queue in a local SQLite file, for single-node deployments
+#       and development. Every state change runs in an immediate
+#       transaction, so API and worker processes on the same node can
+#       share the file safely.
+#
+# ---------------------------------------------------------------------
+class SQLiteJobQueue( JobQueue ):
+
+    def __init__( self, path: str, **kwargs: Any ) -> None:
+        super().__init__( **kwargs )
+        os.makedirs( os.path.dirname( os.path.abspath( path ) ), exist_ok=True )
+
+        # -------------------------------------------------------------
+        # One connection shared by the threads of this process; the
+        # lock serializes them, the busy timeout other processes.
+        # -------------------------------------------------------------
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect( path, check_same_thread=False, isolation_level=None, timeout=30 )
+        self._conn.execute( "PRAGMA journal_mode=WAL" )
+        self._conn.executescript( SCHEMA )
+
+        # -------------------------------------------------------------
+        # Queue files created before jobs carried a cost get the column
+        # added, with existing jobs at cost zero.
+        # -------------------------------------------------------------
+        columns = { row[ 1 ] for row in self._conn.execute( "PRAGMA table_info( jobs )" ) }
+        if "cost" not in columns:
+            self._conn.execute( "ALTER TABLE jobs ADD COLUMN cost REAL NOT NULL DEFAULT 0" )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: enqueue
+    #
+    #   DESCRIPTION:
+    #       Queue a job unless one with the same id already exists, and
+    #       return the (new or existing) job.
+    #
+    # -----------------------------------------------------------------
+    def enqueue( self, job_id: str, payload: Dict[ str, Any ], cost: float = 0.0 ) -> Job:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs ( id, payload, state, visible_at, created_at, updated_at, cost ) VALUES ( ?, ?, ?, ?, ?, ?, ? )",
+                ( job_id, json.dumps( payload ), QUEUED, now, now, now, cost )
+            )
+        return self.get( job_id )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: get
+    #
+    #   DESCRIPTION:
+    #       Current state of a job, or None if it doesn't exist.
+    #
+    # -----------------------------------------------------------------
+    def get( self, job_id: str ) -> Optional[ Job ]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT { JOB_COLUMNS } FROM jobs WHERE id = ?",
+                ( job_id, )
+            ).fetchone()
+        return self._job( row ) if row else None
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: reserve
+    #
+    #   DESCRIPTION:
+    #       Lease the visible job with the lowest priority (shortest
+    #       predicted job, aged), or return None if there is none. Jobs
+    #       whose lease expired on their last attempt are dead-lettered
+    #       first.
+    #
+    # -----------------------------------------------------------------
+    def reserve( self, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> Optional[ Job ]:
+        now   = time.time()
+        lease = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute( "BEGIN IMMEDIATE" )
+            try:
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, lease = NULL, error = ?, updated_at = ? "
+                    "WHERE state = ? AND visible_at <= ? AND attempts >= ?",
+                    ( DEAD, LEASE_EXPIRED_ERROR, now, RUNNING, now, self.max_attempts )
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE state IN ( ?, ? ) AND visible_at <= ? "
+                    "ORDER BY cost - ? * ( ? - created_at ), visible_at LIMIT 1",
+                    ( QUEUED, RUNNING, now, JOB_AGING_RATE, now )
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, attempts = attempts + 1, lease = ?, visible_at = ?, updated_at = ? WHERE id = ?",
+                        ( RUNNING, lease, now + visibility_timeout, now, row[ 0 ] )
+                    )
+                self._conn.execute( "COMMIT" )
+            except BaseException:
+                self._conn.execute( "ROLLBACK" )
+                raise
+        return self.get( row[ 0 ] ) if row is not None else None
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: extend
+    #
+    #   DESCRIPTION:
+    #       Push a reserved job's visibility deadline out. Returns False
+    #       if the lease has been lost.
+    #
+    # -----------------------------------------------------------------
+    def extend( self, job: Job, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> bool:
+        return self._update(
+            "UPDATE jobs SET visible_at = ? WHERE id = ? AND lease = ?",
+            ( time.time() + visibility_timeout, job.id, job.lease )
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: complete
+    #
+    #   DESCRIPTION:
+    #       Store a reserved job's result. Returns False (and stores
+    #       nothing) if the lease has been lost.
+    #
+    # -----------------------------------------------------------------
+    def complete( self, job: Job, result: Dict[ str, Any ] ) -> bool:
+        return self._update(
+            "UPDATE jobs SET state = ?, lease = NULL, result = ?, error = NULL, updated_at = ? WHERE id = ? AND lease = ?",
+            ( DONE, json.dumps( result ), time.time(), job.id, job.lease )
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: fail
+    #
+    #   DESCRIPTION:
+    #       Record a failed attempt. The job is retried after a backoff
+    #       or, on its last attempt (or with retry=False), dead-lettered.
+    #       Returns the job's new state, or None if the lease has been
+    #       lost.
+    #
+    # -----------------------------------------------------------------
+    def fail( self, job: Job, error: str, retry: bool = True ) -> Optional[ str ]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute( "SELECT attempts FROM jobs WHERE id = ? AND lease = ?", ( job.id, job.lease ) ).fetchone()
+            if row is None:
+                return None
+            state = DEAD if not retry or row[ 0 ] >= self.max_attempts else QUEUED
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, lease = NULL, error = ?, visible_at = ?, updated_at = ? WHERE id = ? AND lease = ?",
+                ( state, error, now + self.retry_seconds * row[ 0 ], now, job.id, job.lease )
+            )
+        return state
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: dead_letters
+    #
+    #   DESCRIPTION:
+    #       Most recently dead-lettered jobs.
+    #
+    # -----------------------------------------------------------------
+    def dead_letters( self, limit: int = 100 ) -> List[ Job ]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT { JOB_COLUMNS } FROM jobs WHERE state = ? ORDER BY updated_at DESC LIMIT ?",
+                ( DEAD, limit )
+            ).fetchall()
+        return [ self._job( row ) for row in rows ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: pending
+    #
+    #   DESCRIPTION:
+    #       Queued and running jobs, without their payloads.
+    #
+    # -----------------------------------------------------------------
+    def pending( self ) -> List[ Job ]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, state, attempts, cost, created_at, updated_at FROM jobs WHERE state IN ( ?, ? )",
+                ( QUEUED, RUNNING )
+            ).fetchall()
+        return [
+            Job( id=job_id, payload={}, state=state, attempts=attempts, cost=cost, created_at=created_at, updated_at=updated_at )
+            for job_id, state, attempts, cost, created_at, updated_at in rows
+        ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: video_in_use
+    #
+    #   DESCRIPTION:
+    #       Whether a queued or running job is for the given video.
+    #
+    # -----------------------------------------------------------------
+    def video_in_use( self, video_hash: str ) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE state IN ( ?, ? ) AND json_extract( payload, '$.video_hash' ) = ? LIMIT 1",
+                ( QUEUED, RUNNING, video_hash )
+            ).fetchone()
+        return row is not None
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: requeue
+    #
+    #   DESCRIPTION:
+    #       Give a dead-lettered job a fresh set of attempts. Returns
+    #       False if the job isn't dead-lettered.
+    #
+    # -----------------------------------------------------------------
+    def requeue( self, job_id: str ) -> bool:
+        now = time.time()
+        return self._update(
+            "UPDATE jobs SET state = ?, attempts = 0, visible_at = ?, updated_at = ? WHERE id = ? AND state = ?",
+            ( QUEUED, now, now, job_id, DEAD )
+        )
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _update
+    #
+    #   DESCRIPTION:
+    #       Run a single-row update; returns whether a row matched.
+    #
+    # -----------------------------------------------------------------
+    def _update( self, sql: str, params: tuple ) -> bool:
+        with self._lock:
+            return self._conn.execute( sql, params ).rowcount > 0
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _job
+    #
+    #   DESCRIPTION:
+    #       Build a Job from a jobs table row.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _job( row: tuple ) -> Job:
+        job_id, payload, state, attempts, lease, result, error, cost, created_at, updated_at = row
+        return Job(
+            id=job_id,
+            payload=json.loads( payload ),
+            state=state,
+            attempts=attempts,
+            lease=lease,
+            result=json.loads( result ) if result else None,
+            error=error,
+            cost=cost,
+            created_at=created_at,
+            updated_at=updated_at
+        )
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: RedisJobQueue
+#
+#   DESCRIPTION:
+#       Job queue on a Redis-compatible server, shared by API and
+#       worker nodes. Each job is a hash; ready, running and dead jobs
+#       are sorted sets scored by visibility time, lease deadline and
+#       dead-letter time. State changes run as server-side scripts.
+#
+#       Deadlines use the clocks of the calling nodes, which must be
+#       roughly in sync (well within the visibility timeout).
+#
+# ---------------------------------------------------------------------
+class RedisJobQueue( JobQueue ):
+
+    def __init__( self, url: str, prefix: str = "swing:jobs", **kwargs: Any ) -> None:
+        super().__init__( **kwargs )
+        if redis is None:
+            raise RuntimeError( "The Redis job queue requires the 'redis' package." )
+
+        self.prefix    = prefix
+        self._client   = redis.Redis.from_url( url, decode_responses=True )
+        self._enqueue  = self._client.register_script( REDIS_ENQUEUE )
+        self._reserve  = self._client.register_script( REDIS_RESERVE )
+        self._extend   = self._client.register_script( REDIS_EXTEND )
+        self._complete = self._client.register_script( REDIS_COMPLETE )
+        self._fail     = self._client.register_script( REDIS_FAIL )
+        self._requeue  = self._client.register_script( REDIS_REQUEUE )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    def enqueue( self, job_id: str, payload: Dict[ str, Any ], cost: float = 0.0 ) -> Job:
+        self._enqueue( keys=[ self.prefix ], args=[ job_id, json.dumps( payload ), time.time(), cost ] )
+        return self.get( job_id )
+
+    def get( self, job_id: str ) -> Optional[ Job ]:
+        return self._job( job_id, self._client.hgetall( f"{ self.prefix }:job:{ job_id }" ) )
+
+    def reserve( self, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> Optional[ Job ]:
+        now    = time.time()
+        job_id = self._reserve(
+            keys=[ self.prefix ],
+            args=[ now, now + visibility_timeout, uuid.uuid4().hex, self.max_attempts, LEASE_EXPIRED_ERROR, JOB_SJF_SCAN, JOB_AGING_RATE ]
+        )
+        return self.get( job_id ) if job_id else None
+
+    def extend( self, job: Job, visibility_timeout: float = JOB_VISIBILITY_SECONDS ) -> bool:
+        return bool( self._extend( keys=[ self.prefix ], args=[ job.id, job.lease, time.time() + visibility_timeout ] ) )
+
+    def complete( self, job: Job, result: Dict[ str, Any ] ) -> bool:
+        return bool( self._complete( keys=[ self.prefix ], args=[ job.id, job.lease, json.dumps( result ), time.time() ] ) )
+
+    def fail( self, job: Job, error: str, retry: bool = True ) -> Optional[ str ]:
+        return self._fail(
+            keys=[ self.prefix ],
+            args=[ job.id, job.lease, error, int( retry ), self.max_attempts, time.time(), self.retry_seconds ]
+        ) or None
+
+    def dead_letters( self, limit: int = 100 ) -> List[ Job ]:
+        return self._jobs( self._client.zrevrange( f"{ self.prefix }:dead", 0, limit - 1 ) )
+
+    def requeue( self, job_id: str ) -> bool:
+        return bool( self._requeue( keys=[ self.prefix ], args=[ job_id, time.time() ] ) )
+
+    def pending( self ) -> List[ Job ]:
+        with self._client.pipeline() as pipe:
+            pipe.zrange( f"{ self.prefix }:ready", 0, -1 )
+            pipe.zrange( f"{ self.prefix }:running", 0, -1 )
+            ready, running = pipe.execute()
+        return self._jobs( ready + running )
+
+    def video_in_use( self, video_hash: str ) -> bool:
+        return any( job.payload.get( "video_hash" ) == video_hash for job in self.pending() )
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _jobs
+    #
+    #   DESCRIPTION:
+    #       Load several jobs in one round trip, skipping any that have
+    #       disappeared.
+    #
+    # -----------------------------------------------------------------
+    def _jobs( self, job_ids: List[ str ] ) -> List[ Job ]:
+        if not job_ids:
+            return []
+        with self._client.pipeline( transaction=False ) as pipe:
+            for job_id in job_ids:
+                pipe.hgetall( f"{ self.prefix }:job:{ job_id }" )
+            rows = pipe.execute()
+        return [ job for job in map( self._job, job_ids, rows ) if job is not None ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _job
+    #
+    #   DESCRIPTION:
+    #       Build a Job from its hash fields, None if the hash is gone.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _job( job_id: str, fields: Dict[ str, str ] ) -> Optional[ Job ]:
+        if not fields:
+            return None
+        return Job(
+            id=job_id,
+            payload=json.loads( fields[ "payload" ] ),
+            state=fields[ "state" ],
+            attempts=int( fields.get( "attempts", 0 ) ),
+            lease=fields.get( "lease" ) or None,
+            result=json.loads( fields[ "result" ] ) if fields.get( "result" ) else None,
+            error=fields.get( "error" ) or None,
+            cost=float( fields.get( "cost", 0 ) ),
+            created_at=float( fields.get( "created_at", 0 ) ),
+            updated_at=float( fields.get( "updated_at", 0 ) )
+        )
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: open_job_queue
+#
+#   DESCRIPTION:
+#       Open the queue backend named by a queue URL (see
+#       JOB_QUEUE_URL).
+#
+# ---------------------------------------------------------------------
+def open_job_queue( url: str = JOB_QUEUE_URL, **kwargs: Any ) -> JobQueue:
+    if url.startswith( ( "redis://", "rediss://", "unix://" ) ):
+        return RedisJobQueue( url, **kwargs )
+    return SQLiteJobQueue( url.removeprefix( "sqlite:///" ), **kwargs )
+
+
+_queue: Optional[ JobQueue ] = None
+_queue_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_job_queue
+#
+#   DESCRIPTION:
+#       Return the process-wide job queue, opening it on first use.
+#
+# ---------------------------------------------------------------------
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = open_job_queue()
+        return _queue
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,179 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import collections
+import hashlib
+import os
+import threading
+import time
+
+from   concurrent.futures import Future
+from   typing             import Any, Callable, Dict, Optional, OrderedDict, Tuple
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Completed responses are reused for LLM_CACHE_TTL_SECONDS (0 disables
+# caching; concurrent identical calls are still coalesced). At most
+# LLM_CACHE_MAX_ENTRIES responses are kept, least recently used first
+# out.
+# ---------------------------------------------------------------------
+LLM_CACHE_TTL_SECONDS = float( os.environ.get( "SWING_LLM_CACHE_TTL_SECONDS", 600 ) )
+LLM_CACHE_MAX_ENTRIES = int( os.environ.get( "SWING_LLM_CACHE_MAX_ENTRIES", 1024 ) )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: prompt_key
+#
+#   DESCRIPTION:
+#       Cache key for a prompt: SHA-256 over the model name, the system
+#       instruction (if any) and the full prompt text.
+#
+# ---------------------------------------------------------------------
+def prompt_key( prompt: str, model: str, system_instruction: Optional[ str ] = None ) -> str:
+    digest = hashlib.sha256()
+    for part in ( model, system_instruction or "", prompt ):
+        digest.update( part.encode( "utf-8" ) )
+        digest.update( b"\0" )
+    return digest.hexdigest()
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: LLMCache
+#
+#   DESCRIPTION:
+#       Single-flight call coalescing plus a TTL cache for LLM calls.
+#       The first caller for a key runs the call; identical calls that
+#       arrive while it is in flight wait for and share its result.
+#       Successful results are then served from cache until they
+#       expire. Failures are shared with the waiting callers but never
+#       cached, so the next request retries.
+#
+# ---------------------------------------------------------------------
+class LLMCache:
+
+    def __init__( self, ttl_seconds: float = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES ) -> None:
+
+        # -------------------------------------------------------------
+        # Initialize the cache policy.
+        # -------------------------------------------------------------
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        # -------------------------------------------------------------
+        # Completed entries ( expires at, value ) in LRU order, and the
+        # calls currently in flight.
+        # -------------------------------------------------------------
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[ str, Tuple[ float, Any ] ] = collections.OrderedDict()
+        self._in_flight: Dict[ str, Future ] = {}
+
+        # -------------------------------------------------------------
+        # Counters: cache hits, calls coalesced onto an in-flight call,
+        # and calls actually made.
+        # -------------------------------------------------------------
+        self.stats: Dict[ str, int ] = { "hits": 0, "coalesced": 0, "calls": 0 }
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: get_or_call
+    #
+    #   DESCRIPTION:
+    #       Return the cached value for key, wait for an identical call
+    #       already in flight, or run call() and share its result.
+    #
+    # -----------------------------------------------------------------
+    def get_or_call( self, key: str, call: Callable[ [], Any ] ) -> Any:
+        with self._lock:
+            entry = self._entries.get( key )
+            if entry is not None and entry[ 0 ] > time.monotonic():
+                self._entries.move_to_end( key )
+                self.stats[ "hits" ] += 1
+                return entry[ 1 ]
+            if entry is not None:
+                del self._entries[ key ]
+
+            future = self._in_flight.get( key )
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[ key ] = future
+                self.stats[ "calls" ] += 1
+            else:
+                self.stats[ "coalesced" ] += 1
+
+        # -------------------------------------------------------------
+        # Followers block on the leader's result (or exception).
+        # -------------------------------------------------------------
+        if not leader:
+            return future.result()
+
+        try:
+            value = call()
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[ key ]
+            future.set_exception( exc )
+            raise
+
+        with self._lock:
+            del self._in_flight[ key ]
+            if self.ttl_seconds > 0:
+                self._entries[ key ] = ( time.monotonic() + self.ttl_seconds, value )
+                while len( self._entries ) > self.max_entries:
+                    self._entries.popitem( last=False )
+        future.set_result( value )
+        return value
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: clear
+    #
+    #   DESCRIPTION:
+    #       Drop every cached response.
+    #
+    # -----------------------------------------------------------------
+    def clear( self ) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_llm_cache: Optional[ LLMCache ] = None
+_llm_cache_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_llm_cache
+#
+#   DESCRIPTION:
+#       Return the process-wide LLM cache, creating it on first use.
+#
+# ---------------------------------------------------------------------
+def get_llm_cache() -> LLMCache:
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache()
+        return _llm_cache
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,202 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import httpx
+import os
+import threading
+
+from   .llm_schema import ResponseSchema
+from   abc         import ABC, abstractmethod
+from   pydantic    import ValidationError
+from   typing      import Dict, Optional, Type
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment choice of provider ("gemini" or "mock") and the model name
+# requests use unless they ask for one.
+# ---------------------------------------------------------------------
+LLM_PROVIDER      = os.environ.get( "SWING_LLM_PROVIDER", "gemini" )
+LLM_DEFAULT_MODEL = os.environ.get( "SWING_LLM_MODEL", "gemini-2.5-flash" )
+
+# ---------------------------------------------------------------------
+# Endpoint and timeout of the local stand-in server (see
+# services/mock_llm_server.py).
+# ---------------------------------------------------------------------
+LLM_MOCK_URL             = os.environ.get( "SWING_LLM_MOCK_URL", "http://127.0.0.1:8765/generate" )
+LLM_MOCK_TIMEOUT_SECONDS = float( os.environ.get( "SWING_LLM_MOCK_TIMEOUT_SECONDS", 30 ) )
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: LLMProviderError
+#
+#   DESCRIPTION:
+#       Raised when a provider fails to return a valid ResponseSchema
+#       (transport error, error status or malformed body).
+#
+# ---------------------------------------------------------------------
+class LLMProviderError( RuntimeError ):
+    pass
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: LLMProvider
+#
+#   DESCRIPTION:
+#       Interface every LLM backend implements: turn a prompt (and an
+#       optional system instruction) into a ResponseSchema.
+#
+# ---------------------------------------------------------------------
+class LLMProvider( ABC ):
+
+    name = ""
+
+    @abstractmethod
+    def generate( self, prompt: str, model: str, system_instruction: Optional[ str ] = None ) -> ResponseSchema:
+        ...
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: GeminiProvider
+#
+#   DESCRIPTION:
+#       Provider backed by the Gemini API with structured JSON output.
+#       The SDK and the API key are only loaded when this provider is
+#       constructed, so the other providers work without either. The
+#       parsed reply is validated against ResponseSchema, so an empty
+#       or malformed one fails (and is never cached).
+#
+# ---------------------------------------------------------------------
+class GeminiProvider( LLMProvider ):
+
+    name = "gemini"
+
+    def __init__( self, api_key: Optional[ str ] = None ) -> None:
+        from .            import config
+        from google       import genai
+        from google.genai import types
+
+        # -------------------------------------------------------------
+        # Initialize with the project-specific API key.
+        # -------------------------------------------------------------
+        self.api_key       = api_key if api_key is not None else config.GEMINI_KEY
+        self.gemini_client = genai.Client( api_key=self.api_key )
+        self._types        = types
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    def generate( self, prompt: str, model: str, system_instruction: Optional[ str ] = None ) -> ResponseSchema:
+        response = self.gemini_client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=self._types.GenerateContentConfig(
+                system_instruction=system_instruction,
+                response_mime_type='application/json',
+                response_schema=ResponseSchema ) )
+
+        if response.parsed is None:
+            raise LLMProviderError( f"{ self.name } provider returned no parsable response" )
+        try:
+            return ResponseSchema.model_validate( response.parsed )
+        except ValidationError as exc:
+            raise LLMProviderError( f"{ self.name } provider failed: { exc }" ) from exc
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: MockHTTPProvider
+#
+#   DESCRIPTION:
+#       Provider that POSTs the request as JSON to a local stand-in
+#       server and validates the reply against ResponseSchema. Lets the
+#       whole pipeline run and be load tested offline. One pooled HTTP
+#       client is shared by every request thread.
+#
+# ---------------------------------------------------------------------
+class MockHTTPProvider( LLMProvider ):
+
+    name = "mock"
+
+    def __init__( self, url: str = LLM_MOCK_URL, timeout: float = LLM_MOCK_TIMEOUT_SECONDS ) -> None:
+        self.url    = url
+        self.client = httpx.Client( timeout=timeout )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    def generate( self, prompt: str, model: str, system_instruction: Optional[ str ] = None ) -> ResponseSchema:
+        payload = { "model": model, "prompt": prompt, "system_instruction": system_instruction }
+        try:
+            response = self.client.post( self.url, json=payload )
+            response.raise_for_status()
+            return ResponseSchema.model_validate_json( response.content )
+        except ( httpx.HTTPError, ValidationError ) as exc:
+            raise LLMProviderError( f"{ self.name } provider failed: { exc }" ) from exc
+
+
+    def close( self ) -> None:
+        self.client.close()
+
+
+PROVIDERS: Dict[ str, Type[ LLMProvider ] ] = {
+    GeminiProvider.name:   GeminiProvider,
+    MockHTTPProvider.name: MockHTTPProvider,
+}
+
+_llm_provider: Optional[ LLMProvider ] = None
+_llm_provider_lock = threading.Lock()
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_llm_provider
+#
+#   DESCRIPTION:
+#       Return the process-wide provider selected by SWING_LLM_PROVIDER,
+#       creating it on first use. Raises ValueError for unknown names.
+#
+# ---------------------------------------------------------------------
+def get_llm_provider() -> LLMProvider:
+    global _llm_provider
+    with _llm_provider_lock:
+        if _llm_provider is None:
+            if LLM_PROVIDER not in PROVIDERS:
+                raise ValueError( f"Unknown LLM provider: { LLM_PROVIDER }" )
+            _llm_provider = PROVIDERS[ LLM_PROVIDER ]()
+        return _llm_provider
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: set_llm_provider
+#
+#   DESCRIPTION:
+#       Install the process-wide provider explicitly (benchmarks point
+#       the whole pipeline at a stand-in server this way).
+#
+# ---------------------------------------------------------------------
+def set_llm_provider( provider: LLMProvider ) -> None:
+    global _llm_provider
+    with _llm_provider_lock:
+        _llm_provider = provider
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
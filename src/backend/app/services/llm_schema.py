@@ -0,0 +1,55 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS 
+# -----------------------------------------------------------------------------
+
+from pydantic import BaseModel
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: ResponseSchemaScore
+#
+#   DESCRIPTION:
+#       Pydantic base model for structuring the LLM responses for
+#       specific swing category scores. Shared by every provider.
+#
+# ---------------------------------------------------------------------
+class ResponseSchemaScore( BaseModel ):
+    name: str                # "Posture & Setup"
+    score: int               # 0–100
+    summary: str             # One-sentence explanation
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: ResponseSchema
+#
+#   DESCRIPTION:
+#       Pydantic base model for structuring the LLM responses. Every
+#       provider returns an instance of this model.
+#
+# ---------------------------------------------------------------------
+class ResponseSchema( BaseModel ):
+    swingAnalysis: str
+    categoryScores: list[ ResponseSchemaScore ]
+    overallScore: int
+    keyObservations: list[ str ]
+    coachingTips: list[ str ]
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION 
+# -----------------------------------------------------------------------------
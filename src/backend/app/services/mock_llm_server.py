@@ -0,0 +1,281 @@
+
+
+#
+# Local stand-in for the LLM API. Answers POST /generate with a valid
+# ResponseSchema after a sampled latency, and fails a configurable
+# fraction of requests, so the pipeline can be load tested offline.
+#
+# backend/app> python -m services.mock_llm_server --port 8765 --median-ms 1500 --error-rate 0.02
+# backend/app> SWING_LLM_PROVIDER=mock uvicorn main:app
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   http.server         import BaseHTTPRequestHandler, ThreadingHTTPServer
+from   services.llm_schema import ResponseSchema
+from   typing              import Any, Dict, List, Optional, Sequence, Tuple
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Categories the real prompt asks the model to score.
+# ---------------------------------------------------------------------
+CATEGORIES = [ "Posture and Setup", "Backswing", "Downswing", "Impact Position", "Follow-Through" ]
+
+# ---------------------------------------------------------------------
+# Default latency distribution (lognormal: median and log-space sigma)
+# and failure behaviour. Errors answer with one of ERROR_STATUSES;
+# timeouts hold the connection for TIMEOUT_SECONDS and then drop it.
+# ---------------------------------------------------------------------
+DEFAULT_MEDIAN_MS       = 1200.0
+DEFAULT_SIGMA           = 0.35
+DEFAULT_ERROR_STATUSES  = ( 429, 500, 503 )
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: mock_response
+#
+#   DESCRIPTION:
+#       A valid ResponseSchema for a prompt. Scores are derived from a
+#       hash of the prompt, so the same prompt always gets the same
+#       answer and different swings get different ones.
+#
+# ---------------------------------------------------------------------
+def mock_response( prompt: str ) -> Dict[ str, Any ]:
+    seed   = int.from_bytes( hashlib.sha256( prompt.encode( "utf-8" ) ).digest()[ :8 ], "big" )
+    rng    = random.Random( seed )
+    scores = [ { "name": name, "score": rng.randint( 40, 95 ), "summary": f"Mock assessment of { name.lower() }." }
+               for name in CATEGORIES ]
+
+    return ResponseSchema(
+        swingAnalysis="Mock analysis generated by the local stand-in server.",
+        categoryScores=scores,
+        overallScore=round( sum( score[ "score" ] for score in scores ) / len( scores ) ),
+        keyObservations=[ "Mock observation one.", "Mock observation two." ],
+        coachingTips=[ "Mock coaching tip one.", "Mock coaching tip two." ]
+    ).model_dump()
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Run a local stand-in LLM server." )
+    parser.add_argument( "--host", default="127.0.0.1" )
+    parser.add_argument( "--port", type=int, default=8765 )
+    parser.add_argument( "--median-ms", type=float, default=DEFAULT_MEDIAN_MS, help="Median response latency." )
+    parser.add_argument( "--sigma", type=float, default=DEFAULT_SIGMA, help="Lognormal sigma of the latency (0 = fixed)." )
+    parser.add_argument( "--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error status." )
+    parser.add_argument( "--error-statuses", type=int, nargs="+", default=list( DEFAULT_ERROR_STATUSES ) )
+    parser.add_argument( "--timeout-rate", type=float, default=0.0, help="Fraction of requests that never answer." )
+    parser.add_argument( "--timeout-seconds", type=float, default=DEFAULT_TIMEOUT_SECONDS )
+    parser.add_argument( "--seed", type=int, default=None )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: MockLLMServer
+#
+#   DESCRIPTION:
+#       Threaded HTTP server with the stand-in's latency and failure
+#       distributions. start() serves from a background thread (for
+#       benchmarks), or serve_forever() can be called directly.
+#
+# ---------------------------------------------------------------------
+class MockLLMServer( ThreadingHTTPServer ):
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        median_ms: float = DEFAULT_MEDIAN_MS,
+        sigma: float = DEFAULT_SIGMA,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[ int ] = DEFAULT_ERROR_STATUSES,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        seed: Optional[ int ] = None
+    ) -> None:
+        super().__init__( ( host, port ), _MockLLMHandler )
+
+        # -------------------------------------------------------------
+        # Initialize the latency and failure distributions.
+        # -------------------------------------------------------------
+        self.median_ms       = median_ms
+        self.sigma           = sigma
+        self.error_rate      = error_rate
+        self.error_statuses  = list( error_statuses )
+        self.timeout_rate    = timeout_rate
+        self.timeout_seconds = timeout_seconds
+
+        self._rng      = random.Random( seed )
+        self._rng_lock = threading.Lock()
+        self._thread: Optional[ threading.Thread ] = None
+
+        # -------------------------------------------------------------
+        # Counters: requests served, error statuses and timeouts.
+        # -------------------------------------------------------------
+        self.stats: Dict[ str, int ] = { "requests": 0, "errors": 0, "timeouts": 0 }
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: url
+    #
+    #   DESCRIPTION:
+    #       Endpoint to point SWING_LLM_MOCK_URL / MockHTTPProvider at.
+    #
+    # -----------------------------------------------------------------
+    @property
+    def url( self ) -> str:
+        host, port = self.server_address[ :2 ]
+        return f"http://{ host }:{ port }/generate"
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: sample
+    #
+    #   DESCRIPTION:
+    #       Draw the outcome of one request: ( outcome, delay seconds,
+    #       status ), where outcome is "ok", "error" or "timeout".
+    #
+    # -----------------------------------------------------------------
+    def sample( self ) -> Tuple[ str, float, int ]:
+        with self._rng_lock:
+            self.stats[ "requests" ] += 1
+            draw  = self._rng.random()
+            delay = self.median_ms / 1000.0 * math.exp( self._rng.gauss( 0.0, self.sigma ) ) if self.sigma > 0 else self.median_ms / 1000.0
+
+            if draw < self.timeout_rate:
+                self.stats[ "timeouts" ] += 1
+                return "timeout", self.timeout_seconds, 0
+            if draw < self.timeout_rate + self.error_rate:
+                self.stats[ "errors" ] += 1
+                return "error", delay, self._rng.choice( self.error_statuses )
+            return "ok", delay, 200
+
+
+    def start( self ) -> str:
+        self._thread = threading.Thread( target=self.serve_forever, daemon=True )
+        self._thread.start()
+        return self.url
+
+
+    def stop( self ) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: _MockLLMHandler
+#
+#   DESCRIPTION:
+#       Request handler for MockLLMServer.
+#
+# ---------------------------------------------------------------------
+class _MockLLMHandler( BaseHTTPRequestHandler ):
+
+    protocol_version        = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST( self ) -> None:
+        length = int( self.headers.get( "Content-Length", 0 ) )
+        try:
+            payload = json.loads( self.rfile.read( length ) or b"{}" )
+        except json.JSONDecodeError:
+            self._reply( 400, { "error": "invalid JSON" } )
+            return
+
+        outcome, delay, status = self.server.sample()
+        time.sleep( delay )
+
+        # -------------------------------------------------------------
+        # A timeout closes the connection without an answer.
+        # -------------------------------------------------------------
+        if outcome == "timeout":
+            self.close_connection = True
+            return
+        if outcome == "error":
+            self._reply( status, { "error": f"mock error { status }" } )
+            return
+        self._reply( 200, mock_response( payload.get( "prompt", "" ) ) )
+
+
+    def _reply( self, status: int, body: Dict[ str, Any ] ) -> None:
+        data = json.dumps( body ).encode( "utf-8" )
+        self.send_response( status )
+        self.send_header( "Content-Type", "application/json" )
+        self.send_header( "Content-Length", str( len( data ) ) )
+        self.end_headers()
+        self.wfile.write( data )
+
+
+    def log_message( self, format: str, *args: Any ) -> None:
+        pass
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args   = parse_args( sys.argv[ 1: ] )
+    server = MockLLMServer(
+        host=args.host,
+        port=args.port,
+        median_ms=args.median_ms,
+        sigma=args.sigma,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        seed=args.seed
+    )
+    print( f"Mock LLM server listening on { server.url }" )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
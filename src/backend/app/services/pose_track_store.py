@@ -0,0 +1,206 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy as np
+import os
+import struct
+import sys
+import uuid
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   lib                               import POSE_TRACK_DIR
+from   swing_analysis_classes.pose_track import PoseTrack
+from   typing                            import Iterator
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# On-disk layout of a ".swpt" pose track file (all little-endian):
+#
+#   [ 0,  64 )        header: magic, version, channels, frames,
+#                     landmarks, data offset, fps (zero padded)
+#   [ 64, ... )       int32 source frame index per row
+#   [ data offset, )  float32 ( frames, landmarks, channels ) with the
+#                     channels x, y, visibility; NaN where missing
+#
+# The data block is 64-byte aligned so it can be memory-mapped and
+# viewed directly as a numpy array.
+# ---------------------------------------------------------------------
+TRACK_MAGIC    = b"SWPT"
+TRACK_VERSION  = 1
+TRACK_CHANNELS = 3
+TRACK_SUFFIX   = ".swpt"
+HEADER_FORMAT  = "<4sHHIIIf"
+HEADER_SIZE    = 64
+DATA_ALIGNMENT = 64
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PoseTrackStore
+#
+#   DESCRIPTION:
+#       Persists pose tracks keyed by the hash of their source video,
+#       so segmentation and metrics can be re-run without re-running
+#       MediaPipe. Tracks are written as a fixed header followed by raw
+#       float32 arrays and are loaded through a memory map, so bulk
+#       re-analysis reads only the pages it touches.
+#
+# ---------------------------------------------------------------------
+class PoseTrackStore:
+
+    def __init__( self, root: str = POSE_TRACK_DIR ) -> None:
+        self.root = root
+        os.makedirs( self.root, exist_ok=True )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: path_for
+    #
+    #   DESCRIPTION:
+    #       File path of the track for the given video hash. Tracks are
+    #       sharded by the first two characters of the hash.
+    #
+    # -----------------------------------------------------------------
+    def path_for( self, key: str ) -> str:
+        return os.path.join( self.root, key[ :2 ], f"{ key }{ TRACK_SUFFIX }" )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: exists
+    #
+    #   DESCRIPTION:
+    #       Whether a track has been stored for the given video hash.
+    #
+    # -----------------------------------------------------------------
+    def exists( self, key: str ) -> bool:
+        return os.path.isfile( self.path_for( key ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: save
+    #
+    #   DESCRIPTION:
+    #       Write a track to disk. The file is written to a uniquely
+    #       named temporary file next to its final location and
+    #       atomically renamed, so readers never observe a partially
+    #       written track and concurrent saves of one key don't collide.
+    #
+    # -----------------------------------------------------------------
+    def save( self, key: str, track: PoseTrack ) -> str:
+
+        # -------------------------------------------------------------
+        # Pack the landmark channels into one contiguous block.
+        # -------------------------------------------------------------
+        data = np.empty( ( track.n_frames, track.xy.shape[ 1 ], TRACK_CHANNELS ), dtype="<f4" )
+        data[ ..., :2 ] = track.xy
+        data[ ..., 2 ]  = track.visibility
+
+        # -------------------------------------------------------------
+        # The data block starts at the first aligned offset after the
+        # frame index table.
+        # -------------------------------------------------------------
+        index_bytes = np.ascontiguousarray( track.frame_indices, dtype="<i4" ).tobytes()
+        data_offset = -( -( HEADER_SIZE + len( index_bytes ) ) // DATA_ALIGNMENT ) * DATA_ALIGNMENT
+        header = struct.pack(
+            HEADER_FORMAT, TRACK_MAGIC, TRACK_VERSION, TRACK_CHANNELS,
+            track.n_frames, data.shape[ 1 ], data_offset, track.fps
+        )
+
+        path     = self.path_for( key )
+        tmp_path = f"{ path }.{ uuid.uuid4().hex }.tmp"
+        os.makedirs( os.path.dirname( path ), exist_ok=True )
+        with open( tmp_path, "wb" ) as file:
+            file.write( header.ljust( HEADER_SIZE, b"\0" ) )
+            file.write( index_bytes )
+            file.write( b"\0" * ( data_offset - HEADER_SIZE - len( index_bytes ) ) )
+            file.write( data.tobytes() )
+        os.replace( tmp_path, path )
+        return path
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: load
+    #
+    #   DESCRIPTION:
+    #       Load a stored track. With mmap=True (default) the returned
+    #       arrays are read-only views into a memory map of the file, so
+    #       nothing is copied until the data is actually used.
+    #
+    # -----------------------------------------------------------------
+    def load( self, key: str, mmap: bool = True ) -> PoseTrack:
+        path = self.path_for( key )
+
+        # -------------------------------------------------------------
+        # Validate the header before trusting any of its sizes.
+        # -------------------------------------------------------------
+        with open( path, "rb" ) as file:
+            header = file.read( HEADER_SIZE )
+        magic, version, channels, n_frames, n_landmarks, data_offset, fps = struct.unpack_from( HEADER_FORMAT, header )
+        if magic != TRACK_MAGIC or version != TRACK_VERSION or channels != TRACK_CHANNELS:
+            raise ValueError( f"Unrecognized pose track file: { path }" )
+
+        # -------------------------------------------------------------
+        # Map (or read) the index table and landmark block.
+        # -------------------------------------------------------------
+        shape = ( n_frames, n_landmarks, channels )
+        if mmap and n_frames:
+            indices = np.memmap( path, dtype="<i4", mode="r", offset=HEADER_SIZE, shape=( n_frames, ) )
+            data    = np.memmap( path, dtype="<f4", mode="r", offset=data_offset, shape=shape )
+        else:
+            with open( path, "rb" ) as file:
+                file.seek( HEADER_SIZE )
+                indices = np.fromfile( file, dtype="<i4", count=n_frames )
+                file.seek( data_offset )
+                data    = np.fromfile( file, dtype="<f4", count=int( np.prod( shape ) ) ).reshape( shape )
+
+        return PoseTrack( xy=data[ ..., :2 ], visibility=data[ ..., 2 ], fps=fps, frame_indices=indices )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: keys
+    #
+    #   DESCRIPTION:
+    #       Iterate over the video hashes of every stored track, in a
+    #       stable (sorted) order.
+    #
+    # -----------------------------------------------------------------
+    def keys( self ) -> Iterator[ str ]:
+        for shard in sorted( os.listdir( self.root ) ):
+            shard_dir = os.path.join( self.root, shard )
+            if not os.path.isdir( shard_dir ):
+                continue
+            for name in sorted( os.listdir( shard_dir ) ):
+                if name.endswith( TRACK_SUFFIX ):
+                    yield name[ :-len( TRACK_SUFFIX ) ]
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
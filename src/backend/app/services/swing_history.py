@@ -0,0 +1,493 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   datetime import datetime, timezone
+from   lib      import BASE_DIR
+from   typing   import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Every finished analysis is recorded in the swing history (a local
+# SQLite database) unless disabled for the deployment.
+# ---------------------------------------------------------------------
+HISTORY_ENABLED = os.environ.get( "SWING_HISTORY", "1" ) == "1"
+HISTORY_DB      = os.environ.get( "SWING_HISTORY_DB", os.path.join( BASE_DIR, "history.sqlite3" ) )
+
+# ---------------------------------------------------------------------
+# Page size limits for history listings, and the default number of
+# swings in a rolling mean.
+# ---------------------------------------------------------------------
+HISTORY_PAGE_SIZE     = 50
+HISTORY_MAX_PAGE_SIZE = 500
+TREND_WINDOW          = 10
+
+# ---------------------------------------------------------------------
+# One row per analysis, and one row per metric of an analysis. Keeping
+# the metrics in their own table lets SQL filter and aggregate any
+# metric by name, including metrics added after the swing was stored.
+# NaN (not measurable) metrics are stored as NULL, which the aggregate
+# functions skip.
+# ---------------------------------------------------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS swings (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    golfer           TEXT,
+    club             TEXT,
+    recorded_at      REAL    NOT NULL,
+    camera_angle     TEXT,
+    experience_level TEXT,
+    model_tier       TEXT,
+    video_hash       TEXT,
+    address_frame    INTEGER,
+    top_frame        INTEGER,
+    impact_frame     INTEGER,
+    analysis         TEXT
+);
+CREATE TABLE IF NOT EXISTS swing_metrics (
+    swing_id INTEGER NOT NULL REFERENCES swings ( id ) ON DELETE CASCADE,
+    name     TEXT    NOT NULL,
+    value    REAL,
+    PRIMARY KEY ( swing_id, name )
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_swings_golfer_date      ON swings ( golfer, recorded_at );
+CREATE INDEX IF NOT EXISTS idx_swings_golfer_club_date ON swings ( golfer, club, recorded_at );
+CREATE INDEX IF NOT EXISTS idx_swings_date             ON swings ( recorded_at );
+CREATE INDEX IF NOT EXISTS idx_swings_video            ON swings ( video_hash );
+CREATE INDEX IF NOT EXISTS idx_swing_metrics_name      ON swing_metrics ( name, swing_id );
+"""
+
+SWING_COLUMNS = (
+    "id", "golfer", "club", "recorded_at", "camera_angle", "experience_level",
+    "model_tier", "video_hash", "address_frame", "top_frame", "impact_frame", "analysis"
+)
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: SwingHistory
+#
+#   DESCRIPTION:
+#       Persistent record of analyzed swings: metrics, key frame
+#       indices, the LLM analysis and a reference to the stored pose
+#       track (the video hash it is keyed by in the PoseTrackStore).
+#       Listings are paginated by a (date, id) cursor, and trends are
+#       computed in SQL, so neither loads a golfer's whole history.
+#
+# ---------------------------------------------------------------------
+class SwingHistory:
+
+    def __init__( self, path: str = HISTORY_DB ) -> None:
+
+        # -------------------------------------------------------------
+        # A single connection is shared across request threads, so all
+        # access goes through the lock.
+        # -------------------------------------------------------------
+        os.makedirs( os.path.dirname( os.path.abspath( path ) ), exist_ok=True )
+        self.path  = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect( path, check_same_thread=False, isolation_level=None )
+        self._conn.execute( "PRAGMA journal_mode=WAL" )
+        self._conn.execute( "PRAGMA foreign_keys=ON" )
+        self._conn.executescript( SCHEMA )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: record
+    #
+    #   DESCRIPTION:
+    #       Store one analysis and return its swing id. key_frames maps
+    #       "address" / "backswing" / "impact" to source frame indices
+    #       (-1 where not found).
+    #
+    # -----------------------------------------------------------------
+    def record(
+        self,
+        metrics: Dict[ str, float ],
+        key_frames: Optional[ Dict[ str, int ] ] = None,
+        analysis: Any = None,
+        golfer: Optional[ str ] = None,
+        club: Optional[ str ] = None,
+        camera_angle: Optional[ str ] = None,
+        experience_level: Optional[ str ] = None,
+        model_tier: Optional[ str ] = None,
+        video_hash: Optional[ str ] = None,
+        recorded_at: Optional[ float ] = None
+    ) -> int:
+        key_frames = key_frames or {}
+        frames     = [ _key_frame( key_frames.get( name ) ) for name in ( "address", "backswing", "impact" ) ]
+
+        with self._lock:
+            self._conn.execute( "BEGIN" )
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO swings ( golfer, club, recorded_at, camera_angle, experience_level, model_tier, video_hash, "
+                    "address_frame, top_frame, impact_frame, analysis ) VALUES ( ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? )",
+                    (
+                        golfer, club, time.time() if recorded_at is None else recorded_at,
+                        camera_angle, experience_level, model_tier, video_hash,
+                        *frames, None if analysis is None else json.dumps( analysis )
+                    )
+                )
+                swing_id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT INTO swing_metrics ( swing_id, name, value ) VALUES ( ?, ?, ? )",
+                    [ ( swing_id, name, _metric_value( value ) ) for name, value in metrics.items() ]
+                )
+                self._conn.execute( "COMMIT" )
+            except BaseException:
+                self._conn.execute( "ROLLBACK" )
+                raise
+        return swing_id
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: get
+    #
+    #   DESCRIPTION:
+    #       One stored swing with its metrics, or None.
+    #
+    # -----------------------------------------------------------------
+    def get( self, swing_id: int ) -> Optional[ Dict[ str, Any ] ]:
+        with self._lock:
+            row = self._conn.execute( f"SELECT { ', '.join( SWING_COLUMNS ) } FROM swings WHERE id = ?", ( swing_id, ) ).fetchone()
+            if row is None:
+                return None
+            return self._with_metrics( [ row ] )[ 0 ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: swings_for_videos
+    #
+    #   DESCRIPTION:
+    #       Stored swings of each of the given video hashes, as short
+    #       { id, golfer, club, recorded_at } entries, newest first.
+    #
+    # -----------------------------------------------------------------
+    def swings_for_videos( self, video_hashes: List[ str ] ) -> Dict[ str, List[ Dict[ str, Any ] ] ]:
+        found: Dict[ str, List[ Dict[ str, Any ] ] ] = { video_hash: [] for video_hash in video_hashes }
+        if not video_hashes:
+            return found
+
+        query = (
+            f"SELECT video_hash, id, golfer, club, recorded_at FROM swings "
+            f"WHERE video_hash IN ( { ', '.join( '?' * len( video_hashes ) ) } ) ORDER BY recorded_at DESC, id DESC"
+        )
+        with self._lock:
+            rows = self._conn.execute( query, video_hashes ).fetchall()
+        for video_hash, swing_id, golfer, club, recorded_at in rows:
+            found[ video_hash ].append( { "id": swing_id, "golfer": golfer, "club": club, "recorded_at": _isoformat( recorded_at ) } )
+        return found
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: history
+    #
+    #   DESCRIPTION:
+    #       One page of swings, newest first, optionally for one golfer
+    #       and club and between two dates (epoch seconds, until
+    #       exclusive). Returns the swings and the cursor of the next
+    #       page, None on the last page.
+    #
+    # -----------------------------------------------------------------
+    def history(
+        self,
+        golfer: Optional[ str ] = None,
+        club: Optional[ str ] = None,
+        since: Optional[ float ] = None,
+        until: Optional[ float ] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        cursor: Optional[ str ] = None
+    ) -> Tuple[ List[ Dict[ str, Any ] ], Optional[ str ] ]:
+        limit         = max( 1, min( limit, HISTORY_MAX_PAGE_SIZE ) )
+        where, params = _filters( golfer, club, since, until )
+        if cursor is not None:
+            recorded_at, swing_id = _parse_cursor( cursor )
+            where.append( "( recorded_at, id ) < ( ?, ? )" )
+            params.extend( [ recorded_at, swing_id ] )
+
+        # -------------------------------------------------------------
+        # Fetch one extra row to know whether another page follows.
+        # -------------------------------------------------------------
+        query = (
+            f"SELECT { ', '.join( SWING_COLUMNS ) } FROM swings { _where( where ) } "
+            "ORDER BY recorded_at DESC, id DESC LIMIT ?"
+        )
+        with self._lock:
+            rows   = self._conn.execute( query, ( *params, limit + 1 ) ).fetchall()
+            swings = self._with_metrics( rows[ :limit ] )
+
+        next_cursor = None
+        if len( rows ) > limit:
+            last        = rows[ limit - 1 ]
+            next_cursor = f"{ last[ 3 ]!r}:{ last[ 0 ] }"
+        return swings, next_cursor
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: trend
+    #
+    #   DESCRIPTION:
+    #       A golfer's values of one metric in date order, each with
+    #       the rolling mean over the last `window` swings (of the same
+    #       club, if given). The window also reaches back before
+    #       `since`, so the first points of a date range are averaged
+    #       over full windows.
+    #
+    # -----------------------------------------------------------------
+    def trend(
+        self,
+        golfer: str,
+        metric: str,
+        window: int = TREND_WINDOW,
+        club: Optional[ str ] = None,
+        since: Optional[ float ] = None,
+        until: Optional[ float ] = None
+    ) -> List[ Dict[ str, Any ] ]:
+        where, params = _filters( golfer, club, None, until, table="s" )
+        outer         = [ "recorded_at >= ?" ] if since is not None else []
+        query = f"""
+            SELECT id, recorded_at, club, value, rolling_mean, rolling_count FROM (
+                SELECT s.id, s.recorded_at, s.club, m.value,
+                       AVG( m.value )   OVER recent AS rolling_mean,
+                       COUNT( m.value ) OVER recent AS rolling_count
+                FROM swings AS s
+                JOIN swing_metrics AS m ON m.swing_id = s.id AND m.name = ?
+                { _where( where ) }
+                WINDOW recent AS ( ORDER BY s.recorded_at, s.id ROWS BETWEEN ? PRECEDING AND CURRENT ROW )
+            ) { _where( outer ) }
+            ORDER BY recorded_at, id
+        """
+        args = ( metric, *params, max( 1, window ) - 1, *( [ since ] if since is not None else [] ) )
+        with self._lock:
+            rows = self._conn.execute( query, args ).fetchall()
+
+        return [
+            {
+                "id": swing_id,
+                "recorded_at": _isoformat( recorded_at ),
+                "club": row_club,
+                "value": value,
+                "rolling_mean": rolling_mean,
+                "rolling_count": rolling_count,
+            }
+            for swing_id, recorded_at, row_club, value, rolling_mean, rolling_count in rows
+        ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: summary
+    #
+    #   DESCRIPTION:
+    #       Per-metric count, mean, min and max over a golfer's swings
+    #       (optionally one club and a date range), aggregated in SQL.
+    #
+    # -----------------------------------------------------------------
+    def summary(
+        self,
+        golfer: str,
+        club: Optional[ str ] = None,
+        since: Optional[ float ] = None,
+        until: Optional[ float ] = None
+    ) -> Dict[ str, Any ]:
+        where, params = _filters( golfer, club, since, until, table="s" )
+        query = f"""
+            SELECT m.name, COUNT( m.value ), AVG( m.value ), MIN( m.value ), MAX( m.value )
+            FROM swings AS s
+            JOIN swing_metrics AS m ON m.swing_id = s.id
+            { _where( where ) }
+            GROUP BY m.name
+            ORDER BY m.name
+        """
+        with self._lock:
+            n_swings = self._conn.execute( f"SELECT COUNT( * ) FROM swings AS s { _where( where ) }", params ).fetchone()[ 0 ]
+            rows     = self._conn.execute( query, params ).fetchall()
+
+        return {
+            "swings": n_swings,
+            "metrics": {
+                name: { "count": count, "mean": mean, "min": low, "max": high }
+                for name, count, mean, low, high in rows
+            },
+        }
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: close
+    #
+    #   DESCRIPTION:
+    #       Close the database connection.
+    #
+    # -----------------------------------------------------------------
+    def close( self ) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _with_metrics
+    #
+    #   DESCRIPTION:
+    #       Swing rows as dicts, with their metrics loaded in a single
+    #       query. Called with the lock held.
+    #
+    # -----------------------------------------------------------------
+    def _with_metrics( self, rows: List[ Tuple ] ) -> List[ Dict[ str, Any ] ]:
+        swings = [ _swing_dict( row ) for row in rows ]
+        if not swings:
+            return swings
+
+        by_id = { swing[ "id" ]: swing for swing in swings }
+        query = f"SELECT swing_id, name, value FROM swing_metrics WHERE swing_id IN ( { ', '.join( '?' * len( by_id ) ) } )"
+        for swing_id, name, value in self._conn.execute( query, list( by_id ) ):
+            by_id[ swing_id ][ "metrics" ][ name ] = value
+        return swings
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _filters
+#
+#   DESCRIPTION:
+#       WHERE clauses and parameters for the common golfer / club /
+#       date range filters.
+#
+# ---------------------------------------------------------------------
+def _filters(
+    golfer: Optional[ str ],
+    club: Optional[ str ],
+    since: Optional[ float ],
+    until: Optional[ float ],
+    table: Optional[ str ] = None
+) -> Tuple[ List[ str ], List[ Any ] ]:
+    prefix = f"{ table }." if table else ""
+    where: List[ str ] = []
+    params: List[ Any ] = []
+    for clause, value in (
+        ( f"{ prefix }golfer = ?", golfer ),
+        ( f"{ prefix }club = ?", club ),
+        ( f"{ prefix }recorded_at >= ?", since ),
+        ( f"{ prefix }recorded_at < ?", until ),
+    ):
+        if value is not None:
+            where.append( clause )
+            params.append( value )
+    return where, params
+
+
+def _where( clauses: List[ str ] ) -> str:
+    return f"WHERE { ' AND '.join( clauses ) }" if clauses else ""
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _parse_cursor
+#
+#   DESCRIPTION:
+#       Split a page cursor into its ( date, id ) position.
+#
+# ---------------------------------------------------------------------
+def _parse_cursor( cursor: str ) -> Tuple[ float, int ]:
+    try:
+        recorded_at, swing_id = cursor.rsplit( ":", 1 )
+        return float( recorded_at ), int( swing_id )
+    except ValueError:
+        raise ValueError( f"Invalid history cursor: { cursor }" ) from None
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _swing_dict / _key_frame / _metric_value / _isoformat
+#
+#   DESCRIPTION:
+#       Conversions between stored rows and API values.
+#
+# ---------------------------------------------------------------------
+def _swing_dict( row: Tuple ) -> Dict[ str, Any ]:
+    swing = dict( zip( SWING_COLUMNS, row ) )
+    swing[ "recorded_at" ] = _isoformat( swing[ "recorded_at" ] )
+    swing[ "key_frames" ]  = {
+        "address": swing.pop( "address_frame" ),
+        "backswing": swing.pop( "top_frame" ),
+        "impact": swing.pop( "impact_frame" ),
+    }
+    swing[ "analysis" ]   = json.loads( swing[ "analysis" ] ) if swing[ "analysis" ] is not None else None
+    swing[ "pose_track" ] = swing[ "video_hash" ]
+    swing[ "metrics" ]    = {}
+    return swing
+
+
+def _key_frame( frame: Optional[ int ] ) -> Optional[ int ]:
+    return None if frame is None or frame < 0 else int( frame )
+
+
+def _metric_value( value: Optional[ float ] ) -> Optional[ float ]:
+    return None if value is None or math.isnan( value ) else float( value )
+
+
+def _isoformat( timestamp: float ) -> str:
+    return datetime.fromtimestamp( timestamp, tz=timezone.utc ).isoformat()
+
+
+_history: Optional[ SwingHistory ] = None
+_history_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_swing_history
+#
+#   DESCRIPTION:
+#       Return the process-wide swing history, opening it on first use.
+#
+# ---------------------------------------------------------------------
+def get_swing_history() -> SwingHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = SwingHistory()
+        return _history
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,176 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import hashlib
+import os
+import sys
+import uuid
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   lib                import VIDEO_DIR
+from   services.job_queue import JobQueue
+from   typing             import BinaryIO
+
+# -----------------------------------------------------------------------------
+#                                  CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Read size used while hashing and copying uploads.
+# ---------------------------------------------------------------------
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# -----------------------------------------------------------------------------
+#                                   CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: VideoStore
+#
+#   DESCRIPTION:
+#       Content-addressed storage for uploaded videos. The API stores
+#       an upload once and hands workers only its sha256 key, so video
+#       bytes never travel through the job queue. Identical uploads
+#       share one file.
+#
+# ---------------------------------------------------------------------
+class VideoStore:
+
+    def __init__( self, root: str = VIDEO_DIR ) -> None:
+        self.root = root
+        os.makedirs( self.root, exist_ok=True )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: path_for
+    #
+    #   DESCRIPTION:
+    #       File path of the video with the given hash. Videos are
+    #       sharded by the first two characters of the hash.
+    #
+    # -----------------------------------------------------------------
+    def path_for( self, key: str ) -> str:
+        return os.path.join( self.root, key[ :2 ], key )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: exists
+    #
+    #   DESCRIPTION:
+    #       Whether a video with the given hash is stored.
+    #
+    # -----------------------------------------------------------------
+    def exists( self, key: str ) -> bool:
+        return os.path.isfile( self.path_for( key ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: put
+    #
+    #   DESCRIPTION:
+    #       Store a video read from a file object and return its hash.
+    #       The content is hashed while it is copied into a temporary
+    #       file, which is then atomically renamed into place (or
+    #       dropped if the video is already stored, whose modification
+    #       time is then bumped to mark the new upload).
+    #
+    # -----------------------------------------------------------------
+    def put( self, file: BinaryIO ) -> str:
+        os.makedirs( self.root, exist_ok=True )
+        tmp_path = os.path.join( self.root, f".{ uuid.uuid4().hex }.tmp" )
+        digest   = hashlib.sha256()
+        try:
+            with open( tmp_path, "wb" ) as out:
+                while chunk := file.read( COPY_CHUNK_BYTES ):
+                    digest.update( chunk )
+                    out.write( chunk )
+
+            key  = digest.hexdigest()
+            path = self.path_for( key )
+            if os.path.isfile( path ):
+                os.remove( tmp_path )
+                os.utime( path )
+            else:
+                os.makedirs( os.path.dirname( path ), exist_ok=True )
+                os.replace( tmp_path, path )
+            return key
+        except BaseException:
+            if os.path.exists( tmp_path ):
+                os.remove( tmp_path )
+            raise
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: put_file
+    #
+    #   DESCRIPTION:
+    #       Store a video already on local disk and return its hash.
+    #
+    # -----------------------------------------------------------------
+    def put_file( self, path: str ) -> str:
+        with open( path, "rb" ) as file:
+            return self.put( file )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: delete
+    #
+    #   DESCRIPTION:
+    #       Remove a stored video. Returns whether it existed.
+    #
+    # -----------------------------------------------------------------
+    def delete( self, key: str ) -> bool:
+        try:
+            os.remove( self.path_for( key ) )
+            return True
+        except FileNotFoundError:
+            return False
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: release
+    #
+    #   DESCRIPTION:
+    #       Remove a stored video nothing needs any more: no queued or
+    #       running job is for it, and it hasn't been uploaded again
+    #       since `since` (an upload on its way to the queue). Returns
+    #       whether it was removed.
+    #
+    # -----------------------------------------------------------------
+    def release( self, key: str, queue: JobQueue, since: float ) -> bool:
+        try:
+            if os.path.getmtime( self.path_for( key ) ) > since:
+                return False
+        except OSError:
+            return False
+        if queue.video_in_use( key ):
+            return False
+        return self.delete( key )
+
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  EXECUTION
+# -----------------------------------------------------------------------------
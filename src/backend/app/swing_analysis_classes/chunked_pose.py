@@ -0,0 +1,369 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import multiprocessing
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+import threading
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures                   import Executor, ProcessPoolExecutor
+from   mediapipe.python.solutions           import pose as mp_pose_module
+from   swing_analysis_classes.pose_track    import LANDMARK_NAMES, PoseTrack, VISIBILITY_THRESHOLD
+from   swing_analysis_classes.shm_transport import SHM_TRANSFER_ENABLED, PoseBlock
+from   swing_analysis_classes.tracking      import MIN_DETECTION_CONFIDENCE, REDETECT_INTERVAL, TRACKER_MIN_CONFIDENCE, TrackingScheduler
+from   video.decoder                        import open_decoder
+from   typing                               import Any, Dict, Iterator, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Worker processes for chunk-parallel pose estimation (0 or 1 turns
+# the mode off). Clips are only split into chunks of at least
+# MIN_CHUNK_FRAMES frames.
+# ---------------------------------------------------------------------
+CHUNK_WORKERS    = int( os.environ.get( "SWING_POSE_CHUNK_WORKERS", 0 ) )
+MIN_CHUNK_FRAMES = int( os.environ.get( "SWING_POSE_MIN_CHUNK_FRAMES", 90 ) )
+
+# ---------------------------------------------------------------------
+# Frames each chunk decodes ahead of its own range. The tracker warms
+# up (fresh detection, landmark smoothing settling) over them, and the
+# overlap is cross-faded into the previous chunk's output.
+# ---------------------------------------------------------------------
+CHUNK_OVERLAP_FRAMES = int( os.environ.get( "SWING_POSE_CHUNK_OVERLAP", 12 ) )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: chunk_count
+#
+#   DESCRIPTION:
+#       Number of chunks to split a clip of n_frames into: one per
+#       worker, as long as every chunk keeps MIN_CHUNK_FRAMES frames.
+#
+# ---------------------------------------------------------------------
+def chunk_count( n_frames: int, workers: int = CHUNK_WORKERS ) -> int:
+    if workers <= 1:
+        return 1
+    return max( 1, min( workers, n_frames // max( 1, MIN_CHUNK_FRAMES ) ) )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: plan_chunks
+#
+#   DESCRIPTION:
+#       Split the source frames [ start, end ) into n_chunks equal
+#       ranges. Returns ( decode start, end ) per chunk, end exclusive;
+#       every chunk but the first starts overlap frames early. With an
+#       unknown end (None) the range is kept as a single chunk.
+#
+# ---------------------------------------------------------------------
+def plan_chunks(
+    start: int,
+    end: Optional[ int ],
+    n_chunks: int,
+    overlap: int = CHUNK_OVERLAP_FRAMES
+) -> List[ Tuple[ int, Optional[ int ] ] ]:
+    if end is None:
+        return [ ( start, None ) ]
+    bounds = np.linspace( start, end, max( 1, n_chunks ) + 1 ).round().astype( int )
+    return [
+        ( max( start, int( bounds[ i ] ) - ( overlap if i else 0 ) ), int( bounds[ i + 1 ] ) )
+        for i in range( len( bounds ) - 1 )
+        if bounds[ i + 1 ] > bounds[ i ]
+    ]
+
+
+_worker_graphs: Dict[ int, Any ] = {}
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _chunk_rows
+#
+#   DESCRIPTION:
+#       Decode source frames [ start, end ) (to the end of the video for
+#       a None end) at the given inference width (None for the source
+#       resolution) and run pose estimation on them, yielding each
+#       frame's index, landmark xy and visibility (None without a
+#       detection). The pose graph is created once per process and
+#       model complexity and reset between chunks. The tracker's
+#       counters are stored in stats.
+#
+# ---------------------------------------------------------------------
+def _chunk_rows(
+    video_path: str,
+    start: int,
+    end: Optional[ int ],
+    model_complexity: int,
+    redetect_interval: int,
+    width: Optional[ int ],
+    stats: Dict[ str, Any ]
+) -> Iterator[ Tuple[ int, Optional[ npt.NDArray ], Optional[ npt.NDArray ] ] ]:
+
+    graph = _worker_graphs.get( model_complexity )
+    if graph is None:
+        graph = mp_pose_module.Pose(
+            static_image_mode=False,
+            model_complexity=model_complexity,
+            smooth_landmarks=True,
+            enable_segmentation=False,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=TRACKER_MIN_CONFIDENCE
+        )
+        _worker_graphs[ model_complexity ] = graph
+    else:
+        graph.reset()
+    tracker = TrackingScheduler( graph, redetect_interval=redetect_interval )
+
+    with open_decoder( video_path, pixel_format="rgb", width=width ) as decoder:
+        stats[ "fps" ] = decoder.fps
+        decoder.seek( start )
+        for frame_idx, rgb in decoder:
+            if end is not None and frame_idx >= end:
+                break
+            results = tracker.process( image=rgb )
+            if results.pose_landmarks:
+                landmarks = results.pose_landmarks.landmark
+                yield (
+                    frame_idx,
+                    np.array( [ ( lm.x, lm.y ) for lm in landmarks ], dtype=np.float32 ),
+                    np.array( [ lm.visibility for lm in landmarks ], dtype=np.float32 )
+                )
+            else:
+                yield frame_idx, None, None
+    stats.update( tracker.stats )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: estimate_chunk
+#
+#   DESCRIPTION:
+#       Worker process entry point: run pose estimation on source
+#       frames [ start, end ) and return the chunk's raw track and the
+#       tracker's counters (pickled back to the caller).
+#
+# ---------------------------------------------------------------------
+def estimate_chunk(
+    video_path: str,
+    start: int,
+    end: Optional[ int ],
+    model_complexity: int = 1,
+    redetect_interval: int = REDETECT_INTERVAL,
+    width: Optional[ int ] = None
+) -> Tuple[ PoseTrack, Dict[ str, int ] ]:
+    stats: Dict[ str, Any ] = {}
+    rows = list( _chunk_rows( video_path, start, end, model_complexity, redetect_interval, width, stats ) )
+
+    missing_xy  = np.full( ( len( LANDMARK_NAMES ), 2 ), np.nan, dtype=np.float32 )
+    missing_vis = np.zeros( len( LANDMARK_NAMES ), dtype=np.float32 )
+    track = PoseTrack(
+        xy=np.stack( [ missing_xy if xy is None else xy for _, xy, _ in rows ] ) if rows else np.empty( ( 0, len( LANDMARK_NAMES ), 2 ), dtype=np.float32 ),
+        visibility=np.stack( [ missing_vis if vis is None else vis for _, _, vis in rows ] ) if rows else np.empty( ( 0, len( LANDMARK_NAMES ) ), dtype=np.float32 ),
+        fps=stats.pop( "fps", 0.0 ),
+        frame_indices=np.array( [ frame_idx for frame_idx, _, _ in rows ], dtype=np.int32 )
+    )
+    return track, stats
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: estimate_chunk_shared
+#
+#   DESCRIPTION:
+#       Like estimate_chunk, but the landmarks are written straight into
+#       rows [ offset, offset + end - start ) of a shared pose block.
+#       Only the number of rows written, the frame rate and the
+#       tracker's counters go back to the caller.
+#
+# ---------------------------------------------------------------------
+def estimate_chunk_shared(
+    video_path: str,
+    start: int,
+    end: int,
+    block: PoseBlock,
+    offset: int,
+    model_complexity: int = 1,
+    redetect_interval: int = REDETECT_INTERVAL,
+    width: Optional[ int ] = None
+) -> Tuple[ int, float, Dict[ str, int ] ]:
+    stats: Dict[ str, Any ] = {}
+    n_rows = 0
+    try:
+        for frame_idx, xy, visibility in _chunk_rows( video_path, start, end, model_complexity, redetect_interval, width, stats ):
+            block.write( offset + n_rows, frame_idx, xy, visibility )
+            n_rows += 1
+    finally:
+        if not block.owner:
+            block.close()
+    return n_rows, stats.pop( "fps", 0.0 ), stats
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: stitch_tracks
+#
+#   DESCRIPTION:
+#       Join consecutive chunk tracks into one. Where a chunk overlaps
+#       the previous one, the two are cross-faded: the weight of the
+#       new chunk (still warming up at the start of the overlap) rises
+#       linearly across it. A landmark observed in only one of the two
+#       is taken from that one.
+#
+# ---------------------------------------------------------------------
+def stitch_tracks( tracks: List[ PoseTrack ] ) -> PoseTrack:
+    tracks = [ track for track in tracks if track.n_frames ]
+    if not tracks:
+        return PoseTrack(
+            xy=np.full( ( 0, len( LANDMARK_NAMES ), 2 ), np.nan, dtype=np.float32 ),
+            visibility=np.zeros( ( 0, len( LANDMARK_NAMES ) ), dtype=np.float32 ),
+            fps=0.0
+        )
+
+    xy, visibility, indices = tracks[ 0 ].xy, tracks[ 0 ].visibility, tracks[ 0 ].frame_indices
+    for track in tracks[ 1: ]:
+        n_overlap = int( min( max( 0, indices[ -1 ] + 1 - track.frame_indices[ 0 ] ), len( indices ), track.n_frames ) )
+
+        # -------------------------------------------------------------
+        # Blend weights of the new chunk over the overlap, per frame
+        # and landmark.
+        # -------------------------------------------------------------
+        old_xy, old_vis = xy[ len( xy ) - n_overlap: ], visibility[ len( xy ) - n_overlap: ]
+        new_xy, new_vis = track.xy[ :n_overlap ], track.visibility[ :n_overlap ]
+        old_seen = ( old_vis > VISIBILITY_THRESHOLD ) & ~np.isnan( old_xy ).any( axis=-1 )
+        new_seen = ( new_vis > VISIBILITY_THRESHOLD ) & ~np.isnan( new_xy ).any( axis=-1 )
+
+        ramp   = ( np.arange( 1, n_overlap + 1, dtype=np.float32 ) / ( n_overlap + 1 ) )[ :, None ]
+        weight = np.where( old_seen & new_seen, ramp, np.where( new_seen, 1.0, np.where( old_seen, 0.0, ramp ) ) ).astype( np.float32 )
+
+        blended_xy  = np.where(
+            np.isnan( old_xy ), new_xy,
+            np.where( np.isnan( new_xy ), old_xy, old_xy + ( new_xy - old_xy ) * weight[ ..., None ] )
+        )
+        blended_vis = old_vis + ( new_vis - old_vis ) * weight
+
+        xy         = np.concatenate( [ xy[ :len( xy ) - n_overlap ], blended_xy, track.xy[ n_overlap: ] ] )
+        visibility = np.concatenate( [ visibility[ :len( visibility ) - n_overlap ], blended_vis, track.visibility[ n_overlap: ] ] )
+        indices    = np.concatenate( [ indices, track.frame_indices[ n_overlap: ] ] )
+
+    return PoseTrack(
+        xy=xy.astype( np.float32 ),
+        visibility=visibility.astype( np.float32 ),
+        fps=tracks[ 0 ].fps,
+        frame_indices=indices.astype( np.int32 )
+    )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: estimate_chunked
+#
+#   DESCRIPTION:
+#       Run pose estimation on source frames [ start, end ) split into
+#       n_chunks overlapping chunks, in parallel on the chunk pool, and
+#       stitch the results. Frames are decoded at the given inference
+#       width, as in the serial path. Returns the raw track and the
+#       summed tracker counters.
+#
+#       The pool must run each task in its own process (pose graphs are
+#       cached per process and aren't thread safe).
+#
+# ---------------------------------------------------------------------
+def estimate_chunked(
+    video_path: str,
+    start: int,
+    end: Optional[ int ],
+    n_chunks: int,
+    model_complexity: int = 1,
+    redetect_interval: int = REDETECT_INTERVAL,
+    pool: Optional[ Executor ] = None,
+    width: Optional[ int ] = None
+) -> Tuple[ PoseTrack, Dict[ str, int ] ]:
+    pool   = pool or get_chunk_pool()
+    chunks = plan_chunks( start, end, n_chunks )
+
+    # -----------------------------------------------------------------
+    # With a known range the workers write into one shared pose block,
+    # one region per chunk, instead of pickling their tracks back.
+    # -----------------------------------------------------------------
+    if SHM_TRANSFER_ENABLED and end is not None:
+        offsets = np.cumsum( [ 0 ] + [ chunk_end - chunk_start for chunk_start, chunk_end in chunks ] )
+        block   = PoseBlock( int( offsets[ -1 ] ) )
+        try:
+            futures = [
+                pool.submit(
+                    estimate_chunk_shared, video_path, chunk_start, chunk_end, block, int( offset ),
+                    model_complexity, redetect_interval, width
+                )
+                for ( chunk_start, chunk_end ), offset in zip( chunks, offsets )
+            ]
+            results = [ future.result() for future in futures ]
+            tracks  = [ block.track( int( offset ), n_rows, fps ) for ( n_rows, fps, _ ), offset in zip( results, offsets ) ]
+            track   = stitch_tracks( tracks )
+            del tracks
+        finally:
+            block.close()
+        chunk_stats = [ stats for _, _, stats in results ]
+    else:
+        futures = [
+            pool.submit( estimate_chunk, video_path, chunk_start, chunk_end, model_complexity, redetect_interval, width )
+            for chunk_start, chunk_end in chunks
+        ]
+        results     = [ future.result() for future in futures ]
+        track       = stitch_tracks( [ chunk_track for chunk_track, _ in results ] )
+        chunk_stats = [ stats for _, stats in results ]
+
+    stats: Dict[ str, int ] = {}
+    for counters in chunk_stats:
+        for key, value in counters.items():
+            stats[ key ] = stats.get( key, 0 ) + value
+    return track, stats
+
+
+_chunk_pool: Optional[ ProcessPoolExecutor ] = None
+_chunk_pool_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_chunk_pool
+#
+#   DESCRIPTION:
+#       Return the process-wide chunk worker pool, starting it on first
+#       use. Workers are spawned (not forked) so they don't inherit the
+#       parent's MediaPipe threads, and stay warm between clips.
+#
+# ---------------------------------------------------------------------
+def get_chunk_pool() -> ProcessPoolExecutor:
+    global _chunk_pool
+    with _chunk_pool_lock:
+        if _chunk_pool is None:
+            _chunk_pool = ProcessPoolExecutor(
+                max_workers=max( 1, CHUNK_WORKERS ),
+                mp_context=multiprocessing.get_context( "spawn" )
+            )
+        return _chunk_pool
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
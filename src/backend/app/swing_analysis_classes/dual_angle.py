@@ -0,0 +1,456 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures                      import ThreadPoolExecutor
+from   fastapi.encoders                        import jsonable_encoder
+from   lib                                     import hash_file
+from   services.artifact_store                 import get_artifact_store
+from   services.gemini_endpoint                import Client
+from   services.pose_track_store               import PoseTrackStore
+from   services.swing_history                  import HISTORY_ENABLED, get_swing_history
+from   swing_analysis_classes.chunked_pose     import chunk_count
+from   swing_analysis_classes.inference_server import get_inference_server
+from   swing_analysis_classes.key_frames       import KEY_FRAMES_ENABLED
+from   swing_analysis_classes.metrics          import MetricsCalculator, finite_metrics
+from   swing_analysis_classes.model_tier       import analysis_slot, choose_model_tier, probe_frame_count
+from   swing_analysis_classes.pose_estimation  import PoseEstimation
+from   swing_analysis_classes.pose_track       import PoseTrack
+from   swing_analysis_classes.prompt           import PromptBuilder
+from   swing_analysis_classes.segmentation     import Segmentation
+from   swing_analysis_classes.session          import wrist_height
+from   video.swing_window                      import SWING_WINDOW_ENABLED, find_swing_window
+from   typing                                  import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# The two camera angles, and the one whose segmentation (address, top
+# of backswing, impact) both clips share once they are synchronized:
+# face-on shows the hands' height most clearly.
+# ---------------------------------------------------------------------
+FACE_ON       = "face_on"
+DOWN_THE_LINE = "down_the_line"
+ANGLES        = ( FACE_ON, DOWN_THE_LINE )
+PRIMARY_ANGLE = FACE_ON
+
+# ---------------------------------------------------------------------
+# Angle each metric is taken from. Face-on sees side bend and lateral
+# sway in the image plane; from down the line, the shoulder and hip
+# lines swing across the view as the body turns, and rising out of
+# posture shows as vertical head movement. Metrics not listed come from
+# the primary angle.
+# ---------------------------------------------------------------------
+METRIC_SOURCES = {
+    "shoulder_rotation_range_deg_backswing": DOWN_THE_LINE,
+    "shoulder_rotation_range_deg": DOWN_THE_LINE,
+    "hip_rotation_range_deg_backswing": DOWN_THE_LINE,
+    "hip_rotation_range_deg": DOWN_THE_LINE,
+    "spine_tilt_mean_deg": FACE_ON,
+    "spine_tilt_range_deg": FACE_ON,
+    "head_movement_x": FACE_ON,
+    "head_movement_y": DOWN_THE_LINE,
+}
+
+# ---------------------------------------------------------------------
+# Camera angle given to the LLM for the merged metrics.
+# ---------------------------------------------------------------------
+DUAL_CAMERA_ANGLE = "face-on and down-the-line (metrics merged from both)"
+
+# ---------------------------------------------------------------------
+# Synchronization: the clips count as aligned when their wrist height
+# trajectories correlate at least this well while overlapping for at
+# least MIN_SYNC_OVERLAP_SECONDS.
+# ---------------------------------------------------------------------
+MIN_SYNC_CORRELATION     = 0.6
+MIN_SYNC_OVERLAP_SECONDS = 1.0
+
+# ---------------------------------------------------------------------
+# Threads running the down-the-line angle of dual-angle requests; the
+# face-on angle runs on the request's own thread. MediaPipe and the
+# decoder release the GIL, so the two clips estimate in parallel, but
+# more angles at once than cores only contend for them.
+# ---------------------------------------------------------------------
+DUAL_WORKERS = int( os.environ.get( "SWING_DUAL_WORKERS", os.cpu_count() or 1 ) )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+_angle_executor = ThreadPoolExecutor( max_workers=DUAL_WORKERS, thread_name_prefix="angle" )
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _resampled_wrist_height
+#
+#   DESCRIPTION:
+#       Wrist height of a (gap-filled) track resampled to `rate`
+#       samples per second, with the time of its first sample. None if
+#       the wrists were never seen.
+#
+# ---------------------------------------------------------------------
+def _resampled_wrist_height( track: PoseTrack, rate: float ) -> Optional[ Tuple[ npt.NDArray[ np.float64 ], float ] ]:
+    with np.errstate( invalid="ignore" ):
+        height = wrist_height( track )
+    times  = np.asarray( track.frame_indices, dtype=np.float64 ) / track.fps
+    finite = np.isfinite( height )
+    if finite.sum() < 2:
+        return None
+
+    grid = np.arange( times[ 0 ], times[ -1 ], 1.0 / rate )
+    return np.interp( grid, times[ finite ], height[ finite ] ), float( times[ 0 ] )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: align_tracks
+#
+#   DESCRIPTION:
+#       Time offset between two recordings of the same swing, found by
+#       cross-correlating their wrist height trajectories (which look
+#       the same from any angle): for one instant, the secondary clip's
+#       time is the primary clip's time plus the offset. Returns
+#       ( offset seconds, correlation ), or None if either clip has no
+#       usable wrist track.
+#
+# ---------------------------------------------------------------------
+def align_tracks( primary: PoseTrack, secondary: PoseTrack ) -> Optional[ Tuple[ float, float ] ]:
+    if primary.n_frames < 2 or secondary.n_frames < 2:
+        return None
+
+    # -----------------------------------------------------------------
+    # Resample both to the faster clip's frame rate and normalize.
+    # -----------------------------------------------------------------
+    rate        = max( primary.fps, secondary.fps )
+    resampled_p = _resampled_wrist_height( primary, rate )
+    resampled_s = _resampled_wrist_height( secondary, rate )
+    if resampled_p is None or resampled_s is None:
+        return None
+    ( p, p_start ), ( s, s_start ) = resampled_p, resampled_s
+    if p.std() <= 1e-9 or s.std() <= 1e-9:
+        return None
+    p = ( p - p.mean() ) / p.std()
+    s = ( s - s.mean() ) / s.std()
+
+    # -----------------------------------------------------------------
+    # Correlation at every lag, averaged over the overlap; lags with
+    # too little overlap are ruled out.
+    # -----------------------------------------------------------------
+    lags    = np.arange( -( len( p ) - 1 ), len( s ) )
+    overlap = np.minimum( len( s ), lags + len( p ) ) - np.maximum( 0, lags )
+    scores  = np.correlate( s, p, mode="full" ) / np.maximum( overlap, 1 )
+    scores[ overlap < min( MIN_SYNC_OVERLAP_SECONDS * rate, len( p ), len( s ) ) ] = -np.inf
+
+    best = int( np.argmax( scores ) )
+    return float( s_start - p_start + lags[ best ] / rate ), min( float( scores[ best ] ), 1.0 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: map_key_frames
+#
+#   DESCRIPTION:
+#       Carry key frames (source video indices) from one clip to the
+#       pose data of the other, given the offset between them. Returns
+#       the ( address, backswing, impact ) positions in that pose data,
+#       or None if any key frame is missing or falls outside it.
+#
+# ---------------------------------------------------------------------
+def map_key_frames(
+    video_frames: Dict[ str, int ],
+    offset: float,
+    fps_from: float,
+    fps_to: float,
+    pose_data_to: List[ Dict[ str, Any ] ]
+) -> Optional[ Tuple[ int, int, int ] ]:
+    if not pose_data_to:
+        return None
+
+    frames = np.array( [ int( frame.get( "frame_index", idx ) ) for idx, frame in enumerate( pose_data_to ) ] )
+    rows: List[ int ] = []
+    for name in ( "address", "backswing", "impact" ):
+        source = video_frames.get( name, -1 )
+        if source < 0:
+            return None
+        target = ( source / fps_from + offset ) * fps_to
+        row    = int( np.argmin( np.abs( frames - target ) ) )
+        if abs( frames[ row ] - target ) > 1.0:
+            return None
+        rows.append( row )
+    return rows[ 0 ], rows[ 1 ], rows[ 2 ]
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: DualAngleAnalysis
+#
+#   DESCRIPTION:
+#       Analysis of one swing recorded face-on and down the line. Both
+#       clips go through pose estimation at the same time, are
+#       synchronized on their wrist height trajectories, and share one
+#       segmentation. Each metric is taken from the angle that
+#       measures it best (METRIC_SOURCES) and the merged metrics get a
+#       single LLM analysis.
+#
+# ---------------------------------------------------------------------
+class DualAngleAnalysis():
+
+    def __init__(
+        self,
+        video_paths: Dict[ str, str ],
+        experience_level: str,
+        metadata: str,
+        model_tier: Optional[ str ] = None,
+        golfer: Optional[ str ] = None,
+        club: Optional[ str ] = None
+    ) -> None:
+
+        if set( video_paths ) != set( ANGLES ):
+            raise ValueError( f"Expected one video per camera angle: { ', '.join( ANGLES ) }" )
+
+        # -------------------------------------------------------------
+        # Input clips per angle and the swing context.
+        # -------------------------------------------------------------
+        self.video_paths      = dict( video_paths )
+        self.video_hashes     = { angle: hash_file( path ) for angle, path in self.video_paths.items() }
+        self.experience_level = experience_level
+        self.metadata         = metadata
+        self.golfer           = golfer
+        self.club             = club
+
+        # -------------------------------------------------------------
+        # Per-angle results: pose model tier, swing window, overlay
+        # video, key frame indices and stills, and metrics.
+        # -------------------------------------------------------------
+        self.model_tiers: Dict[ str, str ] = {}
+        self.swing_windows: Dict[ str, Optional[ Tuple[ int, int ] ] ] = {}
+        self.video_overlay_paths: Dict[ str, Optional[ str ] ] = {}
+        self.key_frame_indices: Dict[ str, Dict[ str, int ] ] = {}
+        self.key_frame_paths: Dict[ str, Dict[ str, Optional[ str ] ] ] = {}
+        self.angle_metrics: Dict[ str, Dict[ str, float ] ] = {}
+
+        # -------------------------------------------------------------
+        # Synchronization: offset (seconds) of the down-the-line clip
+        # relative to the face-on clip, the peak correlation, and
+        # whether the shared segmentation was applied.
+        # -------------------------------------------------------------
+        self.sync_offset: Optional[ float ] = None
+        self.sync_correlation: Optional[ float ] = None
+        self.synchronized = False
+
+        # -------------------------------------------------------------
+        # Merged metrics, the analysis and its swing history id.
+        # -------------------------------------------------------------
+        self.metrics: Dict[ str, float ] = {}
+        self.analysis: Any = ""
+        self.swing_id: Optional[ int ] = None
+
+        with analysis_slot():
+            self._process_swing( requested_tier=model_tier )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: response
+    #
+    #   DESCRIPTION:
+    #       JSON-ready result: the analysis of the merged metrics, which
+    #       angle each metric came from, the synchronization, and the
+    #       overlay video and key frames of each angle.
+    #
+    # -----------------------------------------------------------------
+    def response( self ) -> Dict:
+        artifact_store = get_artifact_store()
+        return {
+            "swing_analysis": jsonable_encoder( self.analysis ),
+            "metrics": finite_metrics( self.metrics ),
+            "metric_sources": { name: METRIC_SOURCES.get( name, PRIMARY_ANGLE ) for name in self.metrics },
+            "sync": {
+                "offset_seconds": self.sync_offset,
+                "correlation": self.sync_correlation,
+                "synchronized": self.synchronized
+            },
+            "angles": {
+                angle: {
+                    "pose_overlay": artifact_store.url_for( self.video_overlay_paths[ angle ] ) if self.video_overlay_paths.get( angle ) else None,
+                    "model_tier": self.model_tiers.get( angle ),
+                    "swing_window": list( self.swing_windows[ angle ] ) if self.swing_windows.get( angle ) else None,
+                    "key_frame_indices": self.key_frame_indices.get( angle, {} ),
+                    "key_frames": {
+                        name: artifact_store.url_for( path ) if path else None
+                        for name, path in self.key_frame_paths.get( angle, {} ).items()
+                    }
+                }
+                for angle in ANGLES
+            },
+            "swing_id": self.swing_id
+        }
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _process_swing
+    #
+    #   DESCRIPTION:
+    #       Run both angles' pose estimation concurrently, synchronize
+    #       and segment them, merge the metrics and analyze.
+    #
+    # -----------------------------------------------------------------
+    def _process_swing( self, requested_tier: Optional[ str ] = None ) -> None:
+
+        # -------------------------------------------------------------
+        # Pose estimation for both angles at once, the second one on
+        # this thread; the wall time is that of the slower clip.
+        # -------------------------------------------------------------
+        future     = _angle_executor.submit( self._estimate_angle, DOWN_THE_LINE, requested_tier )
+        estimators = { PRIMARY_ANGLE: self._estimate_angle( PRIMARY_ANGLE, requested_tier ) }
+        estimators[ DOWN_THE_LINE ] = future.result()
+
+        # -------------------------------------------------------------
+        # Store the raw tracks, once per distinct upload (both angles
+        # may be the same video).
+        # -------------------------------------------------------------
+        track_store = PoseTrackStore()
+        for video_hash, angle in { self.video_hashes[ angle ]: angle for angle in ANGLES }.items():
+            track_store.save( video_hash, estimators[ angle ].raw_track )
+
+        # -------------------------------------------------------------
+        # Segment the primary angle, then carry its key frames over to
+        # the other angle if the clips synchronize; otherwise segment
+        # that one on its own.
+        # -------------------------------------------------------------
+        primary   = estimators[ PRIMARY_ANGLE ]
+        segments  = { PRIMARY_ANGLE: Segmentation( primary.pose_data ) }
+        alignment = align_tracks( primary.pose_track, estimators[ DOWN_THE_LINE ].pose_track )
+        if alignment is not None:
+            self.sync_offset, self.sync_correlation = alignment
+
+        secondary  = estimators[ DOWN_THE_LINE ]
+        key_frames = None
+        if alignment is not None and self.sync_correlation >= MIN_SYNC_CORRELATION:
+            key_frames = map_key_frames(
+                segments[ PRIMARY_ANGLE ].video_frames,
+                self.sync_offset,
+                primary.fps,
+                secondary.fps,
+                secondary.pose_data
+            )
+        self.synchronized         = key_frames is not None
+        segments[ DOWN_THE_LINE ] = Segmentation( secondary.pose_data, key_frames=key_frames )
+
+        # -------------------------------------------------------------
+        # Per-angle metrics, merged by source angle.
+        # -------------------------------------------------------------
+        for angle in ANGLES:
+            self.key_frame_indices[ angle ] = dict( segments[ angle ].video_frames )
+            self.angle_metrics[ angle ]     = MetricsCalculator( pose_data=estimators[ angle ].pose_data, segments=segments[ angle ] ).metrics
+        self.metrics = {
+            name: self.angle_metrics[ METRIC_SOURCES.get( name, PRIMARY_ANGLE ) ][ name ]
+            for name in self.angle_metrics[ PRIMARY_ANGLE ]
+        }
+
+        # -------------------------------------------------------------
+        # Key frame stills of both angles.
+        # -------------------------------------------------------------
+        for angle, estimator in estimators.items():
+            if estimator.key_frames is not None:
+                self.key_frame_paths[ angle ] = estimator.key_frames.save(
+                    segments[ angle ].video_frames,
+                    estimator.pose_data,
+                    self.video_paths[ angle ]
+                )
+
+        # -------------------------------------------------------------
+        # One LLM call for the merged metrics.
+        # -------------------------------------------------------------
+        prompt_builder = PromptBuilder(
+            camera_angle=DUAL_CAMERA_ANGLE,
+            experience_level=self.experience_level,
+            metadata=self.metadata,
+            metrics=self.metrics
+        )
+        self.analysis = Client().generate_response(
+            prompt=prompt_builder.prompt,
+            system_instruction=prompt_builder.system_instruction
+        )
+
+        # -------------------------------------------------------------
+        # Record the swing once, against the primary angle's track.
+        # -------------------------------------------------------------
+        if HISTORY_ENABLED:
+            self.swing_id = get_swing_history().record(
+                metrics=self.metrics,
+                key_frames=self.key_frame_indices[ PRIMARY_ANGLE ],
+                analysis=jsonable_encoder( self.analysis ),
+                golfer=self.golfer,
+                club=self.club,
+                camera_angle="dual",
+                experience_level=self.experience_level,
+                model_tier=self.model_tiers[ PRIMARY_ANGLE ],
+                video_hash=self.video_hashes[ PRIMARY_ANGLE ]
+            )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _estimate_angle
+    #
+    #   DESCRIPTION:
+    #       Single-angle pose stage, as in Analyze: swing window
+    #       pre-pass, model tier and pose estimation with overlay.
+    #
+    # -----------------------------------------------------------------
+    def _estimate_angle( self, angle: str, requested_tier: Optional[ str ] ) -> PoseEstimation:
+        video_path = self.video_paths[ angle ]
+
+        window = find_swing_window( video_path ) if SWING_WINDOW_ENABLED else None
+        if window is not None:
+            n_frames = window[ 1 ] - window[ 0 ]
+        else:
+            n_frames = probe_frame_count( video_path )
+        model_tier = choose_model_tier( requested_tier, n_frames=n_frames )
+
+        chunks = chunk_count( n_frames )
+        pose_estimator = PoseEstimation(
+            vid_in=video_path,
+            overlay=True,
+            inference_server=get_inference_server() if chunks == 1 else None,
+            model_tier=model_tier,
+            frame_range=window,
+            key_frames=KEY_FRAMES_ENABLED,
+            chunks=chunks
+        )
+
+        self.swing_windows[ angle ]       = window
+        self.model_tiers[ angle ]         = model_tier
+        self.video_overlay_paths[ angle ] = pose_estimator.output_vid_path
+        return pose_estimator
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
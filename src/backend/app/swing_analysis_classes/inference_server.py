@@ -0,0 +1,324 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import itertools
+import numpy.typing as npt
+import os
+import queue
+import sys
+import threading
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures              import Future, wait
+from   mediapipe.python.solutions      import pose as mp_pose_module
+from   swing_analysis_classes.tracking import MIN_DETECTION_CONFIDENCE, REDETECT_INTERVAL, TRACKER_MIN_CONFIDENCE, TrackingScheduler
+from   typing                          import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment switch and worker count for the shared inference server.
+# ---------------------------------------------------------------------
+INFERENCE_SERVER_ENABLED = os.environ.get( "SWING_INFERENCE_SERVER", "0" ) == "1"
+INFERENCE_WORKERS        = int( os.environ.get( "SWING_INFERENCE_WORKERS", os.cpu_count() or 1 ) )
+
+# ---------------------------------------------------------------------
+# Idle pose graphs per model complexity, kept warm between clips and
+# live connections.
+# ---------------------------------------------------------------------
+_idle_graphs: Dict[ int, List[ Any ] ] = {}
+_graphs_lock = threading.Lock()
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: acquire_graph
+#
+#   DESCRIPTION:
+#       A warm pose graph of the given model complexity: an idle one
+#       from the pool (reset for a new stream) or, if none is idle, a
+#       new one.
+#
+# ---------------------------------------------------------------------
+def acquire_graph( model_complexity: int ) -> Any:
+    with _graphs_lock:
+        idle  = _idle_graphs.get( model_complexity )
+        graph = idle.pop() if idle else None
+
+    if graph is None:
+        return mp_pose_module.Pose(
+            static_image_mode=False,
+            model_complexity=model_complexity,
+            smooth_landmarks=True,
+            enable_segmentation=False,
+            min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+            min_tracking_confidence=TRACKER_MIN_CONFIDENCE
+        )
+    graph.reset()
+    return graph
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: release_graph
+#
+#   DESCRIPTION:
+#       Hand a pose graph back to the idle pool.
+#
+# ---------------------------------------------------------------------
+def release_graph( model_complexity: int, graph: Any ) -> None:
+    with _graphs_lock:
+        _idle_graphs.setdefault( model_complexity, [] ).append( graph )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: close_idle_graphs
+#
+#   DESCRIPTION:
+#       Close and forget every idle pose graph.
+#
+# ---------------------------------------------------------------------
+def close_idle_graphs() -> None:
+    with _graphs_lock:
+        graphs = [ graph for idle in _idle_graphs.values() for graph in idle ]
+        _idle_graphs.clear()
+    for graph in graphs:
+        graph.close()
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: ClipSession
+#
+#   DESCRIPTION:
+#       Per-clip handle on the inference server. Holds the clip's
+#       tracking scheduler (pose graph state) and the future of its
+#       most recently submitted frame. A clip's frames run in order on
+#       one worker, so that future resolving means all of them have.
+#
+# ---------------------------------------------------------------------
+class ClipSession:
+
+    def __init__(
+        self,
+        clip_id: int,
+        worker: "_InferenceWorker",
+        tracker: TrackingScheduler,
+        fps: float,
+        model_complexity: int,
+        first_frame: int = 0
+    ) -> None:
+        self.clip_id          = clip_id
+        self.worker           = worker
+        self.tracker          = tracker
+        self.fps              = fps
+        self.model_complexity = model_complexity
+        self.first_frame      = first_frame
+        self.last_future: Optional[ Future ] = None
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: _InferenceWorker
+#
+#   DESCRIPTION:
+#       One inference thread. Clips are pinned to a worker for their
+#       whole lifetime, so a clip's frames are processed in order by a
+#       single thread while that thread interleaves frames from all of
+#       its clips, one frame per graph call.
+#
+# ---------------------------------------------------------------------
+class _InferenceWorker:
+
+    def __init__( self, server: "InferenceServer", name: str ) -> None:
+        self.server = server
+        self.queue: "queue.Queue[ Optional[ Tuple[ ClipSession, int, npt.NDArray, Future ] ] ]" = queue.Queue()
+        self.active_clips = 0
+        self.thread = threading.Thread( target=self._run, name=name, daemon=True )
+        self.thread.start()
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _run
+    #
+    #   DESCRIPTION:
+    #       Run queued frames in submission order until shut down.
+    #
+    # -----------------------------------------------------------------
+    def _run( self ) -> None:
+        while ( item := self.queue.get() ) is not None:
+            session, _, image, future = item
+            try:
+                future.set_result( session.tracker.process( image ) )
+            except Exception as exc:
+                future.set_exception( exc )
+            self.server.count_frame()
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: InferenceServer
+#
+#   DESCRIPTION:
+#       Shared pose inference service for all in-flight clips: a fixed
+#       set of inference threads with a pool of warm pose graphs.
+#       Frames submitted by concurrent requests are queued per worker
+#       thread and each result is returned through the frame's future,
+#       so a request can keep decoding while its earlier frames run.
+#
+#       This bounds inference threads and graph construction across
+#       requests; it does not batch. The MediaPipe solution graphs take
+#       one image per call, so every frame is its own graph call.
+#
+# ---------------------------------------------------------------------
+class InferenceServer:
+
+    def __init__( self, workers: int = INFERENCE_WORKERS ) -> None:
+
+        # -------------------------------------------------------------
+        # Initialize counters. They are updated by every worker
+        # thread, under their own lock.
+        # -------------------------------------------------------------
+        self.stats: Dict[ str, int ] = { "frames": 0 }
+        self._stats_lock = threading.Lock()
+
+        # -------------------------------------------------------------
+        # Start the worker threads.
+        # -------------------------------------------------------------
+        self._lock     = threading.Lock()
+        self._clip_ids = itertools.count()
+        self._workers  = [ _InferenceWorker( self, name=f"pose-inference-{ i }" ) for i in range( max( 1, workers ) ) ]
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: open_clip
+    #
+    #   DESCRIPTION:
+    #       Start a clip session on the least loaded worker, with a warm
+    #       pose graph of the requested model complexity from the pool.
+    #
+    # -----------------------------------------------------------------
+    def open_clip(
+        self,
+        fps: float = 0.0,
+        redetect_interval: int = REDETECT_INTERVAL,
+        model_complexity: int = 1,
+        first_frame: int = 0
+    ) -> ClipSession:
+        with self._lock:
+            worker = min( self._workers, key=lambda w: w.active_clips )
+            worker.active_clips += 1
+
+        tracker = TrackingScheduler( acquire_graph( model_complexity ), redetect_interval=redetect_interval )
+        return ClipSession( next( self._clip_ids ), worker, tracker, fps, model_complexity, first_frame )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: submit
+    #
+    #   DESCRIPTION:
+    #       Queue one RGB frame of a clip. The returned future resolves
+    #       to MediaPipe's result once the frame has run.
+    #
+    # -----------------------------------------------------------------
+    def submit( self, session: ClipSession, frame_index: int, image: npt.NDArray ) -> Future:
+        future: Future = Future()
+        session.last_future = future
+        session.worker.queue.put( ( session, frame_index, image, future ) )
+        return future
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: close_clip
+    #
+    #   DESCRIPTION:
+    #       Finish a clip: wait for its frames to run and hand its pose
+    #       graph back to the idle pool.
+    #
+    # -----------------------------------------------------------------
+    def close_clip( self, session: ClipSession ) -> None:
+        if session.last_future is not None:
+            wait( [ session.last_future ] )
+        with self._lock:
+            session.worker.active_clips -= 1
+        release_graph( session.model_complexity, session.tracker.pose_obj )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: count_frame
+    #
+    #   DESCRIPTION:
+    #       Add one processed frame to the counters.
+    #
+    # -----------------------------------------------------------------
+    def count_frame( self ) -> None:
+        with self._stats_lock:
+            self.stats[ "frames" ] += 1
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: shutdown
+    #
+    #   DESCRIPTION:
+    #       Stop the worker threads and release pooled graphs.
+    #
+    # -----------------------------------------------------------------
+    def shutdown( self ) -> None:
+        for worker in self._workers:
+            worker.queue.put( None )
+        for worker in self._workers:
+            worker.thread.join()
+        close_idle_graphs()
+
+
+_server: Optional[ InferenceServer ] = None
+_server_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_inference_server
+#
+#   DESCRIPTION:
+#       Return the process-wide inference server when server mode is
+#       enabled for this deployment (SWING_INFERENCE_SERVER=1), else
+#       None.
+#
+# ---------------------------------------------------------------------
+def get_inference_server() -> Optional[ InferenceServer ]:
+    global _server
+    if not INFERENCE_SERVER_ENABLED:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = InferenceServer()
+        return _server
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
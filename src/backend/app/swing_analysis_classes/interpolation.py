@@ -0,0 +1,335 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   scipy.interpolate                 import CubicSpline
+from   scipy.signal                      import savgol_filter
+from   swing_analysis_classes.pose_track import PoseTrack
+from   typing                            import Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Supported gap filling and smoothing methods.
+# ---------------------------------------------------------------------
+FILL_METHODS      = ( "linear", "spline" )
+SMOOTHING_METHODS = ( None, "savgol", "one_euro" )
+
+# ---------------------------------------------------------------------
+# Savitzky-Golay defaults: window length in frames (odd) and polynomial
+# order.
+# ---------------------------------------------------------------------
+SAVGOL_WINDOW = 7
+SAVGOL_ORDER  = 2
+
+# ---------------------------------------------------------------------
+# One-euro filter defaults (Casiez et al.): minimum cutoff frequency
+# (Hz), speed coefficient, and derivative cutoff frequency (Hz).
+# ---------------------------------------------------------------------
+ONE_EURO_MIN_CUTOFF = 1.0
+ONE_EURO_BETA       = 0.5
+ONE_EURO_D_CUTOFF   = 1.0
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: fill_linear
+#
+#   DESCRIPTION:
+#       Linearly interpolate missing samples of a ( frames, columns )
+#       array, for every column at once. For each missing sample the
+#       nearest valid sample before and after it are found with running
+#       max/min accumulations, so there is no per-gap Python loop.
+#       Only interior gaps are filled: leading and trailing gaps (and
+#       columns with no valid samples) are left as NaN, since there is
+#       nothing on one side to interpolate from.
+#
+# ---------------------------------------------------------------------
+def fill_linear( values: npt.NDArray, valid: npt.NDArray[ np.bool_ ] ) -> npt.NDArray:
+    n_frames = values.shape[ 0 ]
+    frames   = np.arange( n_frames )[ :, None ]
+
+    # -----------------------------------------------------------------
+    # Index of the previous and next valid sample for every position.
+    # -----------------------------------------------------------------
+    prev_idx = np.maximum.accumulate( np.where( valid, frames, -1 ), axis=0 )
+    next_idx = np.minimum.accumulate( np.where( valid, frames, n_frames )[ ::-1 ], axis=0 )[ ::-1 ]
+
+    # -----------------------------------------------------------------
+    # Samples with a valid sample on both sides (or valid themselves).
+    # -----------------------------------------------------------------
+    has_data = ( prev_idx >= 0 ) & ( next_idx < n_frames )
+    prev_idx = np.clip( prev_idx, 0, n_frames - 1 )
+    next_idx = np.clip( next_idx, 0, n_frames - 1 )
+
+    # -----------------------------------------------------------------
+    # Blend the bracketing samples by distance.
+    # -----------------------------------------------------------------
+    prev_val = np.take_along_axis( values, prev_idx, axis=0 )
+    next_val = np.take_along_axis( values, next_idx, axis=0 )
+    span     = np.maximum( next_idx - prev_idx, 1 )
+    weight   = ( frames - prev_idx ) / span
+
+    filled = prev_val + ( next_val - prev_val ) * weight
+    filled = np.where( valid, values, filled )
+    return np.where( has_data, filled, np.nan ).astype( values.dtype )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: fill_spline
+#
+#   DESCRIPTION:
+#       Fill missing samples with a cubic spline through the valid
+#       samples of each column. Falls back to linear filling for
+#       columns with too few samples to fit a spline. Leading and
+#       trailing gaps are left missing rather than extrapolated.
+#
+# ---------------------------------------------------------------------
+def fill_spline( values: npt.NDArray, valid: npt.NDArray[ np.bool_ ] ) -> npt.NDArray:
+    filled = fill_linear( values, valid )
+    frames = np.arange( values.shape[ 0 ] )
+
+    for col in range( values.shape[ 1 ] ):
+        known = np.flatnonzero( valid[ :, col ] )
+        if len( known ) < 4:
+            continue
+
+        # -------------------------------------------------------------
+        # Only interior gaps are filled.
+        # -------------------------------------------------------------
+        inside = ( ~valid[ :, col ] ) & ( frames > known[ 0 ] ) & ( frames < known[ -1 ] )
+        if inside.any():
+            spline = CubicSpline( known, values[ known, col ] )
+            filled[ inside, col ] = spline( frames[ inside ] )
+    return filled
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: smooth_one_euro
+#
+#   DESCRIPTION:
+#       Apply a one-euro filter along the frame axis, vectorized across
+#       columns. The cutoff adapts to speed, so jitter at address is
+#       damped while fast downswing motion isn't lagged.
+#
+# ---------------------------------------------------------------------
+def smooth_one_euro(
+    values: npt.NDArray,
+    fps: float,
+    min_cutoff: float = ONE_EURO_MIN_CUTOFF,
+    beta: float = ONE_EURO_BETA,
+    d_cutoff: float = ONE_EURO_D_CUTOFF
+) -> npt.NDArray:
+
+    # -----------------------------------------------------------------
+    # Smoothing factor for an exponential filter with the given cutoff.
+    # -----------------------------------------------------------------
+    dt = 1.0 / fps if fps > 0 else 1.0 / 30.0
+    def __alpha( cutoff ):
+        tau = 1.0 / ( 2.0 * np.pi * cutoff )
+        return 1.0 / ( 1.0 + tau / dt )
+
+    out = np.array( values, copy=True )
+    if len( out ) == 0:
+        return out
+
+    # -----------------------------------------------------------------
+    # A column restarts from its first sample after a missing one
+    # (e.g. when the golfer walks into view), rather than from zero.
+    # -----------------------------------------------------------------
+    x_prev  = np.nan_to_num( out[ 0 ] )
+    dx_prev = np.zeros_like( x_prev )
+    missing = np.isnan( values[ 0 ] )
+    for i in range( 1, len( out ) ):
+        x        = np.nan_to_num( out[ i ], nan=0.0 )
+        x_prev   = np.where( missing, x, x_prev )
+        dx_prev  = np.where( missing, 0.0, dx_prev )
+        dx       = ( x - x_prev ) / dt
+        dx_hat   = dx_prev + __alpha( d_cutoff ) * ( dx - dx_prev )
+        a        = __alpha( min_cutoff + beta * np.abs( dx_hat ) )
+        x_hat    = x_prev + a * ( x - x_prev )
+        missing  = np.isnan( values[ i ] )
+        out[ i ] = np.where( missing, np.nan, x_hat )
+        x_prev, dx_prev = x_hat, dx_hat
+    return out
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: smooth_savgol
+#
+#   DESCRIPTION:
+#       Apply a Savitzky-Golay filter along the frame axis to each run
+#       of present samples in each column. Columns with no missing
+#       samples are filtered in one call; runs shorter than the window
+#       are left as they are.
+#
+# ---------------------------------------------------------------------
+def smooth_savgol(
+    values: npt.NDArray,
+    window: int = SAVGOL_WINDOW,
+    order: int = SAVGOL_ORDER
+) -> npt.NDArray:
+    out     = np.array( values, copy=True )
+    missing = np.isnan( out )
+    if len( out ) < window:
+        return out
+
+    complete = ~missing.any( axis=0 )
+    if complete.any():
+        out[ :, complete ] = savgol_filter( out[ :, complete ], window, order, axis=0 )
+
+    for col in np.flatnonzero( ~complete ):
+        present = np.flatnonzero( ~missing[ :, col ] )
+        for run in np.split( present, np.flatnonzero( np.diff( present ) > 1 ) + 1 ):
+            if len( run ) >= window:
+                out[ run, col ] = savgol_filter( out[ run, col ], window, order )
+    return out
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PoseInterpolation
+#
+#   DESCRIPTION:
+#       Post-processing stage that fills dropped or low-visibility
+#       landmarks across the whole track at once and optionally
+#       smooths the result. The mask of landmarks that were actually
+#       observed is carried forward on the output track, so downstream
+#       code can still tell measured from interpolated data.
+#
+#       Only interior gaps are filled; leading and trailing gaps (e.g.
+#       frames before the golfer walks into view) stay missing, as do
+#       gaps longer than max_gap frames.
+#
+# ---------------------------------------------------------------------
+class PoseInterpolation:
+
+    def __init__(
+        self,
+        pose_track: PoseTrack,
+        method: str = "linear",
+        smoothing: Optional[ str ] = None,
+        max_gap: Optional[ int ] = None
+    ) -> None:
+
+        if method not in FILL_METHODS:
+            raise ValueError( f"Unknown fill method: { method }" )
+        if smoothing not in SMOOTHING_METHODS:
+            raise ValueError( f"Unknown smoothing method: { smoothing }" )
+
+        # -------------------------------------------------------------
+        # Initialize the input track and stage configuration.
+        # -------------------------------------------------------------
+        self.input_track = pose_track
+        self.method      = method
+        self.smoothing   = smoothing
+        self.max_gap     = max_gap
+
+        # -------------------------------------------------------------
+        # Run the stage.
+        # -------------------------------------------------------------
+        self.pose_track = self._interpolate()
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _interpolate
+    #
+    #   DESCRIPTION:
+    #       Fill, optionally smooth, and package the output track.
+    #
+    # -----------------------------------------------------------------
+    def _interpolate( self ) -> PoseTrack:
+        track                 = self.input_track
+        n_frames, n_landmarks = track.xy.shape[ :2 ]
+        observed              = np.asarray( track.valid )
+
+        # -------------------------------------------------------------
+        # Flatten to ( frames, landmarks * 2 ) so x and y of every
+        # landmark are filled in one pass.
+        # -------------------------------------------------------------
+        values = np.asarray( track.xy, dtype=np.float32 ).reshape( n_frames, n_landmarks * 2 )
+        valid  = np.repeat( observed, 2, axis=1 )
+
+        if n_frames == 0:
+            filled = values.copy()
+        elif self.method == "spline":
+            filled = fill_spline( values, valid )
+        else:
+            filled = fill_linear( values, valid )
+
+        # -------------------------------------------------------------
+        # Drop fills that span gaps longer than allowed.
+        # -------------------------------------------------------------
+        if self.max_gap is not None and n_frames:
+            filled[ self._long_gaps( valid ) ] = np.nan
+
+        # -------------------------------------------------------------
+        # Optional temporal smoothing of the filled track.
+        # -------------------------------------------------------------
+        if self.smoothing == "savgol":
+            filled = smooth_savgol( filled )
+        elif self.smoothing == "one_euro":
+            filled = smooth_one_euro( filled, track.fps )
+
+        # -------------------------------------------------------------
+        # Package the result, carrying the observation mask forward.
+        # -------------------------------------------------------------
+        xy           = filled.reshape( n_frames, n_landmarks, 2 ).astype( np.float32 )
+        interpolated = ~observed & ~np.isnan( xy ).any( axis=-1 )
+        return PoseTrack(
+            xy=xy,
+            visibility=np.array( track.visibility, dtype=np.float32 ),
+            fps=track.fps,
+            frame_indices=np.array( track.frame_indices ),
+            interpolated=interpolated
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _long_gaps
+    #
+    #   DESCRIPTION:
+    #       Mask of missing samples that belong to a run of more than
+    #       max_gap consecutive missing samples (per column).
+    #
+    # -----------------------------------------------------------------
+    def _long_gaps( self, valid: npt.NDArray[ np.bool_ ] ) -> npt.NDArray[ np.bool_ ]:
+        n_frames = valid.shape[ 0 ]
+        frames   = np.arange( n_frames )[ :, None ]
+        prev_idx = np.maximum.accumulate( np.where( valid, frames, -1 ), axis=0 )
+        next_idx = np.minimum.accumulate( np.where( valid, frames, n_frames )[ ::-1 ], axis=0 )[ ::-1 ]
+        return ~valid & ( ( next_idx - prev_idx - 1 ) > self.max_gap )
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
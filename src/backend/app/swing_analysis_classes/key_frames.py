@@ -0,0 +1,431 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import collections
+import cv2
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   services.artifact_store             import ArtifactStore, get_artifact_store
+from   swing_analysis_classes.segmentation import MOVEMENT_THRESHOLD, STABILITY_WINDOW
+from   video.decoder                       import open_decoder
+from   typing                              import Any, Deque, Dict, List, Optional, Tuple
+from   mediapipe.python.solutions          import pose as mp_pose_module
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment switch and output encoding ("jpeg" or "webp") of the key
+# frame stills.
+# ---------------------------------------------------------------------
+KEY_FRAMES_ENABLED = os.environ.get( "SWING_KEY_FRAMES", "1" ) == "1"
+KEY_FRAME_FORMAT   = os.environ.get( "SWING_KEY_FRAME_FORMAT", "jpeg" )
+KEY_FRAME_QUALITY  = int( os.environ.get( "SWING_KEY_FRAME_QUALITY", 80 ) )
+KEY_FRAME_FORMATS  = {
+    "jpeg": ( ".jpg", cv2.IMWRITE_JPEG_QUALITY ),
+    "webp": ( ".webp", cv2.IMWRITE_WEBP_QUALITY ),
+}
+
+# ---------------------------------------------------------------------
+# Stills are downscaled so their longer side is at most this many
+# pixels; candidates are kept at that size.
+# ---------------------------------------------------------------------
+KEY_FRAME_MAX_SIZE = 640
+
+# ---------------------------------------------------------------------
+# The most recent RING_SIZE decoded frames are referenced (not copied)
+# so a key frame recognized a few frames late is still at hand, and up
+# to CANDIDATES_PER_KEY of the best scoring frames are kept per key
+# frame while decoding.
+# ---------------------------------------------------------------------
+RING_SIZE          = STABILITY_WINDOW + 2
+CANDIDATES_PER_KEY = 3
+
+# ---------------------------------------------------------------------
+# Key frames, in the order Segmentation reports them.
+# ---------------------------------------------------------------------
+KEY_FRAME_NAMES = ( "address", "backswing", "impact" )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: draw_pose
+#
+#   DESCRIPTION:
+#       Draw a pose (landmarks as stored in the pose data) onto a BGR
+#       image in place: connections in white, joints in red. Only
+#       valid landmarks are drawn.
+#
+# ---------------------------------------------------------------------
+def draw_pose( image: npt.NDArray[ np.uint8 ], landmarks: Dict[ str, Dict[ str, Any ] ] ) -> None:
+    height, width = image.shape[ :2 ]
+    thickness     = max( 1, round( max( height, width ) / 320 ) )
+
+    def __point( name: str ) -> Optional[ Tuple[ int, int ] ]:
+        landmark = landmarks.get( name )
+        if not landmark or not landmark[ "valid" ]:
+            return None
+        return round( landmark[ "x" ] * width ), round( landmark[ "y" ] * height )
+
+    for start, end in mp_pose_module.POSE_CONNECTIONS:
+        p1 = __point( mp_pose_module.PoseLandmark( start ).name )
+        p2 = __point( mp_pose_module.PoseLandmark( end ).name )
+        if p1 is not None and p2 is not None:
+            cv2.line( image, p1, p2, ( 224, 224, 224 ), thickness, cv2.LINE_AA )
+
+    for name in landmarks:
+        point = __point( name )
+        if point is not None:
+            cv2.circle( image, point, thickness + 1, ( 0, 0, 255 ), -1, cv2.LINE_AA )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: downscale
+#
+#   DESCRIPTION:
+#       Shrink an image so its longer side is at most max_size.
+#
+# ---------------------------------------------------------------------
+def downscale( image: npt.NDArray[ np.uint8 ], max_size: int = KEY_FRAME_MAX_SIZE ) -> npt.NDArray[ np.uint8 ]:
+    height, width = image.shape[ :2 ]
+    scale         = max_size / max( height, width )
+    if scale >= 1.0:
+        return image.copy()
+    return cv2.resize( image, ( round( width * scale ), round( height * scale ) ), interpolation=cv2.INTER_AREA )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: KeyFrameCollector
+#
+#   DESCRIPTION:
+#       Collects the stills for the address, top of backswing and
+#       impact frames while the clip is decoded for pose estimation, so
+#       they don't need a second decode pass.
+#
+#       Every decoded frame is observed with its raw landmarks. The
+#       same signals Segmentation uses (shoulder / hip stability, wrist
+#       height, wrist distance from address) score each frame on the
+#       fly, and the best few candidates per key frame are kept,
+#       downscaled. Once Segmentation has picked the final frames, each
+#       one is taken from the candidates or the ring of recent frames,
+#       or else decoded with a single targeted seek.
+#
+# ---------------------------------------------------------------------
+class KeyFrameCollector:
+
+    def __init__(
+        self,
+        rotate: bool = False,
+        movement_threshold: float = MOVEMENT_THRESHOLD,
+        stability_window: int = STABILITY_WINDOW
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Orientation applied to the stills (matches the overlay video)
+        # and the address detection parameters.
+        # -------------------------------------------------------------
+        self.rotate             = rotate
+        self.movement_threshold = movement_threshold
+        self.stability_window   = stability_window
+
+        # -------------------------------------------------------------
+        # Ring of recent ( frame index, RGB image, landmarks ),
+        # downscaled candidate images by frame index, and ( score,
+        # frame index ) candidates per key frame, best first.
+        # -------------------------------------------------------------
+        self._recent: Deque[ Tuple[ int, npt.NDArray[ np.uint8 ], Dict[ str, Any ] ] ] = collections.deque( maxlen=RING_SIZE )
+        self._kept: Dict[ int, npt.NDArray[ np.uint8 ] ] = {}
+        self._candidates: Dict[ str, List[ Tuple[ float, int ] ] ] = { name: [] for name in KEY_FRAME_NAMES }
+
+        # -------------------------------------------------------------
+        # Online segmentation state.
+        # -------------------------------------------------------------
+        self._previous_vector: Optional[ npt.NDArray ] = None
+        self._stable_count   = 0
+        self._address_hands: Optional[ float ] = None
+
+        # -------------------------------------------------------------
+        # Number of key frames that needed a seek on the last save().
+        # -------------------------------------------------------------
+        self.seeks = 0
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: observe
+    #
+    #   DESCRIPTION:
+    #       Feed one decoded RGB frame and its raw landmarks, in order.
+    #       The image is referenced, not copied, unless it becomes a
+    #       candidate.
+    #
+    # -----------------------------------------------------------------
+    def observe( self, frame_idx: int, rgb: npt.NDArray[ np.uint8 ], landmarks: Dict[ str, Dict[ str, Any ] ] ) -> None:
+        self._recent.append( ( frame_idx, rgb, landmarks ) )
+
+        # -------------------------------------------------------------
+        # Address: start of the first run of stable frames. The run's
+        # first frame is still in the ring when the run completes.
+        # -------------------------------------------------------------
+        vector = self._pose_vector( landmarks )
+        if self._address_hands is None:
+            if vector is not None and self._previous_vector is not None and np.linalg.norm( vector - self._previous_vector ) < self.movement_threshold:
+                self._stable_count += 1
+            else:
+                self._stable_count = 0
+            if self._stable_count >= self.stability_window:
+                address_idx = frame_idx - ( self.stability_window - 1 )
+                address     = self._from_ring( address_idx )
+                if address is not None:
+                    self._offer( "address", 0.0, address_idx, address[ 1 ] )
+                    self._address_hands = self._hands_position( address[ 2 ] )
+        self._previous_vector = vector
+
+        # -------------------------------------------------------------
+        # Top of backswing: highest average wrist y. Impact candidates
+        # that precede a new top are no longer possible.
+        # -------------------------------------------------------------
+        left, right = landmarks[ "LEFT_WRIST" ], landmarks[ "RIGHT_WRIST" ]
+        if left[ "valid" ] and right[ "valid" ]:
+            if self._offer( "backswing", ( left[ "y" ] + right[ "y" ] ) / 2.0, frame_idx, rgb ):
+                top = self._candidates[ "backswing" ][ 0 ][ 1 ]
+                self._candidates[ "impact" ] = [ c for c in self._candidates[ "impact" ] if c[ 1 ] >= top ]
+                self._release()
+
+        # -------------------------------------------------------------
+        # Impact: after the top, wrists closest to their address
+        # position.
+        # -------------------------------------------------------------
+        backswing = self._candidates[ "backswing" ]
+        if self._address_hands is not None and backswing and frame_idx >= backswing[ 0 ][ 1 ]:
+            hands = self._hands_position( landmarks )
+            if hands is not None:
+                self._offer( "impact", -abs( hands - self._address_hands ), frame_idx, rgb )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: save
+    #
+    #   DESCRIPTION:
+    #       Encode the final key frames, with their (final) pose drawn,
+    #       into the artifact store. video_frames maps each key frame
+    #       name to a source frame index (-1 if missing), as reported by
+    #       Segmentation.video_frames. Returns the artifact paths, None
+    #       for key frames that couldn't be produced.
+    #
+    # -----------------------------------------------------------------
+    def save(
+        self,
+        video_frames: Dict[ str, int ],
+        pose_data: List[ Dict[ str, Any ] ],
+        video_path: str,
+        artifact_store: Optional[ ArtifactStore ] = None
+    ) -> Dict[ str, Optional[ str ] ]:
+        artifact_store = artifact_store or get_artifact_store()
+        landmarks      = { int( frame.get( "frame_index", i ) ): frame[ "landmarks" ] for i, frame in enumerate( pose_data ) }
+
+        # -------------------------------------------------------------
+        # Take each key frame from what was kept while decoding.
+        # -------------------------------------------------------------
+        images: Dict[ str, Optional[ npt.NDArray[ np.uint8 ] ] ] = {}
+        for name in KEY_FRAME_NAMES:
+            frame_idx = video_frames.get( name, -1 )
+            images[ name ] = None if frame_idx < 0 else self._kept.get( frame_idx )
+            if images[ name ] is None and frame_idx >= 0:
+                recent = self._from_ring( frame_idx )
+                images[ name ] = downscale( recent[ 1 ] ) if recent is not None else None
+
+        # -------------------------------------------------------------
+        # Fall back to a targeted seek for anything that wasn't kept.
+        # -------------------------------------------------------------
+        missing = sorted( { video_frames[ name ] for name in KEY_FRAME_NAMES if images[ name ] is None and video_frames.get( name, -1 ) >= 0 } )
+        self.seeks = len( missing )
+        if missing:
+            decoded = self._seek_frames( video_path, missing )
+            for name in KEY_FRAME_NAMES:
+                if images[ name ] is None and video_frames.get( name, -1 ) in decoded:
+                    images[ name ] = decoded[ video_frames[ name ] ]
+
+        # -------------------------------------------------------------
+        # Draw, orient, encode and register each still.
+        # -------------------------------------------------------------
+        extension, quality_flag = KEY_FRAME_FORMATS[ KEY_FRAME_FORMAT ]
+        paths: Dict[ str, Optional[ str ] ] = {}
+        for name in KEY_FRAME_NAMES:
+            paths[ name ] = None
+            if images[ name ] is None:
+                continue
+
+            still = cv2.cvtColor( images[ name ], cv2.COLOR_RGB2BGR )
+            draw_pose( still, landmarks.get( video_frames[ name ], {} ) )
+            if self.rotate:
+                still = cv2.rotate( still, cv2.ROTATE_90_CLOCKWISE )
+
+            ok, encoded = cv2.imencode( extension, still, [ quality_flag, KEY_FRAME_QUALITY ] )
+            if not ok:
+                continue
+            path = artifact_store.allocate( prefix=f"key_frame_{ name }", suffix=extension )
+            with open( path, "wb" ) as file:
+                file.write( encoded.tobytes() )
+            artifact_store.register( path, kind="key_frame" )
+            paths[ name ] = path
+
+        # -------------------------------------------------------------
+        # The decoded frames are no longer needed.
+        # -------------------------------------------------------------
+        self._recent.clear()
+        self._kept.clear()
+        return paths
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _offer
+    #
+    #   DESCRIPTION:
+    #       Offer a frame as a candidate for a key frame (higher scores
+    #       are better). Returns True if it became the best candidate.
+    #
+    # -----------------------------------------------------------------
+    def _offer( self, name: str, score: float, frame_idx: int, rgb: npt.NDArray[ np.uint8 ] ) -> bool:
+        candidates = self._candidates[ name ]
+        if len( candidates ) >= CANDIDATES_PER_KEY and score <= candidates[ -1 ][ 0 ]:
+            return False
+
+        candidates.append( ( score, frame_idx ) )
+        candidates.sort( key=lambda candidate: -candidate[ 0 ] )
+        del candidates[ CANDIDATES_PER_KEY: ]
+        if frame_idx not in self._kept:
+            self._kept[ frame_idx ] = downscale( rgb )
+        self._release()
+        return candidates[ 0 ][ 1 ] == frame_idx
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _release
+    #
+    #   DESCRIPTION:
+    #       Drop kept images that are no longer a candidate for any key
+    #       frame.
+    #
+    # -----------------------------------------------------------------
+    def _release( self ) -> None:
+        wanted = { idx for candidates in self._candidates.values() for _, idx in candidates }
+        for frame_idx in [ idx for idx in self._kept if idx not in wanted ]:
+            del self._kept[ frame_idx ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _from_ring
+    #
+    #   DESCRIPTION:
+    #       ( frame index, RGB image, landmarks ) of a frame still in the
+    #       ring of recent frames, or None.
+    #
+    # -----------------------------------------------------------------
+    def _from_ring( self, frame_idx: int ) -> Optional[ Tuple[ int, npt.NDArray[ np.uint8 ], Dict[ str, Any ] ] ]:
+        for recent in self._recent:
+            if recent[ 0 ] == frame_idx:
+                return recent
+        return None
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _seek_frames
+    #
+    #   DESCRIPTION:
+    #       Decode the given source frames (sorted) with one decoder,
+    #       seeking to each in turn. Returns downscaled RGB images.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _seek_frames( video_path: str, frame_indices: List[ int ] ) -> Dict[ int, npt.NDArray[ np.uint8 ] ]:
+        images: Dict[ int, npt.NDArray[ np.uint8 ] ] = {}
+        try:
+            decoder = open_decoder( video_path, pixel_format="rgb" )
+        except FileNotFoundError:
+            return images
+
+        with decoder:
+            for frame_idx in frame_indices:
+                decoder.seek( frame_idx )
+                for idx, rgb in decoder:
+                    if idx >= frame_idx:
+                        if idx == frame_idx:
+                            images[ idx ] = downscale( rgb )
+                        break
+        return images
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _pose_vector
+    #
+    #   DESCRIPTION:
+    #       Shoulder / hip position vector used for address detection,
+    #       or None if any of them is invalid.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _pose_vector( landmarks: Dict[ str, Dict[ str, Any ] ] ) -> Optional[ npt.NDArray ]:
+        positions = []
+        for key in [ "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_HIP", "RIGHT_HIP" ]:
+            if not landmarks[ key ][ "valid" ]:
+                return None
+            positions.extend( [ landmarks[ key ][ "x" ], landmarks[ key ][ "y" ] ] )
+        return np.array( positions )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _hands_position
+    #
+    #   DESCRIPTION:
+    #       Mean norm of the wrist positions, or None if either wrist
+    #       is invalid.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def _hands_position( landmarks: Dict[ str, Dict[ str, Any ] ] ) -> Optional[ float ]:
+        positions = []
+        for key in [ "LEFT_WRIST", "RIGHT_WRIST" ]:
+            if not landmarks.get( key, {} ).get( "valid" ):
+                return None
+            positions.append( np.linalg.norm( [ landmarks[ key ][ "x" ], landmarks[ key ][ "y" ] ] ) )
+        return float( np.mean( positions ) )
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
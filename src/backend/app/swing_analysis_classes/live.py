@@ -0,0 +1,209 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   swing_analysis_classes.inference_server import acquire_graph, release_graph
+from   swing_analysis_classes.metrics         import finite_metrics
+from   swing_analysis_classes.model_tier      import MODEL_TIERS
+from   swing_analysis_classes.pose_estimation import landmarks_from_results
+from   swing_analysis_classes.streaming       import StreamingAnalysis
+from   swing_analysis_classes.tracking        import REDETECT_INTERVAL, TrackingScheduler
+from   typing                                 import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Live camera feeds: per-connection latency budget (a frame older than
+# this when its turn comes is dropped, not processed), the pose model
+# tier used when the client doesn't ask for one, and the camera frame
+# rate assumed when the client doesn't report it.
+# ---------------------------------------------------------------------
+LIVE_BUDGET_MS  = float( os.environ.get( "SWING_LIVE_BUDGET_MS", 100.0 ) )
+LIVE_MODEL_TIER = os.environ.get( "SWING_LIVE_MODEL_TIER", "lite" )
+LIVE_FPS        = 30.0
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: LiveSession
+#
+#   DESCRIPTION:
+#       Incremental swing analysis of a live camera feed. Each frame
+#       runs through a warm pose graph and the streaming segmentation /
+#       metrics; process() returns the frame's landmarks together with
+#       any events it triggered:
+#
+#           address  the golfer settled at address
+#           swing    a swing completed (follow-through detected), with
+#                    its address / top / impact frames and metrics
+#
+#       After a swing the analysis restarts, so one session covers any
+#       number of swings. Frames may be skipped (the caller drops them
+#       when behind); frame indices are the caller's, and the frame
+#       rate the follow-through detection uses is scaled to the share
+#       of frames actually processed.
+#
+# ---------------------------------------------------------------------
+class LiveSession:
+
+    def __init__(
+        self,
+        model_tier: str = LIVE_MODEL_TIER,
+        fps: float = LIVE_FPS,
+        redetect_interval: int = REDETECT_INTERVAL
+    ) -> None:
+
+        if model_tier not in MODEL_TIERS:
+            raise ValueError( f"Unknown model tier: { model_tier }" )
+
+        # -------------------------------------------------------------
+        # Pose graph, from the warm pool, and its tracking scheduler.
+        # -------------------------------------------------------------
+        self.model_tier       = model_tier
+        self.model_complexity = MODEL_TIERS[ model_tier ]
+        self.pose_obj         = acquire_graph( self.model_complexity )
+        self.tracker          = TrackingScheduler( self.pose_obj, redetect_interval=redetect_interval )
+
+        # -------------------------------------------------------------
+        # Camera frame rate and the running swing analysis.
+        # -------------------------------------------------------------
+        self.fps    = fps if fps > 0 else LIVE_FPS
+        self.swings = 0
+        self.stream: StreamingAnalysis
+        self._new_swing()
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: process
+    #
+    #   DESCRIPTION:
+    #       Run one RGB frame. Returns its landmarks (None if no pose
+    #       was detected) and the events it triggered.
+    #
+    # -----------------------------------------------------------------
+    def process( self, frame_index: int, image: npt.NDArray ) -> Tuple[ Optional[ Dict[ str, Dict[ str, Any ] ] ], List[ Dict[ str, Any ] ] ]:
+        results   = self.tracker.process( image=image )
+        landmarks = landmarks_from_results( results.pose_landmarks )
+        events    = self._advance( frame_index, landmarks )
+        return ( landmarks if results.pose_landmarks else None ), events
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: end
+    #
+    #   DESCRIPTION:
+    #       The feed ended: report the swing in progress, if the golfer
+    #       got as far as address, as an incomplete swing.
+    #
+    # -----------------------------------------------------------------
+    def end( self ) -> List[ Dict[ str, Any ] ]:
+        if self.stream.segmentation.address_frame < 0:
+            return []
+        return [ self._finish_swing( complete=False ) ]
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: close
+    #
+    #   DESCRIPTION:
+    #       Return the pose graph to the warm pool.
+    #
+    # -----------------------------------------------------------------
+    def close( self ) -> None:
+        if self.pose_obj is not None:
+            release_graph( self.model_complexity, self.pose_obj )
+            self.pose_obj = None
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    def _new_swing( self ) -> None:
+        self.stream         = StreamingAnalysis( fps=self.fps, early_stop=True )
+        self._address_sent  = False
+        self._first_frame   = -1
+        self._frames_pushed = 0
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _advance
+    #
+    #   DESCRIPTION:
+    #       Feed the landmarks to the swing analysis and collect the
+    #       events that became known.
+    #
+    # -----------------------------------------------------------------
+    def _advance( self, frame_index: int, landmarks: Dict[ str, Dict[ str, Any ] ] ) -> List[ Dict[ str, Any ] ]:
+        if self._first_frame < 0:
+            self._first_frame = frame_index
+        self._frames_pushed += 1
+        self.stream.fps      = self.fps * self._frames_pushed / ( frame_index - self._first_frame + 1 )
+        self.stream.push( frame_index, landmarks )
+
+        events: List[ Dict[ str, Any ] ] = []
+        segments = self.stream.segmentation
+        if not self._address_sent and segments.address_frame >= 0:
+            self._address_sent = True
+            events.append( { "type": "address", "frame": segments.video_frame( segments.address_frame ) } )
+        if self.stream.should_stop:
+            events.append( self._finish_swing( complete=True ) )
+        return events
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _finish_swing
+    #
+    #   DESCRIPTION:
+    #       Finalize the current swing's segmentation and metrics, and
+    #       start over for the next one.
+    #
+    # -----------------------------------------------------------------
+    def _finish_swing( self, complete: bool ) -> Dict[ str, Any ]:
+        metrics      = self.stream.finish()
+        video_frames = self.stream.segmentation.video_frames
+        self.swings += 1
+        event = {
+            "type": "swing",
+            "swing": self.swings,
+            "complete": complete,
+            "address": video_frames[ "address" ],
+            "top": video_frames[ "backswing" ],
+            "impact": video_frames[ "impact" ],
+            "metrics": finite_metrics( metrics ),
+        }
+        self._new_swing()
+        return event
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
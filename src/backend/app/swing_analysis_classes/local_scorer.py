@@ -0,0 +1,181 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import math
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   services.llm_schema import ResponseSchema, ResponseSchemaScore
+from   typing              import Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Typical ( low, high ) band of each metric as MetricsCalculator
+# measures it: screen-space angles in degrees, head movement as a
+# fraction of the frame. Spine tilt and head movement are scored by
+# magnitude. These are coarse bands for a fallback score, not a swing
+# model.
+# ---------------------------------------------------------------------
+REFERENCE_RANGES: Dict[ str, Tuple[ float, float ] ] = {
+    "shoulder_rotation_range_deg_backswing": ( 20.0, 60.0 ),
+    "shoulder_rotation_range_deg": ( 30.0, 90.0 ),
+    "hip_rotation_range_deg_backswing": ( 5.0, 30.0 ),
+    "hip_rotation_range_deg": ( 10.0, 50.0 ),
+    "spine_tilt_range_deg": ( 0.0, 15.0 ),
+    "head_movement_x": ( 0.0, 0.05 ),
+    "head_movement_y": ( 0.0, 0.05 )
+}
+
+MAGNITUDE_METRICS = ( "spine_tilt_range_deg", "head_movement_x", "head_movement_y" )
+
+METRIC_LABELS = {
+    "shoulder_rotation_range_deg_backswing": "Shoulder turn in the backswing",
+    "shoulder_rotation_range_deg": "Shoulder rotation through the swing",
+    "hip_rotation_range_deg_backswing": "Hip turn in the backswing",
+    "hip_rotation_range_deg": "Hip rotation through the swing",
+    "spine_tilt_range_deg": "Change in spine tilt",
+    "head_movement_x": "Lateral head movement",
+    "head_movement_y": "Vertical head movement"
+}
+
+# ---------------------------------------------------------------------
+# Categories (as the LLM is asked to score them) and the metrics each
+# is scored on.
+# ---------------------------------------------------------------------
+CATEGORIES = {
+    "Posture and Setup": ( "spine_tilt_range_deg", ),
+    "Backswing": ( "shoulder_rotation_range_deg_backswing", "hip_rotation_range_deg_backswing" ),
+    "Downswing": ( "hip_rotation_range_deg", ),
+    "Impact Position": ( "head_movement_x", "head_movement_y" ),
+    "Follow-Through": ( "shoulder_rotation_range_deg", )
+}
+
+# ---------------------------------------------------------------------
+# One tip per metric and direction out of its band.
+# ---------------------------------------------------------------------
+COACHING_TIPS = {
+    ( "shoulder_rotation_range_deg_backswing", "low" ): "Turn your lead shoulder fully under your chin before starting down.",
+    ( "shoulder_rotation_range_deg_backswing", "high" ): "Shorten the backswing so the shoulder turn stays controlled.",
+    ( "shoulder_rotation_range_deg", "low" ): "Keep rotating your chest toward the target through the finish.",
+    ( "shoulder_rotation_range_deg", "high" ): "Let the body slow down at the finish instead of over-rotating.",
+    ( "hip_rotation_range_deg_backswing", "low" ): "Allow the trail hip to turn back instead of staying locked.",
+    ( "hip_rotation_range_deg_backswing", "high" ): "Brace the trail leg to limit hip turn and build coil against it.",
+    ( "hip_rotation_range_deg", "low" ): "Start the downswing by clearing the lead hip toward the target.",
+    ( "hip_rotation_range_deg", "high" ): "Keep the hips from spinning out so the arms can catch up.",
+    ( "spine_tilt_range_deg", "high" ): "Hold your spine angle from address through impact.",
+    ( "head_movement_x", "high" ): "Keep your head centered over the ball instead of swaying.",
+    ( "head_movement_y", "high" ): "Stay level through the swing; avoid standing up or dipping."
+}
+
+# ---------------------------------------------------------------------
+# Score of a metric inside its band, points lost per band width
+# outside it, the floor, and the score of a metric that couldn't be
+# measured.
+# ---------------------------------------------------------------------
+IN_RANGE_SCORE   = 100
+POINTS_PER_BAND  = 40
+MIN_SCORE        = 30
+UNMEASURED_SCORE = 70
+
+MAX_TIPS = 3
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: metric_score
+#
+#   DESCRIPTION:
+#       Score (0 - 100) of one metric against its reference band, and
+#       "low" / "high" if it falls outside the band (None inside it,
+#       or when the metric wasn't measured).
+#
+# ---------------------------------------------------------------------
+def metric_score( name: str, value: Optional[ float ] ) -> Tuple[ int, Optional[ str ] ]:
+    if value is None or math.isnan( value ):
+        return UNMEASURED_SCORE, None
+
+    low, high = REFERENCE_RANGES[ name ]
+    value     = abs( value ) if name in MAGNITUDE_METRICS else value
+    if low <= value <= high:
+        return IN_RANGE_SCORE, None
+
+    excess = ( low - value ) if value < low else ( value - high )
+    score  = IN_RANGE_SCORE - POINTS_PER_BAND * excess / ( high - low )
+    return max( MIN_SCORE, int( round( score ) ) ), "low" if value < low else "high"
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: score_locally
+#
+#   DESCRIPTION:
+#       Score a swing from its metrics without the LLM. The result has
+#       the same schema as an LLM analysis: category scores against
+#       the reference bands, an overall score, observations for the
+#       metrics out of band and tips for the worst of them.
+#
+# ---------------------------------------------------------------------
+def score_locally( metrics: Dict[ str, float ] ) -> ResponseSchema:
+    scores     = { name: metric_score( name, metrics.get( name ) ) for name in REFERENCE_RANGES }
+    categories: List[ ResponseSchemaScore ] = []
+
+    for category, names in CATEGORIES.items():
+        score      = int( round( sum( scores[ name ][ 0 ] for name in names ) / len( names ) ) )
+        off        = [ name for name in names if scores[ name ][ 1 ] is not None ]
+        unmeasured = [ name for name in names if metrics.get( name ) is None or math.isnan( metrics[ name ] ) ]
+        if off:
+            summary = "; ".join( f"{ METRIC_LABELS[ name ] } is { scores[ name ][ 1 ] }er than typical" for name in off ) + "."
+        elif unmeasured:
+            summary = "Could not be measured reliably from this video."
+        else:
+            summary = "Within the typical range."
+        categories.append( ResponseSchemaScore( name=category, score=score, summary=summary ) )
+
+    # -----------------------------------------------------------------
+    # Observations and tips for the metrics furthest out of band.
+    # -----------------------------------------------------------------
+    off_band     = sorted( ( name for name in scores if scores[ name ][ 1 ] is not None ), key=lambda name: scores[ name ][ 0 ] )
+    observations = [ f"{ METRIC_LABELS[ name ] } is { scores[ name ][ 1 ] }er than typical." for name in off_band ]
+    tips         = [ COACHING_TIPS[ ( name, scores[ name ][ 1 ] ) ] for name in off_band if ( name, scores[ name ][ 1 ] ) in COACHING_TIPS ]
+    if not observations:
+        observations = [ "All measured metrics are within their typical ranges." ]
+
+    overall   = int( round( sum( category.score for category in categories ) / len( categories ) ) )
+    strongest = max( categories, key=lambda category: category.score )
+    weakest   = min( categories, key=lambda category: category.score )
+    analysis  = (
+        f"Scored locally from the pose metrics, without a written coach analysis. "
+        f"Overall score { overall }; strongest area { strongest.name }, weakest area { weakest.name }."
+    )
+
+    return ResponseSchema(
+        swingAnalysis=analysis,
+        categoryScores=categories,
+        overallScore=overall,
+        keyObservations=observations,
+        coachingTips=tips[ :MAX_TIPS ]
+    )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -6,6 +6,10 @@
 
 import os
 import sys
+import time
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing             import Dict, Optional
 
 # ---------------------------------------------------------------------
 # Add the parent directory to the system path to allow for relative
@@ -18,19 +22,42 @@ sys.path.append( PARENT_DIR )
 # TODO: Add imports for footage preprocessing modules here.
 # ---------------------------------------------------------------------
 
-from swing_analysis_classes.pose_estimation import PoseEstimation
-from swing_analysis_classes.metrics         import MetricsCalculator
-from swing_analysis_classes.prompt          import PromptBuilder
-from services.gemini_endpoint               import Client
+from fastapi.encoders                        import jsonable_encoder
+from lib                                     import hash_file
+from swing_analysis_classes.chunked_pose     import chunk_count
+from swing_analysis_classes.inference_server import get_inference_server
+from swing_analysis_classes.key_frames       import KEY_FRAMES_ENABLED
+from swing_analysis_classes.local_scorer     import score_locally
+from swing_analysis_classes.pose_estimation  import PoseEstimation
+from swing_analysis_classes.metrics          import MetricsCalculator
+from swing_analysis_classes.model_tier       import analysis_slot, choose_model_tier, probe_frame_count
+from swing_analysis_classes.pipeline_config  import LOCAL_SCORER, PipelineConfig
+from swing_analysis_classes.prompt           import PromptBuilder
+from swing_analysis_classes.segmentation     import Segmentation
+from swing_analysis_classes.streaming        import STREAMING_ENABLED, StreamingAnalysis
+from services.artifact_store                 import get_artifact_store
+from services.cost_model                     import COST_MODEL_ENABLED, get_cost_model, probe_video
+from services.gemini_endpoint                import Client
+from services.pose_track_store               import PoseTrackStore
+from services.swing_history                  import HISTORY_ENABLED, get_swing_history
+from video.swing_window                      import SWING_WINDOW_ENABLED, find_swing_window
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+# Threads available for LLM calls running alongside the rest of the
+# pipeline.
+# ---------------------------------------------------------------------
+LLM_WORKERS = int( os.environ.get( "SWING_LLM_WORKERS", 16 ) )
+
 # -----------------------------------------------------------------------------
 #                                 PROCEDURES
 # -----------------------------------------------------------------------------
 
+_llm_executor = ThreadPoolExecutor( max_workers=LLM_WORKERS, thread_name_prefix="llm" )
+
 # -----------------------------------------------------------------------------
 #                                  CLASSES
 # -----------------------------------------------------------------------------
@@ -46,7 +73,18 @@ from services.gemini_endpoint               import Client
 # ---------------------------------------------------------------------
 class Analyze():
 
-    def __init__( self, video_path: str, camera_angle: str, experience_level: str, metadata: str ) -> None:
+    def __init__(
+        self,
+        video_path: str,
+        camera_angle: str,
+        experience_level: str,
+        metadata: str,
+        model_tier: Optional[ str ] = None,
+        video_hash: Optional[ str ] = None,
+        golfer: Optional[ str ] = None,
+        club: Optional[ str ] = None,
+        pipeline: Optional[ PipelineConfig ] = None
+    ) -> None:
 
         # -------------------------------------------------------------
         # Path to the swing video we are analyzing.
@@ -60,21 +98,124 @@ class Analyze():
         self.experience_level = experience_level
         self.metadata         = metadata
 
+        # -------------------------------------------------------------
+        # Who swung which club, for the swing history.
+        # -------------------------------------------------------------
+        self.golfer = golfer
+        self.club   = club
+
         # -------------------------------------------------------------
         # Path to the outputted swing video with pose estimations
         # overlayed.
         # -------------------------------------------------------------
         self.video_overlay_path = None
 
+        # -------------------------------------------------------------
+        # Pose model tier actually used ("lite", "full" or "heavy").
+        # -------------------------------------------------------------
+        self.model_tier = None
+
+        # -------------------------------------------------------------
+        # Configuration of the pipeline stages: frame stride, inference
+        # width, model tier, overlay and scorer. A deadline scheduler
+        # may have chosen it; otherwise the deployment defaults apply.
+        # -------------------------------------------------------------
+        self.pipeline = pipeline or PipelineConfig()
+
+        # -------------------------------------------------------------
+        # Source frame range ( start, end ) the pose model ran on, or
+        # None for the whole clip.
+        # -------------------------------------------------------------
+        self.swing_window = None
+
+        # -------------------------------------------------------------
+        # Artifact paths of the address, top of backswing and impact
+        # stills ( None where unavailable ).
+        # -------------------------------------------------------------
+        self.key_frame_paths = {}
+
+        # -------------------------------------------------------------
+        # Swing metrics, source frame indices of the key frames, and
+        # the id of this analysis in the swing history ( None when the
+        # history is disabled ).
+        # -------------------------------------------------------------
+        self.metrics: Dict[ str, float ] = {}
+        self.key_frame_indices: Dict[ str, int ] = {}
+        self.swing_id: Optional[ int ] = None
+
+        # -------------------------------------------------------------
+        # Wall-clock seconds the pipeline took.
+        # -------------------------------------------------------------
+        self.pipeline_seconds = 0.0
+
+        # -------------------------------------------------------------
+        # Pending LLM call.
+        # -------------------------------------------------------------
+        self._llm_future: Optional[ Future ] = None
+
+        # -------------------------------------------------------------
+        # Content hash of the input video. Persisted pose data is keyed
+        # by this value. Callers that already know it (e.g. a worker
+        # reading from the video store) can pass it in.
+        # -------------------------------------------------------------
+        self.video_hash = video_hash or hash_file( self.video_path )
+
         # -------------------------------------------------------------
         # Attribute for holding the final swing analysis.
         # -------------------------------------------------------------
         self.analysis = ""
 
         # -------------------------------------------------------------
-        # Run the pipeline.
+        # Run the pipeline. The pose model tier is resolved while this
+        # analysis counts towards the in-flight queue depth, so an
+        # "auto" request sees the load it is joining.
+        # -------------------------------------------------------------
+        start = time.perf_counter()
+        with analysis_slot():
+            self._process_swing( requested_tier=model_tier )
+        self.pipeline_seconds = time.perf_counter() - start
+
+        # -------------------------------------------------------------
+        # Feed the measured time to the cost model that admission
+        # control predicts from.
         # -------------------------------------------------------------
-        self._process_swing()
+        if COST_MODEL_ENABLED:
+            get_cost_model().observe( probe_video( self.video_path ), self.pipeline.cost_config(), self.pipeline_seconds )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: response
+    #
+    #   DESCRIPTION:
+    #       JSON-ready analysis result: the swing analysis plus the URLs
+    #       of the pose overlay video and key frame stills under the
+    #       static shared directory mount, and the pipeline choices (with
+    #       whether a deadline, if any, was met).
+    #
+    # -----------------------------------------------------------------
+    def response( self ) -> Dict:
+        deadline         = self.pipeline.deadline_seconds
+        artifact_store   = get_artifact_store()
+        pose_overlay_url = artifact_store.url_for( self.video_overlay_path ) if self.video_overlay_path else None
+        key_frame_urls   = { name: artifact_store.url_for( path ) if path else None for name, path in self.key_frame_paths.items() }
+
+        return {
+            "swing_analysis": jsonable_encoder( self.analysis ),
+            "pose_overlay": pose_overlay_url,
+            "model_tier": self.model_tier,
+            "swing_window": list( self.swing_window ) if self.swing_window else None,
+            "key_frames": key_frame_urls,
+            "swing_id": self.swing_id,
+            "pipeline_seconds": round( self.pipeline_seconds, 3 ),
+            "pipeline": {
+                **self.pipeline.to_dict(),
+                "deadline_met": self.pipeline_seconds <= deadline if deadline is not None else None
+            }
+        }
 
     # -----------------------------------------------------------------
     #                        PRIVATE METHODS
@@ -88,25 +229,128 @@ class Analyze():
     #       Run the full swing analysis pipeline.
     #
     # -----------------------------------------------------------------
-    def _process_swing( self ) -> None:
+    def _process_swing( self, requested_tier: Optional[ str ] = None ) -> None:
 
         # -------------------------------------------------------------
         # TODO: Preprocess the footage (e.g., stabilization, cropping).
         # -------------------------------------------------------------
 
         # -------------------------------------------------------------
-        # Extract the pose data from the processed footage.
+        # Find the swing itself with a cheap motion pre-pass, so the
+        # pose model skips waggles, walking up to the ball and posing
+        # after the shot. None means analyze the whole clip.
+        # -------------------------------------------------------------
+        self.swing_window = find_swing_window( self.video_path ) if SWING_WINDOW_ENABLED else None
+
+        # -------------------------------------------------------------
+        # Pick the pose model tier for the frames that will actually be
+        # analyzed, unless the pipeline configuration fixes it.
         # -------------------------------------------------------------
+        if self.swing_window is not None:
+            n_frames = self.swing_window[ 1 ] - self.swing_window[ 0 ]
+        else:
+            n_frames = probe_frame_count( self.video_path )
+        self.model_tier          = self.pipeline.model_tier or choose_model_tier( requested_tier, n_frames=n_frames )
+        self.pipeline.model_tier = self.model_tier
+
+        # -------------------------------------------------------------
+        # Segment the swing and compute its metrics while it is being
+        # decoded. The LLM call starts as soon as the last frame is
+        # processed, overlapping the overlay video finalization.
+        # -------------------------------------------------------------
+        stream = StreamingAnalysis( on_complete=lambda done: self._start_llm( done.metrics ) ) if STREAMING_ENABLED else None
+
+        # -------------------------------------------------------------
+        # Extract the pose data from the processed footage. When the
+        # deployment enables the shared inference server, frames run on
+        # its pooled pose graphs alongside other requests. With chunk
+        # workers enabled, long clips are instead split into chunks
+        # estimated in parallel (only without a frame stride).
+        # -------------------------------------------------------------
+        chunks = chunk_count( n_frames ) if self.pipeline.stride == 1 else 1
         pose_estimator = PoseEstimation(
             vid_in=self.video_path,
-            overlay=True
+            overlay=self.pipeline.overlay,
+            inference_server=get_inference_server() if chunks == 1 else None,
+            model_tier=self.model_tier,
+            frame_range=self.swing_window,
+            key_frames=KEY_FRAMES_ENABLED,
+            stream=stream,
+            chunks=chunks,
+            stride=self.pipeline.stride,
+            inference_width=self.pipeline.inference_width
         )
         self.video_overlay_path = pose_estimator.output_vid_path
 
         # -------------------------------------------------------------
-        # Perform metrics calculations based on the extracted pose data.
+        # Persist the raw pose track so the swing can be re-analyzed
+        # later without re-running pose estimation.
         # -------------------------------------------------------------
-        metrics_calculator = MetricsCalculator( pose_data=pose_estimator.pose_data )
+        PoseTrackStore().save( self.video_hash, pose_estimator.raw_track )
+
+        # -------------------------------------------------------------
+        # Without streaming, segment the swing and perform the metrics
+        # calculations on the extracted pose data now.
+        # -------------------------------------------------------------
+        if stream is not None:
+            segments = stream.segmentation
+        else:
+            segments           = Segmentation( pose_estimator.pose_data )
+            metrics_calculator = MetricsCalculator( pose_data=pose_estimator.pose_data, segments=segments )
+            self._start_llm( metrics_calculator.metrics )
+
+        # -------------------------------------------------------------
+        # Save the key frame stills from the frames kept while
+        # decoding.
+        # -------------------------------------------------------------
+        self.key_frame_indices = dict( segments.video_frames )
+        if pose_estimator.key_frames is not None:
+            self.key_frame_paths = pose_estimator.key_frames.save(
+                segments.video_frames,
+                pose_estimator.pose_data,
+                self.video_path
+            )
+
+        # -------------------------------------------------------------
+        # Wait for the analysis.
+        # -------------------------------------------------------------
+        self.analysis = self._llm_future.result()
+
+        # -------------------------------------------------------------
+        # Record the analysis in the swing history, with a reference to
+        # the stored pose track.
+        # -------------------------------------------------------------
+        if HISTORY_ENABLED:
+            self.swing_id = get_swing_history().record(
+                metrics=self.metrics,
+                key_frames=self.key_frame_indices,
+                analysis=jsonable_encoder( self.analysis ),
+                golfer=self.golfer,
+                club=self.club,
+                camera_angle=self.camera_angle,
+                experience_level=self.experience_level,
+                model_tier=self.model_tier,
+                video_hash=self.video_hash
+            )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _start_llm
+    #
+    #   DESCRIPTION:
+    #       Build the prompt from the swing metrics and start the LLM
+    #       call in the background. With the local scorer, the swing
+    #       is scored right away instead.
+    #
+    # -----------------------------------------------------------------
+    def _start_llm( self, metrics: Dict[ str, float ] ) -> None:
+        self.metrics = metrics
+
+        if self.pipeline.scorer == LOCAL_SCORER:
+            self._llm_future = Future()
+            self._llm_future.set_result( score_locally( metrics ) )
+            return
 
         # -------------------------------------------------------------
         # Build the prompt for the AI model using the calculated
@@ -116,14 +360,18 @@ class Analyze():
             camera_angle=self.camera_angle,
             experience_level=self.experience_level,
             metadata=self.metadata,
-            metrics=metrics_calculator.metrics
+            metrics=metrics
         )
-        
+
         # -------------------------------------------------------------
-        # Send the prompt to the AI model and get the analysis.
+        # Send the prompt to the AI model.
         # -------------------------------------------------------------
         client = Client()
-        self.analysis = client.generate_response( prompt=prompt_builder.prompt )
+        self._llm_future = _llm_executor.submit(
+            client.generate_response,
+            prompt=prompt_builder.prompt,
+            system_instruction=prompt_builder.system_instruction
+        )
 
 # -----------------------------------------------------------------------------
 #                                 EXECUTION 
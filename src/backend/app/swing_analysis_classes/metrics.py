@@ -4,6 +4,7 @@
 #                                  IMPORTS 
 # -----------------------------------------------------------------------------
 
+import math
 import numpy as np
 import os
 import sys
@@ -16,7 +17,7 @@ PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
 sys.path.append( PARENT_DIR )
 
 from   swing_analysis_classes.segmentation import Segmentation
-from   typing                              import Any, Dict, List
+from   typing                              import Any, Dict, List, Optional
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
@@ -113,6 +114,19 @@ def spine_tilt_helper( frame: Dict[ str, Any ] ) -> float:
     # Return the calculated angle.
     # -----------------------------------------------------------------
     return angle
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: finite_metrics
+#
+#   DESCRIPTION:
+#       Metrics with NaN (not measurable) replaced by None, so they
+#       serialize to strict JSON.
+#
+# ---------------------------------------------------------------------
+def finite_metrics( metrics: Dict[ str, float ] ) -> Dict[ str, Optional[ float ] ]:
+    return { key: ( None if math.isnan( value ) else float( value ) ) for key, value in metrics.items() }
     
 
 # -----------------------------------------------------------------------------
@@ -131,13 +145,15 @@ def spine_tilt_helper( frame: Dict[ str, Any ] ) -> float:
 # ---------------------------------------------------------------------
 class MetricsCalculator:
 
-    def __init__( self, pose_data: List[ Dict[ str, Any ] ] ) -> None:
+    def __init__( self, pose_data: List[ Dict[ str, Any ] ], segments: Optional[ Segmentation ] = None ) -> None:
 
         # -------------------------------------------------------------
-        # Create a Segmentation object to identify key frames. This
-        # will help with metric calculations.
+        # Create a Segmentation object to identify key frames, unless
+        # the caller already segmented the swing (e.g. with tuned
+        # thresholds). This will help with metric calculations.
         # -------------------------------------------------------------
-        segments = Segmentation( pose_data )
+        if segments is None:
+            segments = Segmentation( pose_data )
         self.address_frame   = segments.address_frame
         self.backswing_frame = segments.backswing_frame
         self.impact_frame    = segments.impact_frame
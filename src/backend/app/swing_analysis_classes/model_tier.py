@@ -0,0 +1,128 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import contextlib
+import cv2
+import os
+import threading
+
+from   typing import Iterator, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Pose landmark model tiers and their MediaPipe model_complexity.
+# ---------------------------------------------------------------------
+MODEL_TIERS = { "lite": 0, "full": 1, "heavy": 2 }
+AUTO_TIER   = "auto"
+
+# ---------------------------------------------------------------------
+# Deployment default. Requests that don't ask for a tier get this one;
+# "auto" lets the load policy below decide.
+# ---------------------------------------------------------------------
+DEFAULT_MODEL_TIER = os.environ.get( "SWING_MODEL_TIER", "full" )
+
+# ---------------------------------------------------------------------
+# Auto policy. Drop to the lite model once this many analyses are
+# already running or the clip is long; use the heavy model only when
+# the server is idle and the clip is short.
+# ---------------------------------------------------------------------
+AUTO_LITE_QUEUE_DEPTH = int( os.environ.get( "SWING_AUTO_LITE_QUEUE_DEPTH", 4 ) )
+AUTO_LITE_FRAMES      = int( os.environ.get( "SWING_AUTO_LITE_FRAMES", 900 ) )
+AUTO_HEAVY_FRAMES     = int( os.environ.get( "SWING_AUTO_HEAVY_FRAMES", 300 ) )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+_in_flight      = 0
+_in_flight_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: analysis_slot
+#
+#   DESCRIPTION:
+#       Context manager that counts an analysis as in flight for the
+#       duration of the block. The count is the queue depth the auto
+#       policy sees.
+#
+# ---------------------------------------------------------------------
+@contextlib.contextmanager
+def analysis_slot() -> Iterator[ None ]:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+    try:
+        yield
+    finally:
+        with _in_flight_lock:
+            _in_flight -= 1
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: queue_depth
+#
+#   DESCRIPTION:
+#       Number of analyses currently in flight in this process.
+#
+# ---------------------------------------------------------------------
+def queue_depth() -> int:
+    return _in_flight
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: probe_frame_count
+#
+#   DESCRIPTION:
+#       Frame count from the container header, without decoding. Zero
+#       if the container doesn't report one.
+#
+# ---------------------------------------------------------------------
+def probe_frame_count( video_path: str ) -> int:
+    cap = cv2.VideoCapture( video_path )
+    try:
+        return max( int( cap.get( cv2.CAP_PROP_FRAME_COUNT ) ), 0 )
+    finally:
+        cap.release()
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: choose_model_tier
+#
+#   DESCRIPTION:
+#       Resolve a requested tier (or the deployment default) to a
+#       concrete tier. "auto" picks from the current queue depth and
+#       the clip's frame count; the depth includes the analysis asking.
+#       Raises ValueError for unknown tiers.
+#
+# ---------------------------------------------------------------------
+def choose_model_tier( requested: Optional[ str ], n_frames: int, depth: Optional[ int ] = None ) -> str:
+    tier = ( requested or DEFAULT_MODEL_TIER ).lower()
+    if tier in MODEL_TIERS:
+        return tier
+    if tier != AUTO_TIER:
+        raise ValueError( f"Unknown model tier: { tier }" )
+
+    depth = queue_depth() if depth is None else depth
+    if depth >= AUTO_LITE_QUEUE_DEPTH or n_frames > AUTO_LITE_FRAMES:
+        return "lite"
+    if depth <= 1 and 0 < n_frames <= AUTO_HEAVY_FRAMES:
+        return "heavy"
+    return "full"
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
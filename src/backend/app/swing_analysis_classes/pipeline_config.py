@@ -0,0 +1,181 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import itertools
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   swing_analysis_classes.model_tier import MODEL_TIERS
+from   typing                            import Any, Dict, Iterator, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Scorers: the LLM, or the local rule-based scorer (no network call).
+# ---------------------------------------------------------------------
+LLM_SCORER   = "llm"
+LOCAL_SCORER = "local"
+SCORERS      = ( LLM_SCORER, LOCAL_SCORER )
+
+# ---------------------------------------------------------------------
+# Deployment defaults for each stage. The inference width is the width
+# frames are decoded at for pose inference (and the overlay); zero
+# keeps the source resolution.
+# ---------------------------------------------------------------------
+DEFAULT_STRIDE          = int( os.environ.get( "SWING_POSE_STRIDE", 1 ) )
+DEFAULT_INFERENCE_WIDTH = int( os.environ.get( "SWING_INFERENCE_WIDTH", 0 ) ) or None
+DEFAULT_OVERLAY         = os.environ.get( "SWING_OVERLAY", "1" ) == "1"
+DEFAULT_SCORER          = os.environ.get( "SWING_SCORER", LLM_SCORER )
+
+# ---------------------------------------------------------------------
+# Options a deadline scheduler may pick from, each with the quality it
+# gives up (a penalty; lower is better). Dropping to the local scorer
+# costs the most, since the written analysis is the product.
+# ---------------------------------------------------------------------
+STRIDE_PENALTIES          = { 1: 0, 2: 2, 3: 5 }
+INFERENCE_WIDTH_PENALTIES = { None: 0, 720: 1, 480: 3 }
+TIER_PENALTIES            = { "heavy": 0, "full": 1, "lite": 4 }
+OVERLAY_PENALTIES         = { True: 0, False: 3 }
+SCORER_PENALTIES          = { LLM_SCORER: 0, LOCAL_SCORER: 6 }
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PipelineConfig
+#
+#   DESCRIPTION:
+#       The configurable stages of one analysis:
+#
+#         stride           estimate every n-th frame of the swing
+#                          window; the frames between are gap filled
+#         inference_width  decode width for pose inference and the
+#                          overlay (None for the source resolution)
+#         model_tier       pose model complexity (None resolves the
+#                          requested tier as usual)
+#         overlay          render the pose overlay video
+#         scorer           LLM or local rule-based scoring
+#
+#       A scheduler that picked the configuration fills in the deadline
+#       it planned for and the predicted pipeline seconds.
+#
+# ---------------------------------------------------------------------
+class PipelineConfig:
+
+    def __init__(
+        self,
+        stride: int = DEFAULT_STRIDE,
+        inference_width: Optional[ int ] = DEFAULT_INFERENCE_WIDTH,
+        model_tier: Optional[ str ] = None,
+        overlay: bool = DEFAULT_OVERLAY,
+        scorer: str = DEFAULT_SCORER
+    ) -> None:
+
+        if stride < 1:
+            raise ValueError( f"Frame stride must be at least 1: { stride }" )
+        if model_tier is not None and model_tier not in MODEL_TIERS:
+            raise ValueError( f"Unknown model tier: { model_tier }" )
+        if scorer not in SCORERS:
+            raise ValueError( f"Unknown scorer: { scorer }" )
+
+        self.stride          = stride
+        self.inference_width = inference_width
+        self.model_tier      = model_tier
+        self.overlay         = overlay
+        self.scorer          = scorer
+
+        # -------------------------------------------------------------
+        # Set by the deadline scheduler.
+        # -------------------------------------------------------------
+        self.deadline_seconds: Optional[ float ] = None
+        self.predicted_seconds: Optional[ float ] = None
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: penalty
+    #
+    #   DESCRIPTION:
+    #       Quality given up by this configuration, relative to the
+    #       best one with the same maximum tier.
+    #
+    # -----------------------------------------------------------------
+    def penalty( self ) -> int:
+        return (
+            STRIDE_PENALTIES.get( self.stride, max( STRIDE_PENALTIES.values() ) ) +
+            INFERENCE_WIDTH_PENALTIES.get( self.inference_width, 0 ) +
+            TIER_PENALTIES.get( self.model_tier, 0 ) +
+            OVERLAY_PENALTIES[ self.overlay ] +
+            SCORER_PENALTIES[ self.scorer ]
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: cost_config
+    #
+    #   DESCRIPTION:
+    #       The choices the cost model predicts from (see
+    #       services/cost_model.py), as a JSON-ready dict.
+    #
+    # -----------------------------------------------------------------
+    def cost_config( self ) -> Dict[ str, Any ]:
+        return {
+            "model_tier": self.model_tier,
+            "stride": self.stride,
+            "inference_width": self.inference_width,
+            "overlay": self.overlay,
+            "scorer": self.scorer
+        }
+
+
+    def to_dict( self ) -> Dict[ str, Any ]:
+        return {
+            **self.cost_config(),
+            "deadline_seconds": self.deadline_seconds,
+            "predicted_seconds": round( self.predicted_seconds, 2 ) if self.predicted_seconds is not None else None
+        }
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: candidates
+    #
+    #   DESCRIPTION:
+    #       Every configuration a scheduler may choose from, for a clip
+    #       of the given source width and at most the given tier.
+    #       Inference widths at or above the source width are the same
+    #       as the source resolution and are skipped.
+    #
+    # -----------------------------------------------------------------
+    @staticmethod
+    def candidates( max_tier: str, source_width: int ) -> Iterator[ "PipelineConfig" ]:
+        tiers  = [ tier for tier in MODEL_TIERS if MODEL_TIERS[ tier ] <= MODEL_TIERS[ max_tier ] ]
+        widths = [ width for width in INFERENCE_WIDTH_PENALTIES if width is None or width < source_width ]
+        for stride, width, tier, overlay, scorer in itertools.product( STRIDE_PENALTIES, widths, tiers, OVERLAY_PENALTIES, SCORERS ):
+            yield PipelineConfig( stride=stride, inference_width=width, model_tier=tier, overlay=overlay, scorer=scorer )
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
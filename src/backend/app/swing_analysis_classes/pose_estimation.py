@@ -4,10 +4,12 @@
 #                                  IMPORTS 
 # -----------------------------------------------------------------------------
 
+import bisect
+import collections
 import cv2
+import numpy as np
 import os
 import sys
-import uuid
 
 # ---------------------------------------------------------------------
 # Add the parent directory to the system path to allow for relative
@@ -16,20 +18,92 @@ import uuid
 PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
 sys.path.append( PARENT_DIR )
 
-from lib                        import SHARED_DIR
-from typing                     import Any, Dict, List, Optional  
-from mediapipe.python.solutions import drawing_utils as mp_drawing_utils
-from mediapipe.python.solutions import pose          as mp_pose_module
+from concurrent.futures                      import Future
+from services.artifact_store                 import get_artifact_store
+from swing_analysis_classes.chunked_pose     import estimate_chunked
+from swing_analysis_classes.inference_server import InferenceServer
+from swing_analysis_classes.interpolation    import PoseInterpolation
+from swing_analysis_classes.key_frames       import KeyFrameCollector
+from swing_analysis_classes.model_tier       import MODEL_TIERS
+from swing_analysis_classes.pose_track       import PoseTrack, VISIBILITY_THRESHOLD
+from swing_analysis_classes.streaming        import StreamingAnalysis
+from swing_analysis_classes.tracking         import MIN_DETECTION_CONFIDENCE, REDETECT_INTERVAL, TRACKER_MIN_CONFIDENCE, TrackingScheduler
+from video.decoder                           import open_decoder
+from video.faststart                         import make_faststart
+from types                                   import SimpleNamespace
+from typing                                  import Any, Deque, Dict, List, Optional, Tuple
+from mediapipe.framework.formats             import landmark_pb2
+from mediapipe.python.solutions              import drawing_utils as mp_drawing_utils
+from mediapipe.python.solutions              import pose          as mp_pose_module
 
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+# Frames kept in flight per clip when running on the shared inference
+# server, so decoding this clip overlaps with inference of its earlier
+# frames.
+# ---------------------------------------------------------------------
+PIPELINE_DEPTH = 4
+
+# ---------------------------------------------------------------------
+# Result recorded for a frame that skipped inference.
+# ---------------------------------------------------------------------
+NO_POSE = SimpleNamespace( pose_landmarks=None )
+
 # -----------------------------------------------------------------------------
 #                                 PROCEDURES
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _track_results
+#
+#   DESCRIPTION:
+#       Rebuild a MediaPipe style result for one row of a pose track,
+#       so precomputed landmarks go through the same recording and
+#       overlay code as live inference. A missing row or a frame
+#       without a detection has no pose landmarks.
+#
+# ---------------------------------------------------------------------
+def _track_results( track: PoseTrack, row: Optional[ int ] ) -> Any:
+    if row is None or np.isnan( track.xy[ row ] ).all():
+        return SimpleNamespace( pose_landmarks=None )
+
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for ( x, y ), visibility in zip( track.xy[ row ], track.visibility[ row ] ):
+        landmark_list.landmark.add( x=float( x ), y=float( y ), visibility=float( visibility ) )
+    return SimpleNamespace( pose_landmarks=landmark_list )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: landmarks_from_results
+#
+#   DESCRIPTION:
+#       Map MediaPipe's pose landmarks for one frame to the pose data
+#       format: an x, y coordinate and validity flag per landmark name.
+#       If no landmarks were detected, all are marked invalid.
+#
+# ---------------------------------------------------------------------
+def landmarks_from_results( pose_landmarks: Any ) -> Dict[ str, Dict[ str, Any ] ]:
+    frame_landmarks: Dict[ str, Dict[ str, Any ] ] = {}
+    if pose_landmarks:
+        for landmark_name, landmark_enum in mp_pose_module.PoseLandmark.__members__.items():
+            landmark = pose_landmarks.landmark[ landmark_enum ]
+            frame_landmarks[ landmark_name ] = {
+                "x": float( landmark.x ),
+                "y": float( landmark.y ),
+                "valid": landmark.visibility > VISIBILITY_THRESHOLD,
+                "visibility": float( landmark.visibility ),
+            }
+    else:
+        for landmark_name in mp_pose_module.PoseLandmark.__members__:
+            frame_landmarks[ landmark_name ] = { "x": None, "y": None, "valid": False }
+    return frame_landmarks
+
 # -----------------------------------------------------------------------------
 #                                  CLASSES
 # -----------------------------------------------------------------------------
@@ -46,34 +120,167 @@ from mediapipe.python.solutions import pose          as mp_pose_module
 # ---------------------------------------------------------------------
 class PoseEstimation:
     
-    def __init__( self, vid_in: str, overlay: Optional[ bool ] = False ) -> None:
+    def __init__(
+        self,
+        vid_in: str,
+        overlay: Optional[ bool ] = False,
+        min_detection_confidence: float = MIN_DETECTION_CONFIDENCE,
+        redetect_interval: int = REDETECT_INTERVAL,
+        interpolation: str = "linear",
+        smoothing: Optional[ str ] = None,
+        inference_server: Optional[ InferenceServer ] = None,
+        model_tier: str = "full",
+        frame_range: Optional[ Tuple[ int, int ] ] = None,
+        key_frames: bool = False,
+        stream: Optional[ StreamingAnalysis ] = None,
+        chunks: int = 1,
+        clip_ranges: Optional[ List[ Tuple[ int, int ] ] ] = None,
+        stride: int = 1,
+        inference_width: Optional[ int ] = None
+    ) -> None:
+
+        if model_tier not in MODEL_TIERS:
+            raise ValueError( f"Unknown model tier: { model_tier }" )
+        if stream is not None and ( interpolation != "linear" or smoothing is not None ):
+            raise ValueError( "Streaming analysis requires linear interpolation without smoothing." )
+        if chunks > 1 and inference_server is not None:
+            raise ValueError( "Chunk-parallel pose estimation can't run on the shared inference server." )
+        if clip_ranges and ( chunks > 1 or inference_server is not None or stream is not None ):
+            raise ValueError( "Clip ranges require local, unchunked pose estimation without streaming." )
+        if stride < 1:
+            raise ValueError( f"Frame stride must be at least 1: { stride }" )
+        if stride > 1 and chunks > 1:
+            raise ValueError( "A frame stride requires unchunked pose estimation." )
         
         # -------------------------------------------------------------
-        # Initialize the input and output video paths with the provided
-        # and constant values.
+        # Initialize the input video path and, for an overlay, reserve
+        # an output path in the managed artifact store.
         # -------------------------------------------------------------
+        self.artifact_store  = get_artifact_store()
         self.input_vid_path  = vid_in
-        self.output_vid_path = os.path.join( SHARED_DIR, f"pose_overlay_{ uuid.uuid4().hex }.mp4" )
+        self.output_vid_path = self.artifact_store.allocate( prefix="pose_overlay", suffix=".mp4" ) if overlay else None
         self.overlay         = overlay
 
+        # -------------------------------------------------------------
+        # Pose inference runs on every stride-th frame of the range (of
+        # each clip, with clip ranges); the frames between are recorded
+        # without a detection and gap filled like any dropped frame.
+        # Frames are decoded at the inference width (None keeps the
+        # source resolution), which also sets the overlay and key frame
+        # resolution. Landmarks are normalized, so neither changes the
+        # pose data's coordinates.
+        # -------------------------------------------------------------
+        self.stride          = stride
+        self.inference_width = inference_width
+
+        # -------------------------------------------------------------
+        # Optional ( start, end ) range of source frames to analyze,
+        # end exclusive. Frame indices in the pose data always refer to
+        # the source video.
+        # -------------------------------------------------------------
+        self.frame_range = frame_range
+
+        # -------------------------------------------------------------
+        # Optional sorted, non-overlapping ( start, end ) clips within
+        # the range (e.g. the swings of a session recording). Only
+        # frames inside a clip are estimated, each clip starts with a
+        # fresh person detection, and each gets its own overlay video
+        # in clip_vid_paths instead of output_vid_path.
+        # -------------------------------------------------------------
+        self.clip_ranges    = sorted( clip_ranges ) if clip_ranges else []
+        self.clip_vid_paths = [ self.artifact_store.allocate( prefix="pose_overlay", suffix=".mp4" ) if overlay else None for _ in self.clip_ranges ]
+        if self.clip_ranges:
+            self.output_vid_path = None
+            if self.frame_range is None:
+                self.frame_range = ( self.clip_ranges[ 0 ][ 0 ], self.clip_ranges[ -1 ][ 1 ] )
+
+        # -------------------------------------------------------------
+        # Optionally keep candidate key frame stills while decoding, so
+        # they can be saved once the swing is segmented.
+        # -------------------------------------------------------------
+        self.key_frames: Optional[ KeyFrameCollector ] = KeyFrameCollector() if key_frames else None
+
+        # -------------------------------------------------------------
+        # Optional streaming segmentation / metrics, fed each frame's
+        # landmarks as they are recorded. It may also end decoding
+        # early once the follow-through is detected.
+        # -------------------------------------------------------------
+        self.stream = stream
+
         # -------------------------------------------------------------
         # Initialize the mediapipe related resources.
+        #
+        # NOTE: MediaPipe's own tracking threshold is kept low; the
+        # tracking scheduler decides when the person detector should
+        # run, from the visibility of the key landmarks.
+        #
+        # With a shared inference server the clip runs on one of the
+        # server's warm pose graphs instead of its own. In chunk mode
+        # inference runs in the chunk worker processes.
         # -------------------------------------------------------------
-        self.mp_drawing = mp_drawing_utils
-        self.mp_pose    = mp_pose_module
-        self.pose_obj   = self.mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=1,
-            smooth_landmarks=True,
-            enable_segmentation=False,
-            min_detection_confidence=0.8,
-            min_tracking_confidence=0.8
-        )
+        self.mp_drawing        = mp_drawing_utils
+        self.mp_pose           = mp_pose_module
+        self.model_tier        = model_tier
+        self.inference_server  = inference_server
+        self.clip_session      = None
+        self.chunks            = chunks
+        self.redetect_interval = redetect_interval
+        self.tracker: Optional[ TrackingScheduler ] = None
+        if self.chunks > 1:
+            self.pose_obj = None
+        elif self.inference_server is not None:
+            self.clip_session = self.inference_server.open_clip(
+                redetect_interval=redetect_interval,
+                model_complexity=MODEL_TIERS[ model_tier ],
+                first_frame=frame_range[ 0 ] if frame_range else 0
+            )
+            self.tracker      = self.clip_session.tracker
+            self.pose_obj     = self.tracker.pose_obj
+        else:
+            self.pose_obj = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=MODEL_TIERS[ model_tier ],
+                smooth_landmarks=True,
+                enable_segmentation=False,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=TRACKER_MIN_CONFIDENCE
+            )
+            self.tracker = TrackingScheduler( self.pose_obj, redetect_interval=redetect_interval )
+
+        # -------------------------------------------------------------
+        # Gap filling / smoothing applied to the raw landmarks. Filling
+        # dropped frames is what makes lower confidence thresholds
+        # usable.
+        # -------------------------------------------------------------
+        self.interpolation = interpolation
+        self.smoothing     = smoothing
+
+        # -------------------------------------------------------------
+        # Frame rate of the input video, filled in while decoding.
+        # -------------------------------------------------------------
+        self.fps = 0.0
+
+        # -------------------------------------------------------------
+        # Detector versus tracker invocation counters for this clip
+        # (summed over the chunk workers in chunk mode).
+        # -------------------------------------------------------------
+        self.inference_stats: Dict[ str, int ] = self.tracker.stats if self.tracker is not None else {}
 
         # -------------------------------------------------------------
         # Calculate pose data and overlay esitmations, if specified.
+        # The raw (as detected) track is kept for persistence; pose_data
+        # and pose_track hold the gap-filled landmarks.
+        #
+        # The clip's pose graph goes back to the inference server
+        # however estimation ends.
         # -------------------------------------------------------------
-        self.pose_data = self._estimate_poses()
+        self.raw_track: Optional[ PoseTrack ] = None
+        self.pose_track: Optional[ PoseTrack ] = None
+        try:
+            self.pose_data = self._estimate_poses()
+        finally:
+            if self.clip_session is not None:
+                self.inference_server.close_clip( self.clip_session )
 
     # -----------------------------------------------------------------
     #                        PRIVATE METHODS
@@ -87,145 +294,331 @@ class PoseEstimation:
         frames: List[ Dict[ str, Any ] ] = []
 
         # -------------------------------------------------------------
-        # Instantiate a VideoCapture instance with the input video.
+        # In chunk mode the whole range is estimated up front by the
+        # chunk workers, in parallel. The serial decode below then only
+        # feeds the overlay, key frames and streaming analysis, and is
+        # skipped when none of them is enabled.
         # -------------------------------------------------------------
-        cap = cv2.VideoCapture( self.input_vid_path )
-        if not cap.isOpened():
-            raise FileNotFoundError( f"Could not open video: { self.input_vid_path }" )
-        
-        # -------------------------------------------------------------
-        # Grab video specific metadata. This will be used if the user
-        # has specified for a pose overlay output.
-        # -------------------------------------------------------------
-        width  = int( cap.get( cv2.CAP_PROP_FRAME_WIDTH ) )
-        height = int( cap.get( cv2.CAP_PROP_FRAME_HEIGHT ) )
-        fps    = cap.get( propId=cv2.CAP_PROP_FPS )
-        
-        # -------------------------------------------------------------
-        # TODO (video-preprocessing):
-        # Phone videos often store portrait footage as rotated landscape
-        # buffers.
-        # 
-        # OpenCV ignores rotation metadata.
-        # -------------------------------------------------------------
-        rotate = True
-        out_width, out_height = ( height, width ) if rotate else ( width, height )
+        chunk_track: Optional[ PoseTrack ] = None
+        if self.chunks > 1:
+            chunk_track = self._estimate_chunks()
+            chunk_rows  = { int( idx ): row for row, idx in enumerate( chunk_track.frame_indices ) }
+            if not ( self.overlay or self.key_frames is not None or self.stream is not None ):
+                self.fps = chunk_track.fps
+                return self._fill_gaps( chunk_track )
 
         # -------------------------------------------------------------
-        # Initialize overlay video writer if debug visualization is
-        # enabled.
-        #
-        # NOTE: We must force the MSMY API for H264 encoding. This
-        # allows for embedded browser streaming.
-        # -------------------------------------------------------------
-        if self.overlay and self.output_vid_path:
-            fourcc = cv2.VideoWriter.fourcc( *"H264" )
-            writer = cv2.VideoWriter(
-                filename=self.output_vid_path,
-                apiPreference=cv2.CAP_MSMF,
-                fourcc=fourcc,
-                fps=fps,
-                frameSize=( out_width, out_height )
-            )
-        else: writer = None
-
-        # -------------------------------------------------------------
-        # Process each from in the video.
+        # Open the input video. Frames are decoded straight to RGB (at
+        # the inference width) for MediaPipe, so no separate color
+        # conversion or resize pass is needed.
         # -------------------------------------------------------------
-        frame_idx = 0
-        while cap.isOpened():
-            # ---------------------------------------------------------
-            # Read video frame-by-frame. Exit if the read is 
-            # unsuccessful for any frame.
-            # ---------------------------------------------------------
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            # ---------------------------------------------------------
-            # Convert to an RGB color-scale (if not already) for 
-            # MediaPipe.
-            # ---------------------------------------------------------
-            frame_corrected: Any = self.pose_obj.process(
-                image=cv2.cvtColor( src=frame, code=cv2.COLOR_BGR2RGB )
-            )
+        decoder = open_decoder( self.input_vid_path, pixel_format="rgb", width=self.inference_width )
+        writer: Any = None
+        writer_path: Optional[ str ] = None
+        try:
 
             # ---------------------------------------------------------
-            # Init structure to hold the landmarks for this frame.
+            # Grab video specific metadata. This will be used if the
+            # user has specified for a pose overlay output.
             # ---------------------------------------------------------
-            frame_landmarks: Dict[ str, Dict[ str, Any ] ] = {}
+            width, height = decoder.output_size()
+            fps           = decoder.fps
+            self.fps = fps
+            if self.stream is not None:
+                self.stream.fps = fps
 
             # ---------------------------------------------------------
-            # Map each MediaPipe landmark to an x, y coordinate and a
-            # validity flag
+            # Seek to the start of the requested range, if any.
             # ---------------------------------------------------------
-            if frame_corrected.pose_landmarks:
-                for landmark_name, landmark_enum in self.mp_pose.PoseLandmark.__members__.items():
-                    landmark = frame_corrected.pose_landmarks.landmark[ landmark_enum ]
-                    frame_landmarks[ landmark_name ] = {
-                        "x": float( landmark.x ),
-                        "y": float( landmark.y ),
-                        "valid": landmark.visibility > 0.6,
-                    }
-                
+            end_idx = None
+            if self.frame_range is not None:
+                decoder.seek( self.frame_range[ 0 ] )
+                end_idx = self.frame_range[ 1 ]
+        
             # ---------------------------------------------------------
-            # If no landmarks are detected, mark all as invalid for
-            # this frame.
+            # TODO (video-preprocessing):
+            # Phone videos often store portrait footage as rotated
+            # landscape buffers.
+            # 
+            # OpenCV ignores rotation metadata.
             # ---------------------------------------------------------
-            else:
-                for landmark_name in self.mp_pose.PoseLandmark.__members__:
-                    frame_landmarks[ landmark_name ] = { "x": None, "y": None, "valid": False }
+            rotate = True
+            out_width, out_height = ( height, width ) if rotate else ( width, height )
+            if self.key_frames is not None:
+                self.key_frames.rotate = rotate
 
             # ---------------------------------------------------------
-            # Append any pose data and move on to the next frame.
+            # Initialize overlay video writer if debug visualization is
+            # enabled.
             # ---------------------------------------------------------
-            frames.append( { "frame_index": frame_idx, "landmarks": frame_landmarks } )
-            frame_idx += 1
+            if self.overlay and self.output_vid_path:
+                writer_path = self.output_vid_path
+                writer      = self._open_writer( writer_path, fps, ( out_width, out_height ) )
 
             # ---------------------------------------------------------
-            # Optional: Overlay Pose Estimation on the input video.
+            # Process each from in the video. On the shared inference
+            # server a few frames are kept in flight and their results
+            # are consumed in order.
             # ---------------------------------------------------------
-            if self.overlay and writer:
-                overlaid = frame.copy()
+            in_flight: Deque[ Tuple[ int, Any, Any, Future ] ] = collections.deque()
+            clip_starts = [ start for start, _ in self.clip_ranges ]
+            clip_idx    = -1
+            stride_from = self.frame_range[ 0 ] if self.frame_range is not None else 0
+            for frame_idx, rgb in decoder:
+                if end_idx is not None and frame_idx >= end_idx:
+                    break
 
                 # -----------------------------------------------------
-                # Draw the landmarks on the new 'overlaid' frame.
+                # With clip ranges, frames between clips are only
+                # decoded. Entering a clip finishes the previous clip's
+                # overlay, opens its own and re-detects the person.
                 # -----------------------------------------------------
-                if frame_corrected.pose_landmarks:
-                    self.mp_drawing.draw_landmarks(
-                        image=overlaid,
-                        landmark_list=frame_corrected.pose_landmarks,
-                        connections=list( self.mp_pose.POSE_CONNECTIONS )
-                    )
-                
+                if self.clip_ranges:
+                    clip = bisect.bisect_right( clip_starts, frame_idx ) - 1
+                    if clip < 0 or frame_idx >= self.clip_ranges[ clip ][ 1 ]:
+                        continue
+                    if clip != clip_idx:
+                        if writer:
+                            self._finish_writer( writer, writer_path )
+                        writer_path = self.clip_vid_paths[ clip ]
+                        writer      = self._open_writer( writer_path, fps, ( out_width, out_height ) ) if self.overlay else None
+                        clip_idx    = clip
+                        stride_from = self.clip_ranges[ clip ][ 0 ]
+                        self.tracker.redetect()
+
                 # -----------------------------------------------------
-                # TODO: Calculate whether the frames orientation needs
-                # to be adjusted before writing.
+                # The overlay is drawn and written in OpenCV's BGR
+                # order.
                 # -----------------------------------------------------
-                if rotate:
-                    overlaid = cv2.rotate( overlaid, cv2.ROTATE_90_CLOCKWISE )
-                
+                frame = cv2.cvtColor( src=rgb, code=cv2.COLOR_RGB2BGR ) if writer else None
+
+                # -----------------------------------------------------
+                # Frames between strides skip inference. On the
+                # inference server they still queue up in order behind
+                # the frames in flight.
+                # -----------------------------------------------------
+                skipped = ( frame_idx - stride_from ) % self.stride != 0
+
+                if self.clip_session is not None:
+                    if skipped:
+                        future = Future()
+                        future.set_result( NO_POSE )
+                    else:
+                        future = self.inference_server.submit( self.clip_session, frame_idx, rgb )
+                    in_flight.append( ( frame_idx, rgb, frame, future ) )
+                    if len( in_flight ) >= PIPELINE_DEPTH:
+                        done_idx, done_rgb, done_frame, future = in_flight.popleft()
+                        self._record_frame( frames, done_idx, done_rgb, done_frame, future.result(), writer, rotate )
+                elif skipped:
+                    self._record_frame( frames, frame_idx, rgb, frame, NO_POSE, writer, rotate )
+                elif chunk_track is not None:
+                    results = _track_results( chunk_track, chunk_rows.get( frame_idx ) )
+                    self._record_frame( frames, frame_idx, rgb, frame, results, writer, rotate )
+                else:
+                    frame_corrected: Any = self.tracker.process( image=rgb )
+                    self._record_frame( frames, frame_idx, rgb, frame, frame_corrected, writer, rotate )
+
                 # -----------------------------------------------------
-                # Write the adjusted, overlayed frames to output.
+                # Nothing after the follow-through changes the
+                # analysis.
                 # -----------------------------------------------------
-                writer.write( overlaid )
+                if self.stream is not None and self.stream.should_stop:
+                    break
+
+            # ---------------------------------------------------------
+            # Drain the frames still in flight.
+            # ---------------------------------------------------------
+            while in_flight:
+                done_idx, done_rgb, done_frame, future = in_flight.popleft()
+                self._record_frame( frames, done_idx, done_rgb, done_frame, future.result(), writer, rotate )
+
+            # ---------------------------------------------------------
+            # Every frame has been processed, so the streamed metrics
+            # are final; let the caller act on them before the overlay
+            # video is finalized.
+            # ---------------------------------------------------------
+            if self.stream is not None:
+                self.stream.finish()
+
+            # ---------------------------------------------------------
+            # Finalize the overlay video.
+            # ---------------------------------------------------------
+            if writer:
+                self._finish_writer( writer, writer_path )
+                writer = None
+
+        # -------------------------------------------------------------
+        # On failure, release the writer and drop the partial overlay.
+        # The decoder is closed either way.
+        # -------------------------------------------------------------
+        except BaseException:
+            if writer:
+                writer.release()
+                if os.path.isfile( writer_path ):
+                    os.remove( writer_path )
+            raise
+        finally:
+            decoder.close()
+
+        return self._fill_gaps( PoseTrack.from_pose_data( frames, fps=self.fps ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _estimate_chunks
+    #
+    #   DESCRIPTION:
+    #       Estimate the whole range on the chunk workers and return the
+    #       stitched raw track. An open-ended range is bounded by the
+    #       video's frame count, read without holding a decoder open
+    #       while the chunks run.
+    #
+    # -----------------------------------------------------------------
+    def _estimate_chunks( self ) -> PoseTrack:
+        start_idx, stop_idx = self.frame_range if self.frame_range is not None else ( 0, None )
+        if stop_idx is None:
+            with open_decoder( self.input_vid_path ) as decoder:
+                stop_idx = decoder.frame_count or None
+
+        chunk_track, self.inference_stats = estimate_chunked(
+            self.input_vid_path,
+            start_idx,
+            stop_idx,
+            self.chunks,
+            model_complexity=MODEL_TIERS[ self.model_tier ],
+            redetect_interval=self.redetect_interval,
+            width=self.inference_width
+        )
+        return chunk_track
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _fill_gaps
+    #
+    #   DESCRIPTION:
+    #       Keep the raw track, fill dropped / low-visibility landmarks
+    #       across the whole track, optionally smooth it, and return the
+    #       frame structure containing the modeled pose data.
+    #
+    # -----------------------------------------------------------------
+    def _fill_gaps( self, raw_track: PoseTrack ) -> List[ Dict[ str, Any ] ]:
+        self.raw_track  = raw_track
+        self.pose_track = PoseInterpolation(
+            raw_track,
+            method=self.interpolation,
+            smoothing=self.smoothing
+        ).pose_track
+        return self.pose_track.to_pose_data()
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _open_writer
+    #
+    #   DESCRIPTION:
+    #       Open an overlay video writer.
+    #
+    #       NOTE: We must force the MSMY API for H264 encoding. This
+    #       allows for embedded browser streaming.
+    #
+    # -----------------------------------------------------------------
+    def _open_writer( self, path: str, fps: float, frame_size: Tuple[ int, int ] ) -> Any:
+        fourcc = cv2.VideoWriter.fourcc( *"H264" )
+        return cv2.VideoWriter(
+            filename=path,
+            apiPreference=cv2.CAP_MSMF,
+            fourcc=fourcc,
+            fps=fps,
+            frameSize=frame_size
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _finish_writer
+    #
+    #   DESCRIPTION:
+    #       Release an overlay video writer, move the MP4 index in front
+    #       of the media so the browser can start playback before the
+    #       download completes, then hand the finished overlay to the
+    #       artifact store. If the rewrite fails the overlay is kept as
+    #       written.
+    #
+    # -----------------------------------------------------------------
+    def _finish_writer( self, writer: Any, path: str ) -> None:
+        writer.release()
+        if os.path.isfile( path ):
+            try:
+                make_faststart( path )
+            except OSError:
+                pass
+        self.artifact_store.register( path, kind="pose_overlay" )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _record_frame
+    #
+    #   DESCRIPTION:
+    #       Append one frame's landmarks to the pose data and, if
+    #       enabled, write its overlay frame and offer it as a key
+    #       frame candidate.
+    #
+    # -----------------------------------------------------------------
+    def _record_frame(
+        self,
+        frames: List[ Dict[ str, Any ] ],
+        frame_idx: int,
+        rgb: Any,
+        frame: Any,
+        frame_corrected: Any,
+        writer: Any,
+        rotate: bool
+    ) -> None:
 
         # -------------------------------------------------------------
-        # Release the video and videowriter resources.
+        # Map each MediaPipe landmark to an x, y coordinate and a
+        # validity flag.
         # -------------------------------------------------------------
-        cap.release()
-        if writer:
-            writer.release()
+        frame_landmarks = landmarks_from_results( frame_corrected.pose_landmarks )
 
         # -------------------------------------------------------------
-        # ...
+        # Append any pose data and move on to the next frame.
         # -------------------------------------------------------------
-            ### Interpolate Missing Pose Data Here ###
+        frames.append( { "frame_index": frame_idx, "landmarks": frame_landmarks } )
+        if self.key_frames is not None:
+            self.key_frames.observe( frame_idx, rgb, frame_landmarks )
+        if self.stream is not None:
+            self.stream.push( frame_idx, frame_landmarks )
 
         # -------------------------------------------------------------
-        # Return the frame structure containing the modeled pose data.
+        # Optional: Overlay Pose Estimation on the input video.
         # -------------------------------------------------------------
-        return frames
+        if self.overlay and writer:
+            overlaid = frame.copy()
+
+            # ---------------------------------------------------------
+            # Draw the landmarks on the new 'overlaid' frame.
+            # ---------------------------------------------------------
+            if frame_corrected.pose_landmarks:
+                self.mp_drawing.draw_landmarks(
+                    image=overlaid,
+                    landmark_list=frame_corrected.pose_landmarks,
+                    connections=list( self.mp_pose.POSE_CONNECTIONS )
+                )
+            
+            # ---------------------------------------------------------
+            # TODO: Calculate whether the frames orientation needs
+            # to be adjusted before writing.
+            # ---------------------------------------------------------
+            if rotate:
+                overlaid = cv2.rotate( overlaid, cv2.ROTATE_90_CLOCKWISE )
+            
+            # ---------------------------------------------------------
+            # Write the adjusted, overlayed frames to output.
+            # ---------------------------------------------------------
+            writer.write( overlaid )
 
 # -----------------------------------------------------------------------------
 #                                 EXECUTION 
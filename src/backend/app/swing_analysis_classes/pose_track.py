@@ -0,0 +1,176 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import math
+import numpy        as np
+import numpy.typing as npt
+
+from   typing       import Any, Dict, List, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# MediaPipe Pose landmark names, in landmark index order. Kept here so
+# consumers of stored tracks don't need to import MediaPipe.
+# ---------------------------------------------------------------------
+LANDMARK_NAMES = (
+    "NOSE", "LEFT_EYE_INNER", "LEFT_EYE", "LEFT_EYE_OUTER", "RIGHT_EYE_INNER",
+    "RIGHT_EYE", "RIGHT_EYE_OUTER", "LEFT_EAR", "RIGHT_EAR", "MOUTH_LEFT",
+    "MOUTH_RIGHT", "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_ELBOW", "RIGHT_ELBOW",
+    "LEFT_WRIST", "RIGHT_WRIST", "LEFT_PINKY", "RIGHT_PINKY", "LEFT_INDEX",
+    "RIGHT_INDEX", "LEFT_THUMB", "RIGHT_THUMB", "LEFT_HIP", "RIGHT_HIP",
+    "LEFT_KNEE", "RIGHT_KNEE", "LEFT_ANKLE", "RIGHT_ANKLE", "LEFT_HEEL",
+    "RIGHT_HEEL", "LEFT_FOOT_INDEX", "RIGHT_FOOT_INDEX",
+)
+LANDMARK_INDEX = { name: idx for idx, name in enumerate( LANDMARK_NAMES ) }
+
+# ---------------------------------------------------------------------
+# A landmark is considered valid when its MediaPipe visibility score is
+# above this threshold.
+# ---------------------------------------------------------------------
+VISIBILITY_THRESHOLD = 0.6
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PoseTrack
+#
+#   DESCRIPTION:
+#       Array representation of the pose data for one clip. Landmark
+#       coordinates are held as a ( frames, landmarks, 2 ) float32 array
+#       with NaN for missing values, alongside per-landmark visibility
+#       scores and the source video frame index of every row. Tracks
+#       produced by PoseInterpolation also carry a mask of landmarks
+#       that were filled in rather than observed.
+#
+#       This is the form pose data is persisted and bulk-processed in;
+#       to_pose_data() converts back to the per-frame dictionaries used
+#       by Segmentation and MetricsCalculator.
+#
+# ---------------------------------------------------------------------
+class PoseTrack:
+
+    def __init__(
+        self,
+        xy: npt.NDArray[ np.float32 ],
+        visibility: npt.NDArray[ np.float32 ],
+        fps: float,
+        frame_indices: Optional[ npt.NDArray[ np.int32 ] ] = None,
+        interpolated: Optional[ npt.NDArray[ np.bool_ ] ] = None
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Arrays are used as given (no copy) so memory-mapped tracks
+        # stay zero-copy.
+        # -------------------------------------------------------------
+        self.xy            = xy
+        self.visibility    = visibility
+        self.fps           = float( fps )
+        self.frame_indices = frame_indices if frame_indices is not None else np.arange( len( xy ), dtype=np.int32 )
+        self.interpolated  = interpolated if interpolated is not None else np.zeros( visibility.shape, dtype=bool )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: n_frames
+    #
+    #   DESCRIPTION:
+    #       Number of frames (rows) in the track.
+    #
+    # -----------------------------------------------------------------
+    @property
+    def n_frames( self ) -> int:
+        return int( self.xy.shape[ 0 ] )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: valid
+    #
+    #   DESCRIPTION:
+    #       ( frames, landmarks ) boolean mask of usable landmarks:
+    #       either observed with enough visibility, or interpolated.
+    #
+    # -----------------------------------------------------------------
+    @property
+    def valid( self ) -> npt.NDArray[ np.bool_ ]:
+        observed = self.visibility > VISIBILITY_THRESHOLD
+        return ( observed | self.interpolated ) & ~np.isnan( self.xy ).any( axis=-1 )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: from_pose_data
+    #
+    #   DESCRIPTION:
+    #       Build a track from the per-frame landmark dictionaries
+    #       produced by PoseEstimation.
+    #
+    # -----------------------------------------------------------------
+    @classmethod
+    def from_pose_data( cls, pose_data: List[ Dict[ str, Any ] ], fps: float ) -> "PoseTrack":
+        n_frames   = len( pose_data )
+        xy         = np.full( ( n_frames, len( LANDMARK_NAMES ), 2 ), np.nan, dtype=np.float32 )
+        visibility = np.zeros( ( n_frames, len( LANDMARK_NAMES ) ), dtype=np.float32 )
+        indices    = np.empty( n_frames, dtype=np.int32 )
+
+        for row, frame in enumerate( pose_data ):
+            indices[ row ] = frame[ "frame_index" ]
+            for name, landmark in frame[ "landmarks" ].items():
+                if landmark[ "x" ] is None:
+                    continue
+                col = LANDMARK_INDEX[ name ]
+                xy[ row, col ]         = ( landmark[ "x" ], landmark[ "y" ] )
+                visibility[ row, col ] = landmark.get( "visibility", 1.0 if landmark[ "valid" ] else 0.0 )
+
+        return cls( xy=xy, visibility=visibility, fps=fps, frame_indices=indices )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: to_pose_data
+    #
+    #   DESCRIPTION:
+    #       Convert back to the per-frame landmark dictionaries consumed
+    #       by Segmentation and MetricsCalculator.
+    #
+    # -----------------------------------------------------------------
+    def to_pose_data( self ) -> List[ Dict[ str, Any ] ]:
+        xy           = np.asarray( self.xy ).tolist()
+        visibility   = np.asarray( self.visibility ).tolist()
+        valid        = self.valid.tolist()
+        interpolated = np.asarray( self.interpolated ).tolist()
+
+        frames = []
+        for row in range( self.n_frames ):
+            landmarks = {}
+            for col, name in enumerate( LANDMARK_NAMES ):
+                x, y = xy[ row ][ col ]
+                landmarks[ name ] = {
+                    "x": None if math.isnan( x ) else x,
+                    "y": None if math.isnan( y ) else y,
+                    "valid": valid[ row ][ col ],
+                    "visibility": visibility[ row ][ col ],
+                    "interpolated": interpolated[ row ][ col ],
+                }
+            frames.append( { "frame_index": int( self.frame_indices[ row ] ), "landmarks": landmarks } )
+        return frames
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
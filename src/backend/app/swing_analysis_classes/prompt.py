@@ -4,9 +4,11 @@
 #                                  IMPORTS 
 # -----------------------------------------------------------------------------
 
+import math
+import os
 import textwrap
 
-from   typing import Any, Dict
+from   typing import Any, Dict, Optional
 from   enum   import Enum
 
 # -----------------------------------------------------------------------------
@@ -56,6 +58,93 @@ TASKS = \
                      { DELIMITER }
                      """ )
 
+# -----------------------------------------------------------------------------
+# Per-swing sections of the full prompt. Dedented once here; each request only
+# fills in the placeholders.
+# -----------------------------------------------------------------------------
+SITUATION_TEMPLATE = \
+    textwrap.dedent( """\
+                     Situation
+                     The golfer is at an {experience_level} experience level.
+                     The swing video was recorded from a {camera_angle} camera angle.
+                     {delimiter}
+                     """ )
+
+METADATA_TEMPLATE = \
+    textwrap.dedent( """\
+                     Metadata
+                     {metadata}
+                     {delimiter}
+                     """ )
+
+METRICS_TEMPLATE = \
+    textwrap.dedent( """\
+                     Pose Metrics
+                     - Shoulder rotation backswing : {shoulder_rotation_range_deg_backswing:.2f}°
+                     - Shoulder rotation range     : {shoulder_rotation_range_deg:.2f}°
+                     - Hip rotation backswing      : {hip_rotation_range_deg_backswing:.2f}°
+                     - Hip rotation range          : {hip_rotation_range_deg:.2f}°
+                     - Spine tilt (mean)           : {spine_tilt_mean_deg:.2f}°
+                     - Spine tilt (range)          : {spine_tilt_range_deg:.2f}°
+                     - Head movement (X)           : {head_movement_x:.2f}% (lateral)
+                     - Head movement (Y)           : {head_movement_y:.2f}% (vertical)
+                     {delimiter}
+                     """ )
+
+# -----------------------------------------------------------------------------
+# Compact mode. Metrics are sent as "key=value" pairs under short keys. The
+# static instructions, with a one-line legend, are sent as the model's system
+# instruction instead of as part of every prompt.
+# -----------------------------------------------------------------------------
+COMPACT_METRIC_KEYS = {
+    "shoulder_rotation_range_deg_backswing": "shoulder_bs_deg",
+    "shoulder_rotation_range_deg": "shoulder_range_deg",
+    "hip_rotation_range_deg_backswing": "hip_bs_deg",
+    "hip_rotation_range_deg": "hip_range_deg",
+    "spine_tilt_mean_deg": "spine_tilt_mean_deg",
+    "spine_tilt_range_deg": "spine_tilt_range_deg",
+    "head_movement_x": "head_x_pct",
+    "head_movement_y": "head_y_pct",
+}
+
+METRICS_LEGEND = \
+    textwrap.dedent( f"""\
+                     Input
+                     Each request gives the golfer's level, the camera angle, the outcome (swing metadata) and pose metrics as key=value (bs = backswing rotation; head_x / head_y = lateral / vertical head movement).
+                     { DELIMITER }
+                     """ )
+
+SYSTEM_INSTRUCTION = f"{ CONTEXT }\n{ METRICS_LEGEND }\n{ TASKS }"
+
+# -----------------------------------------------------------------------------
+# Deployment default for compact mode.
+# -----------------------------------------------------------------------------
+COMPACT_PROMPTS = os.environ.get( "SWING_COMPACT_PROMPT", "1" ) == "1"
+
+# -----------------------------------------------------------------------------
+# Rough characters-per-token ratio for English prose, used for token estimates
+# without calling a tokenizer.
+# -----------------------------------------------------------------------------
+CHARS_PER_TOKEN = 4.0
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: estimate_tokens
+#
+#   DESCRIPTION:
+#       Estimate the number of input tokens for a piece of text.
+#
+# ---------------------------------------------------------------------
+def estimate_tokens( text: str ) -> int:
+    return math.ceil( len( text ) / CHARS_PER_TOKEN )
+
+
+SYSTEM_INSTRUCTION_TOKENS = estimate_tokens( SYSTEM_INSTRUCTION )
+
 # -----------------------------------------------------------------------------
 #                                   CLASSES
 # -----------------------------------------------------------------------------
@@ -70,10 +159,22 @@ TASKS = \
 #       experience level, and metadata. This prompt is then used to 
 #       generate the swing analysis via the Gemini API service.
 #
+#       In compact mode the static instructions are exposed separately
+#       as 'system_instruction' (send it as the model's system
+#       instruction) and 'prompt' holds only the per-swing data, with
+#       the metrics serialized densely.
+#
 # ---------------------------------------------------------------------
 class PromptBuilder:
 
-    def __init__( self, camera_angle: str, experience_level: str, metadata: str, metrics: Dict[ str, Any ] ) -> None:
+    def __init__(
+        self,
+        camera_angle: str,
+        experience_level: str,
+        metadata: str,
+        metrics: Dict[ str, Any ],
+        compact: bool = COMPACT_PROMPTS
+    ) -> None:
         
         # -------------------------------------------------------------
         # Initialize the metrics, experience level, and camera angle
@@ -83,11 +184,18 @@ class PromptBuilder:
         self.experience_level = experience_level
         self.camera_angle     = camera_angle
         self.metadata         = metadata
+        self.compact          = compact
 
         # -------------------------------------------------------------
-        # Build and store the prompt.
+        # Build and store the prompt, the system instruction to send
+        # with it (compact mode only), and the estimated input tokens:
+        # for the per-swing prompt alone, and in total.
         # -------------------------------------------------------------
-        self.prompt = self._build_prompt()
+        self.system_instruction: Optional[ str ] = SYSTEM_INSTRUCTION if compact else None
+        self.prompt = self._build_compact_prompt() if compact else self._build_prompt()
+
+        self.prompt_tokens    = estimate_tokens( self.prompt )
+        self.estimated_tokens = self.prompt_tokens + ( SYSTEM_INSTRUCTION_TOKENS if compact else 0 )
 
 
     # -----------------------------------------------------------------
@@ -103,13 +211,29 @@ class PromptBuilder:
     #
     # -----------------------------------------------------------------
     def _build_prompt( self ) -> str:
-        return textwrap.dedent( f"""
+        return f"""
 { CONTEXT }
 { self._build_situation() }
 { self._build_metadata() }
 { self._build_metrics() }
 { TASKS }
-""" )
+"""
+
+
+    # -----------------------------------------------------------------
+    #
+    #   METHOD NAME: _build_compact_prompt
+    #
+    #   DESCRIPTION:
+    #       Per-swing data only, one short line per field. The field
+    #       names and metric keys are explained in SYSTEM_INSTRUCTION.
+    #
+    # -----------------------------------------------------------------
+    def _build_compact_prompt( self ) -> str:
+        metrics = ",".join(
+            f"{ key }={ self.metrics[ name ]:.1f}" for name, key in COMPACT_METRIC_KEYS.items()
+        )
+        return f"level={ self.experience_level }\nangle={ self.camera_angle }\noutcome={ self.metadata }\nmetrics={ metrics }\n"
 
 
     # -----------------------------------------------------------------
@@ -123,12 +247,11 @@ class PromptBuilder:
     #
     # -----------------------------------------------------------------
     def _build_situation( self ) -> str:
-        return textwrap.dedent( f"""\
-                                Situation
-                                The golfer is at an { self.experience_level } experience level.
-                                The swing video was recorded from a { self.camera_angle } camera angle.
-                                { DELIMITER }
-                                """ )
+        return SITUATION_TEMPLATE.format(
+            experience_level=self.experience_level,
+            camera_angle=self.camera_angle,
+            delimiter=DELIMITER
+        )
 
 
     # -----------------------------------------------------------------
@@ -143,11 +266,7 @@ class PromptBuilder:
     #
     # -----------------------------------------------------------------
     def _build_metadata( self ) -> str:
-        return textwrap.dedent( f"""\
-                                Metadata
-                                { self.metadata }
-                                { DELIMITER }
-                                """ )
+        return METADATA_TEMPLATE.format( metadata=self.metadata, delimiter=DELIMITER )
 
 
     # -----------------------------------------------------------------
@@ -160,23 +279,8 @@ class PromptBuilder:
     #
     # -----------------------------------------------------------------
     def _build_metrics( self ) -> str:
-        return textwrap.dedent( f"""\
-                                Pose Metrics
-                                - Shoulder rotation backswing : { self.metrics[ "shoulder_rotation_range_deg_backswing" ]:.2f}°
-                                - Shoulder rotation range     : { self.metrics[ "shoulder_rotation_range_deg" ]:.2f}°
-                                - Hip rotation backswing      : { self.metrics[ "hip_rotation_range_deg_backswing" ]:.2f}°
-                                - Hip rotation range          : { self.metrics[ "hip_rotation_range_deg" ]:.2f}°
-                                - Spine tilt (mean)           : { self.metrics[ "spine_tilt_mean_deg" ]:.2f}°
-                                - Spine tilt (range)          : { self.metrics[ "spine_tilt_range_deg" ]:.2f}°
-                                - Head movement (X)           : { self.metrics[ "head_movement_x" ]:.2f}% (lateral)
-                                - Head movement (Y)           : { self.metrics[ "head_movement_y" ]:.2f}% (vertical)
-                                { DELIMITER }
-                                """ )
-
+        return METRICS_TEMPLATE.format( delimiter=DELIMITER, **self.metrics )
 
-# -----------------------------------------------------------------------------
-#                                 PROCEDURES
-# -----------------------------------------------------------------------------
 
 # -----------------------------------------------------------------------------
 #                                  EXECUTION 
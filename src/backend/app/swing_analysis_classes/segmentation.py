@@ -7,12 +7,21 @@
 import numpy        as np
 import numpy.typing as npt
 
-from   typing       import Any, Dict, List
+from   typing       import Any, Dict, List, Optional, Tuple
 
 # -----------------------------------------------------------------------------
 #                                 CONSTANTS
 # -----------------------------------------------------------------------------
 
+# ---------------------------------------------------------------------
+# Default movement thresholding used to find the address position. A
+# frame is "stable" when the shoulder/hip pose vector moves less than
+# MOVEMENT_THRESHOLD from the previous frame, and address is the start
+# of the first STABILITY_WINDOW consecutive stable frames.
+# ---------------------------------------------------------------------
+MOVEMENT_THRESHOLD = 0.003
+STABILITY_WINDOW   = 3
+
 # -----------------------------------------------------------------------------
 #                                 PROCEDURES
 # -----------------------------------------------------------------------------
@@ -32,22 +41,54 @@ from   typing       import Any, Dict, List
 # ---------------------------------------------------------------------
 class Segmentation:
     
-    def __init__( self, pose_data: List[ Dict[ str, Any ] ] ) -> None:
+    def __init__(
+        self,
+        pose_data: List[ Dict[ str, Any ] ],
+        movement_threshold: float = MOVEMENT_THRESHOLD,
+        stability_window: int = STABILITY_WINDOW,
+        key_frames: Optional[ Tuple[ int, int, int ] ] = None
+    ) -> None:
 
         # -------------------------------------------------------------
         # Initialize the pose data with the frame data outputted by
         # pose_estimation.py.
         # -------------------------------------------------------------        
         self.pose_data = pose_data
+
+        # -------------------------------------------------------------
+        # Movement thresholding used for address detection. Overridable
+        # so stored swings can be re-segmented with tuned values.
+        # -------------------------------------------------------------
+        self.movement_threshold = movement_threshold
+        self.stability_window   = stability_window
         
         # -------------------------------------------------------------
         # Initialize the frame indices for key swing segements.
         # Specifically, we are tracking address, top of the backswing,
         # and impact frames.
+        #
+        # Callers that already know them (e.g. synchronized from
+        # another camera angle of the same swing) can pass the
+        # ( address, backswing, impact ) positions in instead.
+        # -------------------------------------------------------------
+        if key_frames is not None:
+            self.address_frame, self.backswing_frame, self.impact_frame = key_frames
+        else:
+            self.address_frame   = self._detect_address_frame()
+            self.backswing_frame = self._detect_backswing_frame()
+            self.impact_frame    = self._detect_impact_frame()
+
         # -------------------------------------------------------------
-        self.address_frame   = self._detect_address_frame()
-        self.backswing_frame = self._detect_backswing_frame()
-        self.impact_frame    = self._detect_impact_frame()
+        # The indices above are positions in pose_data. The pose data
+        # may cover only part of the clip (e.g. the detected swing
+        # window), so also report each key frame as an index into the
+        # source video.
+        # -------------------------------------------------------------
+        self.video_frames = {
+            "address": self._video_frame( self.address_frame ),
+            "backswing": self._video_frame( self.backswing_frame ),
+            "impact": self._video_frame( self.impact_frame ),
+        }
 
     # -----------------------------------------------------------------
     #                        PRIVATE METHODS
@@ -70,12 +111,6 @@ class Segmentation:
     # -----------------------------------------------------------------
     def _detect_address_frame( self ) -> int:
 
-        # -------------------------------------------------------------
-        # Define local constants related to movement thresholding.
-        # -------------------------------------------------------------
-        MOVEMENT_THRESHOLD = 0.003
-        STABILITY_WINDOW   = 3
-
         # -------------------------------------------------------------
         # Initialize return index.
         # -------------------------------------------------------------
@@ -138,7 +173,7 @@ class Segmentation:
             # Calculate movement only if both current and previous pose
             # vectors are valid.
             # ---------------------------------------------------------
-            if pose_vectors[ i ] is None or pose_vectors[ i - 1 ] is None:
+            if pose_vectors[ i ].size == 0 or pose_vectors[ i - 1 ].size == 0:
                 movements.append( None )
                 continue
             
@@ -155,7 +190,7 @@ class Segmentation:
             # If there was movement and it is below the threshold,
             # increment.
             # ---------------------------------------------------------
-            if movement is not None and movement < MOVEMENT_THRESHOLD:
+            if movement is not None and movement < self.movement_threshold:
                 stable_frame_count += 1
             else:
                 stable_frame_count = 0
@@ -164,8 +199,8 @@ class Segmentation:
             # If we have a window of consequtive stable frames, mark
             # the index and set the address frame.
             # ---------------------------------------------------------
-            if stable_frame_count >= STABILITY_WINDOW:
-                address_frame_idx = i - ( STABILITY_WINDOW - 1 )
+            if stable_frame_count >= self.stability_window:
+                address_frame_idx = i - ( self.stability_window - 1 )
                 break
 
         # -------------------------------------------------------------
@@ -282,6 +317,12 @@ class Segmentation:
             # ---------------------------------------------------------
             for key in [ "LEFT_WRIST", "RIGHT_WRIST" ]:
                 # -----------------------------------------------------
+                # Frames without a usable wrist position can't be
+                # compared; NaN keeps them out of the search below.
+                # -----------------------------------------------------
+                if not landmark[ key ][ "valid" ]:
+                    return np.float64( np.nan )
+                # -----------------------------------------------------
                 # calculate the landmark's vector norm and add to the
                 # positions list.
                 # -----------------------------------------------------
@@ -324,12 +365,27 @@ class Segmentation:
         # If no valid frames are found, set impact frame to the address
         # frame. (Best effort)
         # -------------------------------------------------------------
-        if impact_frame_idx is None:
+        if impact_frame_idx == -1:
             impact_frame_idx = self.address_frame
 
         return impact_frame_idx
 
 
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _video_frame
+    #
+    #   DESCRIPTION:
+    #       Map a position in pose_data to its source video frame index.
+    #       Missing key frames (-1) stay -1.
+    #
+    # -----------------------------------------------------------------
+    def _video_frame( self, idx: int ) -> int:
+        if idx < 0 or idx >= len( self.pose_data ):
+            return -1
+        return int( self.pose_data[ idx ].get( "frame_index", idx ) )
+
+
 # -----------------------------------------------------------------------------
 #                                 EXECUTION 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,334 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import multiprocessing
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+import threading
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   concurrent.futures                     import ProcessPoolExecutor
+from   lib                                    import hash_file
+from   services.artifact_store                import get_artifact_store
+from   services.pose_track_store              import PoseTrackStore
+from   services.swing_history                 import HISTORY_ENABLED, get_swing_history
+from   swing_analysis_classes.interpolation   import PoseInterpolation
+from   swing_analysis_classes.metrics         import MetricsCalculator, finite_metrics
+from   swing_analysis_classes.model_tier      import analysis_slot, choose_model_tier
+from   swing_analysis_classes.pose_estimation import PoseEstimation
+from   swing_analysis_classes.pose_track      import LANDMARK_INDEX, PoseTrack
+from   swing_analysis_classes.segmentation    import Segmentation
+from   video.swing_window                     import MAX_SESSION_SWINGS, find_swing_windows
+from   typing                                 import Any, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Worker processes that segment and score the swings of a session in
+# parallel (1 scores them in the calling thread).
+# ---------------------------------------------------------------------
+SESSION_WORKERS = int( os.environ.get( "SWING_SESSION_WORKERS", os.cpu_count() or 1 ) )
+
+# ---------------------------------------------------------------------
+# Wrist height check that tells a swing from other motion (walking,
+# teeing up, raking a ball over). Wrist height is measured above the
+# hips in torso lengths: about 0 at address, above 1 at the top of a
+# full swing. A motion burst is only kept as a swing if the wrists
+# reach HANDS_HIGH for at least HANDS_HIGH_FRAMES frames.
+# ---------------------------------------------------------------------
+HANDS_HIGH        = 0.75
+HANDS_HIGH_FRAMES = 2
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: wrist_height
+#
+#   DESCRIPTION:
+#       Per-frame height of the hands (mean of both wrists) above the
+#       mid-hip, in torso lengths (median shoulder to hip distance over
+#       the track). NaN where the wrists or hips are missing.
+#
+# ---------------------------------------------------------------------
+def wrist_height( track: PoseTrack ) -> npt.NDArray[ np.float64 ]:
+    xy        = np.asarray( track.xy, dtype=np.float64 )
+    wrists    = xy[ :, [ LANDMARK_INDEX[ "LEFT_WRIST" ], LANDMARK_INDEX[ "RIGHT_WRIST" ] ] ].mean( axis=1 )
+    hips      = xy[ :, [ LANDMARK_INDEX[ "LEFT_HIP" ], LANDMARK_INDEX[ "RIGHT_HIP" ] ] ].mean( axis=1 )
+    shoulders = xy[ :, [ LANDMARK_INDEX[ "LEFT_SHOULDER" ], LANDMARK_INDEX[ "RIGHT_SHOULDER" ] ] ].mean( axis=1 )
+
+    torso_lengths = np.linalg.norm( shoulders - hips, axis=-1 )
+    torso_lengths = torso_lengths[ np.isfinite( torso_lengths ) ]
+    torso         = float( np.median( torso_lengths ) ) if len( torso_lengths ) else 0.0
+    if torso <= 1e-6:
+        return np.full( track.n_frames, np.nan )
+
+    # -----------------------------------------------------------------
+    # Image y grows downwards.
+    # -----------------------------------------------------------------
+    return ( hips[ :, 1 ] - wrists[ :, 1 ] ) / torso
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: clip_track
+#
+#   DESCRIPTION:
+#       Rows of a track whose source frame index is in [ start, end ).
+#
+# ---------------------------------------------------------------------
+def clip_track( track: PoseTrack, start: int, end: int ) -> PoseTrack:
+    rows = ( track.frame_indices >= start ) & ( track.frame_indices < end )
+    return PoseTrack(
+        xy=track.xy[ rows ],
+        visibility=track.visibility[ rows ],
+        fps=track.fps,
+        frame_indices=track.frame_indices[ rows ],
+        interpolated=track.interpolated[ rows ]
+    )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: score_swing
+#
+#   DESCRIPTION:
+#       Worker entry point: gap-fill one swing candidate's raw track,
+#       confirm it is a swing from the wrist height, then segment it
+#       and compute its metrics. Returns ( key frames as source video
+#       indices, metrics ), or None if the candidate isn't a swing.
+#
+# ---------------------------------------------------------------------
+def score_swing( raw_track: PoseTrack ) -> Optional[ Tuple[ Dict[ str, int ], Dict[ str, float ] ] ]:
+    if raw_track.n_frames == 0:
+        return None
+
+    track = PoseInterpolation( raw_track ).pose_track
+    with np.errstate( invalid="ignore" ):
+        hands_high = int( np.sum( wrist_height( track ) >= HANDS_HIGH ) )
+    if hands_high < HANDS_HIGH_FRAMES:
+        return None
+
+    pose_data = track.to_pose_data()
+    segments  = Segmentation( pose_data )
+    metrics   = MetricsCalculator( pose_data=pose_data, segments=segments ).metrics
+    return dict( segments.video_frames ), metrics
+
+
+_session_pool: Optional[ ProcessPoolExecutor ] = None
+_session_pool_lock = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_session_pool
+#
+#   DESCRIPTION:
+#       Return the process-wide swing scoring pool, starting it on
+#       first use. Workers are spawned (not forked) so they don't
+#       inherit the parent's MediaPipe threads.
+#
+# ---------------------------------------------------------------------
+def get_session_pool() -> ProcessPoolExecutor:
+    global _session_pool
+    with _session_pool_lock:
+        if _session_pool is None:
+            _session_pool = ProcessPoolExecutor(
+                max_workers=max( 1, SESSION_WORKERS ),
+                mp_context=multiprocessing.get_context( "spawn" )
+            )
+        return _session_pool
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: SessionAnalysis
+#
+#   DESCRIPTION:
+#       Analysis of a range session recording with any number of
+#       swings. Every swing is found with the motion energy pre-pass,
+#       the pose model runs over all of them in one decode of the
+#       source file (skipping the frames in between), and each burst
+#       whose wrists rise like a swing is segmented and scored on its
+#       own, in parallel. Each swing gets its metrics, key frames and
+#       overlay clip; no LLM analysis is requested.
+#
+# ---------------------------------------------------------------------
+class SessionAnalysis():
+
+    def __init__(
+        self,
+        video_path: str,
+        camera_angle: Optional[ str ] = None,
+        experience_level: Optional[ str ] = None,
+        model_tier: Optional[ str ] = None,
+        video_hash: Optional[ str ] = None,
+        golfer: Optional[ str ] = None,
+        club: Optional[ str ] = None,
+        max_swings: int = MAX_SESSION_SWINGS
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Path to the session video and the context recorded with each
+        # swing in the history.
+        # -------------------------------------------------------------
+        self.video_path       = video_path
+        self.camera_angle     = camera_angle
+        self.experience_level = experience_level
+        self.golfer           = golfer
+        self.club             = club
+        self.max_swings       = max_swings
+
+        # -------------------------------------------------------------
+        # Content hash of the input video. Each swing's pose track is
+        # stored under "<hash>_<first frame>".
+        # -------------------------------------------------------------
+        self.video_hash = video_hash or hash_file( self.video_path )
+
+        # -------------------------------------------------------------
+        # Pose model tier actually used, the number of motion bursts
+        # considered, and the per-swing results in time order.
+        # -------------------------------------------------------------
+        self.model_tier: Optional[ str ] = None
+        self.candidates = 0
+        self.swings: List[ Dict[ str, Any ] ] = []
+
+        # -------------------------------------------------------------
+        # Run the pipeline while counting towards the in-flight queue
+        # depth, like a single swing analysis.
+        # -------------------------------------------------------------
+        with analysis_slot():
+            self._process_session( requested_tier=model_tier )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: response
+    #
+    #   DESCRIPTION:
+    #       JSON-ready session result: one entry per swing with its
+    #       source frame window, key frames, metrics and overlay clip
+    #       URL.
+    #
+    # -----------------------------------------------------------------
+    def response( self ) -> Dict:
+        artifact_store = get_artifact_store()
+        return {
+            "model_tier": self.model_tier,
+            "candidates": self.candidates,
+            "swings": [
+                {
+                    "swing": number,
+                    "window": list( swing[ "window" ] ),
+                    "key_frames": swing[ "key_frames" ],
+                    "metrics": finite_metrics( swing[ "metrics" ] ),
+                    "pose_overlay": artifact_store.url_for( swing[ "overlay_path" ] ) if os.path.isfile( swing[ "overlay_path" ] ) else None,
+                    "swing_id": swing[ "swing_id" ]
+                }
+                for number, swing in enumerate( self.swings, start=1 )
+            ]
+        }
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _process_session
+    #
+    #   DESCRIPTION:
+    #       Run the session pipeline.
+    #
+    # -----------------------------------------------------------------
+    def _process_session( self, requested_tier: Optional[ str ] = None ) -> None:
+
+        # -------------------------------------------------------------
+        # Find every burst of motion worth running pose estimation on.
+        # -------------------------------------------------------------
+        windows         = find_swing_windows( self.video_path, max_swings=self.max_swings )
+        self.candidates = len( windows )
+        self.model_tier = choose_model_tier( requested_tier, n_frames=sum( end - start for start, end in windows ) )
+        if not windows:
+            return
+
+        # -------------------------------------------------------------
+        # One decode of the source for all candidates, with an overlay
+        # clip per candidate.
+        # -------------------------------------------------------------
+        pose_estimator = PoseEstimation(
+            vid_in=self.video_path,
+            overlay=True,
+            model_tier=self.model_tier,
+            clip_ranges=windows
+        )
+        tracks = [ clip_track( pose_estimator.raw_track, start, end ) for start, end in pose_estimator.clip_ranges ]
+
+        # -------------------------------------------------------------
+        # Confirm, segment and score the candidates in parallel.
+        # -------------------------------------------------------------
+        if SESSION_WORKERS > 1 and len( tracks ) > 1:
+            scores = list( get_session_pool().map( score_swing, tracks ) )
+        else:
+            scores = [ score_swing( track ) for track in tracks ]
+
+        # -------------------------------------------------------------
+        # Keep the swings; drop the overlay clips of everything else.
+        # Each swing's raw track is stored on its own so it can be
+        # re-scored or matched like a single swing upload.
+        # -------------------------------------------------------------
+        artifact_store = get_artifact_store()
+        track_store    = PoseTrackStore()
+        for window, track, overlay_path, score in zip( pose_estimator.clip_ranges, tracks, pose_estimator.clip_vid_paths, scores ):
+            if score is None:
+                artifact_store.discard( overlay_path )
+                continue
+
+            key_frames, metrics = score
+            track_key           = f"{ self.video_hash }_{ window[ 0 ] }"
+            track_store.save( track_key, track )
+
+            swing_id = None
+            if HISTORY_ENABLED:
+                swing_id = get_swing_history().record(
+                    metrics=metrics,
+                    key_frames=key_frames,
+                    golfer=self.golfer,
+                    club=self.club,
+                    camera_angle=self.camera_angle,
+                    experience_level=self.experience_level,
+                    model_tier=self.model_tier,
+                    video_hash=track_key
+                )
+
+            self.swings.append( {
+                "window": window,
+                "key_frames": key_frames,
+                "metrics": metrics,
+                "overlay_path": overlay_path,
+                "swing_id": swing_id
+            } )
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,189 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   multiprocessing.shared_memory     import SharedMemory
+from   swing_analysis_classes.pose_track import LANDMARK_NAMES, PoseTrack
+from   typing                            import Any, Dict, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Pass pose arrays between processes through shared memory instead of
+# pickling them.
+# ---------------------------------------------------------------------
+SHM_TRANSFER_ENABLED = os.environ.get( "SWING_SHM_TRANSFER", "1" ) != "0"
+
+# ---------------------------------------------------------------------
+# Array offsets inside a shared block are aligned to this many bytes.
+# ---------------------------------------------------------------------
+BLOCK_ALIGNMENT = 64
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _aligned
+#
+#   DESCRIPTION:
+#       Round a byte offset up to the block alignment.
+#
+# ---------------------------------------------------------------------
+def _aligned( offset: int ) -> int:
+    return -( -offset // BLOCK_ALIGNMENT ) * BLOCK_ALIGNMENT
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PoseBlock
+#
+#   DESCRIPTION:
+#       Preallocated pose arrays in shared memory: source frame index,
+#       landmark x / y and visibility for n_frames rows. Worker
+#       processes write their rows in place and report back only how
+#       many they wrote, so pose tracks never get pickled.
+#
+#       It is passed to workers as an argument, and the creating
+#       process owns the memory. Tracks returned by track() are views
+#       and must be copied (or dropped) before close().
+#
+# ---------------------------------------------------------------------
+class PoseBlock:
+
+    def __init__( self, n_frames: int, n_landmarks: int = len( LANDMARK_NAMES ) ) -> None:
+        self.n_frames    = n_frames
+        self.n_landmarks = n_landmarks
+        self._shm        = SharedMemory( create=True, size=max( 1, self._layout()[ -1 ] ) )
+        self.owner       = True
+        self._attach()
+
+    def __getstate__( self ) -> Dict[ str, Any ]:
+        return { "n_frames": self.n_frames, "n_landmarks": self.n_landmarks, "name": self._shm.name }
+
+    def __setstate__( self, state: Dict[ str, Any ] ) -> None:
+        self.n_frames    = state[ "n_frames" ]
+        self.n_landmarks = state[ "n_landmarks" ]
+        self._shm        = SharedMemory( name=state[ "name" ] )
+        self.owner       = False
+        self._attach()
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: write
+    #
+    #   DESCRIPTION:
+    #       Store one frame's landmarks in a row. A frame without a
+    #       detection has NaN coordinates and zero visibility.
+    #
+    # -----------------------------------------------------------------
+    def write(
+        self,
+        row: int,
+        frame_idx: int,
+        xy: Optional[ npt.NDArray ] = None,
+        visibility: Optional[ npt.NDArray ] = None
+    ) -> None:
+        self.frame_indices[ row ] = frame_idx
+        if xy is None:
+            self.xy[ row ]         = np.nan
+            self.visibility[ row ] = 0.0
+        else:
+            self.xy[ row ]         = xy
+            self.visibility[ row ] = visibility
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: track
+    #
+    #   DESCRIPTION:
+    #       Pose track viewing rows [ start, start + n_rows ).
+    #
+    # -----------------------------------------------------------------
+    def track( self, start: int, n_rows: int, fps: float ) -> PoseTrack:
+        rows = slice( start, start + n_rows )
+        return PoseTrack(
+            xy=self.xy[ rows ],
+            visibility=self.visibility[ rows ],
+            fps=fps,
+            frame_indices=self.frame_indices[ rows ]
+        )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: close
+    #
+    #   DESCRIPTION:
+    #       Detach from the shared memory; the owner also frees it.
+    #
+    # -----------------------------------------------------------------
+    def close( self ) -> None:
+        self.frame_indices = self.xy = self.visibility = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+            self.owner = False
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _layout
+    #
+    #   DESCRIPTION:
+    #       Byte offsets of the index, xy and visibility arrays, and the
+    #       total size.
+    #
+    # -----------------------------------------------------------------
+    def _layout( self ) -> Tuple[ int, int, int, int ]:
+        xy_offset         = _aligned( self.n_frames * 4 )
+        visibility_offset = _aligned( xy_offset + self.n_frames * self.n_landmarks * 2 * 4 )
+        return 0, xy_offset, visibility_offset, visibility_offset + self.n_frames * self.n_landmarks * 4
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _attach
+    #
+    #   DESCRIPTION:
+    #       View the shared memory as the pose arrays.
+    #
+    # -----------------------------------------------------------------
+    def _attach( self ) -> None:
+        index_offset, xy_offset, visibility_offset, _ = self._layout()
+        buffer = self._shm.buf
+        self.frame_indices = np.ndarray( ( self.n_frames, ), dtype=np.int32, buffer=buffer, offset=index_offset )
+        self.xy            = np.ndarray( ( self.n_frames, self.n_landmarks, 2 ), dtype=np.float32, buffer=buffer, offset=xy_offset )
+        self.visibility    = np.ndarray( ( self.n_frames, self.n_landmarks ), dtype=np.float32, buffer=buffer, offset=visibility_offset )
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,478 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+import os
+import shutil
+import sys
+import threading
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   lib                                  import BASE_DIR
+from   swing_analysis_classes.interpolation import PoseInterpolation
+from   swing_analysis_classes.pose_track    import LANDMARK_INDEX, PoseTrack
+from   swing_analysis_classes.segmentation  import Segmentation
+from   typing                               import Iterable, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Location of the swing similarity index built by build_swing_index.py.
+# ---------------------------------------------------------------------
+SIMILARITY_INDEX_DIR = os.environ.get( "SWING_SIMILARITY_INDEX", os.path.join( BASE_DIR, "similarity_index" ) )
+
+# ---------------------------------------------------------------------
+# Landmarks compared between swings, and the number of frames every
+# address to impact window is resampled to.
+# ---------------------------------------------------------------------
+SIMILARITY_LANDMARKS = (
+    "NOSE",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER",
+    "LEFT_ELBOW", "RIGHT_ELBOW",
+    "LEFT_WRIST", "RIGHT_WRIST",
+    "LEFT_HIP", "RIGHT_HIP",
+    "LEFT_KNEE", "RIGHT_KNEE",
+)
+SEQUENCE_LENGTH = 32
+
+# ---------------------------------------------------------------------
+# Embeddings are the flattened sequence projected on its leading
+# principal components, fitted on (a sample of) the indexed swings when
+# the index is built. Swing motion is highly correlated across joints
+# and time, so a few dozen components keep nearly all of the variance;
+# a fixed random projection of the same size loses too much of it to
+# rank candidates for DTW.
+# ---------------------------------------------------------------------
+EMBEDDING_DIM   = 64
+PCA_SAMPLE_SIZE = 20000
+
+# ---------------------------------------------------------------------
+# Search defaults: inverted lists probed per query, candidates kept
+# for exact DTW re-ranking, and the DTW warping band (frames).
+# ---------------------------------------------------------------------
+N_PROBE  = 8
+RERANK   = 64
+DTW_BAND = 4
+
+# ---------------------------------------------------------------------
+# Arrays making up an index on disk, one .npy file each.
+# ---------------------------------------------------------------------
+INDEX_ARRAYS = ( "keys", "embeddings", "sequences", "mean", "components", "centroids", "order", "offsets" )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: swing_sequence
+#
+#   DESCRIPTION:
+#       Normalized ( SEQUENCE_LENGTH, 2 * landmarks ) trajectory of a
+#       gap-filled track between two rows (address and impact). Each
+#       frame is centered on the mid-hip at address and scaled by the
+#       torso length at address, so camera distance and framing drop
+#       out; time is linearly resampled to a fixed length, so tempo
+#       does too. Landmarks never seen are left at the origin.
+#
+# ---------------------------------------------------------------------
+def swing_sequence( track: PoseTrack, start: int, end: int ) -> npt.NDArray[ np.float32 ]:
+    columns = [ LANDMARK_INDEX[ name ] for name in SIMILARITY_LANDMARKS ]
+    window  = np.asarray( track.xy[ start:end + 1 ], dtype=np.float64 )
+    points  = window[ :, columns ]
+
+    # -----------------------------------------------------------------
+    # Body frame at address; if the address frame lacks hips or
+    # shoulders, use the window's median pose instead.
+    # -----------------------------------------------------------------
+    hips      = window[ :, [ LANDMARK_INDEX[ "LEFT_HIP" ], LANDMARK_INDEX[ "RIGHT_HIP" ] ] ].mean( axis=1 )
+    shoulders = window[ :, [ LANDMARK_INDEX[ "LEFT_SHOULDER" ], LANDMARK_INDEX[ "RIGHT_SHOULDER" ] ] ].mean( axis=1 )
+    body      = np.isfinite( hips ).all( axis=1 ) & np.isfinite( shoulders ).all( axis=1 )
+    if body[ 0 ]:
+        origin = hips[ 0 ]
+        torso  = float( np.linalg.norm( shoulders[ 0 ] - hips[ 0 ] ) )
+    elif body.any():
+        origin = np.median( hips[ body ], axis=0 )
+        torso  = float( np.median( np.linalg.norm( shoulders[ body ] - hips[ body ], axis=-1 ) ) )
+    else:
+        origin, torso = np.zeros( 2 ), 1.0
+    if torso <= 1e-6:
+        torso = 1.0
+
+    normalized = np.nan_to_num( ( points - origin ) / torso ).reshape( len( points ), -1 )
+
+    # -----------------------------------------------------------------
+    # Resample to SEQUENCE_LENGTH frames.
+    # -----------------------------------------------------------------
+    source    = np.linspace( 0.0, 1.0, len( normalized ) )
+    target    = np.linspace( 0.0, 1.0, SEQUENCE_LENGTH )
+    resampled = [ np.interp( target, source, normalized[ :, col ] ) for col in range( normalized.shape[ 1 ] ) ]
+    return np.stack( resampled, axis=1 ).astype( np.float32 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: track_sequence
+#
+#   DESCRIPTION:
+#       Gap-fill and segment a raw (stored) pose track and return its
+#       address to impact sequence. Falls back to the whole track when
+#       segmentation finds no usable window; None for an empty track.
+#
+# ---------------------------------------------------------------------
+def track_sequence( raw_track: PoseTrack ) -> Optional[ npt.NDArray[ np.float32 ] ]:
+    if raw_track.n_frames == 0:
+        return None
+
+    track      = PoseInterpolation( raw_track ).pose_track
+    segments   = Segmentation( track.to_pose_data() )
+    start, end = segments.address_frame, segments.impact_frame
+    if start < 0 or end <= start:
+        start, end = 0, track.n_frames - 1
+    return swing_sequence( track, start, end )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: fit_pca
+#
+#   DESCRIPTION:
+#       Mean and ( dim, features ) leading principal components of the
+#       flattened sequences, fitted on a random sample of them.
+#
+# ---------------------------------------------------------------------
+def fit_pca( sequences: npt.NDArray, dim: int = EMBEDDING_DIM, sample: int = PCA_SAMPLE_SIZE, seed: int = 0 ) -> Tuple[ npt.NDArray[ np.float32 ], npt.NDArray[ np.float32 ] ]:
+    rng  = np.random.default_rng( seed )
+    rows = rng.choice( len( sequences ), min( sample, len( sequences ) ), replace=False )
+    flat = np.asarray( sequences[ np.sort( rows ) ], dtype=np.float32 ).reshape( len( rows ), -1 )
+    mean = flat.mean( axis=0 )
+    _, _, components = np.linalg.svd( flat - mean, full_matrices=False )
+    return mean, components[ :dim ].astype( np.float32 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: project
+#
+#   DESCRIPTION:
+#       Embedding(s) of one sequence or a stack of them: the flattened
+#       sequence projected on the fitted components.
+#
+# ---------------------------------------------------------------------
+def project( sequences: npt.NDArray, mean: npt.NDArray, components: npt.NDArray ) -> npt.NDArray[ np.float32 ]:
+    flat = np.asarray( sequences, dtype=np.float32 )
+    flat = flat.reshape( *flat.shape[ :-2 ], -1 )
+    return ( flat - mean ) @ components.T
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: dtw_distances
+#
+#   DESCRIPTION:
+#       Exact DTW distance from one ( L, D ) query sequence to each of
+#       ( C, L, D ) candidate sequences, within a Sakoe-Chiba band,
+#       normalized by path length bound 2 * L. The cells of one
+#       anti-diagonal only depend on earlier anti-diagonals, so the
+#       recurrence runs one anti-diagonal at a time across all
+#       candidates at once.
+#
+# ---------------------------------------------------------------------
+def dtw_distances( query: npt.NDArray, candidates: npt.NDArray, band: int = DTW_BAND ) -> npt.NDArray[ np.float64 ]:
+    query      = np.asarray( query, dtype=np.float32 )
+    candidates = np.asarray( candidates, dtype=np.float32 )
+    n_cand, n  = candidates.shape[ 0 ], query.shape[ 0 ]
+    m          = candidates.shape[ 1 ]
+    band       = max( band, abs( n - m ) )
+
+    cross = np.einsum( "id,cjd->cij", query, candidates )
+    cost  = np.sqrt( np.maximum( ( query ** 2 ).sum( axis=1 )[ None, :, None ] + ( candidates ** 2 ).sum( axis=2 )[ :, None, : ] - 2.0 * cross, 0.0 ) )
+    acc  = np.full( ( n_cand, n + 1, m + 1 ), np.inf )
+    acc[ :, 0, 0 ] = 0.0
+
+    for diagonal in range( 2, n + m + 1 ):
+        i = np.arange( max( 1, diagonal - m ), min( n, diagonal - 1 ) + 1 )
+        j = diagonal - i
+        keep = np.abs( i - j ) <= band
+        i, j = i[ keep ], j[ keep ]
+        if len( i ) == 0:
+            continue
+        best = np.minimum( np.minimum( acc[ :, i - 1, j ], acc[ :, i, j - 1 ] ), acc[ :, i - 1, j - 1 ] )
+        acc[ :, i, j ] = cost[ :, i - 1, j - 1 ] + best
+
+    return acc[ :, n, m ] / ( n + m )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: kmeans
+#
+#   DESCRIPTION:
+#       Lloyd's k-means on a sample of the vectors; returns the
+#       ( n_clusters, dim ) centroids. Empty clusters are re-seeded
+#       from random sample points.
+#
+# ---------------------------------------------------------------------
+def kmeans( vectors: npt.NDArray, n_clusters: int, iterations: int = 10, sample: int = 256, seed: int = 0 ) -> npt.NDArray[ np.float32 ]:
+    rng  = np.random.default_rng( seed )
+    data = np.asarray( vectors, dtype=np.float32 )
+    if len( data ) > n_clusters * sample:
+        data = data[ rng.choice( len( data ), n_clusters * sample, replace=False ) ]
+
+    centroids = data[ rng.choice( len( data ), n_clusters, replace=False ) ].copy()
+    for _ in range( iterations ):
+        labels = nearest_centroids( data, centroids )
+        counts = np.bincount( labels, minlength=n_clusters )
+        sums   = np.zeros_like( centroids )
+        np.add.at( sums, labels, data )
+        empty  = counts == 0
+        centroids[ ~empty ] = sums[ ~empty ] / counts[ ~empty, None ]
+        centroids[ empty ]  = data[ rng.choice( len( data ), int( empty.sum() ) ) ]
+    return centroids
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: nearest_centroids
+#
+#   DESCRIPTION:
+#       Index of the nearest centroid for every vector, computed in
+#       blocks to bound memory.
+#
+# ---------------------------------------------------------------------
+def nearest_centroids( vectors: npt.NDArray, centroids: npt.NDArray, block: int = 65536 ) -> npt.NDArray[ np.int64 ]:
+    labels = np.empty( len( vectors ), dtype=np.int64 )
+    norms  = ( centroids ** 2 ).sum( axis=1 )
+    for start in range( 0, len( vectors ), block ):
+        chunk = np.asarray( vectors[ start:start + block ], dtype=np.float32 )
+        labels[ start:start + block ] = ( norms[ None, : ] - 2.0 * chunk @ centroids.T ).argmin( axis=1 )
+    return labels
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: SimilarityIndex
+#
+#   DESCRIPTION:
+#       Approximate k-NN over swing embeddings with exact DTW
+#       re-ranking. Embeddings (PCA of the sequences) are partitioned
+#       into inverted lists by k-means (IVF); a query scans only the
+#       lists of its N_PROBE nearest centroids, keeps the RERANK
+#       closest embeddings, and re-ranks those by DTW on the stored
+#       sequences (float16).
+#
+#       Lists are stored as one array of row ids sorted by list plus
+#       list offsets, so an index loaded with mmap=True reads only the
+#       rows a query touches.
+#
+# ---------------------------------------------------------------------
+class SimilarityIndex:
+
+    def __init__(
+        self,
+        keys: npt.NDArray,
+        embeddings: npt.NDArray[ np.float32 ],
+        sequences: npt.NDArray[ np.float16 ],
+        mean: npt.NDArray[ np.float32 ],
+        components: npt.NDArray[ np.float32 ],
+        centroids: npt.NDArray[ np.float32 ],
+        order: npt.NDArray[ np.int64 ],
+        offsets: npt.NDArray[ np.int64 ]
+    ) -> None:
+        self.keys       = keys
+        self.embeddings = embeddings
+        self.sequences  = sequences
+        self.mean       = mean
+        self.components = components
+        self.centroids  = centroids
+        self.order      = order
+        self.offsets    = offsets
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: build
+    #
+    #   DESCRIPTION:
+    #       Index the given ( key, sequence ) pairs. The number of lists
+    #       defaults to about the square root of the number of swings.
+    #
+    # -----------------------------------------------------------------
+    @classmethod
+    def build( cls, keys: Iterable[ str ], sequences: npt.NDArray, n_lists: Optional[ int ] = None, seed: int = 0 ) -> "SimilarityIndex":
+        keys      = np.asarray( list( keys ), dtype=str )
+        sequences = np.asarray( sequences, dtype=np.float16 )
+        if len( keys ) != len( sequences ):
+            raise ValueError( "Every sequence needs exactly one key." )
+        if len( keys ) == 0:
+            raise ValueError( "Can't build a similarity index without swings." )
+
+        # -------------------------------------------------------------
+        # Embed, then partition the embeddings into inverted lists.
+        # -------------------------------------------------------------
+        mean, components = fit_pca( sequences, seed=seed )
+        embeddings       = np.concatenate( [
+            project( sequences[ start:start + 65536 ], mean, components ) for start in range( 0, len( keys ), 65536 )
+        ] )
+
+        n_lists   = max( 1, min( n_lists or int( round( np.sqrt( len( keys ) ) ) ), len( keys ) ) )
+        centroids = kmeans( embeddings, n_lists, seed=seed )
+        labels    = nearest_centroids( embeddings, centroids )
+        order     = np.argsort( labels, kind="stable" ).astype( np.int64 )
+        offsets   = np.concatenate( [ [ 0 ], np.cumsum( np.bincount( labels, minlength=n_lists ) ) ] ).astype( np.int64 )
+        return cls( keys, embeddings, sequences, mean, components, centroids, order, offsets )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: load / save
+    #
+    #   DESCRIPTION:
+    #       Read / write an index directory. Saving writes a sibling
+    #       directory and swaps it in, so a reader never sees a mix of
+    #       old and new arrays.
+    #
+    # -----------------------------------------------------------------
+    @classmethod
+    def load( cls, path: str = SIMILARITY_INDEX_DIR, mmap: bool = True ) -> "SimilarityIndex":
+        mode = "r" if mmap else None
+        return cls( **{ name: np.load( os.path.join( path, f"{ name }.npy" ), mmap_mode=mode ) for name in INDEX_ARRAYS } )
+
+
+    def save( self, path: str = SIMILARITY_INDEX_DIR ) -> str:
+        tmp_path = f"{ path }.tmp"
+        old_path = f"{ path }.old"
+        shutil.rmtree( tmp_path, ignore_errors=True )
+        os.makedirs( tmp_path )
+        for name in INDEX_ARRAYS:
+            np.save( os.path.join( tmp_path, f"{ name }.npy" ), getattr( self, name ) )
+
+        shutil.rmtree( old_path, ignore_errors=True )
+        if os.path.isdir( path ):
+            os.replace( path, old_path )
+        os.replace( tmp_path, path )
+        shutil.rmtree( old_path, ignore_errors=True )
+        return path
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: __len__
+    #
+    #   DESCRIPTION:
+    #       Number of indexed swings.
+    #
+    # -----------------------------------------------------------------
+    def __len__( self ) -> int:
+        return len( self.keys )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: embed
+    #
+    #   DESCRIPTION:
+    #       Embedding(s) of one sequence or a stack of them.
+    #
+    # -----------------------------------------------------------------
+    def embed( self, sequences: npt.NDArray ) -> npt.NDArray[ np.float32 ]:
+        return project( sequences, np.asarray( self.mean ), np.asarray( self.components ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: search
+    #
+    #   DESCRIPTION:
+    #       The k swings closest to the query sequence by DTW, as
+    #       ( key, distance ) pairs, nearest first. Keys in `exclude`
+    #       (e.g. the query swing itself) are skipped.
+    #
+    # -----------------------------------------------------------------
+    def search(
+        self,
+        sequence: npt.NDArray,
+        k: int = 5,
+        n_probe: int = N_PROBE,
+        rerank: int = RERANK,
+        exclude: Iterable[ str ] = ()
+    ) -> List[ Tuple[ str, float ] ]:
+        if len( self ) == 0:
+            return []
+
+        # -------------------------------------------------------------
+        # Candidates: rows of the n_probe nearest inverted lists.
+        # -------------------------------------------------------------
+        query   = self.embed( sequence )
+        centers = np.argsort( ( ( self.centroids - query ) ** 2 ).sum( axis=1 ) )[ :max( 1, n_probe ) ]
+        rows    = np.concatenate( [ self.order[ self.offsets[ c ]:self.offsets[ c + 1 ] ] for c in centers ] )
+        rows    = np.sort( rows )
+
+        excluded = set( exclude )
+        if excluded:
+            rows = rows[ ~np.isin( self.keys[ rows ], list( excluded ) ) ]
+        if len( rows ) == 0:
+            return []
+
+        # -------------------------------------------------------------
+        # Keep the closest embeddings, then re-rank them by exact DTW.
+        # -------------------------------------------------------------
+        distances = ( ( np.asarray( self.embeddings[ rows ] ) - query ) ** 2 ).sum( axis=1 )
+        keep      = max( k, rerank )
+        if len( rows ) > keep:
+            best = np.argpartition( distances, keep - 1 )[ :keep ]
+            rows = np.sort( rows[ best ] )
+
+        dtw   = dtw_distances( sequence, np.asarray( self.sequences[ rows ] ) )
+        ranks = np.argsort( dtw, kind="stable" )[ :k ]
+        return [ ( str( self.keys[ rows[ rank ] ] ), float( dtw[ rank ] ) ) for rank in ranks ]
+
+
+_index: Optional[ SimilarityIndex ] = None
+_index_mtime = -1.0
+_index_lock  = threading.Lock()
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: get_similarity_index
+#
+#   DESCRIPTION:
+#       Return the process-wide similarity index (memory-mapped), or
+#       None if none has been built. A rebuilt index is picked up on
+#       the next call.
+#
+# ---------------------------------------------------------------------
+def get_similarity_index() -> Optional[ SimilarityIndex ]:
+    global _index, _index_mtime
+    keys_path = os.path.join( SIMILARITY_INDEX_DIR, "keys.npy" )
+    with _index_lock:
+        try:
+            mtime = os.path.getmtime( keys_path )
+        except OSError:
+            return None
+        if _index is None or mtime != _index_mtime:
+            _index       = SimilarityIndex.load( SIMILARITY_INDEX_DIR )
+            _index_mtime = mtime
+        return _index
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
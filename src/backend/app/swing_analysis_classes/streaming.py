@@ -0,0 +1,612 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import collections
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   swing_analysis_classes.metrics      import rotation_helper, spine_tilt_helper
+from   swing_analysis_classes.segmentation import MOVEMENT_THRESHOLD, STABILITY_WINDOW
+from   typing                              import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment switches: segment and score the swing while it is being
+# decoded, and stop decoding once the follow-through is detected. Early
+# stopping changes which frames are analyzed, so it is opt-in.
+# ---------------------------------------------------------------------
+STREAMING_ENABLED  = os.environ.get( "SWING_STREAMING", "1" ) == "1"
+EARLY_STOP_ENABLED = os.environ.get( "SWING_EARLY_STOP", "0" ) == "1"
+
+# ---------------------------------------------------------------------
+# The follow-through counts as detected once the impact frame has held
+# for FOLLOW_THROUGH_SECONDS, with the wrists at least
+# FOLLOW_THROUGH_MIN_DELTA (normalized) away from their address
+# position the whole time.
+# ---------------------------------------------------------------------
+FOLLOW_THROUGH_SECONDS   = 0.75
+FOLLOW_THROUGH_MIN_DELTA = 0.05
+
+# ---------------------------------------------------------------------
+# Landmarks segmentation and the metrics read. Only these are gap
+# filled and passed on.
+# ---------------------------------------------------------------------
+STREAM_LANDMARKS = (
+    "NOSE",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER",
+    "LEFT_WRIST", "RIGHT_WRIST",
+    "LEFT_HIP", "RIGHT_HIP",
+)
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: hands_position
+#
+#   DESCRIPTION:
+#       Mean norm of the two wrist positions, NaN if either is invalid
+#       (the measure Segmentation uses to find impact).
+#
+# ---------------------------------------------------------------------
+def hands_position( landmarks: Dict[ str, Dict[ str, Any ] ] ) -> float:
+    positions = []
+    for key in [ "LEFT_WRIST", "RIGHT_WRIST" ]:
+        if not landmarks[ key ][ "valid" ]:
+            return np.float64( np.nan )
+        positions.append( np.linalg.norm( [ landmarks[ key ][ "x" ], landmarks[ key ][ "y" ] ] ) )
+    return np.mean( positions )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: StreamingGapFill
+#
+#   DESCRIPTION:
+#       Incremental form of the default PoseInterpolation stage (linear
+#       filling, no smoothing, no gap limit). Frames go in as decoded
+#       and come out filled and in order: a frame is held back only
+#       while one of its landmarks sits in a gap that hasn't closed
+#       yet. Values are rounded exactly as the batch stage rounds them,
+#       so downstream results match the batch pipeline bit for bit.
+#
+# ---------------------------------------------------------------------
+class StreamingGapFill:
+
+    def __init__( self, names: Tuple[ str, ... ] = STREAM_LANDMARKS ) -> None:
+
+        # -------------------------------------------------------------
+        # Landmarks to fill.
+        # -------------------------------------------------------------
+        self.names = names
+
+        # -------------------------------------------------------------
+        # Frames not yet emitted, as [ frame index, { name: ( x, y ) |
+        # None while unresolved | () if never observed } ], and the row
+        # number of the first of them.
+        # -------------------------------------------------------------
+        self._pending: Deque[ List[ Any ] ] = collections.deque()
+        self._base = 0
+        self._rows = 0
+
+        # -------------------------------------------------------------
+        # Per landmark: last observed ( row, x, y ) and the rows of the
+        # gap currently open after it.
+        # -------------------------------------------------------------
+        self._last: Dict[ str, Optional[ Tuple[ int, np.float32, np.float32 ] ] ] = { name: None for name in names }
+        self._open: Dict[ str, List[ int ] ] = { name: [] for name in names }
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: push
+    #
+    #   DESCRIPTION:
+    #       Add one frame's raw landmarks; returns the frames that are
+    #       now complete, in order.
+    #
+    # -----------------------------------------------------------------
+    def push( self, frame_index: int, landmarks: Dict[ str, Dict[ str, Any ] ] ) -> List[ Dict[ str, Any ] ]:
+        row    = self._rows
+        values: Dict[ str, Any ] = {}
+        self._pending.append( [ frame_index, values ] )
+        self._rows += 1
+
+        for name in self.names:
+            landmark = landmarks[ name ]
+            if not landmark[ "valid" ] or landmark[ "x" ] is None:
+                # -----------------------------------------------------
+                # Before the first observation this is a leading gap,
+                # which stays missing; no need to hold the frame back.
+                # -----------------------------------------------------
+                if self._last[ name ] is None:
+                    values[ name ] = ()
+                else:
+                    values[ name ] = None
+                    self._open[ name ].append( row )
+                continue
+
+            x, y = np.float32( landmark[ "x" ] ), np.float32( landmark[ "y" ] )
+            values[ name ] = ( float( x ), float( y ) )
+
+            # ---------------------------------------------------------
+            # Close the gap before this sample by blending from the
+            # last sample.
+            # ---------------------------------------------------------
+            last = self._last[ name ]
+            for gap_row in self._open[ name ]:
+                weight = ( gap_row - last[ 0 ] ) / ( row - last[ 0 ] )
+                filled = (
+                    float( np.float32( np.float64( last[ 1 ] ) + np.float64( x - last[ 1 ] ) * weight ) ),
+                    float( np.float32( np.float64( last[ 2 ] ) + np.float64( y - last[ 2 ] ) * weight ) ),
+                )
+                self._pending[ gap_row - self._base ][ 1 ][ name ] = filled
+            self._open[ name ] = []
+            self._last[ name ] = ( row, x, y )
+
+        return self._drain()
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: finish
+    #
+    #   DESCRIPTION:
+    #       End of the clip: trailing gaps stay missing, as in the batch
+    #       stage. Returns the remaining frames.
+    #
+    # -----------------------------------------------------------------
+    def finish( self ) -> List[ Dict[ str, Any ] ]:
+        for name in self.names:
+            for gap_row in self._open[ name ]:
+                self._pending[ gap_row - self._base ][ 1 ][ name ] = ()
+            self._open[ name ] = []
+        return self._drain()
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _drain
+    #
+    #   DESCRIPTION:
+    #       Pop the complete frames at the head of the queue, as pose
+    #       data frames.
+    #
+    # -----------------------------------------------------------------
+    def _drain( self ) -> List[ Dict[ str, Any ] ]:
+        ready = []
+        while self._pending and all( value is not None for value in self._pending[ 0 ][ 1 ].values() ):
+            frame_index, values = self._pending.popleft()
+            self._base += 1
+            ready.append( {
+                "frame_index": frame_index,
+                "landmarks": {
+                    name: { "x": value[ 0 ], "y": value[ 1 ], "valid": True } if value else { "x": None, "y": None, "valid": False }
+                    for name, value in values.items()
+                },
+            } )
+        return ready
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: StreamingSegmentation
+#
+#   DESCRIPTION:
+#       Incremental Segmentation. The address stability window, the
+#       running wrist maximum (top of backswing) and the best impact
+#       candidate after it are updated as each frame arrives; after
+#       finish() the key frames equal those Segmentation finds on the
+#       same frames, and the same attributes are exposed.
+#
+# ---------------------------------------------------------------------
+class StreamingSegmentation:
+
+    def __init__(
+        self,
+        movement_threshold: float = MOVEMENT_THRESHOLD,
+        stability_window: int = STABILITY_WINDOW
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Movement thresholding used for address detection.
+        # -------------------------------------------------------------
+        self.movement_threshold = movement_threshold
+        self.stability_window   = stability_window
+
+        # -------------------------------------------------------------
+        # Key frames found so far, as positions in the frame sequence.
+        # -------------------------------------------------------------
+        self.address_frame   = -1
+        self.backswing_frame = -1
+        self.impact_frame    = -1
+        self.video_frames: Dict[ str, int ] = {}
+
+        # -------------------------------------------------------------
+        # Per-frame source index and hands position, and the running
+        # state behind each key frame.
+        # -------------------------------------------------------------
+        self.n_frames = 0
+        self._frame_indices: List[ int ] = []
+        self._hands: List[ float ] = []
+
+        self._previous_vector: Optional[ npt.NDArray ] = None
+        self._stable_count  = 0
+        self._address_hands: Optional[ float ] = None
+        self._backswing_y   = float( "-inf" )
+        self._impact_delta  = float( "inf" )
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: push
+    #
+    #   DESCRIPTION:
+    #       Add the next (gap filled) pose data frame.
+    #
+    # -----------------------------------------------------------------
+    def push( self, frame: Dict[ str, Any ] ) -> None:
+        i         = self.n_frames
+        landmarks = frame[ "landmarks" ]
+        self.n_frames += 1
+        self._frame_indices.append( int( frame.get( "frame_index", i ) ) )
+        self._hands.append( hands_position( landmarks ) )
+
+        # -------------------------------------------------------------
+        # Address: first window of consecutive stable frames.
+        # -------------------------------------------------------------
+        if self.address_frame < 0:
+            vector = self._pose_vector( landmarks )
+            if vector is not None and self._previous_vector is not None and np.linalg.norm( vector - self._previous_vector ) < self.movement_threshold:
+                self._stable_count += 1
+            else:
+                self._stable_count = 0
+            self._previous_vector = vector
+
+            if self._stable_count >= self.stability_window:
+                self.address_frame  = i - ( self.stability_window - 1 )
+                self._address_hands = self._hands[ self.address_frame ]
+                self._rescan_impact()
+
+        # -------------------------------------------------------------
+        # Top of backswing: running maximum of the mean wrist y (the
+        # first frame wins ties). A new top restarts the impact search.
+        # -------------------------------------------------------------
+        left, right = landmarks[ "LEFT_WRIST" ], landmarks[ "RIGHT_WRIST" ]
+        hands_y     = ( left[ "y" ] + right[ "y" ] ) / 2.0 if left[ "valid" ] and right[ "valid" ] else float( "-inf" )
+        if i == 0 or hands_y > self._backswing_y:
+            self._backswing_y    = hands_y
+            self.backswing_frame = i
+            self._impact_delta   = float( "inf" )
+            self.impact_frame    = -1
+
+        # -------------------------------------------------------------
+        # Impact: wrists closest to their address position, from the
+        # top of the backswing on.
+        # -------------------------------------------------------------
+        if self._address_hands is not None:
+            self._consider_impact( i )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: finish
+    #
+    #   DESCRIPTION:
+    #       End of the clip. Without a stable address, Segmentation
+    #       compares against the last frame's hands; mirror that, then
+    #       resolve the final key frames.
+    #
+    # -----------------------------------------------------------------
+    def finish( self ) -> None:
+        if self.n_frames and self.address_frame < 0:
+            self._address_hands = self._hands[ -1 ]
+            self._rescan_impact()
+        if self.n_frames and self.impact_frame == -1:
+            self.impact_frame = self.address_frame
+
+        self.video_frames = {
+            "address": self.video_frame( self.address_frame ),
+            "backswing": self.video_frame( self.backswing_frame ),
+            "impact": self.video_frame( self.impact_frame ),
+        }
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: hands_delta
+    #
+    #   DESCRIPTION:
+    #       Distance of the wrists from their address position at the
+    #       given position, NaN if unknown.
+    #
+    # -----------------------------------------------------------------
+    def hands_delta( self, i: int ) -> float:
+        if self._address_hands is None:
+            return float( "nan" )
+        return float( abs( self._hands[ i ] - self._address_hands ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: video_frame
+    #
+    #   DESCRIPTION:
+    #       Source frame index of a position in the frame sequence, -1
+    #       if out of range (e.g. a key frame not found yet).
+    #
+    # -----------------------------------------------------------------
+    def video_frame( self, idx: int ) -> int:
+        if idx < 0 or idx >= self.n_frames:
+            return -1
+        return self._frame_indices[ idx ]
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    def _consider_impact( self, i: int ) -> None:
+        delta = abs( self._hands[ i ] - self._address_hands )
+        if delta < self._impact_delta:
+            self._impact_delta = delta
+            self.impact_frame  = i
+
+
+    def _rescan_impact( self ) -> None:
+        self._impact_delta = float( "inf" )
+        self.impact_frame  = -1
+        for i in range( max( self.backswing_frame, 0 ), self.n_frames ):
+            self._consider_impact( i )
+
+
+    @staticmethod
+    def _pose_vector( landmarks: Dict[ str, Dict[ str, Any ] ] ) -> Optional[ npt.NDArray ]:
+        positions = []
+        for key in [ "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_HIP", "RIGHT_HIP" ]:
+            if not landmarks[ key ][ "valid" ]:
+                return None
+            positions.extend( [ landmarks[ key ][ "x" ], landmarks[ key ][ "y" ] ] )
+        return np.array( positions )
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: StreamingMetrics
+#
+#   DESCRIPTION:
+#       Incremental MetricsCalculator. The per-frame rotation, spine
+#       tilt and head position values are computed as frames arrive;
+#       finish() only aggregates them over the final address ->
+#       backswing / impact ranges.
+#
+# ---------------------------------------------------------------------
+class StreamingMetrics:
+
+    def __init__( self ) -> None:
+
+        # -------------------------------------------------------------
+        # Per-frame series.
+        # -------------------------------------------------------------
+        self._shoulder_angles: List[ float ] = []
+        self._hip_angles: List[ float ] = []
+        self._spine_tilts: List[ float ] = []
+        self._head: List[ Tuple[ float, float ] ] = []
+
+        # -------------------------------------------------------------
+        # Final metrics, filled in by finish().
+        # -------------------------------------------------------------
+        self.metrics: Dict[ str, float ] = {}
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    def push( self, frame: Dict[ str, Any ] ) -> None:
+        nose = frame[ "landmarks" ][ "NOSE" ]
+        self._shoulder_angles.append( rotation_helper( frame, "LEFT_SHOULDER", "RIGHT_SHOULDER" ) )
+        self._hip_angles.append( rotation_helper( frame, "LEFT_HIP", "RIGHT_HIP" ) )
+        self._spine_tilts.append( spine_tilt_helper( frame ) )
+        self._head.append( ( nose[ "x" ], nose[ "y" ] ) if nose[ "valid" ] else ( np.nan, np.nan ) )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: finish
+    #
+    #   DESCRIPTION:
+    #       Aggregate the series over the key frame ranges of a finished
+    #       segmentation. Same keys and values as MetricsCalculator.
+    #
+    # -----------------------------------------------------------------
+    def finish( self, segments: StreamingSegmentation ) -> Dict[ str, float ]:
+        shoulders = np.array( self._shoulder_angles, dtype=np.float64 )
+        hips      = np.array( self._hip_angles, dtype=np.float64 )
+        tilts     = np.array( self._spine_tilts, dtype=np.float64 )
+        head      = np.array( self._head, dtype=np.float64 ).reshape( -1, 2 )
+
+        # -------------------------------------------------------------
+        # Frame positions from address to the top of the backswing and
+        # to impact (a missing address, -1, wraps like list indexing).
+        # -------------------------------------------------------------
+        backswing = np.arange( segments.address_frame, segments.backswing_frame + 1 )
+        impact    = np.arange( segments.address_frame, segments.impact_frame + 1 )
+
+        def __mean( series: npt.NDArray, rows: npt.NDArray ) -> float:
+            return float( np.mean( series[ rows ] ) ) if len( rows ) else 0.0
+
+        def __ptp( series: npt.NDArray, rows: npt.NDArray ) -> float:
+            return float( np.ptp( series[ rows ] ) ) if len( rows ) else 0.0
+
+        def __head_delta( axis: int ) -> float:
+            positions = head[ impact, axis ] if len( impact ) else np.empty( 0 )
+            positions = positions[ ~np.isnan( positions ) ]
+            return float( positions[ -1 ] - positions[ 0 ] ) if len( positions ) else 0.0
+
+        self.metrics = {
+            "shoulder_rotation_range_deg_backswing" : __mean( shoulders, backswing ),
+            "shoulder_rotation_range_deg"           : __ptp( shoulders, impact ),
+            "hip_rotation_range_deg_backswing"      : __mean( hips, backswing ),
+            "hip_rotation_range_deg"                : __ptp( hips, impact ),
+            "spine_tilt_mean_deg"                   : __mean( tilts, impact ),
+            "spine_tilt_range_deg"                  : __ptp( tilts, impact ),
+            "head_movement_x"                       : __head_delta( axis=0 ),
+            "head_movement_y"                       : __head_delta( axis=1 ),
+        }
+        return self.metrics
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: StreamingAnalysis
+#
+#   DESCRIPTION:
+#       Gap filling, segmentation and metrics run frame by frame while
+#       the clip is decoded. The metrics are final as soon as the last
+#       frame has been processed, at which point on_complete is called
+#       (e.g. to start the LLM call while the overlay video is still
+#       being finalized). With early stopping enabled, should_stop
+#       turns True once the follow-through is detected.
+#
+#       Gives the same results as PoseInterpolation (linear, no
+#       smoothing), Segmentation and MetricsCalculator on the same
+#       frames.
+#
+# ---------------------------------------------------------------------
+class StreamingAnalysis:
+
+    def __init__(
+        self,
+        fps: float = 0.0,
+        on_complete: Optional[ Callable[ [ "StreamingAnalysis" ], None ] ] = None,
+        early_stop: bool = EARLY_STOP_ENABLED
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Initialize the stages.
+        # -------------------------------------------------------------
+        self.fps          = fps
+        self.on_complete  = on_complete
+        self.early_stop   = early_stop
+        self.gap_fill     = StreamingGapFill()
+        self.segmentation = StreamingSegmentation()
+        self.metrics_calc = StreamingMetrics()
+
+        # -------------------------------------------------------------
+        # Results and follow-through state.
+        # -------------------------------------------------------------
+        self.metrics: Dict[ str, float ] = {}
+        self.complete     = False
+        self.should_stop  = False
+        self._follow_run  = 0
+        self._impact_seen = -1
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: push
+    #
+    #   DESCRIPTION:
+    #       Feed one decoded frame's raw landmarks, in order.
+    #
+    # -----------------------------------------------------------------
+    def push( self, frame_index: int, landmarks: Dict[ str, Dict[ str, Any ] ] ) -> None:
+        for frame in self.gap_fill.push( frame_index, landmarks ):
+            self._process( frame )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: finish
+    #
+    #   DESCRIPTION:
+    #       Last frame processed: finalize segmentation and metrics and
+    #       notify on_complete.
+    #
+    # -----------------------------------------------------------------
+    def finish( self ) -> Dict[ str, float ]:
+        for frame in self.gap_fill.finish():
+            self._process( frame )
+        self.segmentation.finish()
+        self.metrics  = self.metrics_calc.finish( self.segmentation )
+        self.complete = True
+
+        if self.on_complete is not None:
+            self.on_complete( self )
+        return self.metrics
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    def _process( self, frame: Dict[ str, Any ] ) -> None:
+        self.segmentation.push( frame )
+        self.metrics_calc.push( frame )
+        if self.early_stop:
+            self._update_follow_through()
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _update_follow_through
+    #
+    #   DESCRIPTION:
+    #       Count the frames since an unchanged impact candidate (after
+    #       a stable address and the top of the backswing) during which
+    #       the wrists stayed away from address; enough of them means
+    #       the follow-through is under way.
+    #
+    # -----------------------------------------------------------------
+    def _update_follow_through( self ) -> None:
+        segments = self.segmentation
+        current  = segments.n_frames - 1
+        if segments.address_frame < 0 or segments.impact_frame <= segments.backswing_frame:
+            self._follow_run = 0
+            return
+
+        if segments.impact_frame != self._impact_seen:
+            self._impact_seen = segments.impact_frame
+            self._follow_run  = 0
+        elif segments.hands_delta( current ) >= FOLLOW_THROUGH_MIN_DELTA:
+            self._follow_run += 1
+        else:
+            self._follow_run = 0
+
+        fps = self.fps if self.fps > 0 else 30.0
+        if self._follow_run >= max( 1, round( FOLLOW_THROUGH_SECONDS * fps ) ):
+            self.should_stop = True
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
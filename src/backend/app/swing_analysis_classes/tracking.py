@@ -0,0 +1,248 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+
+from   typing       import Any, Dict, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Force a fresh person detection at least this often (in frames), even
+# if tracking looks healthy. Zero disables periodic re-detection.
+# ---------------------------------------------------------------------
+REDETECT_INTERVAL = 120
+
+# ---------------------------------------------------------------------
+# Tracking is considered collapsed when the mean visibility of the key
+# landmarks stays below COLLAPSE_VISIBILITY for COLLAPSE_FRAMES
+# consecutive frames. This is a visibility, not a tracking confidence:
+# far-side landmarks in down-the-line views and blurred wrists in the
+# downswing routinely sit well below MediaPipe's confidence thresholds
+# while the track is fine, so only a pose that has mostly faded counts.
+# ---------------------------------------------------------------------
+COLLAPSE_VISIBILITY = 0.4
+COLLAPSE_FRAMES     = 2
+
+# ---------------------------------------------------------------------
+# Internal MediaPipe tracking threshold used while the scheduler is in
+# charge. Kept low so MediaPipe doesn't silently fall back to the
+# detector on every brief dip (e.g. motion blur in the downswing); the
+# scheduler decides when re-detection is actually warranted.
+# ---------------------------------------------------------------------
+TRACKER_MIN_CONFIDENCE = 0.3
+
+# ---------------------------------------------------------------------
+# MediaPipe person detection threshold for every pose graph the
+# pipelines build.
+# ---------------------------------------------------------------------
+MIN_DETECTION_CONFIDENCE = 0.8
+
+# ---------------------------------------------------------------------
+# Landmarks whose visibility defines tracking confidence: shoulders,
+# hips and wrists (MediaPipe landmark indices).
+# ---------------------------------------------------------------------
+KEY_LANDMARKS = [ 11, 12, 15, 16, 23, 24 ]
+
+# ---------------------------------------------------------------------
+# ROI motion model. The ROI center and size follow an alpha-beta
+# (constant velocity) filter; a tracked pose whose center lands more
+# than ROI_GATE ROI-sizes from the prediction is treated as a tracking
+# failure.
+# ---------------------------------------------------------------------
+ROI_ALPHA = 0.85
+ROI_BETA  = 0.3
+ROI_GATE  = 0.75
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: TrackingScheduler
+#
+#   DESCRIPTION:
+#       Explicit detect-once, track-after scheduler around a MediaPipe
+#       Pose object running in video (tracking) mode.
+#
+#       The expensive person detector only runs when the scheduler asks
+#       for it, by resetting the graph: on the first frame, on a fixed
+#       cadence, or after tracking confidence collapses. In between,
+#       the landmark model tracks from the previous frame, and an ROI
+#       propagated with a constant velocity model is used to reject
+#       tracks that jump implausibly.
+#
+#       Per-clip counters of detector versus tracker frames are kept in
+#       'stats'. A frame that follows a frame with no pose counts as a
+#       detector frame, because MediaPipe re-detects on its own then.
+#
+# ---------------------------------------------------------------------
+class TrackingScheduler:
+
+    def __init__(
+        self,
+        pose_obj: Any,
+        redetect_interval: int = REDETECT_INTERVAL,
+        collapse_threshold: float = COLLAPSE_VISIBILITY,
+        collapse_frames: int = COLLAPSE_FRAMES
+    ) -> None:
+
+        # -------------------------------------------------------------
+        # Initialize the wrapped model and the scheduling policy.
+        # -------------------------------------------------------------
+        self.pose_obj           = pose_obj
+        self.redetect_interval  = redetect_interval
+        self.collapse_threshold = collapse_threshold
+        self.collapse_frames    = collapse_frames
+
+        # -------------------------------------------------------------
+        # Scheduling state. The first frame always runs the detector.
+        # -------------------------------------------------------------
+        self._need_detection    = True
+        self._frames_since_det  = 0
+        self._low_conf_frames   = 0
+
+        # -------------------------------------------------------------
+        # ROI motion model state: [ cx, cy, size ] and its velocity.
+        # -------------------------------------------------------------
+        self.roi: Optional[ npt.NDArray ] = None
+        self._roi_velocity = np.zeros( 3 )
+
+        # -------------------------------------------------------------
+        # Per-clip invocation counters.
+        # -------------------------------------------------------------
+        self.stats: Dict[ str, int ] = { "detector": 0, "tracker": 0, "collapses": 0 }
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: process
+    #
+    #   DESCRIPTION:
+    #       Run the pose model on one RGB frame, choosing between a
+    #       fresh detection and tracking, and return MediaPipe's result.
+    #
+    # -----------------------------------------------------------------
+    def process( self, image: npt.NDArray ) -> Any:
+
+        # -------------------------------------------------------------
+        # Decide whether this frame should run the detector.
+        # -------------------------------------------------------------
+        cadence_due = self.redetect_interval > 0 and self._frames_since_det >= self.redetect_interval
+        if cadence_due and not self._need_detection:
+            self.pose_obj.reset()
+            self._need_detection = True
+
+        if self._need_detection:
+            self.stats[ "detector" ] += 1
+            self._frames_since_det = 0
+        else:
+            self.stats[ "tracker" ] += 1
+            self._frames_since_det += 1
+
+        # -------------------------------------------------------------
+        # Run the model and score how well tracking is holding up.
+        # -------------------------------------------------------------
+        results = self.pose_obj.process( image=image )
+        self._need_detection = False
+
+        if not results.pose_landmarks:
+            # ---------------------------------------------------------
+            # Lost the person entirely: MediaPipe re-detects next frame.
+            # ---------------------------------------------------------
+            self._need_detection  = True
+            self._low_conf_frames = 0
+            self.roi              = None
+            return results
+
+        landmarks  = results.pose_landmarks.landmark
+        confidence = float( np.mean( [ landmarks[ idx ].visibility for idx in KEY_LANDMARKS ] ) )
+        points     = np.array( [ ( landmarks[ idx ].x, landmarks[ idx ].y ) for idx in KEY_LANDMARKS ] )
+        plausible  = self._update_roi( points )
+
+        # -------------------------------------------------------------
+        # A sustained confidence dip, or a jump the motion model can't
+        # explain, schedules a fresh detection for the next frame.
+        # -------------------------------------------------------------
+        self._low_conf_frames = self._low_conf_frames + 1 if confidence < self.collapse_threshold else 0
+        if self._low_conf_frames >= self.collapse_frames or not plausible:
+            self.stats[ "collapses" ] += 1
+            self.pose_obj.reset()
+            self._need_detection  = True
+            self._low_conf_frames = 0
+            self.roi              = None
+
+        return results
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: redetect
+    #
+    #   DESCRIPTION:
+    #       Drop the current track so the next frame runs the detector,
+    #       e.g. when frames are skipped and the person may have moved.
+    #
+    # -----------------------------------------------------------------
+    def redetect( self ) -> None:
+        if not self._need_detection:
+            self.pose_obj.reset()
+        self._need_detection  = True
+        self._low_conf_frames = 0
+        self.roi              = None
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _update_roi
+    #
+    #   DESCRIPTION:
+    #       Advance the ROI motion model with the observed key points.
+    #       Returns False if the observation falls outside the gate
+    #       around the predicted ROI.
+    #
+    # -----------------------------------------------------------------
+    def _update_roi( self, points: npt.NDArray ) -> bool:
+        lo, hi   = points.min( axis=0 ), points.max( axis=0 )
+        observed = np.array( [ ( lo[ 0 ] + hi[ 0 ] ) / 2, ( lo[ 1 ] + hi[ 1 ] ) / 2, max( hi[ 0 ] - lo[ 0 ], hi[ 1 ] - lo[ 1 ] ) ] )
+
+        # -------------------------------------------------------------
+        # First observation after a detection seeds the model.
+        # -------------------------------------------------------------
+        if self.roi is None:
+            self.roi           = observed
+            self._roi_velocity = np.zeros( 3 )
+            return True
+
+        # -------------------------------------------------------------
+        # Predict, gate, then correct (alpha-beta filter).
+        # -------------------------------------------------------------
+        predicted = self.roi + self._roi_velocity
+        residual  = observed - predicted
+        if np.hypot( residual[ 0 ], residual[ 1 ] ) > ROI_GATE * max( predicted[ 2 ], 1e-3 ):
+            return False
+
+        self.roi           = predicted + ROI_ALPHA * residual
+        self._roi_velocity = self._roi_velocity + ROI_BETA * residual
+        return True
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,15 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Put the app directory on the path so tests import modules the same
+# way the app does ("from services.x import ...").
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.insert( 0, PARENT_DIR )
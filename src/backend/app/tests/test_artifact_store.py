@@ -0,0 +1,98 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import os
+import sqlite3
+import time
+
+from   services.artifact_store import ArtifactStore
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _write
+#
+#   DESCRIPTION:
+#       Allocate an artifact path and write size bytes to it.
+#
+# ---------------------------------------------------------------------
+def _write( store: ArtifactStore, size: int = 100 ) -> str:
+    path = store.allocate( prefix="pose_overlay", suffix=".mp4" )
+    with open( path, "wb" ) as file:
+        file.write( b"\0" * size )
+    return path
+
+
+def test_register_tracks_the_artifact( tmp_path ):
+    store = ArtifactStore( str( tmp_path ) )
+    path  = _write( store )
+    assert store.register( path, kind="pose_overlay" )
+    assert store.status( store.relative_path( path ) ) == "live"
+    assert store.etag( store.relative_path( path ) )
+    assert not store.register( store.allocate( prefix="pose_overlay", suffix=".mp4" ), kind="pose_overlay" )
+
+
+def test_expired_artifacts_leave_tombstones( tmp_path ):
+    store = ArtifactStore( str( tmp_path ), ttl_seconds=0 )
+    path  = _write( store )
+    store.register( path, kind="pose_overlay" )
+    assert store.sweep() == 1
+    assert not os.path.exists( path )
+    assert store.status( store.relative_path( path ) ) == "expired"
+
+
+def test_register_never_evicts_the_new_artifact( tmp_path ):
+    store = ArtifactStore( str( tmp_path ), max_bytes=150 )
+    older = _write( store )
+    store.register( older, kind="pose_overlay" )
+
+    # -----------------------------------------------------------------
+    # Over the cap: the least recently used artifact goes, even though
+    # the new one alone is over the cap too.
+    # -----------------------------------------------------------------
+    newer = _write( store, size=200 )
+    store.register( newer, kind="pose_overlay" )
+    assert not os.path.exists( older )
+    assert os.path.exists( newer )
+    assert store.status( store.relative_path( newer ) ) == "live"
+
+
+def test_sweep_removes_stale_unregistered_files( tmp_path ):
+    store      = ArtifactStore( str( tmp_path ) )
+    registered = _write( store )
+    store.register( registered, kind="pose_overlay" )
+    orphan     = _write( store )
+    fresh      = _write( store )
+
+    past = time.time() - 2 * 60 * 60
+    for path in ( registered, orphan ):
+        os.utime( path, ( past, past ) )
+
+    assert store.sweep() == 1
+    assert os.path.exists( registered )
+    assert not os.path.exists( orphan )
+    assert os.path.exists( fresh )
+
+
+def test_sweeper_survives_database_errors( tmp_path ):
+    store = ArtifactStore( str( tmp_path ), sweep_interval=0.01 )
+    calls = []
+
+    def sweep() -> int:
+        calls.append( 1 )
+        raise sqlite3.OperationalError( "database is locked" )
+
+    store.sweep = sweep
+    store.start_sweeper()
+    deadline = time.time() + 5
+    while len( calls ) < 3 and time.time() < deadline:
+        time.sleep( 0.01 )
+    assert store._sweeper.is_alive()
+    store.stop_sweeper()
+    assert len( calls ) >= 3
@@ -0,0 +1,190 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy as np
+import pytest
+
+from   services                               import cost_model, job_queue
+from   services.cost_model                    import ACCEPT, COST_FEATURES, DEFAULT_COEFFICIENTS, DOWNGRADE, MIN_CALIBRATION_SAMPLES, QUEUE, REJECT, CostModel, VideoProbe, admit, choose_pipeline, features_for
+from   services.job_queue                     import SQLiteJobQueue
+from   swing_analysis_classes.pipeline_config import LLM_SCORER, LOCAL_SCORER, PipelineConfig
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Coefficients the synthetic samples are generated from. The heavy
+# tier never appears in them.
+# ---------------------------------------------------------------------
+TRUE_COEFFICIENTS = {
+    "base": 0.5,
+    "llm": 3.0,
+    "decode": 0.001,
+    "convert": 0.003,
+    "overlay": 0.004,
+    "pose_lite": 0.005,
+    "pose_full": 0.02,
+    "pose_heavy": 0.0
+}
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def model( tmp_path, monkeypatch ) -> CostModel:
+    model = CostModel( str( tmp_path / "costs.sqlite3" ) )
+    monkeypatch.setattr( cost_model, "_model", model )
+    return model
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _observe_synthetic
+#
+#   DESCRIPTION:
+#       Record n analyses of random clips and configurations, timed
+#       exactly by TRUE_COEFFICIENTS.
+#
+# ---------------------------------------------------------------------
+def _observe_synthetic( model: CostModel, n: int ) -> None:
+    rng = np.random.default_rng( 0 )
+    for _ in range( n ):
+        width = int( rng.choice( [ 1280, 1920 ] ) )
+        probe = VideoProbe(
+            frame_count=int( rng.integers( 300, 3000 ) ),
+            fps=float( rng.choice( [ 30.0, 60.0, 240.0 ] ) ),
+            width=width,
+            height=width * 9 // 16
+        )
+        config = {
+            "model_tier": str( rng.choice( [ "lite", "full" ] ) ),
+            "stride": int( rng.integers( 1, 4 ) ),
+            "inference_width": [ None, 720, 480 ][ rng.integers( 3 ) ],
+            "overlay": bool( rng.integers( 2 ) ),
+            "scorer": str( rng.choice( [ LLM_SCORER, LOCAL_SCORER ] ) )
+        }
+        features = features_for( probe, config )
+        model.observe( probe, config, sum( TRUE_COEFFICIENTS[ name ] * value for name, value in zip( COST_FEATURES, features ) ) )
+
+
+def test_defaults_until_enough_samples( model ):
+    _observe_synthetic( model, MIN_CALIBRATION_SAMPLES - 1 )
+    assert model.calibrate() == 0
+    assert model.coefficients == DEFAULT_COEFFICIENTS
+
+
+def test_calibration_recovers_coefficients( model ):
+    _observe_synthetic( model, 200 )
+    assert model.calibrate() == 200
+    for name in COST_FEATURES:
+        expected = DEFAULT_COEFFICIENTS[ name ] if name == "pose_heavy" else TRUE_COEFFICIENTS[ name ]
+        assert model.coefficients[ name ] == pytest.approx( expected, rel=1e-4, abs=1e-9 ), name
+
+
+def test_calibration_never_goes_negative( model ):
+    probe = VideoProbe( frame_count=600, fps=60.0, width=1920, height=1080 )
+    for index in range( 40 ):
+        config = { "model_tier": "full", "stride": 1 + index % 3, "overlay": bool( index % 2 ), "scorer": LLM_SCORER }
+        model.observe( probe, config, 1.0 + ( index % 2 ) * -0.5 )
+    model.calibrate()
+    assert min( model.coefficients.values() ) >= 0.0
+
+
+def test_admit_downgrades_expensive_tiers( model, monkeypatch ):
+    monkeypatch.setattr( cost_model, "ADMISSION_ENABLED", True )
+    probe = VideoProbe( frame_count=2400, fps=240.0, width=1920, height=1080 )
+    costs = { tier: model.predict( probe, { "model_tier": tier } ) for tier in ( "lite", "full", "heavy" ) }
+    monkeypatch.setattr( cost_model, "ADMISSION_DOWNGRADE_SECONDS", ( costs[ "lite" ] + costs[ "full" ] ) / 2 )
+    monkeypatch.setattr( cost_model, "ADMISSION_MAX_SECONDS", costs[ "heavy" ] * 2 )
+
+    admission = admit( probe, "heavy" )
+    assert admission.action == DOWNGRADE
+    assert admission.model_tier == "lite" and admission.tier_override() == "lite"
+    assert admission.predicted_seconds == pytest.approx( costs[ "lite" ] )
+
+
+def test_admit_rejects_and_queues( model, monkeypatch ):
+    monkeypatch.setattr( cost_model, "ADMISSION_ENABLED", True )
+    probe = VideoProbe( frame_count=2400, fps=240.0, width=1920, height=1080 )
+    cost  = model.predict( probe, { "model_tier": "lite" } )
+    monkeypatch.setattr( cost_model, "ADMISSION_DOWNGRADE_SECONDS", cost * 10 )
+
+    monkeypatch.setattr( cost_model, "ADMISSION_MAX_SECONDS", cost / 2 )
+    assert admit( probe, "lite" ).action == REJECT
+
+    monkeypatch.setattr( cost_model, "ADMISSION_MAX_SECONDS", cost * 10 )
+    monkeypatch.setattr( cost_model, "ADMISSION_SYNC_SECONDS", cost / 2 )
+    assert admit( probe, "lite", synchronous=True ).action == QUEUE
+
+    monkeypatch.setattr( cost_model, "ADMISSION_SYNC_SECONDS", cost * 2 )
+    assert admit( probe, "lite", synchronous=True ).action == ACCEPT
+
+
+def test_admit_rejects_on_queue_backlog( model, monkeypatch, tmp_path ):
+    monkeypatch.setattr( cost_model, "ADMISSION_ENABLED", True )
+    monkeypatch.setattr( cost_model, "ADMISSION_MAX_WAIT_SECONDS", 100.0 )
+    monkeypatch.setattr( job_queue, "JOB_WORKERS", 1 )
+    queue = SQLiteJobQueue( str( tmp_path / "jobs.sqlite3" ) )
+    probe = VideoProbe( frame_count=300, fps=30.0, width=1280, height=720 )
+
+    # -----------------------------------------------------------------
+    # Longer queued jobs run after a short one, so only running jobs
+    # hold it up.
+    # -----------------------------------------------------------------
+    for index in range( 3 ):
+        queue.enqueue( str( index ), {}, cost=50.0 )
+    assert admit( probe, "lite", queue=queue ).action == ACCEPT
+
+    for _ in range( 3 ):
+        queue.reserve()
+    admission = admit( probe, "lite", queue=queue )
+    assert admission.action == REJECT
+    assert admission.retry_after == pytest.approx( 50.0, abs=1.0 )
+
+
+def test_choose_pipeline_keeps_full_quality_with_time_to_spare( model ):
+    probe  = VideoProbe( frame_count=600, fps=60.0, width=1920, height=1080 )
+    chosen = choose_pipeline( probe, 1e6, "heavy" )
+    assert chosen.penalty() == 0
+    assert chosen.deadline_seconds == 1e6
+    assert chosen.predicted_seconds == pytest.approx( model.predict( probe, chosen.cost_config() ) )
+
+
+def test_choose_pipeline_gives_up_least_quality_in_time( model ):
+    probe      = VideoProbe( frame_count=2400, fps=240.0, width=1920, height=1080 )
+    candidates = [ ( config, model.predict( probe, config.cost_config() ) ) for config in PipelineConfig.candidates( "heavy", probe.width ) ]
+    deadline   = float( np.median( [ predicted for _, predicted in candidates ] ) )
+
+    chosen = choose_pipeline( probe, deadline, "heavy" )
+    assert chosen.predicted_seconds <= deadline
+    assert chosen.penalty() == min( config.penalty() for config, predicted in candidates if predicted <= deadline )
+    assert chosen.penalty() > 0
+
+
+def test_choose_pipeline_falls_back_to_fastest( model ):
+    probe  = VideoProbe( frame_count=2400, fps=240.0, width=1920, height=1080 )
+    chosen = choose_pipeline( probe, 0.0, "full" )
+    assert chosen.model_tier == "lite"
+    assert chosen.predicted_seconds == pytest.approx(
+        min( model.predict( probe, config.cost_config() ) for config in PipelineConfig.candidates( "full", probe.width ) )
+    )
+    assert chosen.predicted_seconds > chosen.deadline_seconds
+
+
+def test_admit_with_deadline_carries_the_pipeline( model, monkeypatch ):
+    monkeypatch.setattr( cost_model, "ADMISSION_ENABLED", True )
+    monkeypatch.setattr( cost_model, "ADMISSION_DOWNGRADE_SECONDS", 1e6 )
+    monkeypatch.setattr( cost_model, "ADMISSION_MAX_SECONDS", 1e6 )
+    probe    = VideoProbe( frame_count=2400, fps=240.0, width=1920, height=1080 )
+    deadline = model.predict( probe, { "model_tier": "heavy" } ) / 2
+
+    admission = admit( probe, "heavy", deadline_seconds=deadline )
+    assert admission.action == DOWNGRADE
+    assert admission.pipeline is not None and admission.tier_override() is None
+    assert admission.model_tier == admission.pipeline.model_tier
+    assert admission.predicted_seconds <= deadline
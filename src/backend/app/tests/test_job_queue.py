@@ -0,0 +1,160 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import pytest
+import threading
+
+from   services           import job_queue
+from   services.job_queue import DEAD, DONE, LEASE_EXPIRED_ERROR, QUEUED, RUNNING, SQLiteJobQueue
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _queue
+#
+#   DESCRIPTION:
+#       A job queue in a temporary directory, retrying without backoff.
+#
+# ---------------------------------------------------------------------
+def _queue( tmp_path, max_attempts: int = 3 ) -> SQLiteJobQueue:
+    return SQLiteJobQueue( str( tmp_path / "jobs.sqlite3" ), max_attempts=max_attempts, retry_seconds=0 )
+
+
+def test_enqueue_is_idempotent( tmp_path ):
+    queue = _queue( tmp_path )
+    first = queue.enqueue( "a", { "n": 1 } )
+    again = queue.enqueue( "a", { "n": 2 } )
+    assert again.payload == first.payload == { "n": 1 }
+    assert len( queue.pending() ) == 1
+
+
+def test_reserved_job_is_invisible_until_its_lease_expires( tmp_path ):
+    queue = _queue( tmp_path )
+    queue.enqueue( "a", {} )
+
+    job = queue.reserve( visibility_timeout=60 )
+    assert job.state == RUNNING and job.attempts == 1
+    assert queue.reserve() is None
+
+    assert queue.extend( job, visibility_timeout=0 )
+    redelivered = queue.reserve( visibility_timeout=60 )
+    assert redelivered.id == "a" and redelivered.attempts == 2
+    assert redelivered.lease != job.lease
+
+
+def test_lost_lease_cannot_change_the_job( tmp_path ):
+    queue = _queue( tmp_path )
+    queue.enqueue( "a", {} )
+    stale = queue.reserve( visibility_timeout=0 )
+    fresh = queue.reserve( visibility_timeout=60 )
+
+    assert not queue.extend( stale )
+    assert not queue.complete( stale, { "ok": False } )
+    assert queue.fail( stale, "boom" ) is None
+
+    assert queue.complete( fresh, { "ok": True } )
+    job = queue.get( "a" )
+    assert job.state == DONE and job.result == { "ok": True }
+
+
+def test_failures_retry_then_dead_letter( tmp_path ):
+    queue = _queue( tmp_path, max_attempts=2 )
+    queue.enqueue( "a", {} )
+
+    assert queue.fail( queue.reserve(), "first" ) == QUEUED
+    assert queue.fail( queue.reserve(), "second" ) == DEAD
+    assert queue.reserve() is None
+    assert [ job.id for job in queue.dead_letters() ] == [ "a" ]
+    assert queue.get( "a" ).error == "second"
+
+
+def test_fail_without_retry_dead_letters_at_once( tmp_path ):
+    queue = _queue( tmp_path )
+    queue.enqueue( "a", {} )
+    assert queue.fail( queue.reserve(), "bad input", retry=False ) == DEAD
+
+
+def test_expired_lease_on_last_attempt_dead_letters( tmp_path ):
+    queue = _queue( tmp_path, max_attempts=1 )
+    queue.enqueue( "a", {} )
+    queue.reserve( visibility_timeout=0 )
+
+    assert queue.reserve() is None
+    job = queue.get( "a" )
+    assert job.state == DEAD and job.error == LEASE_EXPIRED_ERROR
+
+
+def test_requeue_gives_fresh_attempts( tmp_path ):
+    queue = _queue( tmp_path, max_attempts=1 )
+    queue.enqueue( "a", {} )
+    assert not queue.requeue( "a" )
+
+    queue.fail( queue.reserve(), "boom" )
+    assert queue.requeue( "a" )
+    job = queue.reserve()
+    assert job.id == "a" and job.attempts == 1
+
+
+def test_concurrent_reserves_lease_each_job_once( tmp_path ):
+    queue = _queue( tmp_path )
+    for index in range( 40 ):
+        queue.enqueue( str( index ), {} )
+
+    reserved = []
+    lock     = threading.Lock()
+
+    def drain():
+        while ( job := queue.reserve( visibility_timeout=60 ) ) is not None:
+            with lock:
+                reserved.append( job.id )
+
+    threads = [ threading.Thread( target=drain ) for _ in range( 4 ) ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted( reserved ) == sorted( str( index ) for index in range( 40 ) )
+
+
+def test_shortest_job_first( tmp_path ):
+    queue = _queue( tmp_path )
+    for job_id, cost in ( ( "long", 30.0 ), ( "short", 5.0 ), ( "medium", 10.0 ) ):
+        queue.enqueue( job_id, {}, cost=cost )
+    assert [ queue.reserve().id for _ in range( 3 ) ] == [ "short", "medium", "long" ]
+
+
+def test_aging_lets_long_jobs_through( tmp_path, monkeypatch ):
+    monkeypatch.setattr( job_queue, "JOB_AGING_RATE", 0.1 )
+    queue = _queue( tmp_path )
+    queue.enqueue( "long", {}, cost=30.0 )
+    queue.enqueue( "short", {}, cost=5.0 )
+
+    # -----------------------------------------------------------------
+    # Waiting 300 s takes 30 s off the long job's priority.
+    # -----------------------------------------------------------------
+    with queue._lock:
+        queue._conn.execute( "UPDATE jobs SET created_at = created_at - 300 WHERE id = 'long'" )
+    assert queue.reserve().id == "long"
+
+
+def test_eta_counts_work_ahead( tmp_path, monkeypatch ):
+    monkeypatch.setattr( job_queue, "JOB_WORKERS", 1 )
+    queue = _queue( tmp_path )
+    for job_id, cost in ( ( "a", 10.0 ), ( "b", 20.0 ), ( "c", 40.0 ) ):
+        queue.enqueue( job_id, {}, cost=cost )
+
+    running = queue.reserve()
+    assert running.id == "a"
+    assert queue.eta( running ) == pytest.approx( 10.0, abs=1.0 )
+    assert queue.eta( queue.get( "b" ) ) == pytest.approx( 30.0, abs=1.0 )
+    assert queue.eta( queue.get( "c" ) ) == pytest.approx( 70.0, abs=1.0 )
+    assert queue.backlog_seconds( 15.0 ) == pytest.approx( 10.0, abs=1.0 )
+
+    queue.complete( running, {} )
+    assert queue.eta( queue.get( "a" ) ) is None
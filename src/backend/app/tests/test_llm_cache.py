@@ -0,0 +1,140 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import threading
+import time
+
+from   services.llm_cache import LLMCache, prompt_key
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _counting
+#
+#   DESCRIPTION:
+#       A call returning value, and the list it appends to when run.
+#
+# ---------------------------------------------------------------------
+def _counting( value ):
+    calls = []
+
+    def call():
+        calls.append( value )
+        return value
+
+    return call, calls
+
+
+def test_prompt_key_covers_model_and_system_instruction():
+    keys = {
+        prompt_key( "prompt", "model-a" ),
+        prompt_key( "prompt", "model-b" ),
+        prompt_key( "prompt", "model-a", "system" ),
+        prompt_key( "system\0prompt", "model-a" )
+    }
+    assert len( keys ) == 4
+    assert prompt_key( "prompt", "model-a" ) == prompt_key( "prompt", "model-a", "" )
+
+
+def test_cached_until_ttl_expires():
+    cache       = LLMCache( ttl_seconds=0.05 )
+    call, calls = _counting( "answer" )
+    assert cache.get_or_call( "k", call ) == "answer"
+    assert cache.get_or_call( "k", call ) == "answer"
+    assert len( calls ) == 1 and cache.stats[ "hits" ] == 1
+
+    time.sleep( 0.1 )
+    cache.get_or_call( "k", call )
+    assert len( calls ) == 2
+
+
+def test_zero_ttl_disables_caching():
+    cache       = LLMCache( ttl_seconds=0 )
+    call, calls = _counting( "answer" )
+    cache.get_or_call( "k", call )
+    cache.get_or_call( "k", call )
+    assert len( calls ) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache( ttl_seconds=60, max_entries=2 )
+    for key in ( "a", "b" ):
+        cache.get_or_call( key, lambda key=key: key )
+    cache.get_or_call( "a", lambda: "unused" )
+    cache.get_or_call( "c", lambda: "c" )
+
+    assert cache.get_or_call( "a", lambda: "unused" ) == "a"
+    assert cache.get_or_call( "c", lambda: "unused" ) == "c"
+    assert cache.get_or_call( "b", lambda: "b again" ) == "b again"
+
+
+def test_concurrent_identical_calls_run_once():
+    cache   = LLMCache( ttl_seconds=60 )
+    started = threading.Event()
+    release = threading.Event()
+    calls   = []
+
+    def call():
+        calls.append( 1 )
+        started.set()
+        release.wait( 5 )
+        return "answer"
+
+    results = []
+    leader  = threading.Thread( target=lambda: results.append( cache.get_or_call( "k", call ) ) )
+    leader.start()
+    started.wait( 5 )
+
+    followers = [ threading.Thread( target=lambda: results.append( cache.get_or_call( "k", call ) ) ) for _ in range( 4 ) ]
+    for thread in followers:
+        thread.start()
+    while cache.stats[ "coalesced" ] < len( followers ):
+        time.sleep( 0.001 )
+    release.set()
+    for thread in [ leader, *followers ]:
+        thread.join()
+
+    assert results == [ "answer" ] * 5
+    assert len( calls ) == 1
+    assert cache.stats == { "hits": 0, "coalesced": 4, "calls": 1 }
+
+
+def test_failure_is_shared_but_not_cached():
+    cache   = LLMCache( ttl_seconds=60 )
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait( 5 )
+        raise RuntimeError( "quota" )
+
+    errors = []
+
+    def run():
+        try:
+            cache.get_or_call( "k", failing )
+        except RuntimeError as exc:
+            errors.append( str( exc ) )
+
+    leader = threading.Thread( target=run )
+    leader.start()
+    started.wait( 5 )
+    follower = threading.Thread( target=run )
+    follower.start()
+    while cache.stats[ "coalesced" ] < 1:
+        time.sleep( 0.001 )
+    release.set()
+    leader.join()
+    follower.join()
+    assert errors == [ "quota", "quota" ]
+
+    call, calls = _counting( "answer" )
+    assert cache.get_or_call( "k", call ) == "answer"
+    assert len( calls ) == 1
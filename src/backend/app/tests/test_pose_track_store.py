@@ -0,0 +1,73 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy as np
+import os
+
+from   concurrent.futures                import ThreadPoolExecutor
+from   services.pose_track_store         import PoseTrackStore
+from   swing_analysis_classes.pose_track import LANDMARK_NAMES, PoseTrack
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _track
+#
+#   DESCRIPTION:
+#       A random pose track with a gap, and non-contiguous source
+#       frame indices.
+#
+# ---------------------------------------------------------------------
+def _track( n_frames: int = 20, seed: int = 0 ) -> PoseTrack:
+    rng        = np.random.default_rng( seed )
+    xy         = rng.random( ( n_frames, len( LANDMARK_NAMES ), 2 ), dtype=np.float32 )
+    visibility = rng.random( ( n_frames, len( LANDMARK_NAMES ) ), dtype=np.float32 )
+    xy[ 3:5 ]  = np.nan
+    return PoseTrack( xy=xy, visibility=visibility, fps=240.0, frame_indices=np.arange( n_frames ) * 2 )
+
+
+def test_round_trip( tmp_path ):
+    store = PoseTrackStore( str( tmp_path ) )
+    track = _track()
+    store.save( "abcdef", track )
+
+    for mmap in ( True, False ):
+        loaded = store.load( "abcdef", mmap=mmap )
+        np.testing.assert_array_equal( loaded.xy, track.xy )
+        np.testing.assert_array_equal( loaded.visibility, track.visibility )
+        np.testing.assert_array_equal( loaded.frame_indices, track.frame_indices )
+        assert loaded.fps == track.fps
+    assert list( store.keys() ) == [ "abcdef" ]
+
+
+def test_empty_track_round_trip( tmp_path ):
+    store = PoseTrackStore( str( tmp_path ) )
+    store.save( "abcdef", _track( n_frames=0 ) )
+    assert store.load( "abcdef" ).n_frames == 0
+
+
+def test_concurrent_saves_of_one_key( tmp_path ):
+    store  = PoseTrackStore( str( tmp_path ) )
+    tracks = [ _track( seed=seed ) for seed in range( 4 ) ]
+
+    def save_many( track: PoseTrack ) -> None:
+        for _ in range( 30 ):
+            store.save( "abcdef", track )
+
+    with ThreadPoolExecutor( max_workers=4 ) as pool:
+        for future in [ pool.submit( save_many, track ) for track in tracks ]:
+            future.result()
+
+    # -----------------------------------------------------------------
+    # The surviving file is one complete track, and no temporary files
+    # are left behind.
+    # -----------------------------------------------------------------
+    loaded = store.load( "abcdef", mmap=False )
+    assert any( np.array_equal( loaded.visibility, track.visibility ) for track in tracks )
+    assert os.listdir( os.path.dirname( store.path_for( "abcdef" ) ) ) == [ "abcdef.swpt" ]
@@ -0,0 +1,115 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import math
+import numpy as np
+import pytest
+
+from   swing_analysis_classes.interpolation import PoseInterpolation
+from   swing_analysis_classes.metrics       import MetricsCalculator
+from   swing_analysis_classes.pose_track    import LANDMARK_NAMES, PoseTrack
+from   swing_analysis_classes.segmentation  import Segmentation
+from   swing_analysis_classes.streaming     import STREAM_LANDMARKS, StreamingAnalysis, StreamingGapFill
+from   typing                               import Any, Dict, List
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _synthetic_swing
+#
+#   DESCRIPTION:
+#       Raw pose data for a synthetic swing: a still address, the hands
+#       going back to the top (largest y, as Segmentation measures it)
+#       and returning through impact, then the follow-through. Landmarks are dropped at random, as PoseEstimation
+#       records low-visibility landmarks.
+#
+# ---------------------------------------------------------------------
+def _synthetic_swing( seed: int, n_frames: int = 150, drop_rate: float = 0.15 ) -> List[ Dict[ str, Any ] ]:
+    rng  = np.random.default_rng( seed )
+    base = { name: ( 0.3 + 0.4 * rng.random(), 0.2 + 0.6 * rng.random() ) for name in LANDMARK_NAMES }
+
+    pose_data = []
+    for frame_idx in range( n_frames ):
+        phase = max( frame_idx - 30, 0 ) / ( n_frames - 30 )
+        lift  = math.sin( math.pi * phase / 0.8 ) * 0.3
+        turn  = math.sin( math.pi * phase / 0.8 ) * 0.1
+
+        landmarks = {}
+        for name, ( x, y ) in base.items():
+            if "WRIST" in name:
+                x, y = x + turn, y + lift
+            elif "SHOULDER" in name or "HIP" in name:
+                x = x + turn * ( 0.5 if "LEFT" in name else -0.5 )
+            x += rng.normal( 0, 1e-4 )
+            y += rng.normal( 0, 1e-4 )
+
+            if frame_idx > 0 and rng.random() < drop_rate:
+                landmarks[ name ] = { "x": None, "y": None, "valid": False }
+            else:
+                landmarks[ name ] = { "x": float( x ), "y": float( y ), "valid": True }
+        pose_data.append( { "frame_index": 1000 + frame_idx, "landmarks": landmarks } )
+    return pose_data
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _batch
+#
+#   DESCRIPTION:
+#       The batch pipeline on raw pose data: linear gap fill, then
+#       Segmentation and MetricsCalculator.
+#
+# ---------------------------------------------------------------------
+def _batch( raw: List[ Dict[ str, Any ] ] ):
+    track     = PoseInterpolation( PoseTrack.from_pose_data( raw, fps=120.0 ) ).pose_track
+    pose_data = track.to_pose_data()
+    segments  = Segmentation( pose_data )
+    return pose_data, segments, MetricsCalculator( pose_data=pose_data, segments=segments ).metrics
+
+
+def _same( a: float, b: float ) -> bool:
+    return ( math.isnan( a ) and math.isnan( b ) ) or a == b
+
+
+@pytest.mark.parametrize( "seed", range( 5 ) )
+def test_gap_fill_matches_batch_interpolation( seed ):
+    raw          = _synthetic_swing( seed )
+    pose_data, _ = _batch( raw )[ :2 ]
+
+    gap_fill = StreamingGapFill()
+    streamed = [ frame for source in raw for frame in gap_fill.push( source[ "frame_index" ], source[ "landmarks" ] ) ]
+    streamed += gap_fill.finish()
+
+    assert [ frame[ "frame_index" ] for frame in streamed ] == [ frame[ "frame_index" ] for frame in pose_data ]
+    for mine, theirs in zip( streamed, pose_data ):
+        for name in STREAM_LANDMARKS:
+            assert mine[ "landmarks" ][ name ][ "x" ] == theirs[ "landmarks" ][ name ][ "x" ]
+            assert mine[ "landmarks" ][ name ][ "y" ] == theirs[ "landmarks" ][ name ][ "y" ]
+
+
+@pytest.mark.parametrize( "seed", range( 5 ) )
+def test_streaming_matches_batch( seed ):
+    raw = _synthetic_swing( seed )
+    _, segments, metrics = _batch( raw )
+
+    completed = []
+    stream    = StreamingAnalysis( fps=120.0, on_complete=completed.append )
+    for frame in raw:
+        stream.push( frame[ "frame_index" ], frame[ "landmarks" ] )
+    streamed = stream.finish()
+
+    assert completed == [ stream ]
+    assert 0 <= segments.address_frame < segments.backswing_frame < segments.impact_frame < len( raw ) - 1
+    assert ( stream.segmentation.address_frame, stream.segmentation.backswing_frame, stream.segmentation.impact_frame ) == (
+        segments.address_frame, segments.backswing_frame, segments.impact_frame
+    )
+    assert stream.segmentation.video_frames == segments.video_frames
+    assert streamed.keys() == metrics.keys()
+    for name in metrics:
+        assert _same( streamed[ name ], metrics[ name ] ), name
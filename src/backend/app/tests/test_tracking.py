@@ -0,0 +1,104 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+from   swing_analysis_classes.tracking import TrackingScheduler
+from   types                           import SimpleNamespace
+from   typing                          import List, Optional, Tuple
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: FakePose
+#
+#   DESCRIPTION:
+#       Stand-in for a MediaPipe Pose graph that plays back a script of
+#       poses, one per process() call: ( visibility, x offset ) for a
+#       person, or None for no pose. Counts reset() calls.
+#
+# ---------------------------------------------------------------------
+class FakePose:
+
+    def __init__( self, script: List[ Optional[ Tuple[ float, float ] ] ] ) -> None:
+        self.script = list( script )
+        self.resets = 0
+
+    def process( self, image ):
+        frame = self.script.pop( 0 )
+        if frame is None:
+            return SimpleNamespace( pose_landmarks=None )
+        visibility, offset = frame
+        landmarks = [
+            SimpleNamespace( x=0.4 + offset + 0.2 * ( idx % 2 ), y=0.3 + 0.4 * ( idx % 3 ) / 2, visibility=visibility )
+            for idx in range( 33 )
+        ]
+        return SimpleNamespace( pose_landmarks=SimpleNamespace( landmark=landmarks ) )
+
+    def reset( self ) -> None:
+        self.resets += 1
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _run
+#
+#   DESCRIPTION:
+#       Feed a script through a scheduler; returns the scheduler.
+#
+# ---------------------------------------------------------------------
+def _run( script, **kwargs ) -> TrackingScheduler:
+    scheduler = TrackingScheduler( FakePose( script ), **kwargs )
+    for _ in range( len( script ) ):
+        scheduler.process( None )
+    return scheduler
+
+
+def test_steady_track_detects_once():
+    scheduler = _run( [ ( 0.9, 0.0 ) ] * 10, redetect_interval=0 )
+    assert scheduler.stats == { "detector": 1, "tracker": 9, "collapses": 0 }
+    assert scheduler.pose_obj.resets == 0
+
+
+def test_redetects_on_cadence():
+    scheduler = _run( [ ( 0.9, 0.0 ) ] * 8, redetect_interval=3 )
+    assert scheduler.stats[ "detector" ] == 2
+    assert scheduler.stats[ "tracker" ] == 6
+    assert scheduler.pose_obj.resets == 1
+
+
+def test_sustained_low_visibility_collapses():
+    script    = [ ( 0.9, 0.0 ), ( 0.1, 0.0 ), ( 0.9, 0.0 ), ( 0.1, 0.0 ), ( 0.1, 0.0 ), ( 0.9, 0.0 ) ]
+    scheduler = _run( script, redetect_interval=0, collapse_frames=2 )
+    assert scheduler.stats == { "detector": 2, "tracker": 4, "collapses": 1 }
+    assert scheduler.pose_obj.resets == 1
+
+
+def test_implausible_jump_collapses():
+    scheduler = _run( [ ( 0.9, 0.0 ), ( 0.9, 0.01 ), ( 0.9, 0.5 ), ( 0.9, 0.5 ) ], redetect_interval=0 )
+    assert scheduler.stats[ "collapses" ] == 1
+    assert scheduler.stats[ "detector" ] == 2
+    assert scheduler.roi is not None
+
+
+def test_lost_pose_counts_as_detection_without_reset():
+    scheduler = _run( [ ( 0.9, 0.0 ), None, ( 0.9, 0.3 ), ( 0.9, 0.3 ) ], redetect_interval=0 )
+    assert scheduler.stats == { "detector": 2, "tracker": 2, "collapses": 0 }
+    assert scheduler.pose_obj.resets == 0
+
+
+def test_redetect_resets_once():
+    scheduler = TrackingScheduler( FakePose( [ ( 0.9, 0.0 ) ] * 2 ), redetect_interval=0 )
+    scheduler.process( None )
+    scheduler.redetect()
+    scheduler.redetect()
+    scheduler.process( None )
+    assert scheduler.pose_obj.resets == 1
+    assert scheduler.stats[ "detector" ] == 2
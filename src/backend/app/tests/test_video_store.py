@@ -0,0 +1,90 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import io
+import os
+import time
+
+from   services.job_queue   import DEAD, DONE, SQLiteJobQueue
+from   services.video_store import VideoStore
+from   worker               import Worker
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _setup
+#
+#   DESCRIPTION:
+#       A video store and job queue in a temporary directory, with one
+#       stored video and a job for it.
+#
+# ---------------------------------------------------------------------
+def _setup( tmp_path, job_id: str = "a" ):
+    store = VideoStore( str( tmp_path / "videos" ) )
+    queue = SQLiteJobQueue( str( tmp_path / "jobs.sqlite3" ), max_attempts=1, retry_seconds=0 )
+    key   = store.put( io.BytesIO( b"video" ) )
+    queue.enqueue( job_id, { "video_hash": key } )
+    return store, queue, key
+
+
+def _worker( store: VideoStore, queue: SQLiteJobQueue, run_job ) -> Worker:
+    worker = Worker( queue, store=store, visibility_timeout=30 )
+    worker.run_job = run_job
+    return worker
+
+
+def test_put_deduplicates_and_bumps_mtime( tmp_path ):
+    store = VideoStore( str( tmp_path ) )
+    key   = store.put( io.BytesIO( b"video" ) )
+    os.utime( store.path_for( key ), ( 0, 0 ) )
+    assert store.put( io.BytesIO( b"video" ) ) == key
+    assert os.path.getmtime( store.path_for( key ) ) > 0
+    assert [ name for name in os.listdir( tmp_path ) if name.endswith( ".tmp" ) ] == []
+
+
+def test_done_job_releases_its_video( tmp_path ):
+    store, queue, key = _setup( tmp_path )
+    os.utime( store.path_for( key ), ( 0, 0 ) )
+    _worker( store, queue, lambda job: { "ok": True } ).run( once=True )
+    assert queue.get( "a" ).state == DONE
+    assert not store.exists( key )
+
+
+def test_dead_job_releases_its_video( tmp_path ):
+    store, queue, key = _setup( tmp_path )
+    os.utime( store.path_for( key ), ( 0, 0 ) )
+
+    def run_job( job ):
+        raise RuntimeError( "boom" )
+
+    _worker( store, queue, run_job ).run( once=True )
+    assert queue.get( "a" ).state == DEAD
+    assert not store.exists( key )
+
+
+def test_video_shared_with_a_queued_job_is_kept( tmp_path ):
+    store, queue, key = _setup( tmp_path )
+    os.utime( store.path_for( key ), ( 0, 0 ) )
+    queue.enqueue( "b", { "video_hash": key } )
+    assert queue.video_in_use( key )
+
+    worker = _worker( store, queue, lambda job: { "ok": True } )
+    worker.process( queue.reserve() )
+    assert store.exists( key )
+
+    worker.run( once=True )
+    assert not store.exists( key )
+
+
+def test_video_uploaded_again_is_kept( tmp_path ):
+    store, queue, key = _setup( tmp_path )
+    job = queue.reserve()
+    queue.complete( job, {} )
+    assert not store.release( key, queue, since=time.time() - 60 )
+    assert store.exists( key )
@@ -0,0 +1,321 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import cv2
+import numpy        as np
+import numpy.typing as npt
+import os
+
+from   abc          import ABC, abstractmethod
+from   typing       import Any, Iterator, Optional, Tuple
+
+# ---------------------------------------------------------------------
+# PyAV is optional. When installed it decodes with FFmpeg's own frame
+# and slice threading and converts / scales in one swscale pass.
+# ---------------------------------------------------------------------
+try:
+    import av
+except ImportError:
+    av = None
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment defaults: backend ("auto", "opencv" or "pyav"), decode
+# threads (0 lets FFmpeg decide) and whether OpenCV may use hardware
+# decoding when the build supports it.
+# ---------------------------------------------------------------------
+DECODER_BACKEND = os.environ.get( "SWING_DECODER", "auto" )
+DECODE_THREADS  = int( os.environ.get( "SWING_DECODE_THREADS", 0 ) )
+DECODE_HW_ACCEL = os.environ.get( "SWING_DECODE_HW_ACCEL", "1" ) == "1"
+
+# ---------------------------------------------------------------------
+# Supported output pixel formats and their PyAV / OpenCV equivalents.
+# ---------------------------------------------------------------------
+PIXEL_FORMATS    = ( "bgr", "rgb", "gray" )
+AV_PIXEL_FORMATS = { "bgr": "bgr24", "rgb": "rgb24", "gray": "gray" }
+CV2_CONVERSIONS  = { "bgr": None, "rgb": cv2.COLOR_BGR2RGB, "gray": cv2.COLOR_BGR2GRAY }
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: open_decoder
+#
+#   DESCRIPTION:
+#       Open a clip with the configured backend. "auto" prefers PyAV
+#       when it is installed and falls back to OpenCV.
+#
+# ---------------------------------------------------------------------
+def open_decoder( path: str, backend: Optional[ str ] = None, **options: Any ) -> "Decoder":
+    backend = backend or DECODER_BACKEND
+    if backend == "auto":
+        backend = "pyav" if av is not None else "opencv"
+
+    if backend == "pyav":
+        return PyAVDecoder( path, **options )
+    if backend == "opencv":
+        return OpenCVDecoder( path, **options )
+    raise ValueError( f"Unknown decoder backend: { backend }" )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: Decoder
+#
+#   DESCRIPTION:
+#       Common interface of the video decoders. Frames come out in the
+#       requested pixel format ("bgr", "rgb" or "gray") and, if a width
+#       is given, downscaled to that width with the aspect ratio kept,
+#       so callers don't need a separate conversion or resize pass.
+#
+#       Iterating yields ( source frame index, image ) pairs.
+#
+# ---------------------------------------------------------------------
+class Decoder( ABC ):
+
+    backend = ""
+
+    def __init__(
+        self,
+        path: str,
+        threads: int = DECODE_THREADS,
+        pixel_format: str = "bgr",
+        width: Optional[ int ] = None
+    ) -> None:
+
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError( f"Unknown pixel format: { pixel_format }" )
+
+        # -------------------------------------------------------------
+        # Initialize the decode options.
+        # -------------------------------------------------------------
+        self.path         = path
+        self.threads      = threads
+        self.pixel_format = pixel_format
+        self.scale_width  = width
+
+        # -------------------------------------------------------------
+        # Stream properties, filled in by the backend.
+        # -------------------------------------------------------------
+        self.fps           = 0.0
+        self.frame_count   = 0
+        self.source_width  = 0
+        self.source_height = 0
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: output_size
+    #
+    #   DESCRIPTION:
+    #       ( width, height ) of the frames this decoder returns. Sizes
+    #       are kept even, which swscale and most encoders require.
+    #
+    # -----------------------------------------------------------------
+    def output_size( self ) -> Tuple[ int, int ]:
+        if not self.scale_width or self.scale_width >= self.source_width:
+            return self.source_width, self.source_height
+        height = round( self.source_height * self.scale_width / self.source_width )
+        return self.scale_width - self.scale_width % 2, max( 2, height - height % 2 )
+
+    # -----------------------------------------------------------------
+    # Backend hooks: seek to a source frame, iterate frames from the
+    # current position, and release the stream.
+    # -----------------------------------------------------------------
+
+    @abstractmethod
+    def seek( self, frame_index: int ) -> None:
+        ...
+
+
+    @abstractmethod
+    def __iter__( self ) -> Iterator[ Tuple[ int, npt.NDArray[ np.uint8 ] ] ]:
+        ...
+
+
+    @abstractmethod
+    def close( self ) -> None:
+        ...
+
+
+    def __enter__( self ) -> "Decoder":
+        return self
+
+
+    def __exit__( self, *exc_info: Any ) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: OpenCVDecoder
+#
+#   DESCRIPTION:
+#       Decoder on OpenCV's FFmpeg backend. The decode thread count and
+#       hardware acceleration are passed as open parameters; builds that
+#       don't accept them are detected and opened with defaults.
+#       Conversion and scaling run on the BGR frames OpenCV returns,
+#       resizing first so the conversion touches fewer pixels.
+#
+# ---------------------------------------------------------------------
+class OpenCVDecoder( Decoder ):
+
+    backend = "opencv"
+
+    def __init__( self, path: str, **options: Any ) -> None:
+        super().__init__( path, **options )
+
+        # -------------------------------------------------------------
+        # Probe for threading / hardware acceleration support.
+        # -------------------------------------------------------------
+        params = []
+        if self.threads > 0:
+            params += [ cv2.CAP_PROP_N_THREADS, self.threads ]
+        if DECODE_HW_ACCEL:
+            params += [ cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY ]
+
+        self.cap = cv2.VideoCapture( path, cv2.CAP_FFMPEG, params ) if params else cv2.VideoCapture( path )
+        if params and not self.cap.isOpened():
+            self.cap = cv2.VideoCapture( path )
+        if not self.cap.isOpened():
+            raise FileNotFoundError( f"Could not open video: { path }" )
+
+        self.fps           = self.cap.get( cv2.CAP_PROP_FPS )
+        self.frame_count   = max( int( self.cap.get( cv2.CAP_PROP_FRAME_COUNT ) ), 0 )
+        self.source_width  = int( self.cap.get( cv2.CAP_PROP_FRAME_WIDTH ) )
+        self.source_height = int( self.cap.get( cv2.CAP_PROP_FRAME_HEIGHT ) )
+        self._next_index   = 0
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    def seek( self, frame_index: int ) -> None:
+        if frame_index > 0:
+            self.cap.set( cv2.CAP_PROP_POS_FRAMES, frame_index )
+        self._next_index = frame_index
+
+
+    def __iter__( self ) -> Iterator[ Tuple[ int, npt.NDArray[ np.uint8 ] ] ]:
+        size       = self.output_size()
+        resize     = size != ( self.source_width, self.source_height )
+        conversion = CV2_CONVERSIONS[ self.pixel_format ]
+        while True:
+            ret, frame = self.cap.read()
+            if not ret:
+                return
+            if resize:
+                frame = cv2.resize( frame, size, interpolation=cv2.INTER_AREA )
+            if conversion is not None:
+                frame = cv2.cvtColor( frame, conversion )
+
+            index = self._next_index
+            self._next_index += 1
+            yield index, frame
+
+
+    def close( self ) -> None:
+        self.cap.release()
+
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: PyAVDecoder
+#
+#   DESCRIPTION:
+#       Decoder on PyAV. Uses FFmpeg frame threading, and converts the
+#       decoder's native YUV frames straight to the requested format
+#       and size in a single swscale call.
+#
+# ---------------------------------------------------------------------
+class PyAVDecoder( Decoder ):
+
+    backend = "pyav"
+
+    def __init__( self, path: str, **options: Any ) -> None:
+        if av is None:
+            raise RuntimeError( "The PyAV decoder backend requires the 'av' package." )
+        super().__init__( path, **options )
+
+        try:
+            self.container = av.open( path )
+        except av.error.FFmpegError as exc:
+            raise FileNotFoundError( f"Could not open video: { path }" ) from exc
+
+        # -------------------------------------------------------------
+        # Configure threading on the video stream.
+        # -------------------------------------------------------------
+        self.stream = self.container.streams.video[ 0 ]
+        self.stream.thread_type = "AUTO"
+        if self.threads > 0:
+            self.stream.codec_context.thread_count = self.threads
+
+        rate               = self.stream.average_rate or self.stream.guessed_rate
+        self.fps           = float( rate ) if rate else 0.0
+        self.frame_count   = self.stream.frames
+        self.source_width  = self.stream.codec_context.width
+        self.source_height = self.stream.codec_context.height
+        self._start_index  = 0
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: seek
+    #
+    #   DESCRIPTION:
+    #       Seek to the keyframe at or before frame_index; frames before
+    #       it are decoded and dropped while iterating.
+    #
+    # -----------------------------------------------------------------
+    def seek( self, frame_index: int ) -> None:
+        self._start_index = frame_index
+        if frame_index > 0 and self.fps > 0:
+            offset = int( frame_index / self.fps / self.stream.time_base ) + ( self.stream.start_time or 0 )
+            self.container.seek( offset, stream=self.stream, backward=True )
+
+
+    def __iter__( self ) -> Iterator[ Tuple[ int, npt.NDArray[ np.uint8 ] ] ]:
+        width, height = self.output_size()
+        av_format     = AV_PIXEL_FORMATS[ self.pixel_format ]
+        start_pts     = self.stream.start_time or 0
+        index         = None
+
+        for frame in self.container.decode( self.stream ):
+            # ---------------------------------------------------------
+            # Source frame index from the presentation time, counting
+            # on from there (robust to missing timestamps).
+            # ---------------------------------------------------------
+            if index is None:
+                index = round( float( ( frame.pts - start_pts ) * self.stream.time_base ) * self.fps ) if frame.pts is not None else 0
+            else:
+                index += 1
+            if index < self._start_index:
+                continue
+
+            image = frame.reformat( width=width, height=height, format=av_format ).to_ndarray()
+            yield index, image
+
+
+    def close( self ) -> None:
+        self.container.close()
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
@@ -0,0 +1,197 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import os
+import struct
+
+from   typing import BinaryIO, List, Tuple
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Atoms whose children may contain chunk offset tables (stco / co64).
+# ---------------------------------------------------------------------
+CONTAINER_ATOMS = { b"moov", b"trak", b"mdia", b"minf", b"stbl" }
+
+# ---------------------------------------------------------------------
+# Buffer size used when copying the (large) media data atom.
+# ---------------------------------------------------------------------
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _read_top_level_atoms
+#
+#   DESCRIPTION:
+#       Walk the top-level atoms of an MP4 file and return a list of
+#       ( type, offset, size ) tuples. Handles 64-bit sizes and the
+#       "extends to end of file" size of zero.
+#
+# ---------------------------------------------------------------------
+def _read_top_level_atoms( file: BinaryIO, file_size: int ) -> List[ Tuple[ bytes, int, int ] ]:
+    atoms  = []
+    offset = 0
+    while offset + 8 <= file_size:
+        file.seek( offset )
+        size, kind = struct.unpack( ">I4s", file.read( 8 ) )
+        if size == 1:
+            size = struct.unpack( ">Q", file.read( 8 ) )[ 0 ]
+        elif size == 0:
+            size = file_size - offset
+
+        # -------------------------------------------------------------
+        # A size smaller than the header means the file is corrupt;
+        # bail out rather than loop forever.
+        # -------------------------------------------------------------
+        if size < 8:
+            raise ValueError( f"Malformed MP4 atom '{ kind.decode( 'latin-1' ) }' at offset { offset }" )
+
+        atoms.append( ( kind, offset, size ) )
+        offset += size
+    return atoms
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _shift_chunk_offsets
+#
+#   DESCRIPTION:
+#       Recursively walk the moov atom and add 'shift' to every entry
+#       of the stco (32-bit) and co64 (64-bit) chunk offset tables, in
+#       place. Raises OverflowError if a 32-bit offset no longer fits.
+#
+# ---------------------------------------------------------------------
+def _shift_chunk_offsets( moov: bytearray, start: int, end: int, shift: int ) -> None:
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from( ">I4s", moov, offset )
+        header = 8
+        if size == 1:
+            size   = struct.unpack_from( ">Q", moov, offset + 8 )[ 0 ]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            raise ValueError( f"Malformed MP4 atom '{ kind.decode( 'latin-1' ) }' inside moov" )
+
+        # -------------------------------------------------------------
+        # Descend into containers, patch offset tables, skip the rest.
+        # -------------------------------------------------------------
+        if kind in CONTAINER_ATOMS:
+            _shift_chunk_offsets( moov, offset + header, offset + size, shift )
+
+        elif kind in ( b"stco", b"co64" ):
+            # ---------------------------------------------------------
+            # Full box: 1 byte version, 3 bytes flags, 4 byte count.
+            # ---------------------------------------------------------
+            table     = offset + header + 4
+            count     = struct.unpack_from( ">I", moov, table )[ 0 ]
+            entry_fmt = ">I" if kind == b"stco" else ">Q"
+            entry_len = struct.calcsize( entry_fmt )
+            for i in range( count ):
+                pos   = table + 4 + i * entry_len
+                value = struct.unpack_from( entry_fmt, moov, pos )[ 0 ] + shift
+                if kind == b"stco" and value > 0xFFFFFFFF:
+                    raise OverflowError( "Chunk offset no longer fits in stco" )
+                struct.pack_into( entry_fmt, moov, pos, value )
+
+        offset += size
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: make_faststart
+#
+#   DESCRIPTION:
+#       Rewrite an MP4 so the moov (index) atom precedes the mdat
+#       (media) atom, allowing browsers to begin playback before the
+#       whole file has downloaded. This is the same transformation as
+#       "ffmpeg -movflags +faststart" / qt-faststart, done without
+#       re-encoding.
+#
+#       The file is rewritten through a temporary file and atomically
+#       replaced; the temporary file is removed if anything fails.
+#       Returns True if the file was rewritten, False if it was already
+#       faststart, malformed, or couldn't be safely relocated.
+#
+# ---------------------------------------------------------------------
+def make_faststart( path: str ) -> bool:
+
+    file_size = os.path.getsize( path )
+    tmp_path  = f"{ path }.faststart"
+    try:
+        with open( path, "rb" ) as src:
+
+            # ---------------------------------------------------------
+            # Locate the moov and first mdat atoms.
+            # ---------------------------------------------------------
+            try:
+                atoms = _read_top_level_atoms( src, file_size )
+            except ValueError:
+                return False
+            kinds = [ kind for kind, _, _ in atoms ]
+            if b"moov" not in kinds or b"mdat" not in kinds:
+                return False
+
+            moov_idx = kinds.index( b"moov" )
+            mdat_idx = kinds.index( b"mdat" )
+            if moov_idx < mdat_idx:
+                return False
+
+            # ---------------------------------------------------------
+            # Load the moov atom and shift its chunk offsets by its own
+            # size, since it's about to be inserted ahead of the media.
+            # ---------------------------------------------------------
+            _, moov_offset, moov_size = atoms[ moov_idx ]
+            src.seek( moov_offset )
+            moov = bytearray( src.read( moov_size ) )
+            header = 16 if struct.unpack_from( ">I", moov, 0 )[ 0 ] == 1 else 8
+            try:
+                _shift_chunk_offsets( moov, header, moov_size, moov_size )
+            except ( OverflowError, ValueError ):
+                return False
+
+            # ---------------------------------------------------------
+            # Write every atom back out in the original order, with moov
+            # moved in front of the first mdat.
+            # ---------------------------------------------------------
+            with open( tmp_path, "wb" ) as dst:
+                for idx, ( kind, offset, size ) in enumerate( atoms ):
+                    if idx == moov_idx:
+                        continue
+                    if idx == mdat_idx:
+                        dst.write( moov )
+                    src.seek( offset )
+                    remaining = size
+                    while remaining > 0:
+                        chunk = src.read( min( COPY_BUFFER_SIZE, remaining ) )
+                        if not chunk:
+                            break
+                        dst.write( chunk )
+                        remaining -= len( chunk )
+
+        # -------------------------------------------------------------
+        # Swap the rewritten file into place.
+        # -------------------------------------------------------------
+        os.replace( tmp_path, path )
+    finally:
+        if os.path.exists( tmp_path ):
+            os.remove( tmp_path )
+    return True
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
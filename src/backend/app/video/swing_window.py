@@ -0,0 +1,284 @@
+
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import numpy        as np
+import numpy.typing as npt
+import os
+import sys
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+sys.path.append( PARENT_DIR )
+
+from   typing        import List, Optional, Tuple
+from   video.decoder import open_decoder
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Deployment switch for the pre-pass.
+# ---------------------------------------------------------------------
+SWING_WINDOW_ENABLED = os.environ.get( "SWING_WINDOW_PREPASS", "1" ) == "1"
+
+# ---------------------------------------------------------------------
+# Width (pixels) of the grayscale thumbnails motion is measured on.
+# ---------------------------------------------------------------------
+THUMB_WIDTH = 64
+
+# ---------------------------------------------------------------------
+# Motion energy is smoothed over SMOOTH_SECONDS, long enough that a
+# single-frame jump (cut, exposure change) can't outscore the sustained
+# motion of a swing. A frame is "active" when its energy is above the
+# noise floor by ACTIVE_FRACTION of the peak's height, and the swing
+# ends on either side once the clip has been quiet for QUIET_SECONDS.
+# ---------------------------------------------------------------------
+SMOOTH_SECONDS  = 0.25
+ACTIVE_FRACTION = 0.15
+QUIET_SECONDS   = 0.4
+
+# ---------------------------------------------------------------------
+# Peak motion (mean absolute gray level change per pixel) below which
+# no swing window is reported and the whole clip is analyzed.
+# ---------------------------------------------------------------------
+MIN_PEAK_ENERGY = 1.0
+
+# ---------------------------------------------------------------------
+# Padding kept around the detected motion. The leading pad must cover
+# the still address position that segmentation looks for.
+# ---------------------------------------------------------------------
+PAD_BEFORE_SECONDS = 1.0
+PAD_AFTER_SECONDS  = 0.5
+
+# ---------------------------------------------------------------------
+# Session recordings (many swings in one clip): a burst counts as a
+# swing candidate when its peak reaches SESSION_PEAK_FRACTION of the
+# strongest burst's height above the noise floor and its motion lasts
+# at least MIN_SWING_SECONDS. At most MAX_SESSION_SWINGS are reported.
+# ---------------------------------------------------------------------
+SESSION_PEAK_FRACTION = 0.25
+MIN_SWING_SECONDS     = 0.3
+MAX_SESSION_SWINGS    = int( os.environ.get( "SWING_SESSION_MAX_SWINGS", 100 ) )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: motion_energy
+#
+#   DESCRIPTION:
+#       Decode the clip once and return the per-frame motion energy
+#       (mean absolute difference between consecutive grayscale
+#       thumbnails) and the clip's frame rate. No pose model is used.
+#
+# ---------------------------------------------------------------------
+def motion_energy( video_path: str ) -> Tuple[ npt.NDArray[ np.float32 ], float ]:
+
+    # -----------------------------------------------------------------
+    # Decode straight to small grayscale thumbnails; with the PyAV
+    # backend the scale and conversion happen inside the decoder.
+    # -----------------------------------------------------------------
+    with open_decoder( video_path, pixel_format="gray", width=THUMB_WIDTH ) as decoder:
+        fps      = decoder.fps or 30.0
+        energy   = []
+        previous = None
+        for _, thumb in decoder:
+            thumb = thumb.astype( np.float32 )
+            energy.append( 0.0 if previous is None else float( np.mean( np.abs( thumb - previous ) ) ) )
+            previous = thumb
+
+    return np.array( energy, dtype=np.float32 ), fps
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _smooth
+#
+#   DESCRIPTION:
+#       Motion energy smoothed over SMOOTH_SECONDS, so short spikes
+#       (compression noise, flicker, cuts) can't outscore a swing.
+#
+# ---------------------------------------------------------------------
+def _smooth( energy: npt.NDArray[ np.float32 ], fps: float ) -> npt.NDArray[ np.float64 ]:
+    width = max( 1, round( SMOOTH_SECONDS * fps ) )
+    return np.convolve( energy, np.ones( width ) / width, mode="same" )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: _extend_burst
+#
+#   DESCRIPTION:
+#       Walk out from a peak on both sides until a quiet run of `quiet`
+#       frames (or a blocked frame) is reached. Returns the first and
+#       last active frames of the burst.
+#
+# ---------------------------------------------------------------------
+def _extend_burst(
+    active: npt.NDArray[ np.bool_ ],
+    peak: int,
+    quiet: int,
+    blocked: Optional[ npt.NDArray[ np.bool_ ] ] = None
+) -> Tuple[ int, int ]:
+    n_frames = len( active )
+
+    def __extend( step: int ) -> int:
+        idx, edge, run = peak, peak, 0
+        while 0 <= idx + step < n_frames and run < quiet:
+            idx += step
+            if blocked is not None and blocked[ idx ]:
+                break
+            if active[ idx ]:
+                edge, run = idx, 0
+            else:
+                run += 1
+        return edge
+
+    return __extend( -1 ), __extend( 1 )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: window_from_energy
+#
+#   DESCRIPTION:
+#       Find the swing in a motion energy signal: the burst around the
+#       strongest motion, extended on both sides until the clip goes
+#       quiet, then padded. Returns ( start, end ) frame indices with
+#       end exclusive, or None if there is no clear swing.
+#
+# ---------------------------------------------------------------------
+def window_from_energy( energy: npt.NDArray[ np.float32 ], fps: float ) -> Optional[ Tuple[ int, int ] ]:
+    n_frames = len( energy )
+    if n_frames < 2:
+        return None
+
+    smoothed = _smooth( energy, fps )
+    peak     = int( np.argmax( smoothed ) )
+    floor    = float( np.median( smoothed ) )
+    if smoothed[ peak ] < MIN_PEAK_ENERGY or smoothed[ peak ] <= floor:
+        return None
+
+    # -----------------------------------------------------------------
+    # Walk out from the peak until a quiet run is long enough.
+    # -----------------------------------------------------------------
+    active      = smoothed > floor + ACTIVE_FRACTION * ( smoothed[ peak ] - floor )
+    quiet       = max( 1, round( QUIET_SECONDS * fps ) )
+    first, last = _extend_burst( active, peak, quiet )
+
+    start = first - round( PAD_BEFORE_SECONDS * fps )
+    end   = last + 1 + round( PAD_AFTER_SECONDS * fps )
+    return max( 0, start ), min( n_frames, end )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: windows_from_energy
+#
+#   DESCRIPTION:
+#       Find every swing in the motion energy of a session recording.
+#       Bursts are taken strongest first, each extended like the single
+#       swing window but never into a burst already found, until the
+#       remaining motion is too weak to be a swing. Returns the padded
+#       ( start, end ) windows in time order; where the padding of two
+#       neighbours would overlap they are split halfway between the
+#       bursts.
+#
+# ---------------------------------------------------------------------
+def windows_from_energy( energy: npt.NDArray[ np.float32 ], fps: float, max_swings: int = MAX_SESSION_SWINGS ) -> List[ Tuple[ int, int ] ]:
+    n_frames = len( energy )
+    if n_frames < 2:
+        return []
+
+    smoothed = _smooth( energy, fps )
+    floor    = float( np.median( smoothed ) )
+    top      = float( smoothed.max() )
+    if top < MIN_PEAK_ENERGY or top <= floor:
+        return []
+
+    # -----------------------------------------------------------------
+    # Take bursts strongest first. Each burst is measured against its
+    # own peak, so a softer swing isn't swallowed by the noise floor
+    # that suits the strongest one.
+    # -----------------------------------------------------------------
+    min_peak  = max( MIN_PEAK_ENERGY, floor + SESSION_PEAK_FRACTION * ( top - floor ) )
+    min_len   = max( 1, round( MIN_SWING_SECONDS * fps ) )
+    quiet     = max( 1, round( QUIET_SECONDS * fps ) )
+    claimed   = np.zeros( n_frames, dtype=bool )
+    remaining = smoothed.copy()
+    bursts: List[ Tuple[ int, int ] ] = []
+    while len( bursts ) < max_swings:
+        peak = int( np.argmax( remaining ) )
+        if remaining[ peak ] < min_peak:
+            break
+
+        active      = smoothed > floor + ACTIVE_FRACTION * ( smoothed[ peak ] - floor )
+        first, last = _extend_burst( active, peak, quiet, blocked=claimed )
+        claimed[ first:last + 1 ]   = True
+        remaining[ first:last + 1 ] = -np.inf
+        if last + 1 - first >= min_len:
+            bursts.append( ( first, last ) )
+
+    # -----------------------------------------------------------------
+    # Pad in time order, splitting the gap between close neighbours.
+    # -----------------------------------------------------------------
+    bursts.sort()
+    pad_before = round( PAD_BEFORE_SECONDS * fps )
+    pad_after  = round( PAD_AFTER_SECONDS * fps )
+    windows: List[ Tuple[ int, int ] ] = []
+    for idx, ( first, last ) in enumerate( bursts ):
+        start = max( 0, first - pad_before )
+        end   = min( n_frames, last + 1 + pad_after )
+        if idx > 0:
+            start = max( start, ( bursts[ idx - 1 ][ 1 ] + 1 + first ) // 2 )
+        if idx + 1 < len( bursts ):
+            end = min( end, ( last + 1 + bursts[ idx + 1 ][ 0 ] ) // 2 )
+        windows.append( ( start, end ) )
+    return windows
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: find_swing_window
+#
+#   DESCRIPTION:
+#       Cheap pre-pass over a clip that returns the frame range worth
+#       running pose estimation on, as ( start, end ) with end
+#       exclusive, or None to analyze the whole clip.
+#
+# ---------------------------------------------------------------------
+def find_swing_window( video_path: str ) -> Optional[ Tuple[ int, int ] ]:
+    energy, fps = motion_energy( video_path )
+    return window_from_energy( energy, fps )
+
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: find_swing_windows
+#
+#   DESCRIPTION:
+#       Cheap pre-pass over a session recording that returns the frame
+#       range of every swing, as ( start, end ) with end exclusive, in
+#       time order.
+#
+# ---------------------------------------------------------------------
+def find_swing_windows( video_path: str, max_swings: int = MAX_SESSION_SWINGS ) -> List[ Tuple[ int, int ] ]:
+    energy, fps = motion_energy( video_path )
+    return windows_from_energy( energy, fps, max_swings=max_swings )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
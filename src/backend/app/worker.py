@@ -0,0 +1,238 @@
+
+
+#
+# Inference worker. Consumes analysis jobs from the job queue (see
+# services/job_queue.py) and runs the full swing analysis on them.
+# Videos are read from the shared video store by content hash; run as
+# many workers, on as many nodes, as the queue needs.
+#
+# backend/app> python worker.py --concurrency 2
+#
+
+# -----------------------------------------------------------------------------
+#                                  IMPORTS
+# -----------------------------------------------------------------------------
+
+import argparse
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+# ---------------------------------------------------------------------
+# Add the parent directory to the system path to allow for relative
+# imports.
+# ---------------------------------------------------------------------
+PARENT_DIR = os.path.dirname( os.path.abspath( __file__ ) )
+sys.path.append( PARENT_DIR )
+
+from services.cost_model               import choose_pipeline, probe_video
+from services.job_queue                import DEAD, JOB_QUEUE_URL, JOB_VISIBILITY_SECONDS, Job, JobQueue, open_job_queue
+from services.video_store              import VideoStore
+from swing_analysis_classes.main       import Analyze
+from swing_analysis_classes.model_tier import choose_model_tier
+from typing                            import Any, Dict, List, Optional
+
+# -----------------------------------------------------------------------------
+#                                 CONSTANTS
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+# Idle wait between queue polls when there is no work.
+# ---------------------------------------------------------------------
+WORKER_POLL_SECONDS = float( os.environ.get( "SWING_WORKER_POLL_SECONDS", 1.0 ) )
+
+logger = logging.getLogger( "swing.worker" )
+
+# -----------------------------------------------------------------------------
+#                                 PROCEDURES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   PROCEDURE NAME: parse_args
+#
+#   DESCRIPTION:
+#       Command-line interface.
+#
+# ---------------------------------------------------------------------
+def parse_args( argv: List[ str ] ) -> argparse.Namespace:
+    parser = argparse.ArgumentParser( description="Run swing analysis jobs from the job queue." )
+    parser.add_argument( "--queue", default=JOB_QUEUE_URL, help="Job queue URL (redis://... or an SQLite path)." )
+    parser.add_argument( "--concurrency", type=int, default=1, help="Jobs run at once by this worker." )
+    parser.add_argument( "--visibility-timeout", type=float, default=JOB_VISIBILITY_SECONDS, help="Job lease length in seconds." )
+    parser.add_argument( "--once", action="store_true", help="Exit once the queue is empty." )
+    return parser.parse_args( argv )
+
+# -----------------------------------------------------------------------------
+#                                  CLASSES
+# -----------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------
+#
+#   CLASS NAME: Worker
+#
+#   DESCRIPTION:
+#       Reserves jobs from the queue and runs them. While a job runs
+#       its lease is extended in the background, so only a worker that
+#       actually died lets the job be redelivered. Jobs whose video is
+#       missing from the store fail permanently; any other error is
+#       retried until the queue dead-letters the job. Once a job is
+#       done or dead its video is removed from the store, unless
+#       another job still needs it.
+#
+# ---------------------------------------------------------------------
+class Worker:
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        store: Optional[ VideoStore ] = None,
+        visibility_timeout: float = JOB_VISIBILITY_SECONDS,
+        poll_seconds: float = WORKER_POLL_SECONDS
+    ) -> None:
+        self.queue              = queue
+        self.store              = store or VideoStore()
+        self.visibility_timeout = visibility_timeout
+        self.poll_seconds       = poll_seconds
+        self.stop_event         = threading.Event()
+
+    # -----------------------------------------------------------------
+    #                        PUBLIC METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: run
+    #
+    #   DESCRIPTION:
+    #       Process jobs until stopped (or, with once=True, until the
+    #       queue has no visible job left).
+    #
+    # -----------------------------------------------------------------
+    def run( self, once: bool = False ) -> None:
+        while not self.stop_event.is_set():
+            job = self.queue.reserve( visibility_timeout=self.visibility_timeout )
+            if job is None:
+                if once:
+                    return
+                self.stop_event.wait( self.poll_seconds )
+                continue
+            self.process( job )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: process
+    #
+    #   DESCRIPTION:
+    #       Run one reserved job and record its result or failure.
+    #
+    # -----------------------------------------------------------------
+    def process( self, job: Job ) -> None:
+        done      = threading.Event()
+        heartbeat = threading.Thread( target=self._heartbeat, args=( job, done ), daemon=True )
+        heartbeat.start()
+        finished  = False
+        try:
+            result = self.run_job( job )
+        except FileNotFoundError as error:
+            logger.warning( "Job %s failed permanently: %s", job.id, error )
+            self.queue.fail( job, str( error ), retry=False )
+        except Exception as error:
+            logger.exception( "Job %s failed on attempt %d", job.id, job.attempts )
+            finished = self.queue.fail( job, f"{ type( error ).__name__ }: { error }" ) == DEAD
+        else:
+            finished = self.queue.complete( job, result )
+            if not finished:
+                logger.warning( "Job %s finished after its lease was lost; result dropped", job.id )
+        finally:
+            done.set()
+            heartbeat.join()
+
+        # -------------------------------------------------------------
+        # A done or dead job no longer needs its video.
+        # -------------------------------------------------------------
+        if finished:
+            self.store.release( job.payload[ "video_hash" ], self.queue, since=job.created_at )
+
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: run_job
+    #
+    #   DESCRIPTION:
+    #       Analyze the job's video straight from the video store and
+    #       return the same response the synchronous endpoint gives.
+    #       A job with a deadline has its pipeline configured for the
+    #       time left of it now that the job starts.
+    #
+    # -----------------------------------------------------------------
+    def run_job( self, job: Job ) -> Dict[ str, Any ]:
+        video_hash = job.payload[ "video_hash" ]
+        video_path = self.store.path_for( video_hash )
+        if not os.path.isfile( video_path ):
+            raise FileNotFoundError( f"Video { video_hash } is not in the video store." )
+
+        pipeline = None
+        if job.payload.get( "deadline_seconds" ) is not None:
+            probe    = probe_video( video_path )
+            tier     = choose_model_tier( job.payload.get( "model_tier" ), n_frames=probe.analyzed_frames() )
+            pipeline = choose_pipeline( probe, job.created_at + job.payload[ "deadline_seconds" ] - time.time(), tier )
+
+        output = Analyze(
+            video_path=video_path,
+            camera_angle=job.payload[ "camera_angle" ],
+            experience_level=job.payload[ "experience_level" ],
+            metadata=job.payload.get( "metadata" ),
+            model_tier=job.payload.get( "model_tier" ),
+            video_hash=video_hash,
+            golfer=job.payload.get( "golfer" ),
+            club=job.payload.get( "club" ),
+            pipeline=pipeline
+        )
+        return output.response()
+
+    # -----------------------------------------------------------------
+    #                        PRIVATE METHODS
+    # -----------------------------------------------------------------
+
+    # -----------------------------------------------------------------
+    #
+    #   PROCEDURE NAME: _heartbeat
+    #
+    #   DESCRIPTION:
+    #       Extend the job's lease every third of the visibility timeout
+    #       until the job is done or the lease is lost.
+    #
+    # -----------------------------------------------------------------
+    def _heartbeat( self, job: Job, done: threading.Event ) -> None:
+        while not done.wait( self.visibility_timeout / 3 ):
+            if not self.queue.extend( job, visibility_timeout=self.visibility_timeout ):
+                logger.warning( "Lost the lease on job %s", job.id )
+                return
+
+# -----------------------------------------------------------------------------
+#                                 EXECUTION
+# -----------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    args = parse_args( sys.argv[ 1: ] )
+    logging.basicConfig( level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s" )
+
+    # -----------------------------------------------------------------
+    # One Worker per concurrent job, all sharing the queue. SIGTERM /
+    # SIGINT stop them after their current job.
+    # -----------------------------------------------------------------
+    queue   = open_job_queue( args.queue )
+    workers = [ Worker( queue, visibility_timeout=args.visibility_timeout ) for _ in range( max( 1, args.concurrency ) ) ]
+    for signum in ( signal.SIGINT, signal.SIGTERM ):
+        signal.signal( signum, lambda *_: [ worker.stop_event.set() for worker in workers ] )
+
+    threads = [ threading.Thread( target=worker.run, kwargs={ "once": args.once } ) for worker in workers ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()